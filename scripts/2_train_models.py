@@ -7,16 +7,23 @@ import pandas as pd
 import numpy as np
 import pickle
 from pathlib import Path
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.metrics import log_loss, roc_auc_score
 from sklearn.preprocessing import StandardScaler
 import lightgbm as lgb
 from tensorflow import keras
-from tensorflow.keras import layers
 import sys
 
 # Ajouter le dossier parent
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from src.config import MODEL_CONFIG
+from src.drift import DriftProfile
+from src.ensemble import fit_stacking_ensemble
+from src.quartiers import N_QUARTIERS, UNKNOWN_CODE, decode_quartiers, embedding_index, encode_quartiers
+from src.features import TIME_FEATURES, add_time_features
+from src.timeseries import detect_date_column
+from src.models import build_lstm_model, reset_unseen_embeddings
+from src.model_bundle import read_manifest, save_bundle
 
 print("=" * 80)
 print("🤖 ENTRAÎNEMENT MODÈLES - DONNÉES CSV LOCALES (70,000 lignes)")
@@ -65,10 +72,78 @@ print("-" * 80)
 feature_cols = MODEL_CONFIG['features']
 target_col = MODEL_CONFIG['target']
 
-print(f"Features utilisées ({len(feature_cols)}) :")
+print(f"Features utilisées ({len(feature_cols)} + {', '.join(MODEL_CONFIG['categorical_features'])}) :")
 for i, feat in enumerate(feature_cols, 1):
     print(f"  {i}. {feat}")
 
+# Quartier en code entier du registre (src/quartiers.py) : catégorielle native
+# pour LightGBM, embedding pour le LSTM
+codes = encode_quartiers(df['quartier'])
+inconnus = int((codes == UNKNOWN_CODE).sum())
+if inconnus:
+    print(f"⚠️ {inconnus} lignes avec un quartier hors registre (traité comme inconnu)")
+
+
+def with_quartier(X_scaled, quartier_codes):
+    """Entrée LightGBM : features normalisées + code du quartier (NaN si inconnu)."""
+    return np.column_stack([X_scaled, np.where(quartier_codes >= 0, quartier_codes, np.nan)])
+
+
+def lstm_inputs(X_scaled, quartier_codes):
+    """Entrées du LSTM : séquences (n, 1, features) et index d'embedding (n, 1)."""
+    n = len(X_scaled)
+    return [X_scaled.reshape(n, 1, -1), embedding_index(quartier_codes, N_QUARTIERS + 1, n).reshape(n, 1)]
+
+
+def validation_split(y_fit):
+    """Indices (ajustement, validation) : la validation sert à l'arrêt anticipé, jamais le jeu de test."""
+    return train_test_split(np.arange(len(y_fit)), test_size=MODEL_CONFIG['validation_size'],
+                            random_state=MODEL_CONFIG['random_state'], stratify=y_fit)
+
+
+def train_lgbm(X_lgb, y_fit):
+    """LightGBM avec arrêt anticipé sur une validation tirée de X_lgb (modèle final et plis)."""
+    fit_idx, val_idx = validation_split(y_fit)
+    fit_data = lgb.Dataset(X_lgb[fit_idx], label=y_fit[fit_idx], categorical_feature=quartier_col)
+    val_data = lgb.Dataset(X_lgb[val_idx], label=y_fit[val_idx], reference=fit_data)
+    return lgb.train(
+        MODEL_CONFIG['lgbm_params'],
+        fit_data,
+        num_boost_round=MODEL_CONFIG['lgbm_num_boost_round'],
+        valid_sets=[val_data],
+        callbacks=[lgb.early_stopping(stopping_rounds=MODEL_CONFIG['lgbm_early_stopping_rounds'], verbose=False)]
+    )
+
+
+def train_lstm(X_lstm, y_fit, verbose=0):
+    """LSTM avec arrêt anticipé sur une validation tirée de X_lstm (modèle final et plis)."""
+    fit_idx, val_idx = validation_split(y_fit)
+    model = build_lstm_model(X_lstm[0].shape[2], N_QUARTIERS, MODEL_CONFIG['quartier_embedding_dim'])
+    model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
+    model.fit(
+        [x[fit_idx] for x in X_lstm], y_fit[fit_idx],
+        validation_data=([x[val_idx] for x in X_lstm], y_fit[val_idx]),
+        epochs=MODEL_CONFIG['lstm_epochs'],
+        batch_size=32,
+        verbose=verbose,
+        callbacks=[keras.callbacks.EarlyStopping(patience=MODEL_CONFIG['lstm_patience'], restore_best_weights=True)]
+    )
+    # Quartiers absents de l'ajustement et ligne des inconnus : vecteur moyen (au lieu des poids initiaux)
+    reset_unseen_embeddings(model, np.unique(X_lstm[1][fit_idx]))
+    return model
+
+# Features temporelles recalculées depuis la date, avec le même code que
+# l'application (src/features.py) : aucun écart d'encodage entraînement / service
+date_col = detect_date_column(df)
+if date_col is not None:
+    df_features = add_time_features(df, date_col)
+    ecarts = int((df_features[TIME_FEATURES].to_numpy() != df[TIME_FEATURES].to_numpy()).any(axis=1).sum())
+    if ecarts:
+        print(f"⚠️ {ecarts} lignes du CSV avaient un encodage temporel différent (recalculé)")
+    df = df_features
+else:
+    print("⚠️ Pas de colonne de date : features temporelles du CSV utilisées telles quelles")
+
 X = df[feature_cols].values
 y = df[target_col].values
 
@@ -84,8 +159,8 @@ print(f"  Coupures : {y.sum()} ({y.mean()*100:.2f}%)")
 print("\n🔀 ÉTAPE 3 : Split train/test (80/20)")
 print("-" * 80)
 
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y,
+X_train, X_test, y_train, y_test, c_train, c_test = train_test_split(
+    X, y, codes,
     test_size=MODEL_CONFIG['test_size'],
     random_state=MODEL_CONFIG['random_state'],
     stratify=y
@@ -116,36 +191,18 @@ print(f"  Écarts-types : {scaler.scale_[:4]}")
 print("\n🌳 ÉTAPE 5 : Entraînement LightGBM")
 print("-" * 80)
 
-lgb_params = {
-    'objective': 'binary',
-    'metric': 'binary_logloss',
-    'boosting_type': 'gbdt',
-    'num_leaves': 31,
-    'learning_rate': 0.05,
-    'feature_fraction': 0.9,
-    'bagging_fraction': 0.8,
-    'bagging_freq': 5,
-    'verbose': -1,
-    'random_state': 42
-}
-
-train_data = lgb.Dataset(X_train_scaled, label=y_train)
-test_data = lgb.Dataset(X_test_scaled, label=y_test, reference=train_data)
+X_train_lgb = with_quartier(X_train_scaled, c_train)
+X_test_lgb = with_quartier(X_test_scaled, c_test)
+quartier_col = [X_train_scaled.shape[1]]
 
-print("🔄 Entraînement en cours...")
-lgb_model = lgb.train(
-    lgb_params,
-    train_data,
-    num_boost_round=100,
-    valid_sets=[test_data],
-    callbacks=[lgb.early_stopping(stopping_rounds=10)]
-)
+print("🔄 Entraînement en cours (arrêt anticipé sur une validation tirée du jeu d'entraînement)...")
+lgb_model = train_lgbm(X_train_lgb, y_train)
 
 # Évaluation
-y_pred_lgb = lgb_model.predict(X_test_scaled)
+y_pred_lgb = lgb_model.predict(X_test_lgb)
 accuracy_lgb = ((y_pred_lgb > 0.5) == y_test).mean()
 
-print(f"✅ LightGBM entraîné")
+print(f"✅ LightGBM entraîné ({lgb_model.best_iteration or lgb_model.num_trees()} arbres)")
 print(f"  Précision test : {accuracy_lgb*100:.2f}%")
 print(f"  Prédiction moyenne : {y_pred_lgb.mean()*100:.2f}%")
 
@@ -156,37 +213,12 @@ print(f"  Prédiction moyenne : {y_pred_lgb.mean()*100:.2f}%")
 print("\n🧠 ÉTAPE 6 : Entraînement LSTM")
 print("-" * 80)
 
-# Reshape pour LSTM (samples, timesteps, features)
-X_train_lstm = X_train_scaled.reshape(-1, 1, X_train_scaled.shape[1])
-X_test_lstm = X_test_scaled.reshape(-1, 1, X_test_scaled.shape[1])
-
-# Modèle LSTM
-lstm_model = keras.Sequential([
-    layers.LSTM(64, input_shape=(1, X_train_scaled.shape[1]), return_sequences=True),
-    layers.Dropout(0.2),
-    layers.LSTM(32),
-    layers.Dropout(0.2),
-    layers.Dense(16, activation='relu'),
-    layers.Dense(1, activation='sigmoid')
-])
-
-lstm_model.compile(
-    optimizer='adam',
-    loss='binary_crossentropy',
-    metrics=['accuracy']
-)
+# Reshape pour LSTM (samples, timesteps, features) + index du quartier
+X_train_lstm = lstm_inputs(X_train_scaled, c_train)
+X_test_lstm = lstm_inputs(X_test_scaled, c_test)
 
 print("🔄 Entraînement en cours (peut prendre 10-15 minutes)...")
-history = lstm_model.fit(
-    X_train_lstm, y_train,
-    validation_data=(X_test_lstm, y_test),
-    epochs=50,
-    batch_size=32,
-    verbose=1,
-    callbacks=[
-        keras.callbacks.EarlyStopping(patience=5, restore_best_weights=True)
-    ]
-)
+lstm_model = train_lstm(X_train_lstm, y_train, verbose=1)
 
 # Évaluation
 y_pred_lstm = lstm_model.predict(X_test_lstm, verbose=0).flatten()
@@ -197,10 +229,57 @@ print(f"  Précision test : {accuracy_lstm*100:.2f}%")
 print(f"  Prédiction moyenne : {y_pred_lstm.mean()*100:.2f}%")
 
 # ============================================================================
-# ÉTAPE 7 : SAUVEGARDE DES MODÈLES
+# ÉTAPE 7 : ENSEMBLE CALIBRÉ (STACKING)
+# ============================================================================
+
+print("\n🧮 ÉTAPE 7 : Ensemble calibré (stacking logistique)")
+print("-" * 80)
+
+# Prédictions hors-échantillon : chaque ligne d'entraînement est prédite par
+# des modèles qui ne l'ont pas vue, entraînés exactement comme les modèles
+# servis (train_lgbm / train_lstm, arrêt anticipé sur une validation du pli)
+folds = StratifiedKFold(n_splits=MODEL_CONFIG['stacking_folds'], shuffle=True,
+                        random_state=MODEL_CONFIG['random_state'])
+oof_lgb = np.zeros(len(y_train))
+oof_lstm = np.zeros(len(y_train))
+for k, (fit_idx, oof_idx) in enumerate(folds.split(X_train_scaled, y_train), 1):
+    print(f"🔄 Pli {k}/{folds.n_splits}...")
+    fold_lgb = train_lgbm(X_train_lgb[fit_idx], y_train[fit_idx])
+    oof_lgb[oof_idx] = fold_lgb.predict(X_train_lgb[oof_idx])
+
+    fold_lstm = train_lstm([x[fit_idx] for x in X_train_lstm], y_train[fit_idx])
+    oof_lstm[oof_idx] = fold_lstm.predict([x[oof_idx] for x in X_train_lstm], verbose=0).flatten()
+
+q_train = decode_quartiers(c_train)
+ensemble = fit_stacking_ensemble(oof_lgb, oof_lstm, q_train, y_train,
+                                 lstm_tolerance=MODEL_CONFIG['stacking_lstm_tolerance'],
+                                 seed=MODEL_CONFIG['random_state'])
+
+# Comparaison sur le jeu de test avec la moyenne 50/50
+y_pred_avg = (y_pred_lgb + y_pred_lstm) / 2
+y_pred_ens = ensemble.predict_proba(y_pred_lgb, y_pred_lstm, c_test)
+ensemble.metrics.update({
+    'test_auc_average': round(roc_auc_score(y_test, y_pred_avg), 5),
+    'test_auc_ensemble': round(roc_auc_score(y_test, y_pred_ens), 5),
+    'test_log_loss_average': round(log_loss(y_test, np.clip(y_pred_avg, 1e-6, 1 - 1e-6)), 5),
+    'test_log_loss_ensemble': round(log_loss(y_test, y_pred_ens), 5)
+})
+
+print(f"✅ Ensemble : logit(risque) = {ensemble.intercept:.3f} + {ensemble.w_lgb:.3f} x logit(LGBM)"
+      + (f" + {ensemble.w_lstm:.3f} x logit(LSTM)" if ensemble.uses_lstm else "") + " + quartier")
+if not ensemble.uses_lstm:
+    print(f"  ⚡ LSTM retiré de l'ensemble (gain en validation croisée {ensemble.metrics['lstm_gain']*100:.2f}%) :"
+          " il ne sera plus exécuté à l'inférence")
+print(f"  AUC test      : moyenne {ensemble.metrics['test_auc_average']:.4f} → "
+      f"ensemble {ensemble.metrics['test_auc_ensemble']:.4f}")
+print(f"  Log loss test : moyenne {ensemble.metrics['test_log_loss_average']:.4f} → "
+      f"ensemble {ensemble.metrics['test_log_loss_ensemble']:.4f}")
+
+# ============================================================================
+# ÉTAPE 8 : SAUVEGARDE DES MODÈLES
 # ============================================================================
 
-print("\n💾 ÉTAPE 7 : Sauvegarde des modèles")
+print("\n💾 ÉTAPE 8 : Sauvegarde des modèles")
 print("-" * 80)
 
 models_dir = Path('models')
@@ -223,6 +302,24 @@ with open(scaler_path, 'wb') as f:
     pickle.dump(scaler, f)
 print(f"✅ Scaler sauvegardé : {scaler_path}")
 
+# Format partagé entre processus (poids mappés en mémoire, sans TensorFlow au service)
+# Repère d'entraînement : données vues par les modèles (manifeste du bundle)
+training = {
+    'source': str(csv_path),
+    'rows': int(len(df)),
+    'rows_train': int(len(X_train)),
+    # Quartiers appris : les autres codes du registre sont servis comme inconnus
+    'quartier_codes': sorted(int(c) for c in np.unique(c_train) if c != UNKNOWN_CODE),
+    'data_start': str(pd.to_datetime(df[date_col]).min()) if date_col else None,
+    'data_end': str(pd.to_datetime(df[date_col]).max()) if date_col else None
+}
+# Profil de dérive : features du jeu d'entraînement, probabilités de l'ensemble sur le jeu de test
+drift_profile = DriftProfile.fit(X_train, y_pred_ens * 100, c_test,
+                                 mois=X_test[:, feature_cols.index('mois')])
+bundle_path = save_bundle(models_dir / 'bundle', lgb_model, scaler, lstm_model, training=training,
+                          ensemble=ensemble, drift_profile=drift_profile)
+print(f"✅ Bundle partagé : {bundle_path} (empreinte {read_manifest(bundle_path)['content_hash'][:12]})")
+
 # ============================================================================
 # RÉSUMÉ FINAL
 # ============================================================================
@@ -233,6 +330,8 @@ print("=" * 80)
 print(f"✅ Données : {len(df):,} lignes, {len(quartiers)} quartiers")
 print(f"✅ LightGBM : {accuracy_lgb*100:.2f}% précision")
 print(f"✅ LSTM : {accuracy_lstm*100:.2f}% précision")
+print(f"✅ Ensemble : AUC {ensemble.metrics['test_auc_ensemble']:.4f}"
+      + ("" if ensemble.uses_lstm else " (sans LSTM)"))
 print(f"✅ Modèles sauvegardés dans : {models_dir}/")
 print("\n" + "=" * 80)
 print("✅ ENTRAÎNEMENT TERMINÉ")
@@ -0,0 +1,99 @@
+"""
+Backtest du modèle déployé sur l'historique
+À exécuter : python scripts/backtest.py [--csv data/synthetic/synthetic_data_v2.csv] [--seuil 20]
+
+Rejoue l'historique à travers le bundle de modèles et affiche AUC, Brier,
+précision / rappel et réussite des alertes, globalement, par quartier et
+par heure ; le rapport JSON compact est écrit dans data/backtest/.
+
+Nécessite le bundle de modèles (python scripts/export_bundle.py).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.backtest import (DEFAULT_HORIZON, DEFAULT_PERIOD, DEFAULT_WINDOW, report_to_json, run_backtest)
+from src.config import SEUILS_RISQUE
+from src.dataset import PreparedDataset
+from src.model_bundle import BUNDLE_DIR, bundle_exists, load_bundle
+from src.quantized import PRECISIONS, apply_precision
+
+DEFAULT_OUTPUT = 'data/backtest/backtest_report.json'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest du modèle sur l'historique")
+    parser.add_argument('--csv', default='data/synthetic/synthetic_data_v2.csv', help="Historique avec coupure")
+    parser.add_argument('--seuil', type=float, action='append',
+                        help=f"Seuil de décision en %% (répétable ; défaut : {SEUILS_RISQUE['moyen']})")
+    parser.add_argument('--seuil-alerte', type=float, default=SEUILS_RISQUE['eleve'], help="Seuil des alertes (%%)")
+    parser.add_argument('--horizon', type=int, default=DEFAULT_HORIZON, help="Heures entre alerte et coupure")
+    parser.add_argument('--periode', default=DEFAULT_PERIOD, help="Période glissante (D, W, M)")
+    parser.add_argument('--fenetre', type=int, default=DEFAULT_WINDOW, help="Périodes par fenêtre glissante")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Threads de scoring")
+    parser.add_argument('--bundle', default=BUNDLE_DIR, help="Dossier du bundle de modèles")
+    parser.add_argument('--precision', choices=PRECISIONS, default='full', help="Précision des modèles")
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT, help="Rapport JSON")
+    parser.add_argument('--rolling-detail', action='store_true',
+                        help="Inclure chaque fenêtre glissante dans le rapport")
+    args = parser.parse_args(argv)
+
+    if not bundle_exists(args.bundle):
+        print(f"❌ Bundle introuvable ({args.bundle}) : python scripts/export_bundle.py")
+        return 1
+    if not Path(args.csv).exists():
+        print(f"❌ Fichier non trouvé : {args.csv}")
+        return 1
+
+    print("=" * 70)
+    print("🔁 BACKTEST")
+    print("=" * 70)
+    start = time.perf_counter()
+    dataset = PreparedDataset(pd.read_csv(args.csv))
+    models = apply_precision(load_bundle(args.bundle), args.precision)
+    load_seconds = time.perf_counter() - start
+
+    try:
+        report = run_backtest(models, dataset, seuils=args.seuil or [SEUILS_RISQUE['moyen']],
+                              seuil_alerte=args.seuil_alerte, horizon=args.horizon, period=args.periode,
+                              window=args.fenetre, workers=args.workers)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    report['secondes'] = {'chargement': load_seconds, **report['secondes']}
+
+    resume = report['resume']
+    print(f"  Modèles  : {resume['modeles']}")
+    print(f"  Période  : {resume['debut']} → {resume['fin']} ({resume['lignes']:,} lignes, "
+          f"{resume['quartiers']} quartiers)")
+    print(f"  Temps    : " + ", ".join(f"{k} {v:.2f} s" for k, v in report['secondes'].items()))
+
+    pd.set_option('display.width', 200)
+    print("\n📊 Global")
+    print(report['global'].round(3).to_string(index=False))
+    print("\n🏘️ Par quartier")
+    print(report['par_quartier'].round(3).to_string(index=False))
+    print("\n🕐 Par heure")
+    print(report['par_heure'][['heure', 'n', 'taux_coupure', 'auc', 'brier', 'alertes']].round(3)
+          .to_string(index=False))
+    if resume['risque_max'] is not None and resume['risque_max'] < args.seuil_alerte:
+        print(f"\n⚠️ Risque maximal {resume['risque_max']} % < seuil d'alerte {args.seuil_alerte} % : "
+              f"aucune alerte sur la période")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report_to_json(report, rolling=args.rolling_detail), f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Rapport : {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
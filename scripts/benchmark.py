@@ -0,0 +1,678 @@
+"""
+Benchmark du pipeline : temps et mémoire de chaque étape
+À exécuter : python scripts/benchmark.py [--sizes 1000,10000,50000]
+
+Étapes mesurées pour chaque taille de dataset :
+  génération, chargement CSV / colonnaire, normalisation,
+  entraînement LightGBM / LSTM, inférence unitaire et batch,
+  ingestion base de données (serveur REST local).
+
+La suite 'memory' (--suite memory --sizes 1,2,4) compare la mémoire par
+processus serveur entre l'ancien chargement et le chargement partagé.
+La suite 'precision' (--suite precision --sizes 1,100,10000) compare les
+modes de précision réduite (AUC, écart, latence par taille de lot).
+La suite 'storage' (--suite storage) compare les backends de stockage :
+REST (serveur local) contre SQLite / DuckDB embarqués, et les formats
+d'envoi en masse (JSON par lignes contre CSV par colonnes).
+La suite 'explain' (--suite explain) mesure le coût des contributions des
+facteurs (src/explain.py) ajouté au scoring en lot, face à pred_contrib.
+La suite 'scenario' (--suite scenario --sizes 10000,100000,1000000) mesure
+le débit (lignes/s) du générateur de scénarios (src/scenarios.py) face au
+générateur ligne par ligne, et de son écriture CSV / parquet.
+
+Les résultats sont écrits en JSON et comparés à benchmarks/baseline_<suite>.json ;
+une étape plus lente que la baseline au-delà de la tolérance est signalée.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.config import MODEL_CONFIG
+from src import benchmark
+
+BENCHMARKS_DIR = Path('benchmarks')
+DEFAULT_SIZES = [1000, 10000, 50000]
+
+# Nombre d'appels pour l'inférence unitaire (une ligne par appel, comme l'UI)
+SINGLE_CALLS = 100
+
+# Rafraîchissements d'un tableau de bord d'historique (suite storage)
+REFRESHES = 50
+
+# Lignes passées à pred_contrib natif (suite explain ; ~330 µs par ligne)
+NATIVE_ROWS = 2000
+
+# Surcoût maximal des contributions, en multiple du temps de scoring
+MAX_EXPLAIN_OVERHEAD = 2.0
+
+# Suite scenario : au-delà, le générateur ligne par ligne n'est pas mesuré
+LEGACY_MAX_ROWS = 100000
+
+
+def _silent(fn, *args, **kwargs):
+    """Exécute fn en masquant ses print (générateur, insert_data_bulk...)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def _optional(module: str):
+    """Importe un module optionnel (None s'il n'est pas installé)."""
+    try:
+        return __import__(module)
+    except ImportError:
+        return None
+
+
+def generate_rows(size: int) -> pd.DataFrame:
+    """Génère environ `size` lignes avec src/data_generator.py."""
+    from src.data_generator import generate_dataset, QUARTIERS_CONFIG
+
+    hours = -(-size // len(QUARTIERS_CONFIG))
+    start = pd.Timestamp('2024-01-01')
+    end = start + pd.Timedelta(hours=hours - 1)
+    df = _silent(generate_dataset, start_date=str(start), end_date=str(end))
+    return df.sort_values('date_heure', kind='stable').iloc[:size].reset_index(drop=True)
+
+
+# ============================================================================
+# SUITE PIPELINE
+# ============================================================================
+
+def run_pipeline_suite(sizes, args):
+    """
+    Mesure chaque étape du pipeline pour chaque taille.
+
+    Les étapes lourdes (génération, entraînement, ingestion) ne sont
+    exécutées qu'une fois par taille, quel que soit `repeat`.
+    """
+    import lightgbm as lgb
+    from sklearn.preprocessing import StandardScaler
+    from src import database
+    from src.rest_stub import LocalRestServer
+    from src.storage import RestBackend
+
+    tf = _optional('tensorflow')
+    pyarrow = _optional('pyarrow')
+    repeat, track_memory = args.repeat, not args.no_memory
+    features = MODEL_CONFIG['features']
+    target = MODEL_CONFIG['target']
+    results = []
+
+    def run(stage, size, fn, heavy=False, rows=None):
+        print(f"  ⏱️  {stage} ({size:,} lignes)...")
+        try:
+            m = benchmark.measure(fn, repeat=1 if heavy else repeat, track_memory=track_memory)
+            results.append(benchmark.make_result(stage, size, m, rows=rows))
+        except Exception as e:
+            results.append(benchmark.make_result(stage, size, status='error', note=str(e)))
+
+    def skip(stage, size, note):
+        results.append(benchmark.make_result(stage, size, status='skipped', note=note))
+
+    with tempfile.TemporaryDirectory() as tmp, LocalRestServer() as server:
+        database.set_backend(RestBackend(server.url))
+
+        for size in sizes:
+            print(f"\n📏 Taille : {size:,} lignes")
+
+            run('generation', size, lambda: generate_rows(size), heavy=True)
+            df = generate_rows(size)
+
+            csv_path = Path(tmp) / f'data_{size}.csv'
+            df.to_csv(csv_path, index=False)
+            run('csv_load', size, lambda: pd.read_csv(csv_path))
+
+            if pyarrow is not None:
+                parquet_path = Path(tmp) / f'data_{size}.parquet'
+                df.to_parquet(parquet_path, index=False)
+                run('columnar_load', size, lambda: pd.read_parquet(parquet_path))
+            else:
+                skip('columnar_load', size, 'pyarrow non installé')
+
+            X = df[features].to_numpy(dtype=np.float64)
+            y = df[target].to_numpy()
+            run('scaling', size, lambda: StandardScaler().fit_transform(X))
+            scaler = StandardScaler().fit(X)
+            X_scaled = scaler.transform(X)
+
+            def train_lgbm():
+                return lgb.train(MODEL_CONFIG['lgbm_params'], lgb.Dataset(X_scaled, label=y),
+                                 num_boost_round=MODEL_CONFIG['lgbm_num_boost_round'])
+
+            run('lgbm_train', size, train_lgbm, heavy=True)
+            lgb_model = train_lgbm()
+
+            lstm_model = None
+            if tf is not None:
+                from src.models import build_lstm_model
+
+                def train_lstm():
+                    model = build_lstm_model(X_scaled.shape[1])
+                    model.compile(optimizer='adam', loss='binary_crossentropy')
+                    model.fit(X_scaled.reshape(-1, 1, X_scaled.shape[1]), y,
+                              epochs=1, batch_size=32, verbose=0)
+                    return model
+
+                run('lstm_train_1_epoch', size, train_lstm, heavy=True)
+                lstm_model = train_lstm()
+            else:
+                skip('lstm_train_1_epoch', size, 'tensorflow non installé')
+
+            def predict(rows):
+                scaled = scaler.transform(rows)
+                pred = lgb_model.predict(scaled)
+                if lstm_model is not None:
+                    pred = (pred + lstm_model.predict(scaled.reshape(-1, 1, scaled.shape[1]),
+                                                      verbose=0).ravel()) / 2
+                return pred
+
+            single_rows = [X[i:i + 1] for i in range(min(SINGLE_CALLS, len(X)))]
+            run('inference_single', size, lambda: [predict(r) for r in single_rows],
+                rows=len(single_rows))
+            run('inference_batch', size, lambda: predict(X))
+
+            run('db_ingest', size,
+                lambda: _silent(database.insert_data_bulk, df, 'enregistrements'), heavy=True)
+
+    return results
+
+
+# ============================================================================
+# SUITE MÉMOIRE (PROCESSUS STREAMLIT)
+# ============================================================================
+
+def _memory_usage_mb():
+    """RSS, PSS et USS du processus courant (Linux, /proc/self/smaps_rollup)."""
+    values = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                values[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return {
+        'rss_mb': round(values.get('Rss', 0), 1),
+        'pss_mb': round(values.get('Pss', 0), 1),
+        'uss_mb': round(values.get('Private_Clean', 0) + values.get('Private_Dirty', 0), 1)
+    }
+
+
+def _memory_worker(mode, csv_path, models_dir, ready, release, queue):
+    """Processus type d'un serveur Streamlit : charge dataset + modèles, prédit, mesure."""
+    import time
+    from src.inference import predict_batch
+    start = time.perf_counter()
+    if mode == 'legacy':
+        import pickle
+        from src.dataset import PreparedDataset
+        dataset = PreparedDataset(pd.read_csv(csv_path))
+        with open(Path(models_dir) / 'lgbm_model.pkl', 'rb') as f:
+            lgb_model = pickle.load(f)
+        with open(Path(models_dir) / 'scaler.pkl', 'rb') as f:
+            scaler = pickle.load(f)
+        from tensorflow import keras
+        models = {'lgb': lgb_model, 'scaler': scaler,
+                  'lstm': keras.models.load_model(Path(models_dir) / 'lstm_model.keras', compile=False)}
+    else:
+        from src.model_bundle import load_bundle
+        from src.shared_store import load_shared_dataset
+        dataset = load_shared_dataset(csv_path)
+        models = load_bundle(Path(models_dir) / 'bundle')
+
+    # Toucher toutes les données, comme les onglets Statistiques / Historique
+    X = dataset.frame[MODEL_CONFIG['features']].to_numpy(dtype=np.float64)
+    predict_batch(models, X[:1], dataset.frame['quartier'].to_numpy()[:1])
+    seconds = time.perf_counter() - start
+    del X
+
+    ready.wait()
+    queue.put({'seconds': seconds, **_memory_usage_mb()})
+    release.wait()
+
+
+def run_memory_suite(sizes, args):
+    """
+    Mémoire par processus serveur, ancien chargement (CSV + pickles + TensorFlow)
+    contre chargement partagé (colonnes et poids mappés en mémoire).
+
+    Ici `sizes` est le nombre de processus lancés simultanément ; le PSS
+    répartit les pages partagées entre eux, l'USS est la mémoire propre à
+    chaque processus (coût d'un processus supplémentaire).
+    """
+    import multiprocessing as mp
+
+    ctx = mp.get_context('spawn')
+    results = []
+    for mode in ('legacy', 'shared'):
+        for n in sizes:
+            print(f"  🧮 {mode} : {n} processus...")
+            ready, release = ctx.Barrier(n + 1), ctx.Barrier(n + 1)
+            queue = ctx.Queue()
+            workers = [ctx.Process(target=_memory_worker,
+                                   args=(mode, args.csv, args.models_dir, ready, release, queue))
+                       for _ in range(n)]
+            for w in workers:
+                w.start()
+            try:
+                ready.wait(timeout=600)
+                samples = [queue.get(timeout=60) for _ in range(n)]
+                release.wait(timeout=60)
+            except Exception as e:
+                for w in workers:
+                    w.terminate()
+                results.append(benchmark.make_result(f'memory_{mode}', n, status='error', note=str(e)))
+                continue
+            for w in workers:
+                w.join()
+
+            result = benchmark.make_result(f'memory_{mode}', n, {
+                'seconds': max(s['seconds'] for s in samples),
+                'min_seconds': min(s['seconds'] for s in samples),
+                'repeat': 1,
+                'peak_mb': None
+            }, rows=n)
+            for key in ('rss_mb', 'pss_mb', 'uss_mb'):
+                result[key] = round(sum(s[key] for s in samples) / n, 1)
+            result['total_pss_mb'] = round(sum(s['pss_mb'] for s in samples), 1)
+            results.append(result)
+
+    for r in results:
+        if r['status'] == 'ok':
+            print(f"  {r['stage']:15s} x{r['size']:<3d} RSS {r['rss_mb']:7.1f} Mo  "
+                  f"USS {r['uss_mb']:7.1f} Mo  PSS total {r['total_pss_mb']:8.1f} Mo")
+    return results
+
+
+# ============================================================================
+# SUITE PRECISION
+# ============================================================================
+
+def run_precision_suite(sizes, args):
+    """
+    Précision réduite (src/quantized.py) contre précision complète.
+
+    Qualité sur le jeu de test de l'entraînement (même découpage que
+    scripts/2_train_models.py) : AUC par modèle, écart des probabilités.
+    Latence et pic mémoire de predict_batch pour chaque taille de lot.
+    """
+    from sklearn.metrics import roc_auc_score
+    from sklearn.model_selection import train_test_split
+    from src.inference import predict_batch
+    from src.model_bundle import load_bundle
+    from src.quantized import PRECISIONS, apply_precision, weights_nbytes
+
+    full = load_bundle(Path(args.models_dir) / 'bundle')
+    df = pd.read_csv(args.csv)
+    X = df[MODEL_CONFIG['features']].to_numpy(dtype=np.float64)
+    y = df[MODEL_CONFIG['target']].to_numpy()
+    _, X_test, _, y_test, _, q_test = train_test_split(X, y, df['quartier'].to_numpy(),
+                                                       test_size=MODEL_CONFIG['test_size'],
+                                                       random_state=MODEL_CONFIG['random_state'], stratify=y)
+    reference = predict_batch(full, X_test, q_test)
+
+    results = []
+    for precision in PRECISIONS:
+        models = apply_precision(full, precision)
+        preds = predict_batch(models, X_test, q_test)
+        quality = {
+            'auc_lgb': round(roc_auc_score(y_test, preds['lgb']), 5),
+            # LSTM non exécuté si l'ensemble ne l'utilise pas
+            'auc_lstm': (round(roc_auc_score(y_test, preds['lstm']), 5)
+                         if not np.isnan(preds['lstm']).any() else float('nan')),
+            'auc_risque': round(roc_auc_score(y_test, preds['risque']), 5),
+            'accuracy': round(float(((preds['risque'] >= 50) == y_test).mean()), 5),
+            'max_abs_diff_pts': round(float(np.abs(preds['risque'] - reference['risque']).max()), 4),
+            'mean_abs_diff_pts': round(float(np.abs(preds['risque'] - reference['risque']).mean()), 5),
+            'weights_kb': {k: round(v / 1024, 1) for k, v in weights_nbytes(models).items()}
+        }
+        print(f"  🎯 {precision:8s} AUC {quality['auc_risque']:.5f}  "
+              f"écart max {quality['max_abs_diff_pts']:.4f} pts")
+        for size in sizes:
+            batch = X_test[:size]
+            print(f"  ⏱️  predict_{precision} ({size:,} lignes)...")
+            m = benchmark.measure(lambda: predict_batch(models, batch, q_test[:size]), repeat=args.repeat,
+                                  track_memory=not args.no_memory)
+            result = benchmark.make_result(f'predict_{precision}', size, m)
+            result.update(quality)
+            results.append(result)
+
+    print(f"\n  {'Précision':10s} {'AUC LGBM':>9s} {'AUC LSTM':>9s} {'AUC risque':>11s} "
+          f"{'Écart max':>10s} {'Poids (Ko)':>11s}")
+    for r in results:
+        if r['size'] == sizes[0]:
+            print(f"  {r['stage'][8:]:10s} {r['auc_lgb']:9.5f} {r['auc_lstm']:9.5f} {r['auc_risque']:11.5f} "
+                  f"{r['max_abs_diff_pts']:10.4f} {sum(r['weights_kb'].values()):11.1f}")
+    return results
+
+
+# ============================================================================
+# SUITE STORAGE
+# ============================================================================
+
+def run_storage_suite(sizes, args):
+    """
+    Backends de stockage (src/storage.py) : même jeu de requêtes sur l'API
+    REST (serveur local src/rest_stub.py, sans latence réseau : borne basse
+    du coût réel de Supabase) et sur les bases embarquées.
+    """
+    from src.history_feed import PredictionFeed
+    from src.rest_stub import LocalRestServer
+    from src.storage import (DuckDBBackend, RestBackend, SQLiteBackend, csv_batches, duckdb_available,
+                             json_batches)
+    from src.table_counts import TableCounts
+
+    repeat, track_memory = args.repeat, not args.no_memory
+    results = []
+    prediction = {
+        'date_heure': pd.Timestamp('2024-06-01 18:00').isoformat(), 'quartier': 'Yoff',
+        'temp_celsius': 34.0, 'humidite_percent': 70, 'vitesse_vent': 15.0, 'conso_megawatt': 900,
+        'proba_lgbm': 0.2, 'proba_lstm': 0.25, 'proba_moyenne': 0.225, 'prediction': 0,
+        'modele_utilise': 'LightGBM+LSTM', 'seuil_decision': 50.0
+    }
+
+    def run(stage, size, fn, heavy=False, rows=None):
+        print(f"  ⏱️  {stage} ({size:,} lignes)...")
+        try:
+            # Écritures : une seule exécution (le pic mémoire rejouerait l'insertion)
+            m = benchmark.measure(fn, repeat=1 if heavy else repeat, track_memory=track_memory and not heavy)
+            results.append(benchmark.make_result(stage, size, m, rows=rows))
+        except Exception as e:
+            results.append(benchmark.make_result(stage, size, status='error', note=str(e)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            print(f"\n📏 Taille : {size:,} lignes")
+            df = generate_rows(size)
+            server = LocalRestServer().start()
+            backends = {
+                'rest': lambda: RestBackend(server.url),
+                'sqlite': lambda: SQLiteBackend(Path(tmp) / f'bench_{size}.db')
+            }
+            if duckdb_available():
+                backends['duckdb'] = lambda: DuckDBBackend(str(Path(tmp) / f'bench_{size}.duckdb'))
+            else:
+                results.append(benchmark.make_result('duckdb_ingest', size, status='skipped',
+                                                     note='duckdb non installé'))
+
+            # Format d'envoi REST : encodage seul (débit, pic mémoire côté client),
+            # puis insertion complète JSON sur un serveur jetable (rest_ingest = CSV)
+            run('wire_json_encode', size, lambda: sum(len(json.dumps(batch)) for batch in json_batches(df)))
+            run('wire_csv_encode', size, lambda: sum(len(body) for _, body in csv_batches(df)))
+            with LocalRestServer() as legacy:
+                run('rest_ingest_json', size,
+                    lambda: _silent(RestBackend(legacy.url).insert_data_bulk, df, wire='json'), heavy=True)
+
+            for name, factory in backends.items():
+                backend = factory()
+                run(f'{name}_ingest', size, lambda: _silent(backend.insert_data_bulk, df), heavy=True)
+                run(f'{name}_stats', size, lambda: _silent(backend.get_statistics_by_quartier))
+                run(f'{name}_stats_quartier', size,
+                    lambda: _silent(backend.get_statistics_by_quartier, 'Yoff'))
+                run(f'{name}_count_exact', size, lambda: backend.get_table_count('enregistrements'))
+                run(f'{name}_count_estimated', size, lambda: backend.estimate_table_count('enregistrements'))
+                counts = TableCounts(backend)
+                counts.count('enregistrements')
+                run(f'{name}_count_cached', size,
+                    lambda: [counts.count('enregistrements') for _ in range(SINGLE_CALLS)], rows=SINGLE_CALLS)
+                run(f'{name}_save_prediction', size,
+                    lambda: [backend.save_prediction(dict(prediction)) for _ in range(SINGLE_CALLS)],
+                    heavy=True, rows=SINGLE_CALLS)
+                run(f'{name}_history', size, lambda: backend.get_predictions_history(100))
+
+                # Tableau de bord rafraîchi REFRESHES fois, 1 nouvelle prédiction par rafraîchissement :
+                # page complète relue à chaque fois, ou flux par curseur (src/history_feed.py)
+                def refresh_pages():
+                    for _ in range(REFRESHES):
+                        backend.save_prediction(dict(prediction))
+                        backend.get_predictions_history(100)
+
+                def refresh_feed():
+                    for _ in range(REFRESHES):
+                        backend.save_prediction(dict(prediction))
+                        feed.poll()
+
+                run(f'{name}_refresh_pages', size, refresh_pages, heavy=True, rows=REFRESHES)
+                results[-1]['rows_fetched'] = 100 * REFRESHES
+                feed = PredictionFeed(backend, capacity=100)
+                feed.poll()  # Amorce
+                feed.poll()  # Rattrapage jusqu'au dernier id
+                fetched = []
+                feed.subscribe(lambda rows: fetched.append(len(rows)))
+                run(f'{name}_refresh_feed', size, refresh_feed, heavy=True, rows=REFRESHES)
+                results[-1]['rows_fetched'] = sum(fetched)
+                backend.close()
+            server.stop()
+
+    print(f"\n  {'Étape':28s} {'Taille':>9s} {'Temps (ms)':>11s} {'Lignes lues':>12s}")
+    for r in results:
+        if r['status'] == 'ok':
+            print(f"  {r['stage']:28s} {r['size']:9,d} {r['min_seconds'] * 1000:11.2f} "
+                  f"{r.get('rows_fetched', ''):>12}")
+    return results
+
+
+# ============================================================================
+# SUITE EXPLAIN
+# ============================================================================
+
+def run_explain_suite(sizes, args):
+    """
+    Contributions des facteurs (src/explain.py) contre scoring seul.
+
+    Pour chaque taille de lot : score_frame seul, score_frame avec
+    contributions, et pred_contrib natif de LightGBM sur NATIVE_ROWS lignes
+    au plus (même entrée) pour le temps par ligne et l'écart maximal.
+    """
+    from src.bulk_scoring import score_frame, validate_columns
+    from src.explain import TreeExplainer, explainer_for
+    from src.features import INPUT_FEATURES, build_features
+    from src.inference import lgb_matrix, model_codes
+    from src.model_bundle import load_bundle
+
+    repeat, track_memory = args.repeat, not args.no_memory
+    models = load_bundle(Path(args.models_dir) / 'bundle')
+    history = pd.read_csv(args.csv)
+    date_col = validate_columns(history.columns)
+    results = []
+
+    print("  ⏱️  explainer_build (tables, une fois par modèle)...")
+    m = benchmark.measure(lambda: TreeExplainer(models['lgb']), repeat=1, track_memory=track_memory)
+    results.append(benchmark.make_result('explainer_build', 0, m))
+    explainer = explainer_for(models['lgb'])
+
+    for size in sizes:
+        print(f"\n📏 Taille : {size:,} lignes")
+        df = pd.concat([history] * -(-size // len(history)), ignore_index=True).iloc[:size]
+
+        print(f"  ⏱️  score ({size:,} lignes)...")
+        m_score = benchmark.measure(lambda: score_frame(models, df, date_col), repeat=repeat,
+                                    track_memory=track_memory)
+        results.append(benchmark.make_result('score', size, m_score))
+        print(f"  ⏱️  score_explain ({size:,} lignes)...")
+        m_explain = benchmark.measure(lambda: score_frame(models, df, date_col, explain=True), repeat=repeat,
+                                      track_memory=track_memory)
+        result = benchmark.make_result('score_explain', size, m_explain)
+        result['overhead_ratio'] = round((m_explain['min_seconds'] - m_score['min_seconds'])
+                                         / m_score['min_seconds'], 3)
+
+        native = df.iloc[:NATIVE_ROWS]
+        X = build_features(pd.to_datetime(native[date_col]).to_numpy(),
+                           *(native[c].to_numpy(dtype=np.float64) for c in INPUT_FEATURES))
+        X_lgb = lgb_matrix(models['lgb'], models['scaler'].transform(X),
+                           model_codes(models, native['quartier'].to_numpy()))
+        print(f"  ⏱️  native_pred_contrib ({len(native):,} lignes)...")
+        m_native = benchmark.measure(lambda: models['lgb'].predict(X_lgb, pred_contrib=True), repeat=1,
+                                     track_memory=False)
+        results.append(benchmark.make_result('native_pred_contrib', len(native), m_native))
+        reference = models['lgb'].predict(X_lgb, pred_contrib=True)
+        result['max_abs_diff_native'] = float(np.abs(explainer.contributions(X_lgb) - reference).max())
+        result['native_seconds_extrapolated'] = round(m_native['min_seconds'] * size / len(native), 3)
+        results.append(result)
+
+    print(f"\n  {'Taille':>9s} {'Scoring (s)':>12s} {'+ contrib. (s)':>15s} {'Surcoût':>8s} "
+          f"{'pred_contrib (s)':>17s} {'Écart max':>10s}")
+    scores = {r['size']: r for r in results if r['stage'] == 'score'}
+    for r in results:
+        if r['stage'] == 'score_explain':
+            print(f"  {r['size']:9,d} {scores[r['size']]['min_seconds']:12.3f} {r['min_seconds']:15.3f} "
+                  f"{r['overhead_ratio']:7.2f}x {r['native_seconds_extrapolated']:17.2f} "
+                  f"{r['max_abs_diff_native']:10.1e}")
+    worst = max(r['overhead_ratio'] for r in results if r['stage'] == 'score_explain')
+    print(f"  {'✅' if worst < MAX_EXPLAIN_OVERHEAD else '⚠️'} Surcoût maximal {worst:.2f}x "
+          f"(objectif < {MAX_EXPLAIN_OVERHEAD:.0f}x le scoring)")
+    return results
+
+
+# ============================================================================
+# SUITE SCENARIO
+# ============================================================================
+
+def benchmark_scenario(size: int):
+    """Scénario d'environ `size` lignes : 8 quartiers, une canicule et des orages récurrents."""
+    from src.config import QUARTIERS_DAKAR
+    from src.scenarios import Scenario
+
+    hours = -(-size // len(QUARTIERS_DAKAR))
+    start = pd.Timestamp('2024-01-01')
+    return Scenario.from_dict({
+        'nom': f'benchmark-{size}', 'debut': str(start), 'fin': str(start + pd.Timedelta(hours=hours - 1)),
+        'quartiers': QUARTIERS_DAKAR, 'tendance': {'rechauffement': 0.05, 'croissance_conso': 0.04},
+        'evenements': [
+            {'type': 'canicule', 'debut': '2024-04-10', 'fin': '2024-04-17'},
+            {'type': 'orage', 'recurrence': {'mois': [7, 8, 9, 10], 'par_an': 8, 'duree_heures': 6}}
+        ]
+    })
+
+
+def run_scenario_suite(sizes, args):
+    """
+    Débit de génération : src/scenarios.py contre src/data_generator.py.
+
+    Pour chaque taille : génération en mémoire du scénario, écriture CSV et
+    parquet (pyarrow), et generate_dataset jusqu'à LEGACY_MAX_ROWS lignes.
+    """
+    from src.scenarios import generate_scenario, write_scenario
+
+    repeat, track_memory = args.repeat, not args.no_memory
+    pyarrow = _optional('pyarrow')
+    results = []
+
+    def run(stage, size, fn, heavy=False, rows=None):
+        print(f"  ⏱️  {stage} ({size:,} lignes)...")
+        m = benchmark.measure(fn, repeat=1 if heavy else repeat, track_memory=track_memory)
+        results.append(benchmark.make_result(stage, size, m, rows=rows))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            print(f"\n📏 Taille : {size:,} lignes")
+            scenario = benchmark_scenario(size)
+            run('scenario_generation', size, lambda: generate_scenario(scenario), rows=scenario.rows)
+            run('scenario_write_csv', size, lambda: write_scenario(scenario, Path(tmp) / 'scenario.csv'),
+                heavy=True, rows=scenario.rows)
+            if pyarrow is not None:
+                run('scenario_write_parquet', size,
+                    lambda: write_scenario(scenario, Path(tmp) / 'scenario.parquet'), rows=scenario.rows)
+            else:
+                results.append(benchmark.make_result('scenario_write_parquet', size, status='skipped',
+                                                     note='pyarrow non installé'))
+            if size <= LEGACY_MAX_ROWS:
+                run('legacy_generation', size, lambda: generate_rows(size), heavy=True)
+            else:
+                results.append(benchmark.make_result('legacy_generation', size, status='skipped',
+                                                     note=f'> {LEGACY_MAX_ROWS:,} lignes'))
+
+    print(f"\n  {'Taille':>9s} {'Scénario (l/s)':>15s} {'+ CSV (l/s)':>12s} {'+ parquet (l/s)':>16s} "
+          f"{'Ancien (l/s)':>13s} {'Gain':>7s}")
+    by_size = {}
+    for r in results:
+        by_size.setdefault(r['size'], {})[r['stage']] = r.get('rows_per_s')
+    for size, rates in by_size.items():
+        legacy = rates.get('legacy_generation')
+        gain = f"{rates['scenario_generation'] / legacy:6.0f}x" if legacy else f"{'-':>7s}"
+        cells = [f"{rates.get(stage):,.0f}" if rates.get(stage) else '-'
+                 for stage in ('scenario_generation', 'scenario_write_csv', 'scenario_write_parquet',
+                               'legacy_generation')]
+        print(f"  {size:9,d} {cells[0]:>15s} {cells[1]:>12s} {cells[2]:>16s} {cells[3]:>13s} {gain}")
+    return results
+
+
+SUITES = {
+    'pipeline': run_pipeline_suite,
+    'memory': run_memory_suite,
+    'precision': run_precision_suite,
+    'storage': run_storage_suite,
+    'explain': run_explain_suite,
+    'scenario': run_scenario_suite
+}
+
+
+# ============================================================================
+# FONCTION PRINCIPALE
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark du pipeline Dakar Power")
+    parser.add_argument('--suite', choices=sorted(SUITES), default='pipeline')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help="Tailles de dataset séparées par des virgules")
+    parser.add_argument('--repeat', type=int, default=3, help="Répétitions des étapes légères")
+    parser.add_argument('--no-memory', action='store_true', help="Ne pas mesurer le pic mémoire")
+    parser.add_argument('--csv', default='data/synthetic/synthetic_data_v2.csv',
+                        help="Dataset historique (suites memory, precision et explain)")
+    parser.add_argument('--models-dir', default='models',
+                        help="Dossier des modèles (suites memory, precision et explain)")
+    parser.add_argument('--output', help="Fichier JSON de sortie (défaut: benchmarks/latest_<suite>.json)")
+    parser.add_argument('--baseline', help="Baseline de référence (défaut: benchmarks/baseline_<suite>.json)")
+    parser.add_argument('--tolerance', type=float, default=benchmark.DEFAULT_TOLERANCE)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Enregistrer ce run comme nouvelle baseline")
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help="Code de sortie 1 si une régression est détectée")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    output = args.output or BENCHMARKS_DIR / f'latest_{args.suite}.json'
+    baseline_path = args.baseline or BENCHMARKS_DIR / f'baseline_{args.suite}.json'
+
+    print("=" * 70)
+    print(f"⏱️  BENCHMARK - suite '{args.suite}'")
+    print("=" * 70)
+
+    results = SUITES[args.suite](sizes, args)
+
+    benchmark.print_results(results)
+    benchmark.save_results(output, results)
+    print(f"\n💾 Résultats : {output}")
+
+    if args.save_baseline:
+        benchmark.save_results(baseline_path, results)
+        print(f"📌 Baseline mise à jour : {baseline_path}")
+        return 0
+
+    baseline = benchmark.load_results(baseline_path)
+    if baseline is None:
+        print(f"ℹ️  Pas de baseline ({baseline_path}) : utilisez --save-baseline")
+        return 0
+
+    regressions = benchmark.compare_to_baseline(results, baseline, args.tolerance)
+    if not regressions:
+        print(f"✅ Aucune régression (tolérance +{args.tolerance*100:.0f}%)")
+        return 0
+
+    print(f"\n🔴 {len(regressions)} régression(s) :")
+    for r in regressions:
+        print(f"  {r['stage']:22s} {r['size']:9,d} : {r['baseline_s']:.4f}s → "
+              f"{r['current_s']:.4f}s (x{r['ratio']})")
+    return 1 if args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
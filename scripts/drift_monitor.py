@@ -0,0 +1,148 @@
+"""
+Dérive des entrées et qualité des données par rapport à l'entraînement
+À exécuter : python scripts/drift_monitor.py --csv data/recent.csv
+         ou : python scripts/drift_monitor.py --state   (état du flux, scripts/stream_ingest.py --drift)
+         ou : python scripts/drift_monitor.py --build-profile [--csv data/synthetic/synthetic_data_v2.csv]
+
+--build-profile : calcule le profil de référence (features et probabilités
+par quartier) sur l'historique d'entraînement et l'ajoute au bundle ;
+scripts/2_train_models.py l'écrit directement au réentraînement.
+Sinon, compare un CSV de relevés récents (scoré par le bundle) ou l'état
+enregistré par le flux au profil : PSI, KS et qualité par feature, dérive
+du risque par quartier (src/drift.py).
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.bulk_scoring import score_frame
+from src.config import MODEL_CONFIG
+from src.drift import (DEFAULT_MIN_ROWS, DEFAULT_STATE_FILE, DriftMonitor, DriftProfile, monitor_frame,
+                       report_to_json)
+from src.features import INPUT_FEATURES, build_features
+from src.model_bundle import BUNDLE_DIR, add_drift_profile, bundle_exists, load_bundle
+from src.timeseries import detect_date_column
+
+DEFAULT_CSV = 'data/synthetic/synthetic_data_v2.csv'
+STATUS_ICONS = {'stable': '✅', 'modérée': '⚠️', 'forte': '🚨', 'insuffisant': '·'}
+
+
+def load_scored(models, path, days=None):
+    """CSV de relevés scoré par le bundle (colonne date_heure), éventuellement réduit aux derniers jours."""
+    df = pd.read_csv(path)
+    date_col = detect_date_column(df)
+    if date_col is None:
+        raise ValueError(f"{path}: pas de colonne de date")
+    df = df.rename(columns={date_col: 'date_heure'})
+    df['date_heure'] = pd.to_datetime(df['date_heure'], errors='coerce')
+    if days:
+        df = df[df['date_heure'] >= df['date_heure'].max() - pd.Timedelta(days=days)]
+    return score_frame(models, df.reset_index(drop=True), 'date_heure')
+
+
+def build_profile(models, args):
+    start = time.perf_counter()
+    scored = load_scored(models, args.csv)
+    valid = scored['risque'].notna().to_numpy()
+    scored = scored[valid]
+    X = build_features(scored['date_heure'].to_numpy(), *(scored[c].to_numpy(dtype=np.float64)
+                                                          for c in INPUT_FEATURES))
+    profile = DriftProfile.fit(X, scored['risque'].to_numpy(), scored['quartier'],
+                               mois=X[:, MODEL_CONFIG['features'].index('mois')])
+    manifest = add_drift_profile(args.bundle, profile)
+    print(f"✅ Profil de dérive : {profile.rows:,} lignes, {len(profile.risque['par_quartier'])} quartiers "
+          f"({time.perf_counter() - start:.2f} s)")
+    print(f"✅ Bundle mis à jour : {args.bundle} (empreinte {manifest['content_hash'][:12]})")
+    return 0
+
+
+def print_report(report):
+    pd.set_option('display.width', 200)
+    qualite = report['qualite']
+    print(f"  Lignes   : {qualite['lignes']:,} (depuis {report['debut']}, mise à jour {report['mise_a_jour']})")
+    print(f"  Dérive   : {STATUS_ICONS[report['statut']]} {report['statut']}")
+
+    print("\n📊 Features (PSI : < 0.1 stable, 0.1-0.25 modérée, > 0.25 forte)")
+    features = report['features'].copy()
+    features['derive'] = [f"{STATUS_ICONS[s]} {s}" + ("" if g else " (calendaire)" if c else " (hors statut)")
+                          for s, c, g in zip(features['derive'], features['calendaire'], features['statut_global'])]
+    print(features.drop(columns=['calendaire', 'statut_global']).round(3).to_string(index=False))
+
+    print("\n🏘️ Risque prédit par quartier")
+    quartiers = report['quartiers'].copy()
+    quartiers['derive'] = [s + ("" if g else " (hors statut)")
+                           for s, g in zip(quartiers['derive'], quartiers['statut_global'])]
+    print(quartiers.drop(columns='statut_global').round(3).to_string(index=False))
+
+    print("\n🧹 Qualité")
+    print(f"  Dates illisibles : {qualite['dates_invalides']:,}")
+    print(f"  Quartiers hors registre : {qualite['quartiers_inconnus']:,}")
+    for name, count in qualite['quartiers_inconnus_frequents']:
+        print(f"    {name:30s} ~{count:,}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dérive des entrées par rapport à l'entraînement")
+    source_group = parser.add_mutually_exclusive_group()
+    source_group.add_argument('--build-profile', action='store_true',
+                              help="Calculer le profil de référence sur --csv et l'ajouter au bundle")
+    source_group.add_argument('--state', nargs='?', const=DEFAULT_STATE_FILE, metavar='PATH',
+                              help=f"État du flux (défaut: {DEFAULT_STATE_FILE})")
+    parser.add_argument('--csv', default=DEFAULT_CSV, help="Relevés à comparer (ou historique d'entraînement)")
+    parser.add_argument('--jours', type=int, help="Ne garder que les N derniers jours du CSV")
+    parser.add_argument('--min-rows', type=int, default=DEFAULT_MIN_ROWS, help="Lignes minimales par statut")
+    parser.add_argument('--bundle', default=BUNDLE_DIR, help="Dossier du bundle de modèles")
+    parser.add_argument('-o', '--output', help="Rapport JSON")
+    args = parser.parse_args(argv)
+
+    if not bundle_exists(args.bundle):
+        print(f"❌ Bundle introuvable ({args.bundle}) : python scripts/export_bundle.py")
+        return 1
+    if args.state is None and not Path(args.csv).exists():
+        print(f"❌ Fichier non trouvé : {args.csv}")
+        return 1
+
+    print("=" * 70)
+    print("🩺 DÉRIVE ET QUALITÉ DES DONNÉES")
+    print("=" * 70)
+    models = load_bundle(args.bundle)
+    if args.build_profile:
+        return build_profile(models, args)
+
+    profile = models['drift_profile']
+    if profile is None:
+        print("❌ Bundle sans profil de dérive : python scripts/drift_monitor.py --build-profile")
+        return 1
+    try:
+        if args.state is not None:
+            monitor = DriftMonitor.load_state(profile, args.state)
+            print(f"  Source   : flux ({args.state})")
+        else:
+            start = time.perf_counter()
+            monitor = monitor_frame(profile, load_scored(models, args.csv, args.jours))
+            print(f"  Source   : {args.csv}" + (f" ({args.jours} derniers jours)" if args.jours else "")
+                  + f", scoré en {time.perf_counter() - start:.2f} s")
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    report = monitor.report(args.min_rows)
+    print_report(report)
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report_to_json(report), f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Rapport : {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+Conversion des modèles existants vers le format partagé (models/bundle/)
+À exécuter : python scripts/export_bundle.py
+
+Relit lgbm_model.pkl, scaler.pkl et lstm_model.keras, puis les écrit au
+format de src/model_bundle.py (LightGBM texte, tableaux .npy mappables,
+manifeste avec empreintes SHA-256). L'ensemble calibré du bundle existant
+(ensemble.json, ajusté par scripts/2_train_models.py) et son profil de dérive
+(drift_profile.json) sont conservés, ainsi que les codes des quartiers vus à
+l'entraînement (manifeste) : les lignes d'embedding des autres quartiers du
+LSTM sont remplacées par le vecteur moyen des quartiers vus.
+L'application utilise ensuite le bundle sans importer TensorFlow.
+"""
+
+import pickle
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.drift import DriftProfile
+from src.ensemble import StackingEnsemble
+from src.model_bundle import BUNDLE_DIR, read_manifest, save_bundle, verify_bundle
+from src.models import reset_unseen_embeddings
+
+print("=" * 70)
+print("📦 EXPORT DES MODÈLES AU FORMAT PARTAGÉ")
+print("=" * 70)
+
+models_dir = Path('models')
+
+with open(models_dir / 'lgbm_model.pkl', 'rb') as f:
+    lgb_model = pickle.load(f)
+print("✅ LightGBM chargé")
+
+with open(models_dir / 'scaler.pkl', 'rb') as f:
+    scaler = pickle.load(f)
+print("✅ Scaler chargé")
+
+lstm_model = None
+lstm_path = models_dir / 'lstm_model.keras'
+if lstm_path.exists():
+    from tensorflow import keras
+    lstm_model = keras.models.load_model(lstm_path, compile=False)
+    print("✅ LSTM chargé")
+else:
+    print("⚠️ LSTM absent : bundle LightGBM seul")
+
+ensemble = StackingEnsemble.load(BUNDLE_DIR) if Path(BUNDLE_DIR).exists() else None
+print("✅ Ensemble calibré conservé" if ensemble is not None else "⚠️ Pas d'ensemble calibré : moyenne des modèles")
+drift_profile = DriftProfile.load(BUNDLE_DIR) if Path(BUNDLE_DIR).exists() else None
+print("✅ Profil de dérive conservé" if drift_profile is not None
+      else "⚠️ Pas de profil de dérive : python scripts/drift_monitor.py --build-profile")
+
+training = {'source': 'scripts/export_bundle.py (lgbm_model.pkl, scaler.pkl, lstm_model.keras)'}
+previous = (read_manifest(BUNDLE_DIR) or {}).get('training', {}) if Path(BUNDLE_DIR).exists() else {}
+if previous.get('quartier_codes') is not None:
+    training['quartier_codes'] = previous['quartier_codes']
+    if lstm_model is not None:
+        replaced = reset_unseen_embeddings(lstm_model, training['quartier_codes'])
+        print(f"✅ Quartiers vus à l'entraînement conservés ({len(training['quartier_codes'])}), "
+              f"{replaced} ligne(s) d'embedding ramenée(s) au vecteur moyen")
+else:
+    print("⚠️ Quartiers d'entraînement inconnus : tous les quartiers du registre sont servis tels quels")
+bundle_path = save_bundle(BUNDLE_DIR, lgb_model, scaler, lstm_model, training=training, ensemble=ensemble,
+                          drift_profile=drift_profile)
+manifest = verify_bundle(bundle_path)
+print(f"\n✅ Bundle écrit : {bundle_path}/ (format v{manifest['format_version']}, empreinte {manifest['content_hash'][:12]})")
+for path in sorted(bundle_path.iterdir()):
+    print(f"  {path.name:40s} {path.stat().st_size / 1024:8.1f} Ko")
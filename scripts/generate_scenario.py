@@ -0,0 +1,84 @@
+"""
+Génération d'un scénario synthétique pluriannuel
+À exécuter : python scripts/generate_scenario.py scenarios/stress_2023_2025.yaml [-o data/scenarios/stress.parquet]
+
+Le scénario (JSON ou YAML, format dans src/scenarios.py) décrit la période,
+les quartiers et les événements injectés (canicules, pics de demande,
+orages de saison des pluies). Les lignes sont générées par blocs vectorisés
+et écrites au fil de l'eau ; le débit (lignes/s) est affiché à la fin.
+Le fichier produit a les colonnes de src/data_generator.py plus
+`evenement`, et se score directement avec scripts/score_csv.py.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.scenarios import DEFAULT_BLOCK_STEPS, DEFAULT_OUTPUT_DIR, OUTPUT_FORMATS, load_scenario, write_scenario
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génération d'un scénario synthétique")
+    parser.add_argument('scenario', help="Fichier de scénario (.json, .yaml)")
+    parser.add_argument('-o', '--output', help=f"Fichier de sortie (défaut: {DEFAULT_OUTPUT_DIR}/<nom>.<format>)")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, help="Format de sortie (défaut : d'après l'extension)")
+    parser.add_argument('--block-steps', type=int, default=DEFAULT_BLOCK_STEPS,
+                        help="Pas de temps par bloc généré")
+    parser.add_argument('--resume', help="Écrire le résumé du scénario (événements tirés, débit) en JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        scenario = load_scenario(args.scenario)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    output = Path(args.output) if args.output else Path(DEFAULT_OUTPUT_DIR) / f"{scenario.nom}.{args.format or 'csv'}"
+
+    print("=" * 70)
+    print("🌦️ GÉNÉRATION DE SCÉNARIO")
+    print("=" * 70)
+    print(f"  Scénario   : {scenario.nom} (graine {scenario.graine})")
+    print(f"  Période    : {scenario.debut} → {scenario.fin} ({len(scenario.timestamps):,} pas, "
+          f"fréquence {scenario.frequence})")
+    print(f"  Quartiers  : {len(scenario.quartiers)} → {scenario.rows:,} lignes")
+    for event in scenario.evenements:
+        print(f"  ⚡ {event.nom:28s} {event.type:12s} {len(event.fenetres):3d} fenêtre(s), "
+              f"intensité {event.intensite:g}, risque +{event.risque:g}")
+    print(f"  Sortie     : {output}")
+
+    def progress(rows, total):
+        print(f"  ⏳ {rows:,} / {total:,} lignes", end='\r', flush=True)
+
+    try:
+        summary = write_scenario(scenario, output, fmt=args.format, block_steps=args.block_steps,
+                                 progress=progress)
+    except ValueError as e:
+        print(f"\n❌ {e}")
+        return 1
+
+    print(f"\n✅ {summary['lignes']:,} lignes en {summary['secondes']:.2f} s "
+          f"({summary['lignes_par_seconde']:,.0f} lignes/s, génération seule "
+          f"{summary['lignes_par_seconde_generation']:,.0f} lignes/s)")
+    print(f"🔴 Coupures : {summary['coupures']:,} ({summary['taux_coupure'] * 100:.2f}%)")
+    pd.set_option('display.width', 200)
+    print("\n⚡ Par événement")
+    print(summary['par_evenement'].round(4).to_string(index=False))
+
+    if args.resume:
+        resume = {**scenario.summary(), 'sortie': str(output),
+                  **{k: v for k, v in summary.items() if k != 'par_evenement'},
+                  'par_evenement': summary['par_evenement'].to_dict('records')}
+        path = Path(args.resume)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(resume, f, ensure_ascii=False, indent=2, default=float)
+        print(f"\n💾 Résumé : {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""
+Génération d'un registre de zones (départs synthétiques)
+À exécuter : python scripts/generate_zones.py --feeders 1000 [-o data/zones_1000.csv]
+
+Les départs sont répartis autour des centres des quartiers de src/config.py.
+Pour les afficher dans l'application :
+    DAKAR_ZONES=data/zones_1000.csv streamlit run streamlit_app/app.py
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.zones import ZoneRegistry, generate_feeders
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Registre de zones synthétique")
+    parser.add_argument('--feeders', type=int, default=1000, help="Nombre de départs")
+    parser.add_argument('--spread-km', type=float, default=1.5, help="Dispersion autour des quartiers (km)")
+    parser.add_argument('--seed', type=int, default=42, help="Graine aléatoire")
+    parser.add_argument('-o', '--output', help="Fichier de sortie (défaut: data/zones_<N>.csv)")
+    args = parser.parse_args(argv)
+
+    output = Path(args.output or f"data/zones_{args.feeders}.csv")
+    frame = generate_feeders(args.feeders, args.spread_km, args.seed)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if output.suffix == '.json':
+        frame.to_json(output, orient='records', force_ascii=False, indent=2)
+    else:
+        frame.to_csv(output, index=False)
+
+    start = time.perf_counter()
+    registry = ZoneRegistry.from_file(output)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"✅ {len(registry):,} zones écrites dans {output} (relu et indexé en {elapsed:.1f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Chargement des données dans la base locale embarquée (hors ligne)
+À exécuter : python scripts/load_local_db.py [--storage sqlite:data/local/dakar.db]
+
+Remplace Supabase pour le développement, les tests et le travail hors
+ligne ; l'application et src/database.py l'utilisent avec :
+    DAKAR_STORAGE=sqlite:data/local/dakar.db
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src import database
+from src.storage import LOCAL_DB
+from src.timeseries import detect_date_column
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chargement de la base locale")
+    parser.add_argument('--csv', default='data/synthetic/synthetic_data_v2.csv', help="Données à charger")
+    parser.add_argument('--storage', default=f'local:{LOCAL_DB}',
+                        help="Backend (sqlite:chemin, duckdb:chemin, local:chemin)")
+    args = parser.parse_args(argv)
+
+    if args.storage.split(':', 1)[0] == 'supabase':
+        print("❌ Utilisez scripts/3_load_to_supabase.py pour Supabase")
+        return 1
+    csv_path = Path(args.csv)
+    if not csv_path.exists():
+        print(f"❌ Fichier non trouvé : {csv_path}")
+        return 1
+
+    backend = database.set_backend(args.storage)
+    print("=" * 70)
+    print(f"📥 CHARGEMENT BASE LOCALE ({backend.name} : {backend.path})")
+    print("=" * 70)
+
+    df = pd.read_csv(csv_path)
+    date_col = detect_date_column(df)
+    if date_col is None:
+        print("❌ Colonne de date introuvable (date_heure, date, timestamp)")
+        return 1
+    df = df.rename(columns={date_col: 'date_heure'})
+    if not database.insert_data_bulk(df):
+        return 1
+    database.print_database_summary()
+    print(database.get_statistics_by_quartier().to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Scoring en masse d'un fichier de scénarios
+À exécuter : python scripts/score_csv.py scenarios.csv [-o scores.csv] [--workers 4]
+
+Colonnes attendues : quartier, timestamp (ou date / date_heure),
+temp_celsius, humidite_percent, vitesse_vent, conso_megawatt.
+Le fichier de sortie reprend toutes les colonnes d'entrée, plus
+lgb, lstm, risque (%) et niveau.
+--explain ajoute les contributions de chaque facteur (colonnes contrib_*,
+en logit du risque, src/explain.py) et affiche les principaux facteurs.
+
+Nécessite le bundle de modèles (python scripts/export_bundle.py).
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.bulk_scoring import DEFAULT_CHUNKSIZE, score_csv
+from src.explain import DEFAULT_TOP
+from src.model_bundle import BUNDLE_DIR, bundle_exists
+from src.quantized import PRECISIONS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scoring en masse d'un CSV de scénarios")
+    parser.add_argument('input', help="CSV de scénarios")
+    parser.add_argument('-o', '--output', help="CSV de sortie (défaut: <input>_scores.csv)")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="Lignes par bloc")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Processus de scoring (1 = sans pool)")
+    parser.add_argument('--bundle', default=BUNDLE_DIR, help="Dossier du bundle de modèles")
+    parser.add_argument('--precision', choices=PRECISIONS, default='full',
+                        help="Précision des modèles (reduced : scaler float32 + LSTM int8)")
+    parser.add_argument('--explain', action='store_true',
+                        help="Ajouter les contributions des facteurs (SHAP) à chaque ligne")
+    args = parser.parse_args(argv)
+
+    source = Path(args.input)
+    output = Path(args.output) if args.output else source.with_name(f"{source.stem}_scores.csv")
+    if not bundle_exists(args.bundle):
+        print(f"❌ Bundle introuvable ({args.bundle}) : python scripts/export_bundle.py")
+        return 1
+
+    print("=" * 70)
+    print("📦 SCORING EN MASSE")
+    print("=" * 70)
+    print(f"  Entrée   : {source}")
+    print(f"  Sortie   : {output}")
+    print(f"  Blocs    : {args.chunksize:,} lignes, {args.workers} processus, précision {args.precision}"
+          + (", contributions" if args.explain else ""))
+
+    def progress(rows):
+        print(f"  ⏳ {rows:,} lignes scorées", end='\r', flush=True)
+
+    try:
+        summary = score_csv(source, output, chunksize=args.chunksize, workers=args.workers,
+                            bundle_dir=args.bundle, precision=args.precision, progress=progress,
+                            explain=args.explain)
+    except ValueError as e:
+        print(f"\n❌ {e}")
+        return 1
+
+    print(f"\n✅ {summary['rows']:,} lignes en {summary['seconds']:.1f} s "
+          f"({summary['rows_per_second']:,.0f} lignes/s)")
+    if summary['invalid']:
+        print(f"⚠️ {summary['invalid']:,} lignes invalides (niveau INVALIDE, scores vides)")
+    if args.explain:
+        print("\n🔍 Principaux facteurs (moyenne des |contributions|, logit)")
+        for row in summary['importance'].importance().head(DEFAULT_TOP).itertuples():
+            print(f"  {row.libelle:20s} {row.importance:7.3f}  (effet moyen {row.effet_moyen:+.3f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Ingestion en continu des relevés (compteurs et météo)
+À exécuter : python scripts/stream_ingest.py --socket 8765
+         ou : python scripts/stream_ingest.py --replay data/synthetic/synthetic_data_v2.csv
+
+--socket : écoute un port TCP, un relevé JSON par ligne, par exemple
+    {"quartier": "Yoff", "timestamp": "2024-06-01T18:00", "temp_celsius": 34,
+     "humidite_percent": 70, "vitesse_vent": 15, "conso_megawatt": 900}
+--replay : rejoue un CSV de relevés (--speed pour respecter le temps des données)
+
+Les prédictions sont ajoutées au backend de stockage (--storage, défaut :
+variable DAKAR_STORAGE) ; --alerts console / jsonl:chemin active les règles
+d'alerte (src/alerting.py) ; --drift tient les résumés de dérive par rapport
+au profil d'entraînement (src/drift.py), écrits régulièrement pour le
+tableau de bord et scripts/drift_monitor.py --state. Ctrl+C arrête le
+service et affiche le bilan.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src import database
+from src.alerting import DEFAULT_COOLDOWN, AlertEngine, create_sink
+from src.drift import DEFAULT_SAVE_SECONDS, DEFAULT_STATE_FILE, DriftMonitor
+from src.model_bundle import BUNDLE_DIR, bundle_exists, load_bundle
+from src.quantized import PRECISIONS, apply_precision
+from src.streaming import (DEFAULT_BATCH, DEFAULT_MAX_LATENCY, DEFAULT_PORT, FileReplaySource, SocketSource,
+                           StreamIngestor)
+
+
+def print_summary(summary, ingestor):
+    print(f"\n✅ {summary['readings']:,} relevés en {summary['wall_seconds']:.1f} s "
+          f"({summary['readings_per_second']:,.0f} relevés/s, {summary['batches']:,} micro-lots)")
+    print(f"  Prédictions stockées : {summary['stored_predictions']:,}")
+    print(f"  Relevés stockés (coupure connue) : {summary['stored_readings']:,}")
+    if ingestor.alerts is not None:
+        stats = ingestor.alerts.stats
+        print(f"  Alertes envoyées : {stats['alerts']:,} (dédupliquées : {stats['deduplicated']:,}, "
+              f"limite de débit : {stats['rate_limited']:,})")
+    if ingestor.drift is not None:
+        report = ingestor.drift.report()
+        drifting = report['features'].loc[report['features']['statut_global'] & (report['features']['derive'] == 'forte'),
+                                          'feature']
+        print(f"  Dérive : {report['statut']}" + (f" ({', '.join(drifting)})" if len(drifting) else "")
+              + f", état dans {ingestor.drift.state_path}")
+    if summary['invalid']:
+        print(f"⚠️ {summary['invalid']:,} relevés invalides ignorés")
+    if summary['storage_errors']:
+        print(f"❌ {summary['storage_errors']} lots non stockés : {ingestor.last_error}")
+    snapshot = ingestor.snapshot()
+    if len(snapshot):
+        print("\n" + snapshot.sort_values('risque_moyen', ascending=False).to_string(index=False))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingestion en continu des relevés")
+    source_group = parser.add_mutually_exclusive_group(required=True)
+    source_group.add_argument('--socket', type=int, nargs='?', const=DEFAULT_PORT, metavar='PORT',
+                              help=f"Écoute TCP, un relevé JSON par ligne (défaut: {DEFAULT_PORT})")
+    source_group.add_argument('--replay', help="CSV de relevés à rejouer")
+    parser.add_argument('--host', default='127.0.0.1', help="Adresse d'écoute (--socket)")
+    parser.add_argument('--speed', type=float, help="Accélération du temps au rejeu (défaut: sans pause)")
+    parser.add_argument('--limit', type=int, help="Arrêt après N relevés")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH, help="Relevés par micro-lot")
+    parser.add_argument('--max-latency', type=float, default=DEFAULT_MAX_LATENCY,
+                        help="Attente maximale avant traitement d'un relevé (secondes)")
+    parser.add_argument('--storage', help="Backend (supabase, sqlite:chemin, duckdb:chemin, local:chemin)")
+    parser.add_argument('--no-store', action='store_true', help="Scorer sans stocker")
+    parser.add_argument('--alerts', action='append', metavar='SINK',
+                        help="Destination des alertes : console, jsonl[:chemin] (option répétable)")
+    parser.add_argument('--alert-cooldown', type=float, default=DEFAULT_COOLDOWN,
+                        help="Délai entre deux alertes d'une règle pour un quartier (secondes)")
+    parser.add_argument('--drift', nargs='?', const=DEFAULT_STATE_FILE, metavar='PATH',
+                        help=f"Surveiller la dérive, état écrit dans PATH (défaut: {DEFAULT_STATE_FILE})")
+    parser.add_argument('--drift-every', type=float, default=DEFAULT_SAVE_SECONDS,
+                        help="Intervalle d'écriture de l'état de dérive (secondes)")
+    parser.add_argument('--bundle', default=BUNDLE_DIR, help="Dossier du bundle de modèles")
+    parser.add_argument('--precision', choices=PRECISIONS, default='full', help="Précision des modèles")
+    args = parser.parse_args(argv)
+
+    if not bundle_exists(args.bundle):
+        print(f"❌ Bundle introuvable ({args.bundle}) : python scripts/export_bundle.py")
+        return 1
+    if args.replay and not Path(args.replay).exists():
+        print(f"❌ Fichier non trouvé : {args.replay}")
+        return 1
+
+    models = apply_precision(load_bundle(args.bundle), args.precision)
+    if args.no_store:
+        backend = False
+    else:
+        backend = database.set_backend(args.storage) if args.storage else database.get_backend()
+
+    print("=" * 70)
+    print("📡 INGESTION EN CONTINU")
+    print("=" * 70)
+    try:
+        sinks = [create_sink(spec) for spec in args.alerts or ()]
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    alerts = AlertEngine(sinks=sinks, cooldown=args.alert_cooldown) if sinks else None
+    drift = None
+    if args.drift:
+        if models.get('drift_profile') is None:
+            print("❌ Bundle sans profil de dérive : python scripts/drift_monitor.py --build-profile")
+            return 1
+        drift = DriftMonitor(models['drift_profile'], state_path=args.drift, save_every=args.drift_every)
+    ingestor = StreamIngestor(models, backend, batch_size=args.batch_size, max_latency=args.max_latency,
+                              alerts=alerts, drift=drift)
+    if args.replay:
+        source = FileReplaySource(args.replay, speed=args.speed)
+        print(f"  Rejeu    : {args.replay}")
+    else:
+        source = SocketSource(args.host, args.socket)
+        print(f"  Écoute   : {args.host}:{source.port} (un relevé JSON par ligne)")
+    print(f"  Stockage : {'aucun' if args.no_store else backend.name}")
+    print(f"  Micro-lots : {args.batch_size:,} relevés ou {args.max_latency} s")
+    if sinks:
+        print(f"  Alertes  : {', '.join(args.alerts)}")
+    if drift is not None:
+        print(f"  Dérive   : {args.drift} (toutes les {args.drift_every:g} s)")
+
+    start = time.perf_counter()
+    try:
+        summary = ingestor.run(source, limit=args.limit)
+    except KeyboardInterrupt:
+        wall = time.perf_counter() - start
+        summary = {**ingestor.stats, 'wall_seconds': wall,
+                   'readings_per_second': ingestor.stats['readings'] / wall if wall else 0.0}
+    finally:
+        if isinstance(source, SocketSource):
+            source.close()
+            if source.rejected:
+                print(f"\n⚠️ {source.rejected:,} lignes JSON illisibles ignorées")
+        if drift is not None:
+            drift.save_state()
+
+    print_summary(summary, ingestor)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
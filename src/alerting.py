@@ -0,0 +1,473 @@
+"""
+Fichier : src/alerting.py
+Alertes sur les flux de scores de risque
+========================================
+
+AlertEngine évalue des règles sur les prédictions qui arrivent (micro-lots
+de src/streaming.py, ou tout DataFrame avec zone, date_heure et risque) :
+
+- LevelCrossing : changement de niveau FAIBLE / MOYEN / ÉLEVÉ (SEUILS_RISQUE)
+- SustainedHigh : risque au-dessus d'un seuil pendant une durée continue
+- RateOfChange : hausse du risque d'au moins `delta` points en `span` relevés
+
+État incrémental : chaque zone a une ligne dans des tableaux numpy (niveau
+courant, début de l'épisode haut, tampon circulaire des derniers risques,
+instant de la dernière alerte par règle). Un lot est trié par zone et
+traité en quelques opérations vectorisées (décalages dans chaque zone),
+sans relire l'historique ; le coût par relevé ne dépend ni du nombre de
+zones suivies, ni du nombre de relevés d'une zone dans le lot.
+
+Notifications :
+- Déduplication : une même règle ne se redéclenche pas pour une zone avant
+  `cooldown` secondes (temps des relevés, donc reproductible au rejeu)
+- Limite de débit : au plus `max_per_minute` alertes envoyées par minute
+  (seau à jetons), les plus graves d'abord ; les alertes écartées sont
+  comptées et signalées par une alerte de synthèse
+- Destinations (sinks) : fichier JSON Lines, console, mémoire, ou toute
+  fonction recevant la liste des alertes (create_sink)
+"""
+
+import json
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src import metrics
+from src.config import SEUILS_RISQUE
+
+LEVELS = np.array(['FAIBLE', 'MOYEN', 'ÉLEVÉ'])
+SEVERITIES = {'info': 0, 'warning': 1, 'critical': 2}
+SEVERITY_ICONS = {'info': 'ℹ️', 'warning': '⚠️', 'critical': '🚨'}
+
+DEFAULT_COOLDOWN = 3600.0
+DEFAULT_MAX_PER_MINUTE = 120
+DEFAULT_ALERTS_FILE = 'data/alerts/alerts.jsonl'
+INITIAL_CAPACITY = 1024
+
+
+def risk_levels(risque) -> np.ndarray:
+    """Code de niveau par valeur de risque (%) : 0 FAIBLE, 1 MOYEN, 2 ÉLEVÉ (SEUILS_RISQUE)."""
+    risque = np.asarray(risque, dtype=np.float64)
+    return ((risque >= SEUILS_RISQUE['moyen']).astype(np.int8)
+            + (risque >= SEUILS_RISQUE['eleve']).astype(np.int8))
+
+
+def _grow(array: np.ndarray, capacity: int, fill) -> np.ndarray:
+    grown = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+# ============================================================================
+# RÈGLES
+# ============================================================================
+
+class ZoneBatch:
+    """
+    Lot de relevés trié par zone, puis par ordre d'arrivée.
+
+    Attributs (tableaux alignés) : idx (ligne de zone), risque, t (secondes),
+    level / prev_level (niveau du relevé et du relevé précédent de la zone,
+    -1 si inconnu), first / last (premier / dernier relevé de la zone dans
+    le lot), pos (rang dans la zone), count (relevés de la zone dans le lot).
+    """
+
+    def __init__(self, idx, risque, t, state_level):
+        self.idx, self.risque, self.t = idx, risque, t
+        n = len(idx)
+        boundary = idx[1:] != idx[:-1]
+        self.first = np.concatenate([[True], boundary])
+        self.last = np.concatenate([boundary, [True]])
+        starts = np.flatnonzero(self.first)
+        group = np.cumsum(self.first) - 1
+        self.pos = np.arange(n) - starts[group]
+        self.count = np.diff(np.append(starts, n))[group]
+        self.level = risk_levels(risque)
+        self.prev_level = np.empty(n, dtype=np.int8)
+        self.prev_level[1:] = self.level[:-1]
+        self.prev_level[self.first] = state_level[idx[self.first]]
+
+
+class Rule:
+    """
+    Règle incrémentale.
+
+    evaluate reçoit un ZoneBatch, met à jour l'état par zone de la règle
+    (tableaux de `capacity` lignes) et retourne (masque des alertes, valeur
+    complémentaire par relevé ou None).
+    """
+
+    name = 'regle'
+    severity = 'warning'
+
+    def allocate(self, capacity: int):
+        """Agrandit l'état par zone à `capacity` lignes."""
+
+    def evaluate(self, batch: ZoneBatch):
+        raise NotImplementedError
+
+    def severities(self, prev_level, level) -> np.ndarray:
+        return np.full(len(level), self.severity, dtype=object)
+
+    def message(self, zone: str, risque: float, prev_level: int, level: int, extra: float) -> str:
+        raise NotImplementedError
+
+
+class LevelCrossing(Rule):
+    """
+    Changement de niveau de risque.
+
+    Args:
+        on_down: Signaler aussi les baisses de niveau (sévérité info)
+
+    Le premier relevé d'une zone sert de référence ; il n'alerte que s'il
+    est déjà ÉLEVÉ.
+    """
+
+    name = 'changement_niveau'
+
+    def __init__(self, on_down: bool = True):
+        self.on_down = on_down
+
+    def evaluate(self, batch):
+        prev_level, level = batch.prev_level, batch.level
+        first = prev_level < 0
+        mask = np.where(first, level == 2, level > prev_level)
+        if self.on_down:
+            mask |= ~first & (level < prev_level)
+        return mask, None
+
+    def severities(self, prev_level, level):
+        return np.where(level < prev_level, 'info', np.where(level == 2, 'critical', 'warning')).astype(object)
+
+    def message(self, zone, risque, prev_level, level, extra):
+        before = LEVELS[prev_level] if prev_level >= 0 else '—'
+        return f"{zone} : risque {before} → {LEVELS[level]} ({risque:.0f} %)"
+
+
+class SustainedHigh(Rule):
+    """
+    Risque resté au-dessus de `threshold` pendant `hours` heures consécutives.
+
+    Une alerte par épisode : l'épisode se termine au premier relevé sous le seuil.
+    """
+
+    name = 'risque_prolonge'
+    severity = 'critical'
+
+    def __init__(self, threshold: float = SEUILS_RISQUE['eleve'], hours: float = 3.0):
+        self.threshold = threshold
+        self.hours = hours
+        self._since = np.empty(0)
+        self._fired = np.empty(0, dtype=bool)
+
+    def allocate(self, capacity):
+        self._since = _grow(self._since, capacity, np.nan)
+        self._fired = _grow(self._fired, capacity, False)
+
+    def evaluate(self, batch):
+        idx, t = batch.idx, batch.t
+        high = batch.risque >= self.threshold
+        prev_high = np.concatenate([[False], high[:-1]]) & ~batch.first
+        # Début d'épisode : premier relevé haut de la zone (éventuellement commencé au lot précédent)
+        starts = high & ~prev_high
+        carried = starts & batch.first & ~np.isnan(self._since[idx])
+        start_time = np.where(carried, self._since[idx], t)
+        run = np.maximum.accumulate(np.where(starts, np.arange(len(t)), 0))
+        hours = np.where(high, (t - start_time[run]) / 3600, np.nan)
+        qualifies = high & (hours >= self.hours)
+        prev_qualifies = np.concatenate([[False], qualifies[:-1]]) & ~starts
+        mask = qualifies & ~prev_qualifies & ~(carried[run] & self._fired[idx])
+
+        last = batch.last
+        self._since[idx[last]] = np.where(high[last], start_time[run[last]], np.nan)
+        self._fired[idx[last]] = qualifies[last]
+        return mask, hours
+
+    def message(self, zone, risque, prev_level, level, extra):
+        return f"{zone} : risque ≥ {self.threshold:.0f} % depuis {extra:.1f} h ({risque:.0f} %)"
+
+
+class RateOfChange(Rule):
+    """
+    Hausse rapide : risque supérieur d'au moins `delta` points à sa valeur
+    d'il y a `span` relevés (tampon circulaire par zone, du plus ancien au
+    plus récent à partir de head).
+    """
+
+    name = 'hausse_rapide'
+
+    def __init__(self, delta: float = 20.0, span: int = 3):
+        self.delta = delta
+        self.span = span
+        self._ring = np.empty((0, span))
+        self._head = np.empty(0, dtype=np.int64)
+
+    def allocate(self, capacity):
+        self._ring = _grow(self._ring, capacity, np.nan)
+        self._head = _grow(self._head, capacity, 0)
+
+    def evaluate(self, batch):
+        idx, risque, pos = batch.idx, batch.risque, batch.pos
+        head = self._head[idx]
+        from_ring = pos < self.span
+        reference = np.empty(len(idx))
+        reference[from_ring] = self._ring[idx[from_ring], (head[from_ring] + pos[from_ring]) % self.span]
+        older = np.flatnonzero(~from_ring)
+        reference[older] = risque[older - self.span]
+        change = risque - reference
+
+        # Les `span` derniers relevés de chaque zone remplacent les plus anciens du tampon
+        kept = pos >= batch.count - self.span
+        self._ring[idx[kept], (head[kept] + pos[kept]) % self.span] = risque[kept]
+        last = batch.last
+        self._head[idx[last]] = (head[last] + batch.count[last]) % self.span
+        return np.nan_to_num(change, nan=-np.inf) >= self.delta, change
+
+    def message(self, zone, risque, prev_level, level, extra):
+        return f"{zone} : hausse de {extra:.0f} points en {self.span} relevés ({risque:.0f} %)"
+
+
+def default_rules() -> List[Rule]:
+    return [LevelCrossing(), SustainedHigh(), RateOfChange()]
+
+
+# ============================================================================
+# DESTINATIONS
+# ============================================================================
+
+class JsonlSink:
+    """Ajoute les alertes à un fichier JSON Lines (une alerte par ligne)."""
+
+    def __init__(self, path=DEFAULT_ALERTS_FILE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def emit(self, alerts: List[Dict]):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.writelines(json.dumps(alert, ensure_ascii=False) + '\n' for alert in alerts)
+
+
+class ConsoleSink:
+    """Affiche les alertes."""
+
+    def emit(self, alerts: List[Dict]):
+        for alert in alerts:
+            print(f"{SEVERITY_ICONS.get(alert['severite'], '')} [{alert['date_heure']}] {alert['message']}")
+
+
+class MemorySink:
+    """Garde les dernières alertes en mémoire (interface, tests)."""
+
+    def __init__(self, capacity: int = 1000):
+        self.alerts = deque(maxlen=capacity)
+
+    def emit(self, alerts: List[Dict]):
+        self.alerts.extend(alerts)
+
+    def recent(self, limit: Optional[int] = None) -> pd.DataFrame:
+        """Alertes gardées, plus récentes d'abord."""
+        alerts = list(self.alerts)[::-1]
+        return pd.DataFrame(alerts[:limit] if limit is not None else alerts)
+
+
+def create_sink(spec: str):
+    """
+    Crée une destination depuis sa spécification.
+
+    Args:
+        spec: 'console', 'memory' ou 'jsonl[:chemin]' (défaut : DEFAULT_ALERTS_FILE)
+    """
+    kind, _, path = spec.partition(':')
+    if kind == 'console':
+        return ConsoleSink()
+    if kind == 'memory':
+        return MemorySink()
+    if kind == 'jsonl':
+        return JsonlSink(path or DEFAULT_ALERTS_FILE)
+    raise ValueError(f"Destination d'alertes inconnue : {spec} (choix : console, memory, jsonl[:chemin])")
+
+
+# ============================================================================
+# MOTEUR
+# ============================================================================
+
+class AlertEngine:
+    """
+    Évalue les règles sur des lots de prédictions, par zone.
+
+    Args:
+        rules: Règles (défaut : default_rules())
+        sinks: Destinations (objets avec emit(alerts), ou fonctions)
+        key: Colonne identifiant la zone ('quartier', 'zone_id'...)
+        cooldown: Délai minimal entre deux alertes d'une règle pour une zone (secondes)
+        max_per_minute: Alertes envoyées par minute au plus (None = sans limite)
+    """
+
+    def __init__(self, rules: Optional[Sequence[Rule]] = None, sinks: Sequence = (), key: str = 'quartier',
+                 cooldown: float = DEFAULT_COOLDOWN, max_per_minute: Optional[int] = DEFAULT_MAX_PER_MINUTE):
+        self.rules = list(rules) if rules is not None else default_rules()
+        self.sinks: List[Callable[[List[Dict]], None]] = [getattr(s, 'emit', s) for s in sinks]
+        self.key = key
+        self.cooldown = cooldown
+        self.max_per_minute = max_per_minute
+        self.stats = {'events': 0, 'alerts': 0, 'deduplicated': 0, 'rate_limited': 0}
+        self._zones = pd.Index([], dtype=object)
+        self._capacity = 0
+        self._level = np.empty(0, dtype=np.int8)
+        self._last_alert = np.empty((0, len(self.rules)))
+        self._tokens = float(max_per_minute or 0)
+        self._refilled = time.monotonic()
+        self._dropped = 0
+        self._allocate(INITIAL_CAPACITY)
+
+    def _allocate(self, capacity: int):
+        self._capacity = capacity
+        self._level = _grow(self._level, capacity, -1)
+        self._last_alert = _grow(self._last_alert, capacity, -np.inf)
+        for rule in self.rules:
+            rule.allocate(capacity)
+
+    def _zone_ids(self, keys: np.ndarray) -> np.ndarray:
+        ids = self._zones.get_indexer(keys)
+        if (ids < 0).any():
+            new = pd.unique(keys[ids < 0])
+            self._zones = self._zones.append(pd.Index(new, dtype=object))
+            if len(self._zones) > self._capacity:
+                self._allocate(max(2 * self._capacity, len(self._zones)))
+            ids = self._zones.get_indexer(keys)
+        return ids
+
+    def __len__(self) -> int:
+        """Nombre de zones suivies."""
+        return len(self._zones)
+
+    def _dedupe(self, rows: np.ndarray, idx: np.ndarray, t: np.ndarray, r: int) -> np.ndarray:
+        """Candidats gardés : une alerte par règle et par zone tous les `cooldown` au plus."""
+        zone = idx[rows]
+        repeated = len(zone) > 1 and (zone[1:] == zone[:-1]).any()
+        if not repeated:
+            return rows[t[rows] - self._last_alert[zone, r] >= self.cooldown]
+        # Plusieurs candidats pour une zone dans le lot : sélection séquentielle (rare)
+        kept = []
+        for row in rows:
+            if t[row] - self._last_alert[idx[row], r] >= self.cooldown:
+                kept.append(row)
+                self._last_alert[idx[row], r] = t[row]
+        return np.array(kept, dtype=np.int64)
+
+    def _budget(self, n: int) -> int:
+        """Alertes envoyables maintenant (seau à jetons)."""
+        if self.max_per_minute is None:
+            return n
+        now = time.monotonic()
+        self._tokens = min(float(self.max_per_minute),
+                           self._tokens + (now - self._refilled) * self.max_per_minute / 60)
+        self._refilled = now
+        return min(n, int(self._tokens))
+
+    def _materialize(self, candidates: List[Dict]) -> List[Dict]:
+        """Alertes à envoyer, les plus graves d'abord si la limite de débit en écarte."""
+        n = sum(len(c['zone']) for c in candidates)
+        summary = []
+        if self._dropped and self._budget(1):
+            summary = [{'date_heure': pd.Timestamp.now().isoformat(timespec='seconds'), 'zone': None,
+                        'regle': 'limite_debit', 'severite': 'warning', 'risque': None, 'niveau': None,
+                        'message': f"{self._dropped} alerte(s) non envoyée(s) "
+                                   f"(limite de {self.max_per_minute}/min)"}]
+            self._tokens -= 1
+            self._dropped = 0
+        if not n:
+            return summary
+
+        columns = {k: np.concatenate([c[k] for c in candidates]) for k in candidates[0]}
+        # Ordre d'arrivée des relevés, puis ordre des règles
+        order = np.argsort(columns['row'], kind='stable')
+        allowed = self._budget(n)
+        if allowed < n:
+            # Les plus graves d'abord ; ordre d'arrivée à gravité égale
+            gravity = np.array([SEVERITIES[s] for s in columns['severite']])
+            order = order[np.argsort(-gravity[order], kind='stable')[:allowed]]
+            self._dropped += n - allowed
+            self.stats['rate_limited'] += n - allowed
+            metrics.inc('alerts_rate_limited_total', n - allowed)
+        if self.max_per_minute is not None:
+            self._tokens -= len(order)
+
+        alerts = []
+        for i in order:
+            rule = self.rules[columns['rule'][i]]
+            zone = self._zones[columns['zone'][i]]
+            prev_level, level = int(columns['prev_level'][i]), int(columns['level'][i])
+            risque = float(columns['risque'][i])
+            alerts.append({
+                'date_heure': str(np.datetime_as_string(columns['date'][i], unit='s')), 'zone': zone, 'regle': rule.name,
+                'severite': columns['severite'][i], 'risque': round(risque, 2), 'niveau': str(LEVELS[level]),
+                'message': rule.message(zone, risque, prev_level, level, float(columns['extra'][i]))
+            })
+        return summary + alerts
+
+    def evaluate(self, predictions: pd.DataFrame) -> List[Dict]:
+        """
+        Évalue un lot de prédictions et envoie les alertes aux destinations.
+
+        Args:
+            predictions: Colonnes `key`, risque (%) et date_heure (facultative :
+                heure courante), dans l'ordre d'arrivée
+
+        Returns:
+            Alertes envoyées
+        """
+        if predictions['risque'].isna().any():
+            predictions = predictions[predictions['risque'].notna()]
+        if predictions.empty:
+            return []
+        keys = predictions[self.key].to_numpy(dtype=object)
+        risque = predictions['risque'].to_numpy(dtype=np.float64)
+        if 'date_heure' in predictions.columns:
+            dates = pd.DatetimeIndex(predictions['date_heure'])
+            dates = (dates.tz_convert(None) if dates.tz is not None else dates).to_numpy()
+        else:
+            dates = np.full(len(predictions), np.datetime64('now'), dtype='datetime64[ns]')
+        t = dates.astype('datetime64[ns]').astype(np.int64) / 1e9
+        idx = self._zone_ids(keys)
+
+        order = np.argsort(idx, kind='stable')
+        batch = ZoneBatch(idx[order], risque[order], t[order], self._level)
+        candidates: List[Dict] = []
+        for r, rule in enumerate(self.rules):
+            mask, extra = rule.evaluate(batch)
+            rows = np.flatnonzero(mask)
+            if not len(rows):
+                continue
+            kept = self._dedupe(rows, batch.idx, batch.t, r)
+            self.stats['deduplicated'] += len(rows) - len(kept)
+            if not len(kept):
+                continue
+            self._last_alert[batch.idx[kept], r] = batch.t[kept]
+            # Candidats gardés en tableaux : les messages ne sont écrits que pour les alertes envoyées
+            candidates.append({
+                'rule': np.full(len(kept), r), 'row': order[kept], 'zone': batch.idx[kept],
+                'risque': batch.risque[kept], 'date': dates[order[kept]],
+                'prev_level': batch.prev_level[kept], 'level': batch.level[kept],
+                'extra': np.full(len(kept), np.nan) if extra is None else extra[kept],
+                'severite': rule.severities(batch.prev_level[kept], batch.level[kept])
+            })
+        self._level[batch.idx[batch.last]] = batch.level[batch.last]
+
+        self.stats['events'] += len(predictions)
+        metrics.inc('alert_events_total', len(predictions))
+        alerts = self._materialize(candidates)
+        if alerts:
+            self.stats['alerts'] += len(alerts)
+            metrics.inc('alerts_sent_total', len(alerts))
+            for sink in self.sinks:
+                try:
+                    sink(alerts)
+                except Exception:
+                    metrics.inc('alert_sink_errors_total')
+        return alerts
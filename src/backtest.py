@@ -0,0 +1,337 @@
+"""
+Fichier : src/backtest.py
+Backtest du modèle déployé sur l'historique
+===========================================
+
+Rejoue l'historique (synthetic_data_v2.csv) dans l'ordre chronologique à
+travers les modèles du bundle, puis mesure ce qu'aurait donné le modèle :
+AUC, Brier, précision / rappel aux seuils de décision, et réussite des
+alertes, globalement, par quartier, par heure de la journée et en fenêtre
+glissante.
+
+Calcul :
+- Scoring vectorisé par quartier (blocs contigus de PreparedDataset), un
+  lot par quartier, répartis sur un pool de threads (LightGBM et numpy
+  relâchent le GIL)
+- Métriques à partir de compteurs additifs par groupe (np.bincount) :
+  effectifs, positifs, vrais positifs par seuil, somme des erreurs
+  quadratiques, histogrammes des scores positifs / négatifs (AUC à
+  AUC_BINS classes de 0,1 point). Une fenêtre glissante ajoute la période
+  qui entre et retire celle qui sort (sommes cumulées) : aucun recalcul
+  sur l'historique de la fenêtre
+- Alertes : début d'épisode de risque ≥ seuil_alerte ; réussie si une
+  coupure survient dans les `horizon` heures. Couverture : part des débuts
+  de coupure précédés d'un risque ≥ seuil_alerte dans les `horizon` heures
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.config import SEUILS_RISQUE
+from src.dataset import PreparedDataset
+from src.features import INPUT_FEATURES, build_features
+from src.inference import predict_batch
+from src.model_registry import version_of
+
+AUC_BINS = 1000
+DEFAULT_PERIOD = 'W'
+DEFAULT_WINDOW = 4
+DEFAULT_HORIZON = 6
+ALL = 'Tous'
+
+
+# ============================================================================
+# SCORING
+# ============================================================================
+
+def _score_block(models: Dict, block: pd.DataFrame, quartier: str) -> np.ndarray:
+    X = build_features(block.index.to_numpy(), *(block[c].to_numpy() for c in INPUT_FEATURES))
+    preds = predict_batch(models, X, np.full(len(block), quartier, dtype=object))
+    if preds is None:
+        raise RuntimeError("Modèles indisponibles (LightGBM ou scaler manquant)")
+    return preds['risque']
+
+
+def score_history(models: Dict, dataset: PreparedDataset, workers: int = 1) -> pd.DataFrame:
+    """
+    Score tout l'historique, un lot vectorisé par quartier.
+
+    Args:
+        models: Jeu de modèles (load_bundle)
+        dataset: Historique préparé (lignes triées par quartier puis date)
+        workers: Threads de scoring (quartiers en parallèle)
+
+    Returns:
+        DataFrame (ordre du dataset) : date, quartier, coupure, risque (%)
+    """
+    if 'coupure' not in dataset.frame.columns:
+        raise ValueError("Colonne 'coupure' absente : rien à comparer aux prédictions")
+    blocks = [(q, dataset.frame.iloc[start:stop]) for q, (start, stop) in dataset.offsets.items()]
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            risques = list(pool.map(lambda item: _score_block(models, item[1], item[0]), blocks))
+    else:
+        risques = [_score_block(models, block, q) for q, block in blocks]
+    return pd.DataFrame({
+        'date': dataset.frame.index.to_numpy(),
+        'quartier': dataset.frame['quartier'].astype(str).to_numpy(),
+        'coupure': dataset.frame['coupure'].to_numpy(dtype=np.int8),
+        'risque': np.concatenate(risques) if risques else np.empty(0)
+    })
+
+
+# ============================================================================
+# COMPTEURS ET MÉTRIQUES
+# ============================================================================
+
+def count_outcomes(groups: np.ndarray, n_groups: int, y: np.ndarray, risque: np.ndarray,
+                   seuils: Sequence[float]) -> Dict[str, np.ndarray]:
+    """
+    Compteurs additifs par groupe (sommables entre groupes et entre périodes).
+
+    Args:
+        groups: Groupe de chaque ligne (0..n_groups-1)
+        y: Coupure observée (0 / 1)
+        risque: Score (%)
+        seuils: Seuils de décision (%)
+
+    Returns:
+        {'n', 'positifs', 'brier' (somme), 'predits' / 'vrais_positifs' (n_groups, len(seuils)),
+        'hist_pos' / 'hist_neg' (n_groups, AUC_BINS)}
+    """
+    p = risque / 100
+    bins = np.minimum((p * AUC_BINS).astype(np.int64), AUC_BINS - 1)
+    flat = groups * AUC_BINS + bins
+    size = n_groups * AUC_BINS
+    predicted = np.stack([risque >= s for s in seuils], axis=1) if len(seuils) else np.empty((len(y), 0), bool)
+    return {
+        'n': np.bincount(groups, minlength=n_groups).astype(np.float64),
+        'positifs': np.bincount(groups, weights=y, minlength=n_groups),
+        'brier': np.bincount(groups, weights=(p - y) ** 2, minlength=n_groups),
+        'predits': np.stack([np.bincount(groups, weights=c, minlength=n_groups) for c in predicted.T], axis=-1)
+        if len(seuils) else np.zeros((n_groups, 0)),
+        'vrais_positifs': np.stack([np.bincount(groups, weights=c & (y == 1), minlength=n_groups)
+                                    for c in predicted.T], axis=-1) if len(seuils) else np.zeros((n_groups, 0)),
+        'hist_pos': np.bincount(flat, weights=y, minlength=size).reshape(n_groups, AUC_BINS),
+        'hist_neg': np.bincount(flat, weights=1 - y, minlength=size).reshape(n_groups, AUC_BINS)
+    }
+
+
+def _ratio(num, den):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(den > 0, num / np.where(den > 0, den, 1), np.nan)
+
+
+def metrics_from_counts(counts: Dict[str, np.ndarray], seuils: Sequence[float]) -> pd.DataFrame:
+    """
+    Métriques d'un ensemble de compteurs (une ligne par groupe).
+
+    Returns:
+        DataFrame : n, taux_coupure, auc, brier, precision_<seuil>, rappel_<seuil>
+    """
+    n, positifs = counts['n'], counts['positifs']
+    hist_pos, hist_neg = counts['hist_pos'], counts['hist_neg']
+    negatifs = n - positifs
+    # AUC = P(score positif > score négatif), ex aequo (même classe) comptés pour moitié
+    neg_below = np.cumsum(hist_neg, axis=-1) - hist_neg
+    concordant = (hist_pos * (neg_below + 0.5 * hist_neg)).sum(axis=-1)
+    out = pd.DataFrame({
+        'n': n.astype(np.int64),
+        'taux_coupure': _ratio(positifs, n),
+        'auc': _ratio(concordant, positifs * negatifs),
+        'brier': _ratio(counts['brier'], n)
+    })
+    for k, s in enumerate(seuils):
+        out[f'precision_{s:g}'] = _ratio(counts['vrais_positifs'][..., k], counts['predits'][..., k])
+        out[f'rappel_{s:g}'] = _ratio(counts['vrais_positifs'][..., k], positifs)
+    return out
+
+
+def rolling_counts(counts: Dict[str, np.ndarray], window: int) -> Dict[str, np.ndarray]:
+    """
+    Compteurs en fenêtre glissante sur l'axe des périodes (axe 1).
+
+    Chaque fenêtre = fenêtre précédente + période entrante - période sortante
+    (différence de sommes cumulées).
+    """
+    rolled = {}
+    for key, values in counts.items():
+        cumulative = np.cumsum(values, axis=1)
+        shifted = np.zeros_like(cumulative)
+        shifted[:, window:] = cumulative[:, :-window]
+        rolled[key] = cumulative - shifted
+    return rolled
+
+
+# ============================================================================
+# ALERTES
+# ============================================================================
+
+def alert_outcomes(scores: pd.DataFrame, seuil_alerte: float, horizon: int) -> pd.DataFrame:
+    """
+    Débuts d'alerte et débuts de coupure, avec leur issue.
+
+    Args:
+        scores: Sortie de score_history (triée par quartier puis date)
+        seuil_alerte: Risque (%) déclenchant une alerte
+        horizon: Fenêtre (heures) entre alerte et coupure
+
+    Returns:
+        DataFrame des événements : date, quartier, type ('alerte' / 'coupure'),
+        succes (alerte suivie d'une coupure / coupure précédée d'une alerte)
+    """
+    quartier = scores['quartier'].to_numpy()
+    new_block = np.concatenate([[True], quartier[1:] != quartier[:-1]])
+    codes = np.cumsum(new_block) - 1
+    hours = scores['date'].to_numpy().astype('datetime64[h]').astype(np.int64)
+    # Clé (quartier, heure) croissante : une recherche dichotomique reste dans le bloc du quartier
+    span = int(hours.max() - hours.min()) + 2 * horizon + 2 if len(hours) else 1
+    key = codes * span + (hours - (hours.min() if len(hours) else 0))
+
+    level = scores['risque'].to_numpy() >= seuil_alerte
+    outage = scores['coupure'].to_numpy() == 1
+    alert_start = level & ~(np.concatenate([[False], level[:-1]]) & ~new_block)
+    outage_start = outage & ~(np.concatenate([[False], outage[:-1]]) & ~new_block)
+
+    cum_outage = np.concatenate([[0], np.cumsum(outage)])
+    cum_level = np.concatenate([[0], np.cumsum(level)])
+    a = np.flatnonzero(alert_start)
+    end = np.searchsorted(key, key[a] + horizon, side='right')
+    hit = cum_outage[end] - cum_outage[a] > 0
+    c = np.flatnonzero(outage_start)
+    begin = np.searchsorted(key, key[c] - horizon, side='left')
+    covered = cum_level[c + 1] - cum_level[begin] > 0
+
+    rows = np.concatenate([a, c])
+    return pd.DataFrame({
+        'date': scores['date'].to_numpy()[rows],
+        'quartier': quartier[rows],
+        'type': np.repeat(['alerte', 'coupure'], [len(a), len(c)]),
+        'succes': np.concatenate([hit, covered])
+    })
+
+
+def _alert_table(events: pd.DataFrame, by: Optional[np.ndarray], labels: List) -> pd.DataFrame:
+    """Alertes, taux de réussite et couverture par groupe (by = None : global)."""
+    table = pd.DataFrame(index=labels)
+    for kind, count_col, rate_col in (('alerte', 'alertes', 'reussite_alertes'),
+                                      ('coupure', 'coupures', 'couverture')):
+        sel = (events['type'] == kind).to_numpy()
+        keys = np.zeros(sel.sum(), dtype=np.int64) if by is None else by[sel]
+        total = np.bincount(keys, minlength=len(labels))
+        success = np.bincount(keys, weights=events['succes'].to_numpy()[sel], minlength=len(labels))
+        table[count_col] = total
+        table[rate_col] = _ratio(success, total)
+    return table.drop(columns='coupures')
+
+
+# ============================================================================
+# BACKTEST
+# ============================================================================
+
+def run_backtest(models: Dict, dataset: PreparedDataset, seuils: Sequence[float] = (SEUILS_RISQUE['moyen'],),
+                 seuil_alerte: float = SEUILS_RISQUE['eleve'], horizon: int = DEFAULT_HORIZON,
+                 period: str = DEFAULT_PERIOD, window: int = DEFAULT_WINDOW, workers: int = 1) -> Dict:
+    """
+    Backtest complet.
+
+    Args:
+        models: Jeu de modèles (load_bundle)
+        dataset: Historique préparé avec la colonne coupure
+        seuils: Seuils de décision (%) pour précision / rappel
+        seuil_alerte: Seuil (%) des alertes
+        horizon: Heures entre une alerte et la coupure qu'elle annonce
+        period: Période des métriques glissantes (alias pandas : 'D', 'W', 'M')
+        window: Périodes par fenêtre glissante
+        workers: Threads de scoring
+
+    Returns:
+        {'resume', 'global', 'par_quartier', 'par_heure' (DataFrames),
+         'glissant' (DataFrame : periode, quartier, métriques), 'secondes'}
+    """
+    seconds = {}
+    start = time.perf_counter()
+    scores = score_history(models, dataset, workers)
+    seconds['scoring'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # Rejeu chronologique : tri stable par date (ordre des quartiers conservé à date égale)
+    timeline = np.argsort(scores['date'].to_numpy(), kind='stable')
+    replay = scores.iloc[timeline]
+    y = replay['coupure'].to_numpy(dtype=np.float64)
+    risque = replay['risque'].to_numpy()
+    quartiers, q_codes = np.unique(replay['quartier'].to_numpy(), return_inverse=True)
+    dates = pd.DatetimeIndex(replay['date'].to_numpy())
+    periods, p_codes = np.unique(dates.to_period(period).start_time.to_numpy(), return_inverse=True)
+    n_q, n_p = len(quartiers), len(periods)
+
+    overall = metrics_from_counts(count_outcomes(np.zeros(len(y), np.int64), 1, y, risque, seuils), seuils)
+    by_quartier = metrics_from_counts(count_outcomes(q_codes, n_q, y, risque, seuils), seuils)
+    hours = dates.hour.to_numpy()
+    by_hour = metrics_from_counts(count_outcomes(hours, 24, y, risque, seuils), seuils)
+
+    # Compteurs par (quartier, période), puis fenêtre glissante ; 'Tous' = somme des quartiers
+    cells = count_outcomes(q_codes * n_p + p_codes, n_q * n_p, y, risque, seuils)
+    cells = {k: v.reshape((n_q, n_p) + v.shape[1:]) for k, v in cells.items()}
+    cells = {k: np.concatenate([v.sum(axis=0, keepdims=True), v]) for k, v in cells.items()}
+    rolled = rolling_counts(cells, window)
+    flat = {k: v.reshape((-1,) + v.shape[2:]) for k, v in rolled.items()}
+    rolling = metrics_from_counts(flat, seuils)
+    rolling.insert(0, 'quartier', np.repeat(np.concatenate([[ALL], quartiers]), n_p))
+    rolling.insert(0, 'periode', np.tile(periods, n_q + 1))
+    # Fenêtres incomplètes (début d'historique) écartées
+    rolling = rolling[np.tile(np.arange(n_p) >= window - 1, n_q + 1)].reset_index(drop=True)
+
+    events = alert_outcomes(scores, seuil_alerte, horizon)
+    ev_q = np.searchsorted(quartiers, events['quartier'].to_numpy())
+    ev_h = pd.DatetimeIndex(events['date']).hour.to_numpy()
+    overall = overall.join(_alert_table(events, None, [0]))
+    by_quartier = by_quartier.join(_alert_table(events, ev_q, list(range(n_q))))
+    by_hour = by_hour.join(_alert_table(events, ev_h, list(range(24))))
+    by_quartier.insert(0, 'quartier', quartiers)
+    by_hour.insert(0, 'heure', np.arange(24))
+    seconds['metriques'] = time.perf_counter() - start
+
+    return {
+        'resume': {
+            'modeles': version_of(models),
+            'debut': str(dates.min()), 'fin': str(dates.max()), 'lignes': int(len(scores)),
+            'quartiers': int(n_q), 'seuils': list(seuils), 'seuil_alerte': seuil_alerte,
+            'horizon_heures': horizon, 'periode': period, 'fenetre': window,
+            'risque_max': round(float(risque.max()), 2) if len(risque) else None
+        },
+        'global': overall,
+        'par_quartier': by_quartier,
+        'par_heure': by_hour,
+        'glissant': rolling,
+        'secondes': seconds
+    }
+
+
+def report_to_json(report: Dict, rolling: bool = False) -> Dict:
+    """
+    Rapport compact sérialisable : tables arrondies, fenêtre glissante
+    résumée (AUC minimale / maximale par quartier) sauf si rolling=True.
+    """
+    def records(frame: pd.DataFrame):
+        return frame.round(4).astype(object).where(frame.notna(), None).to_dict('records')
+
+    glissant = report['glissant']
+    summary = glissant.groupby('quartier', sort=False)['auc'].agg(['min', 'max', 'last']).reset_index()
+    summary.columns = ['quartier', 'auc_min', 'auc_max', 'auc_derniere']
+    out = {
+        'resume': report['resume'],
+        'global': records(report['global'])[0],
+        'par_quartier': records(report['par_quartier']),
+        'par_heure': records(report['par_heure']),
+        'glissant': records(summary),
+        'secondes': {k: round(v, 3) for k, v in report['secondes'].items()}
+    }
+    if rolling:
+        detail = glissant.assign(periode=glissant['periode'].astype(str))
+        out['glissant_detail'] = records(detail)
+    return out
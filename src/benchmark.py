@@ -0,0 +1,179 @@
+"""
+Fichier : src/benchmark.py
+Outils de mesure de performance (temps et mémoire)
+==================================================
+
+Fonctions partagées par scripts/benchmark.py :
+- Mesure d'une étape (temps médian sur plusieurs répétitions + pic mémoire)
+- Sauvegarde / lecture des résultats au format JSON
+- Comparaison avec une baseline et détection des régressions
+"""
+
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Une étape est en régression si elle est plus lente de 25% que la baseline
+DEFAULT_TOLERANCE = 0.25
+
+# En dessous de ce temps (secondes), le bruit de mesure domine : pas d'alerte
+MIN_SECONDS = 0.005
+
+
+def measure(fn: Callable, repeat: int = 3, track_memory: bool = True) -> Dict:
+    """
+    Mesure le temps d'exécution et le pic mémoire d'une fonction.
+
+    Le temps est mesuré sans tracemalloc (qui ralentit fortement les
+    allocations) ; le pic mémoire est mesuré lors d'une exécution séparée.
+
+    Args:
+        fn: Fonction sans argument à mesurer
+        repeat: Nombre de répétitions chronométrées
+        track_memory: Mesurer le pic mémoire Python/NumPy (tracemalloc)
+
+    Returns:
+        Dictionnaire {seconds, min_seconds, repeat, peak_mb}
+    """
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    peak_mb = None
+    if track_memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peak_mb = round(peak / 1024 ** 2, 3)
+
+    return {
+        'seconds': statistics.median(timings),
+        'min_seconds': min(timings),
+        'repeat': repeat,
+        'peak_mb': peak_mb
+    }
+
+
+def make_result(stage: str, size: int, measurement: Optional[Dict] = None,
+                status: str = 'ok', note: str = '', rows: Optional[int] = None) -> Dict:
+    """
+    Construit une ligne de résultat pour une étape et une taille.
+
+    Args:
+        stage: Nom de l'étape (ex: 'lgbm_train')
+        size: Nombre de lignes du dataset
+        measurement: Résultat de measure() (None si l'étape est sautée)
+        status: 'ok', 'skipped' ou 'error'
+        note: Explication (dépendance manquante, message d'erreur...)
+        rows: Lignes traitées par exécution, pour le débit (défaut: size)
+
+    Returns:
+        Dictionnaire sérialisable en JSON
+    """
+    result = {'stage': stage, 'size': size, 'status': status}
+    if measurement is not None:
+        result.update(measurement)
+        if measurement['seconds'] > 0:
+            result['rows_per_s'] = round((rows or size) / measurement['seconds'], 1)
+    if note:
+        result['note'] = note
+    return result
+
+
+def environment_info() -> Dict:
+    """Décrit la machine et les versions, pour comparer des runs comparables."""
+    info = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine()
+    }
+    for module in ('numpy', 'pandas', 'sklearn', 'lightgbm', 'tensorflow'):
+        try:
+            info[module] = __import__(module).__version__
+        except ImportError:
+            info[module] = None
+    return info
+
+
+def save_results(path, results: List[Dict], meta: Dict = None):
+    """Écrit les résultats d'un run au format JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {'meta': meta or environment_info(), 'results': results}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+
+
+def load_results(path) -> Optional[Dict]:
+    """Lit un fichier de résultats (None s'il n'existe pas)."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_to_baseline(results: List[Dict], baseline: Dict,
+                        tolerance: float = DEFAULT_TOLERANCE) -> List[Dict]:
+    """
+    Compare un run avec la baseline et retourne les régressions.
+
+    Args:
+        results: Résultats du run courant
+        baseline: Contenu d'un fichier de résultats (load_results)
+        tolerance: Ralentissement relatif toléré (0.25 = +25%)
+
+    Returns:
+        Liste des régressions {stage, size, baseline_s, current_s, ratio}
+    """
+    reference = {
+        (r['stage'], r['size']): r
+        for r in baseline.get('results', []) if r.get('status') == 'ok'
+    }
+
+    regressions = []
+    for result in results:
+        if result.get('status') != 'ok':
+            continue
+        ref = reference.get((result['stage'], result['size']))
+        if ref is None:
+            continue
+        if max(result['seconds'], ref['seconds']) < MIN_SECONDS:
+            continue
+        ratio = result['seconds'] / ref['seconds'] if ref['seconds'] > 0 else float('inf')
+        if ratio > 1 + tolerance:
+            regressions.append({
+                'stage': result['stage'],
+                'size': result['size'],
+                'baseline_s': ref['seconds'],
+                'current_s': result['seconds'],
+                'ratio': round(ratio, 2)
+            })
+    return regressions
+
+
+def print_results(results: List[Dict]):
+    """Affiche les résultats sous forme de tableau."""
+    print(f"\n{'Étape':22s} {'Taille':>9s} {'Temps (s)':>11s} {'Lignes/s':>13s} {'Pic (Mo)':>10s}")
+    print("-" * 70)
+    for r in results:
+        if r['status'] != 'ok':
+            print(f"{r['stage']:22s} {r['size']:9,d} {r['status']:>11s}   {r.get('note', '')}")
+            continue
+        peak = f"{r['peak_mb']:.1f}" if r.get('peak_mb') is not None else '-'
+        print(f"{r['stage']:22s} {r['size']:9,d} {r['seconds']:11.4f} "
+              f"{r.get('rows_per_s', 0):13,.0f} {peak:>10s}")
@@ -0,0 +1,200 @@
+"""
+Fichier : src/bulk_scoring.py
+Scoring en masse d'un fichier CSV de scénarios
+==============================================
+
+Le fichier est lu par blocs (pd.read_csv(chunksize=...)), chaque bloc est
+scoré en vectorisé (src/features.py + src/inference.py) et écrit aussitôt
+dans le fichier de sortie : la mémoire reste bornée quelle que soit la
+taille du fichier.
+
+Avec workers > 1, les blocs sont répartis sur un pool de processus. Chaque
+processus charge le bundle (models/bundle/) une seule fois ; les poids
+mappés en mémoire sont partagés entre tous les processus. Les blocs sont
+écrits dans l'ordre du fichier d'entrée, avec au plus 2 x workers blocs en
+cours pour borner la mémoire.
+
+Colonnes attendues : quartier, une colonne de date (timestamp, date,
+date_heure...), temp_celsius, humidite_percent, vitesse_vent, conso_megawatt.
+
+Avec explain=True, les contributions de chaque facteur au risque
+(src/explain.py, colonnes contrib_*) sont calculées dans le même lot et
+écrites à côté des scores.
+"""
+
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.config import SEUILS_RISQUE
+from src.explain import CONTRIB_COLUMNS, ImportanceAggregator, explain_batch
+from src.features import INPUT_FEATURES, build_features
+from src.inference import predict_batch
+from src.model_bundle import BUNDLE_DIR, load_bundle
+from src.quantized import apply_precision
+from src.timeseries import detect_date_column
+
+DEFAULT_CHUNKSIZE = 100_000
+REQUIRED_COLUMNS = ['quartier'] + INPUT_FEATURES
+
+# Modèles du processus de travail (chargés une fois par l'initialiseur du pool)
+_WORKER_MODELS: Optional[Dict] = None
+
+
+def validate_columns(columns) -> Optional[str]:
+    """
+    Vérifie l'en-tête du fichier.
+
+    Returns:
+        Colonne de date détectée
+
+    Raises:
+        ValueError: Colonne obligatoire ou colonne de date absente
+    """
+    missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+    date_col = detect_date_column(pd.DataFrame(columns=list(columns)))
+    if date_col is None:
+        missing.append('timestamp')
+    if missing:
+        raise ValueError(f"Colonnes manquantes : {', '.join(missing)}")
+    return date_col
+
+
+def score_frame(models: Dict, df: pd.DataFrame, date_col: str, explain: bool = False) -> pd.DataFrame:
+    """
+    Score un bloc de scénarios.
+
+    Les lignes invalides (date illisible, valeur manquante ou non numérique)
+    sont conservées avec des scores vides.
+
+    Args:
+        models: {'lgb', 'lstm', 'scaler'}
+        df: Bloc du fichier d'entrée
+        date_col: Colonne de date
+        explain: Ajouter les contributions des facteurs (CONTRIB_COLUMNS, logit du risque)
+
+    Returns:
+        df complété par 'lgb', 'lstm', 'risque' (%) et 'niveau' (et CONTRIB_COLUMNS)
+
+    Raises:
+        ValueError: explain demandé avec un LightGBM sans contributions (précision 'binned')
+    """
+    dates = pd.to_datetime(df[date_col], errors='coerce')
+    inputs = df[INPUT_FEATURES].apply(pd.to_numeric, errors='coerce')
+    valid = (dates.notna() & inputs.notna().all(axis=1) & df['quartier'].notna()).to_numpy()
+
+    out = df.copy()
+    for col in ('lgb', 'lstm', 'risque') + (tuple(CONTRIB_COLUMNS) if explain else ()):
+        out[col] = np.nan
+    if valid.any():
+        X = build_features(dates[valid].to_numpy(), *(inputs[c].to_numpy()[valid] for c in INPUT_FEATURES))
+        preds = predict_batch(models, X, df['quartier'].to_numpy()[valid])
+        if preds is None:
+            raise RuntimeError("Modèles indisponibles (LightGBM ou scaler manquant)")
+        for col, values in preds.items():
+            out.loc[valid, col] = np.round(values, 2)
+        if explain:
+            contributions = explain_batch(models, X, df['quartier'].to_numpy()[valid], preds['risque'])
+            if contributions is None:
+                raise ValueError("Contributions indisponibles pour ce LightGBM (précision 'binned')")
+            out.loc[valid, CONTRIB_COLUMNS] = np.round(contributions, 4)
+
+    risque = out['risque'].to_numpy()
+    out['niveau'] = np.select(
+        [np.isnan(risque), risque < SEUILS_RISQUE['moyen'], risque < SEUILS_RISQUE['eleve']],
+        ['INVALIDE', 'FAIBLE', 'MOYEN'], 'ÉLEVÉ'
+    )
+    return out
+
+
+def _init_worker(bundle_dir: str, precision: str):
+    global _WORKER_MODELS
+    _WORKER_MODELS = apply_precision(load_bundle(bundle_dir), precision)
+
+
+def _score_in_worker(df: pd.DataFrame, date_col: str, explain: bool) -> pd.DataFrame:
+    return score_frame(_WORKER_MODELS, df, date_col, explain)
+
+
+def iter_scored_chunks(source, models: Optional[Dict] = None, chunksize: int = DEFAULT_CHUNKSIZE,
+                       workers: int = 1, bundle_dir: str = BUNDLE_DIR,
+                       precision: str = 'full', explain: bool = False) -> Iterator[pd.DataFrame]:
+    """
+    Lit et score le fichier bloc par bloc, dans l'ordre.
+
+    Args:
+        source: Chemin ou fichier ouvert (CSV)
+        models: Modèles déjà chargés (workers=1) ; sinon chargés depuis bundle_dir
+        chunksize: Lignes par bloc
+        workers: Nombre de processus (1 = dans le processus courant)
+        bundle_dir: Bundle chargé par chaque processus de travail
+        precision: Précision des modèles chargés depuis bundle_dir (src/quantized.py)
+        explain: Ajouter les contributions des facteurs (voir score_frame)
+
+    Yields:
+        Blocs scorés (voir score_frame)
+    """
+    reader = pd.read_csv(source, chunksize=chunksize)
+    first = next(reader, None)
+    if first is None:
+        return
+    date_col = validate_columns(first.columns)
+
+    def chunks():
+        yield first
+        yield from reader
+
+    if workers <= 1:
+        models = models if models is not None else apply_precision(load_bundle(bundle_dir), precision)
+        for chunk in chunks():
+            yield score_frame(models, chunk, date_col, explain)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(str(bundle_dir), precision)) as pool:
+        pending = deque()
+        for chunk in chunks():
+            pending.append(pool.submit(_score_in_worker, chunk, date_col, explain))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def score_csv(source, destination, models: Optional[Dict] = None, chunksize: int = DEFAULT_CHUNKSIZE,
+              workers: int = 1, bundle_dir: str = BUNDLE_DIR, precision: str = 'full',
+              progress: Optional[Callable[[int], None]] = None, explain: bool = False) -> Dict:
+    """
+    Score un CSV de scénarios et écrit le résultat au fil de l'eau.
+
+    Args:
+        source: CSV d'entrée (chemin ou fichier ouvert)
+        destination: CSV de sortie (chemin ou fichier ouvert en texte)
+        models, chunksize, workers, bundle_dir, precision, explain: Voir iter_scored_chunks
+        progress: Appelé après chaque bloc avec le nombre de lignes traitées
+
+    Returns:
+        {'rows', 'invalid', 'chunks', 'seconds', 'rows_per_second'}, plus
+        'importance' (ImportanceAggregator cumulé sur les blocs) avec explain
+    """
+    start = time.perf_counter()
+    summary = {'rows': 0, 'invalid': 0, 'chunks': 0}
+    importance = ImportanceAggregator() if explain else None
+    for scored in iter_scored_chunks(source, models, chunksize, workers, bundle_dir, precision, explain):
+        scored.to_csv(destination, mode='a' if summary['chunks'] else 'w',
+                      header=summary['chunks'] == 0, index=False)
+        summary['rows'] += len(scored)
+        summary['invalid'] += int(scored['risque'].isna().sum())
+        summary['chunks'] += 1
+        if importance is not None:
+            importance.update_frame(scored)
+        if progress is not None:
+            progress(summary['rows'])
+    summary['seconds'] = time.perf_counter() - start
+    summary['rows_per_second'] = summary['rows'] / summary['seconds'] if summary['seconds'] else 0.0
+    if importance is not None:
+        summary['importance'] = importance
+    return summary
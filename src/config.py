@@ -111,9 +111,39 @@ MODEL_CONFIG = {
         'saison',
         'is_peak_hour'
     ],
+    # Colonnes catégorielles ajoutées après les features (codes de src/quartiers.py) :
+    # catégorielle native pour LightGBM, embedding pour le LSTM
+    'categorical_features': ['quartier'],
+    'quartier_embedding_dim': 4,
     'target': 'coupure',
     'test_size': 0.2,
-    'random_state': 42
+    # Part du jeu d'ajustement réservée à l'arrêt anticipé (modèles finaux et
+    # modèles des plis) : le jeu de test ne sert qu'à l'évaluation
+    'validation_size': 0.1,
+    'random_state': 42,
+    'lgbm_params': {
+        'objective': 'binary',
+        'metric': 'binary_logloss',
+        'boosting_type': 'gbdt',
+        'num_leaves': 31,
+        'learning_rate': 0.05,
+        'feature_fraction': 0.9,
+        'bagging_fraction': 0.8,
+        'bagging_freq': 5,
+        'verbose': -1,
+        'random_state': 42
+    },
+    'lgbm_num_boost_round': 100,
+    'lgbm_early_stopping_rounds': 10,
+    'lstm_epochs': 50,
+    'lstm_patience': 5,
+    # Ensemble calibré (src/ensemble.py) : prédictions hors-échantillon
+    # par validation croisée sur le jeu d'entraînement, chaque pli entraîné
+    # comme les modèles finaux (mêmes paramètres, arrêt anticipé dans le pli)
+    'stacking_folds': 5,
+    # Gain relatif de log loss sous lequel le LSTM est retiré de l'ensemble
+    # (il n'est alors plus exécuté à l'inférence) ; 0 = retiré seulement s'il n'aide pas
+    'stacking_lstm_tolerance': 0.0
 }
 
 print("✅ Config chargée : 8 quartiers")
\ No newline at end of file
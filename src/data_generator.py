@@ -28,6 +28,8 @@ random.seed(RANDOM_SEED)
 # CONFIGURATION DES QUARTIERS AVEC PONDÉRATION
 # ============================================================================
 
+# Noms canoniques du registre (src/quartiers.py)
+
 QUARTIERS_CONFIG = {
     'Guediawaye': {
         'risque_base': 0.134,  # 13.4% (le PLUS risqué)
@@ -41,7 +43,7 @@ QUARTIERS_CONFIG = {
         'consommation_avg': 750,
         'temperature_bias': 1.0
     },
-    'Sicap-Liberté': {
+    'Sicap-Liberte': {
         'risque_base': 0.088,  # 8.8%
         'facteur': 1.2,
         'consommation_avg': 700,
@@ -53,7 +55,7 @@ QUARTIERS_CONFIG = {
         'consommation_avg': 650,
         'temperature_bias': 0.0
     },
-    'Mermoz-Sacré-Cœur': {
+    'Mermoz-Sacre-Coeur': {
         'risque_base': 0.054,  # 5.4%
         'facteur': 0.8,
         'consommation_avg': 600,
@@ -1,36 +1,54 @@
-"""Gestion Base de DonnÃ©es via API REST Supabase"""
-import requests
-import pandas as pd
+"""Gestion Base de Données : Supabase (API REST) ou base locale embarquée (src/storage.py)"""
+import threading
 from datetime import datetime
 
-from src.config import SUPABASE_CONFIG
+from src.storage import StorageBackend, create_backend
+from src.table_counts import TableCounts
 
-BASE_URL = SUPABASE_CONFIG['url']
-API_KEY = SUPABASE_CONFIG['key']
+_backend = None
+_counts = None
+_backend_lock = threading.Lock()
 
-HEADERS = {
-    'apikey': API_KEY,
-    'Authorization': f'Bearer {API_KEY}',
-    'Content-Type': 'application/json',
-    'Prefer': 'return=representation'
-}
+def get_backend() -> StorageBackend:
+    """Backend actif, créé au premier appel depuis DAKAR_STORAGE (Supabase par défaut)."""
+    global _backend, _counts
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend()
+            _counts = TableCounts(_backend)
+        return _backend
+
+def get_table_counts() -> TableCounts:
+    """Comptages en cache du backend actif (src/table_counts.py)."""
+    get_backend()
+    return _counts
+
+def set_backend(backend):
+    """
+    Remplace le backend actif.
+
+    Args:
+        backend: StorageBackend, ou spécification ('sqlite:chemin.db', 'supabase'...)
+
+    Returns:
+        Le backend installé
+    """
+    global _backend, _counts
+    if isinstance(backend, str):
+        backend = create_backend(backend)
+    with _backend_lock:
+        if _counts is not None:
+            _counts.close()
+        _backend = backend
+        _counts = TableCounts(backend)
+    return backend
 
 def test_connection():
-    """Teste la connexion Ã  l'API Supabase."""
-    try:
-        response = requests.get(f"{BASE_URL}/rest/v1/", headers=HEADERS, timeout=10)
-        if response.status_code in [200, 404]:
-            print("âœ… Connexion Supabase API rÃ©ussie")
-            return True
-        else:
-            print(f"âŒ Erreur API : {response.status_code}")
-            return False
-    except Exception as e:
-        print(f"âŒ Erreur de connexion : {e}")
-        return False
+    """Teste la connexion au backend (API Supabase ou base locale)."""
+    return get_backend().test_connection()
 
 def get_create_tables_sql():
-    """Retourne le SQL pour crÃ©er les tables."""
+    """Retourne le SQL pour créer les tables (Supabase / PostgreSQL)."""
     return """
 CREATE TABLE IF NOT EXISTS enregistrements (
     id BIGSERIAL PRIMARY KEY,
@@ -71,45 +89,13 @@ CREATE INDEX IF NOT EXISTS idx_predictions_quartier ON predictions(quartier);
 """
 
 def insert_data_bulk(df, table_name='enregistrements'):
-    """InsÃ¨re un DataFrame en bulk via l'API REST."""
-    print(f"\nðŸ“Š Insertion de {len(df):,} lignes dans '{table_name}'...")
-    
-    try:
-        data = df.to_dict('records')
-        
-        for record in data:
-            if 'date_heure' in record and isinstance(record['date_heure'], pd.Timestamp):
-                record['date_heure'] = record['date_heure'].isoformat()
-        
-        batch_size = 100
-        total_batches = (len(data) + batch_size - 1) // batch_size
-        
-        for i in range(0, len(data), batch_size):
-            batch = data[i:i+batch_size]
-            response = requests.post(
-                f"{BASE_URL}/rest/v1/{table_name}",
-                headers=HEADERS,
-                json=batch,
-                timeout=30
-            )
-            
-            if response.status_code not in [200, 201]:
-                print(f"âŒ Erreur batch {i//batch_size + 1}")
-                return False
-            
-            print(f"  Batch {(i//batch_size)+1}/{total_batches} : {len(batch)} lignes")
-        
-        print(f"âœ… {len(df):,} lignes insÃ©rÃ©es !")
-        return True
-        
-    except Exception as e:
-        print(f"âŒ Erreur : {e}")
-        return False
+    """Insère un DataFrame en bulk (lots REST ou insertion locale en une transaction)."""
+    return get_backend().insert_data_bulk(df, table_name)
 
-def save_prediction_to_db(quartier, temp, humidite, vent, conso, proba_lgbm, 
-                          proba_lstm, proba_moyenne, prediction, 
+def save_prediction_to_db(quartier, temp, humidite, vent, conso, proba_lgbm,
+                          proba_lstm, proba_moyenne, prediction,
                           modele_utilise="LightGBM+LSTM", seuil_decision=50.0):
-    """Sauvegarde une prÃ©diction."""
+    """Sauvegarde une prédiction."""
     try:
         data = {
             'quartier': quartier,
@@ -125,137 +111,53 @@ def save_prediction_to_db(quartier, temp, humidite, vent, conso, proba_lgbm,
             'seuil_decision': float(seuil_decision),
             'date_heure': datetime.now().isoformat()
         }
-        
-        response = requests.post(
-            f"{BASE_URL}/rest/v1/predictions",
-            headers=HEADERS,
-            json=data,
-            timeout=10
-        )
-        return response.status_code in [200, 201]
-    except:
+    except (TypeError, ValueError):
         return False
+    return get_backend().save_prediction(data)
 
 def get_predictions_history(limit=100):
-    """RÃ©cupÃ¨re l'historique des prÃ©dictions."""
-    try:
-        response = requests.get(
-            f"{BASE_URL}/rest/v1/predictions",
-            headers=HEADERS,
-            params={'order': 'date_heure.desc', 'limit': limit},
-            timeout=10
-        )
-        if response.status_code == 200:
-            return pd.DataFrame(response.json())
-        return pd.DataFrame()
-    except:
-        return pd.DataFrame()
+    """Récupère l'historique des prédictions (plus récentes d'abord)."""
+    return get_backend().get_predictions_history(limit)
+
+def get_predictions_since(since_id=0, limit=1000):
+    """Prédictions d'id > since_id, par id croissant (voir src/history_feed.py)."""
+    return get_backend().get_predictions_since(since_id, limit)
 
 def get_statistics_by_quartier(quartier_filter=None):
     """
-    RÃ©cupÃ¨re les statistiques par quartier depuis les ENREGISTREMENTS SYNTHÃ‰TIQUES.
-    
+    Récupère les statistiques par quartier depuis les ENREGISTREMENTS SYNTHÉTIQUES.
+
     Args:
-        quartier_filter: Si spÃ©cifiÃ©, filtre pour un quartier particulier
-    
+        quartier_filter: Si spécifié, filtre pour un quartier particulier
+
     Returns:
         DataFrame avec les stats par quartier
     """
-    try:
-        # RÃ©cupÃ©rer TOUS les enregistrements (avec pagination)
-        all_data = []
-        offset = 0
-        limit = 1000
-        
-        while True:
-            params = {
-                'select': 'quartier,coupure,temp_celsius,conso_megawatt',
-                'order': 'id',
-                'limit': limit,
-                'offset': offset
-            }
-            
-            # Filtrer par quartier si spÃ©cifiÃ©
-            if quartier_filter:
-                params['quartier'] = f'eq.{quartier_filter}'
-            
-            response = requests.get(
-                f"{BASE_URL}/rest/v1/enregistrements",
-                headers=HEADERS,
-                params=params,
-                timeout=15
-            )
-            
-            if response.status_code != 200:
-                break
-            
-            data = response.json()
-            
-            if not data:
-                break
-            
-            all_data.extend(data)
-            
-            if len(data) < limit:
-                break
-            
-            offset += limit
-        
-        if not all_data:
-            return pd.DataFrame()
-        
-        # CrÃ©er DataFrame
-        df = pd.DataFrame(all_data)
-        
-        # Calculer les statistiques par quartier
-        stats = df.groupby('quartier').agg({
-            'coupure': ['count', 'sum', 'mean'],
-            'temp_celsius': 'mean',
-            'conso_megawatt': 'mean'
-        }).reset_index()
-        
-        stats.columns = ['quartier', 'total_enregistrements', 'total_coupures', 
-                        'taux_coupure', 'temp_moyenne', 'conso_moyenne']
-        
-        # Calculer le taux en pourcentage
-        stats['risque_moyen'] = stats['taux_coupure']  # DÃ©jÃ  entre 0 et 1
-        
-        # Trier par taux de coupure dÃ©croissant
-        stats = stats.sort_values('risque_moyen', ascending=False)
-        
-        return stats
-        
-    except Exception as e:
-        print(f"âŒ Erreur get_statistics_by_quartier: {e}")
-        import traceback
-        traceback.print_exc()
-        return pd.DataFrame()
+    return get_backend().get_statistics_by_quartier(quartier_filter)
 
-def get_table_count(table_name):
-    """Compte les lignes dans une table."""
-    try:
-        response = requests.get(
-            f"{BASE_URL}/rest/v1/{table_name}",
-            headers={**HEADERS, 'Prefer': 'count=exact'},
-            params={'select': 'id', 'limit': 1},
-            timeout=10
-        )
-        if response.status_code == 200:
-            count = response.headers.get('Content-Range', '0').split('/')[-1]
-            return int(count) if count != '*' else 0
-        return 0
-    except:
-        return 0
+def get_table_count(table_name, mode='auto'):
+    """
+    Compte les lignes dans une table.
+
+    Args:
+        table_name: Table ('enregistrements', 'predictions')
+        mode: 'auto' (cache avec TTL, estimation pour les grandes tables),
+            'exact' (COUNT(*)) ou 'estimated'
+    """
+    return get_table_counts().count(table_name, mode)
 
 def print_database_summary():
-    """Affiche un rÃ©sumÃ© de la base de donnÃ©es."""
+    """Affiche un résumé de la base de données."""
+    backend = get_backend()
     print("\n" + "=" * 70)
-    print(" ðŸ“Š RÃ‰SUMÃ‰ DE LA BASE DE DONNÃ‰ES SUPABASE")
+    print(f" 📊 RÉSUMÉ DE LA BASE DE DONNÉES ({backend.name.upper()})")
+    print("=" * 70)
+
+    counts = get_table_counts()
+    count_enr = counts.count('enregistrements')
+    count_pred = counts.count('predictions')
+    approx = {'estimated': ' (estimation)'}
+
+    print(f"📋 Enregistrements : {count_enr:,} lignes{approx.get(counts.kind('enregistrements'), '')}")
+    print(f"🔮 Prédictions : {count_pred:,} lignes{approx.get(counts.kind('predictions'), '')}")
     print("=" * 70)
-    
-    count_enr = get_table_count('enregistrements')
-    count_pred = get_table_count('predictions')
-    
-    print(f"ðŸ“‹ Enregistrements : {count_enr:,} lignes")
-    print(f"ðŸ”® PrÃ©dictions : {count_pred:,} lignes")
-    print("=" * 70)
\ No newline at end of file
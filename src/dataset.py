@@ -0,0 +1,131 @@
+"""
+Fichier : src/dataset.py
+Dataset historique préparé une seule fois au chargement
+=======================================================
+
+PreparedDataset centralise tout le travail qui était refait à chaque rendu
+des onglets Statistiques et Historique :
+- Dates parsées une fois, en index (DatetimeIndex)
+- Lignes triées par (quartier, date) : chaque quartier est un bloc contigu
+- Quartier stocké en catégoriel sur les codes du registre (src/quartiers.py),
+  noms ramenés à leur forme canonique
+- Offsets [début, fin) par quartier : un filtre est une tranche iloc (vue),
+  plus de masque booléen ni de copie
+- Statistiques par quartier et agrégats temporels pré-calculés
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.quartiers import canonical_name, quartier_categorical
+from src.timeseries import ALL_QUARTIERS, build_rollups, detect_date_column
+
+
+class PreparedDataset:
+    """
+    Dataset historique trié et indexé, partagé en lecture seule.
+
+    Args:
+        df: Données brutes (lues depuis le CSV)
+        date_col: Colonne de date (détectée automatiquement si None)
+    """
+
+    def __init__(self, df: pd.DataFrame, date_col: Optional[str] = None):
+        date_col = date_col or detect_date_column(df)
+        if date_col is not None:
+            dates = pd.to_datetime(df[date_col]).to_numpy()
+        else:
+            dates = pd.date_range(start='2023-01-01', periods=len(df), freq='h').to_numpy()
+
+        if 'quartier' in df.columns:
+            quartiers = quartier_categorical(df['quartier'])
+            order = np.lexsort((dates, quartiers.codes))
+        else:
+            quartiers = None
+            order = np.argsort(dates, kind='stable')
+
+        frame = df.drop(columns=[date_col] if date_col else []).iloc[order]
+        frame.index = pd.DatetimeIndex(dates[order], name='date')
+        if quartiers is not None:
+            frame['quartier'] = quartiers[order]
+
+        self._finalize(frame, date_col)
+
+    @classmethod
+    def from_prepared(cls, frame: pd.DataFrame, date_col: Optional[str] = None) -> 'PreparedDataset':
+        """
+        Construit le dataset à partir d'un frame déjà trié et indexé
+        (ex: colonnes mappées en mémoire par src/shared_store.py), sans copie.
+        """
+        dataset = cls.__new__(cls)
+        dataset._finalize(frame, date_col)
+        return dataset
+
+    def _finalize(self, frame: pd.DataFrame, date_col: Optional[str]):
+        self.frame = frame
+        self.date_col = date_col
+        self.offsets: Dict[str, Tuple[int, int]] = self._compute_offsets()
+        self.quartier_stats = self._compute_quartier_stats()
+        self.rollups = build_rollups(frame)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @property
+    def quartiers(self):
+        return list(self.offsets)
+
+    def _compute_offsets(self) -> Dict[str, Tuple[int, int]]:
+        if 'quartier' not in self.frame.columns:
+            return {}
+        codes = self.frame['quartier'].cat.codes.to_numpy()
+        categories = self.frame['quartier'].cat.categories
+        # Les codes sont triés : les bornes de chaque bloc se lisent directement
+        bounds = np.searchsorted(codes, np.arange(len(categories) + 1))
+        return {
+            categories[i]: (int(bounds[i]), int(bounds[i + 1]))
+            for i in range(len(categories)) if bounds[i + 1] > bounds[i]
+        }
+
+    def _compute_quartier_stats(self) -> pd.DataFrame:
+        if 'quartier' not in self.frame.columns or 'coupure' not in self.frame.columns:
+            return pd.DataFrame()
+        stats = self.frame.groupby('quartier', observed=True, sort=True).agg(
+            coupures=('coupure', 'sum'),
+            total=('coupure', 'size'),
+            temp_moy=('temp_celsius', 'mean'),
+            conso_moy=('conso_megawatt', 'mean')
+        ).reset_index()
+        stats['quartier'] = stats['quartier'].astype(str)
+        stats['taux_coupure'] = stats['coupures'] / stats['total']
+        return stats
+
+    def view(self, quartier: str = ALL_QUARTIERS) -> pd.DataFrame:
+        """
+        Lignes d'un quartier (tranche contiguë, sans copie).
+
+        Args:
+            quartier: Nom du quartier (toute orthographe), ou ALL_QUARTIERS pour tout le dataset
+
+        Returns:
+            DataFrame indexé par date, trié chronologiquement pour un quartier
+        """
+        if quartier == ALL_QUARTIERS:
+            return self.frame
+        start, stop = self.offsets.get(canonical_name(quartier), (0, 0))
+        return self.frame.iloc[start:stop]
+
+    def count(self, quartier: str = ALL_QUARTIERS) -> int:
+        """Nombre de lignes d'un quartier, en O(1)."""
+        if quartier == ALL_QUARTIERS:
+            return len(self.frame)
+        start, stop = self.offsets.get(canonical_name(quartier), (0, 0))
+        return stop - start
+
+    def stats(self, quartier: str = ALL_QUARTIERS) -> pd.DataFrame:
+        """Statistiques par quartier (taux de coupure, moyennes), filtrées si besoin."""
+        if quartier == ALL_QUARTIERS or self.quartier_stats.empty:
+            return self.quartier_stats
+        return self.quartier_stats[self.quartier_stats['quartier'] == canonical_name(quartier)]
@@ -0,0 +1,896 @@
+"""
+Fichier : src/drift.py
+Surveillance de la dérive des entrées et de la qualité des données
+==================================================================
+
+Le profil d'entraînement (DriftProfile, drift_profile.json dans le bundle)
+résume la distribution de référence de chaque colonne de
+MODEL_CONFIG['features'] et des probabilités prédites par quartier :
+bornes de classes (déciles, ou valeurs distinctes pour une feature
+discrète), proportions attendues par classe, percentiles 1-99, min / max.
+Pour les features non calendaires (météo, consommation) et pour le
+risque, proportions et percentiles sont aussi enregistrés par mois
+('par_mois').
+
+DriftMonitor tient, en mémoire constante, des résumés en continu des
+lignes scorées (micro-lots de src/streaming.py, fichier récent...) :
+- histogramme à classes fixes (bornes du profil) par feature et, pour le
+  risque, par quartier : np.searchsorted + np.bincount par lot
+- t-digest (TDigest) par feature continue et par quartier : quantiles et
+  fonction de répartition approchés, quelques dizaines de centroïdes
+- count-min (CountMinSketch) des noms de quartiers hors registre, avec
+  les plus fréquents
+- compteurs de qualité : valeurs manquantes, hors de la plage vue à
+  l'entraînement, dates illisibles
+
+Le coût par ligne scorée est constant (quelques opérations vectorisées
+par lot ; les t-digests trient un tampon de taille bornée), la mémoire ne
+dépend pas du nombre de lignes vues.
+
+Dérive (report) :
+- PSI (Population Stability Index) entre proportions attendues et
+  observées par classe : < 0.1 stable, 0.1-0.25 modérée, > 0.25 forte
+- KS : écart maximal entre fonctions de répartition (percentiles du
+  profil contre t-digest ; histogrammes pour une feature discrète)
+
+Les features saisonnières (température, humidité...) et le risque sont
+comparés au profil des mois observés : la référence d'une fenêtre est le
+mélange des profils mensuels, pondéré par les lignes vues chaque mois (un
+mois d'hiver n'est pas comparé à une année entière). Sans profil mensuel
+(bundle antérieur, mois trop peu représenté à l'entraînement), la
+comparaison se fait au profil annuel et n'entre dans le statut global que
+si la fenêtre couvre les douze mois.
+
+Les features calendaires (heure, mois...) sont suivies mais n'entrent pas
+dans le statut global : sur une fenêtre de quelques jours, leur
+distribution diffère toujours d'une année d'entraînement.
+
+Usage :
+    profile = models['drift_profile']            # load_bundle
+    monitor = DriftMonitor(profile)
+    monitor.update(scored)                        # date_heure, entrées, quartier, risque
+    monitor.report()['features']
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config import MODEL_CONFIG
+from src.features import INPUT_FEATURES, TIME_FEATURES, time_features
+from src.quartiers import N_QUARTIERS, QUARTIERS, encode_quartiers
+
+PROFILE_FILE = 'drift_profile.json'
+PROFILE_VERSION = 1
+DEFAULT_STATE_FILE = 'data/drift/drift_state.json'
+
+DEFAULT_BINS = 10
+MAX_DISCRETE_VALUES = 32
+PERCENTILES = np.arange(1, 100) / 100
+DEFAULT_COMPRESSION = 100
+DEFAULT_MIN_ROWS = 100
+DEFAULT_SAVE_SECONDS = 30.0
+TOP_UNKNOWN = 10
+
+MONTHS = 12
+MONTH_FEATURE = 'mois'
+# Lignes d'entraînement minimales d'un mois pour son profil (sinon profil annuel)
+MIN_MONTH_ROWS = 100
+
+PSI_THRESHOLDS = (0.1, 0.25)
+STATUSES = ['stable', 'modérée', 'forte']
+INSUFFICIENT = 'insuffisant'
+ALL = 'Tous'
+
+# Proportion minimale d'une classe dans le calcul du PSI (classe vide d'un côté)
+PSI_EPSILON = 1e-4
+
+
+# ============================================================================
+# MESURES DE DÉRIVE
+# ============================================================================
+
+def psi(expected, observed) -> float:
+    """
+    Population Stability Index entre deux répartitions par classe.
+
+    Args:
+        expected: Proportions (ou effectifs) de référence
+        observed: Effectifs (ou proportions) observés, mêmes classes
+
+    Returns:
+        PSI (0 = identiques), NaN si aucune observation
+    """
+    expected = np.asarray(expected, dtype=np.float64)
+    observed = np.asarray(observed, dtype=np.float64)
+    if observed.sum() <= 0 or expected.sum() <= 0:
+        return float('nan')
+    e = np.clip(expected / expected.sum(), PSI_EPSILON, None)
+    o = np.clip(observed / observed.sum(), PSI_EPSILON, None)
+    return float(np.sum((o - e) * np.log(o / e)))
+
+
+def ks_from_counts(expected, observed) -> float:
+    """Statistique KS entre deux répartitions par classe (écart maximal des cumuls)."""
+    expected = np.asarray(expected, dtype=np.float64)
+    observed = np.asarray(observed, dtype=np.float64)
+    if observed.sum() <= 0 or expected.sum() <= 0:
+        return float('nan')
+    return float(np.abs(np.cumsum(expected) / expected.sum() - np.cumsum(observed) / observed.sum()).max())
+
+
+def drift_status(value: float, rows: int, min_rows: int = DEFAULT_MIN_ROWS) -> str:
+    """Statut d'un PSI : stable, modérée, forte (insuffisant sous min_rows lignes)."""
+    if rows < min_rows or np.isnan(value):
+        return INSUFFICIENT
+    return STATUSES[int(np.searchsorted(PSI_THRESHOLDS, value, side='right'))]
+
+
+def _bin_edges(values: np.ndarray, bins: int):
+    """Bornes intérieures des classes : valeurs distinctes (discrète) ou quantiles."""
+    uniques = np.unique(values)
+    if len(uniques) <= MAX_DISCRETE_VALUES and np.all(uniques == np.round(uniques)):
+        return (uniques[:-1] + uniques[1:]) / 2, True
+    return np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1])), False
+
+
+def _bin_counts(edges: np.ndarray, values: np.ndarray) -> np.ndarray:
+    return np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+
+
+def _month_index(months: np.ndarray) -> np.ndarray:
+    """Index 1-12 des mois (0 = mois inconnu : date illisible, valeur hors 1-12)."""
+    months = np.asarray(months, dtype=np.float64)
+    valid = np.isfinite(months) & (months >= 1) & (months <= MONTHS)
+    return np.where(valid, months, 0).astype(np.int64)
+
+
+def _by_month(values: np.ndarray, months: np.ndarray, edges: np.ndarray) -> Dict:
+    """Proportions (classes du profil annuel) et percentiles de chaque mois assez représenté."""
+    par_mois = {}
+    for month in range(1, MONTHS + 1):
+        month_values = values[months == month]
+        if len(month_values) >= MIN_MONTH_ROWS:
+            par_mois[str(month)] = {
+                'rows': int(len(month_values)),
+                'expected': (_bin_counts(edges, month_values) / len(month_values)).tolist(),
+                'percentiles': np.quantile(month_values, PERCENTILES).tolist()
+            }
+    return par_mois
+
+
+def reference_cdf(percentiles, weights=None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fonction de répartition de référence aux percentiles du profil.
+
+    Args:
+        percentiles: Percentiles de référence, ou liste de percentiles (un par mois)
+        weights: Poids de chaque liste (mélange des profils mensuels) ; None = une seule référence
+
+    Returns:
+        (valeurs, répartition en chaque valeur)
+    """
+    if weights is None:
+        percentiles, weights = [percentiles], [1.0]
+    components = [np.asarray(p) for p in percentiles]
+    grid = np.unique(np.concatenate(components))
+    # Répartition en chaque percentile, valeurs répétées comprises
+    # (humidité plafonnée à 95 % : F(95) = 1, pas le rang du premier percentile à 95)
+    cdf = np.sum([w * np.searchsorted(p, grid, side='right') / (len(p) + 1)
+                  for w, p in zip(weights, components)], axis=0)
+    return grid, cdf
+
+
+def month_reference(spec: Dict, month_rows) -> Tuple[np.ndarray, List, np.ndarray, str]:
+    """
+    Référence d'une distribution du profil pour une fenêtre observée.
+
+    Args:
+        spec: Entrée du profil ('expected', 'percentiles', 'par_mois' facultatif)
+        month_rows: Lignes observées par mois (index 1-12 ; index 0 = mois inconnu, ignoré)
+
+    Returns:
+        (proportions attendues, percentiles de chaque composante, poids des
+         composantes, 'mois' si tous les mois observés ont leur profil, sinon 'annuel')
+    """
+    month_rows = np.asarray(month_rows, dtype=np.float64)[1:MONTHS + 1]
+    par_mois = spec.get('par_mois')
+    if par_mois is None or month_rows.sum() <= 0:
+        return np.asarray(spec['expected']), [spec['percentiles']], np.ones(1), 'annuel'
+    observed = np.flatnonzero(month_rows)
+    components = [par_mois.get(str(m + 1), spec) for m in observed]
+    weights = month_rows[observed] / month_rows.sum()
+    expected = np.sum([w * np.asarray(c['expected']) for w, c in zip(weights, components)], axis=0)
+    matched = all(str(m + 1) in par_mois for m in observed)
+    return expected, [c['percentiles'] for c in components], weights, 'mois' if matched else 'annuel'
+
+
+# ============================================================================
+# RÉSUMÉS EN CONTINU
+# ============================================================================
+
+class TDigest:
+    """
+    t-digest (variante à fusion) : quantiles approchés en mémoire bornée.
+
+    Les valeurs sont mises en tampon ; quand le tampon dépasse `buffer_size`,
+    tampon et centroïdes sont triés et fusionnés en au plus
+    compression / 2 + 1 centroïdes, plus fins aux extrémités (échelle
+    k = compression / 2π · arcsin(2q - 1)).
+
+    Args:
+        compression: Précision (nombre de centroïdes de l'ordre de compression / 2)
+        buffer_size: Valeurs en attente avant fusion (défaut : 10 x compression)
+    """
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION, buffer_size: Optional[int] = None):
+        self.compression = compression
+        self.buffer_size = buffer_size or 10 * compression
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._buffer = []
+        self._buffered = 0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return
+        self._buffer.append(values)
+        self._buffered += len(values)
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        if self._buffered >= self.buffer_size:
+            self._compress()
+
+    def _compress(self):
+        if not self._buffered:
+            return
+        values = np.concatenate(self._buffer)
+        means = np.concatenate([self.means, values])
+        weights = np.concatenate([self.weights, np.ones(len(values))])
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        group = np.floor(k + self.compression / 4).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+        self._buffer = []
+        self._buffered = 0
+
+    def _support(self):
+        self._compress()
+        cumulative = np.cumsum(self.weights)
+        positions = (cumulative - self.weights / 2) / cumulative[-1]
+        return np.r_[self.min, self.means, self.max], np.r_[0.0, positions, 1.0]
+
+    def cdf(self, x) -> np.ndarray:
+        """Fonction de répartition approchée en x (NaN si vide)."""
+        x = np.asarray(x, dtype=np.float64)
+        if not self.count:
+            return np.full(x.shape, np.nan)
+        xs, ys = self._support()
+        return np.where(x >= self.max, 1.0, np.interp(x, xs, ys))
+
+    def quantile(self, q) -> np.ndarray:
+        """Quantiles approchés (q dans [0, 1] ; NaN si vide)."""
+        q = np.asarray(q, dtype=np.float64)
+        if not self.count:
+            return np.full(q.shape, np.nan)
+        xs, ys = self._support()
+        return np.interp(q, ys, xs)
+
+    @classmethod
+    def merge(cls, digests: List['TDigest'], compression: int = DEFAULT_COMPRESSION) -> 'TDigest':
+        """Digest de l'union de plusieurs digests (centroïdes fusionnés)."""
+        merged = cls(compression)
+        for digest in digests:
+            if digest.count:
+                digest._compress()
+                merged._buffer.append(digest.means)
+                merged.weights = np.r_[merged.weights, digest.weights]
+                merged.count += digest.count
+                merged.min, merged.max = min(merged.min, digest.min), max(merged.max, digest.max)
+        if merged._buffer:
+            means = np.concatenate(merged._buffer)
+            order = np.argsort(means, kind='stable')
+            merged.means, merged.weights = means[order], merged.weights[order]
+            merged._buffer = []
+        return merged
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.means.nbytes + self.weights.nbytes + sum(b.nbytes for b in self._buffer))
+
+    def to_dict(self) -> Dict:
+        self._compress()
+        return {'means': self.means.tolist(), 'weights': self.weights.tolist(), 'count': self.count,
+                'min': self.min if self.count else None, 'max': self.max if self.count else None}
+
+    @classmethod
+    def from_dict(cls, spec: Dict, compression: int = DEFAULT_COMPRESSION) -> 'TDigest':
+        digest = cls(compression)
+        digest.means = np.asarray(spec['means'], dtype=np.float64)
+        digest.weights = np.asarray(spec['weights'], dtype=np.float64)
+        digest.count = int(spec['count'])
+        if digest.count:
+            digest.min, digest.max = float(spec['min']), float(spec['max'])
+        return digest
+
+
+class CountMinSketch:
+    """
+    Fréquences approchées de clés quelconques en mémoire fixe.
+
+    Chaque clé incrémente une case par ligne de la table (double hachage
+    du hash 64 bits de pandas) ; l'estimation est le minimum des cases,
+    jamais inférieure à la vraie fréquence.
+
+    Args:
+        width: Cases par ligne (erreur ~ total / width)
+        depth: Lignes (probabilité d'erreur ~ 2^-depth)
+    """
+
+    def __init__(self, width: int = 1024, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+
+    def _indexes(self, keys) -> np.ndarray:
+        h = pd.util.hash_array(np.asarray(keys, dtype=object))
+        h1, h2 = h & np.uint64(0xFFFFFFFF), (h >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((h1 + rows * h2) % np.uint64(self.width)).astype(np.int64)
+
+    def add(self, keys):
+        if not len(keys):
+            return
+        for row, index in enumerate(self._indexes(keys)):
+            self.table[row] += np.bincount(index, minlength=self.width)
+        self.total += len(keys)
+
+    def estimate(self, keys) -> np.ndarray:
+        if not len(keys):
+            return np.empty(0, dtype=np.int64)
+        index = self._indexes(keys)
+        return self.table[np.arange(self.depth)[:, None], index].min(axis=0)
+
+    def to_dict(self) -> Dict:
+        return {'width': self.width, 'depth': self.depth, 'total': self.total, 'table': self.table.tolist()}
+
+    @classmethod
+    def from_dict(cls, spec: Dict) -> 'CountMinSketch':
+        sketch = cls(spec['width'], spec['depth'])
+        sketch.table = np.asarray(spec['table'], dtype=np.int64).reshape(sketch.depth, sketch.width)
+        sketch.total = int(spec['total'])
+        return sketch
+
+
+# ============================================================================
+# PROFIL D'ENTRAÎNEMENT
+# ============================================================================
+
+class DriftProfile:
+    """
+    Distribution de référence des features et des probabilités prédites.
+
+    Args:
+        features: {feature: {'discrete', 'edges', 'expected', 'percentiles', 'min', 'max',
+            'par_mois' (features non calendaires) : {'1'..'12': {'rows', 'expected', 'percentiles'}}}}
+        risque: {'edges', 'expected', 'percentiles', 'par_mois', 'par_quartier':
+            {quartier: {'rows', 'expected', 'percentiles', 'par_mois'}}}
+        rows: Lignes ayant servi au profil des features
+        created_at: Date de création (ISO)
+    """
+
+    def __init__(self, features: Dict[str, Dict], risque: Dict, rows: int, created_at: Optional[str] = None):
+        self.features = features
+        self.risque = risque
+        self.rows = rows
+        self.created_at = created_at or datetime.now().isoformat(timespec='seconds')
+
+    @staticmethod
+    def _summarize(values: np.ndarray, bins: int) -> Dict:
+        edges, discrete = _bin_edges(values, bins)
+        counts = _bin_counts(edges, values)
+        return {'discrete': bool(discrete), 'edges': edges.tolist(), 'expected': (counts / len(values)).tolist(),
+                'percentiles': np.quantile(values, PERCENTILES).tolist(),
+                'min': float(values.min()), 'max': float(values.max())}
+
+    @classmethod
+    def fit(cls, X, risque, quartiers, bins: int = DEFAULT_BINS, mois=None) -> 'DriftProfile':
+        """
+        Profil de référence des données d'entraînement.
+
+        Args:
+            X: Features (n, len(MODEL_CONFIG['features'])), dans l'ordre de la configuration
+            risque: Probabilités prédites (%) sur des données de référence
+            quartiers: Quartier de chaque probabilité (noms ou codes du registre)
+            bins: Classes des features continues et du risque (déciles par défaut)
+            mois: Mois (1-12) de chaque probabilité, pour le profil mensuel du
+                risque (None = profil annuel seul)
+
+        Returns:
+            DriftProfile
+        """
+        X = np.asarray(X, dtype=np.float64)
+        names = MODEL_CONFIG['features']
+        months = _month_index(X[:, names.index(MONTH_FEATURE)]) if MONTH_FEATURE in names else None
+        features = {}
+        for j, name in enumerate(names):
+            finite = np.isfinite(X[:, j])
+            features[name] = cls._summarize(X[:, j][finite], bins)
+            if months is not None and name not in TIME_FEATURES:
+                features[name]['par_mois'] = _by_month(X[:, j][finite], months[finite],
+                                                       np.asarray(features[name]['edges']))
+
+        risque = np.asarray(risque, dtype=np.float64)
+        codes = np.asarray(quartiers) if np.issubdtype(np.asarray(quartiers).dtype, np.integer) \
+            else encode_quartiers(quartiers)
+        finite = np.isfinite(risque)
+        risque, codes = risque[finite], codes[finite]
+        risk_months = _month_index(mois)[finite] if mois is not None else None
+        summary = cls._summarize(risque, bins)
+        summary.pop('discrete')
+        edges = np.asarray(summary['edges'])
+        if risk_months is not None:
+            summary['par_mois'] = _by_month(risque, risk_months, edges)
+        par_quartier = {}
+        for code in np.unique(codes[codes >= 0]):
+            selected = codes == code
+            values = risque[selected]
+            par_quartier[QUARTIERS[code]] = {
+                'rows': int(len(values)),
+                'expected': (_bin_counts(edges, values) / len(values)).tolist(),
+                'percentiles': np.quantile(values, PERCENTILES).tolist()
+            }
+            if risk_months is not None:
+                par_quartier[QUARTIERS[code]]['par_mois'] = _by_month(values, risk_months[selected], edges)
+        summary['par_quartier'] = par_quartier
+        return cls(features, summary, int(len(X)))
+
+    def reference(self, name: str, month_rows) -> Tuple[np.ndarray, List, np.ndarray, str]:
+        """Référence de la feature `name` pour les mois observés (voir month_reference)."""
+        return month_reference(self.features[name], month_rows)
+
+    def to_dict(self) -> Dict:
+        return {'version': PROFILE_VERSION, 'created_at': self.created_at, 'rows': self.rows,
+                'features': self.features, 'risque': self.risque}
+
+    def save(self, directory) -> Path:
+        path = Path(directory) / PROFILE_FILE
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        return path
+
+    @classmethod
+    def load(cls, directory) -> Optional['DriftProfile']:
+        """Profil du bundle, ou None s'il n'en contient pas."""
+        path = Path(directory) / PROFILE_FILE
+        if not path.exists():
+            return None
+        with open(path, encoding='utf-8') as f:
+            spec = json.load(f)
+        if spec.get('version') != PROFILE_VERSION or list(spec['features']) != list(MODEL_CONFIG['features']):
+            return None
+        return cls(spec['features'], spec['risque'], spec['rows'], spec.get('created_at'))
+
+
+# ============================================================================
+# MONITEUR
+# ============================================================================
+
+class DriftMonitor:
+    """
+    Résumés en continu des lignes scorées, comparés au profil d'entraînement.
+
+    Args:
+        profile: Profil de référence (DriftProfile)
+        state_path: Fichier d'état réécrit toutes les `save_every` secondes
+            (lu par le tableau de bord et scripts/drift_monitor.py) ; None = aucun
+        save_every: Intervalle d'écriture de l'état (secondes)
+        compression: Précision des t-digests
+    """
+
+    def __init__(self, profile: DriftProfile, state_path=None, save_every: float = DEFAULT_SAVE_SECONDS,
+                 compression: int = DEFAULT_COMPRESSION):
+        self.profile = profile
+        self.state_path = Path(state_path) if state_path else None
+        self.save_every = save_every
+        self.compression = compression
+        self._edges = {name: np.asarray(spec['edges']) for name, spec in profile.features.items()}
+        self._risk_edges = np.asarray(profile.risque['edges'])
+        self._lock = threading.Lock()
+        self._saved = time.monotonic()
+        self.reset()
+
+    def reset(self):
+        """Repart de zéro (nouvelle fenêtre d'observation)."""
+        n_risk_bins = len(self._risk_edges) + 1
+        with self._lock:
+            self.rows = 0
+            self.invalid_dates = 0
+            # Lignes par mois (index 0 : date illisible), poids des profils mensuels
+            self.month_rows = np.zeros(MONTHS + 1, dtype=np.int64)
+            self.started_at = datetime.now().isoformat(timespec='seconds')
+            self.updated_at = None
+            self.counts = {name: np.zeros(len(edges) + 1, dtype=np.int64) for name, edges in self._edges.items()}
+            self.missing = dict.fromkeys(self._edges, 0)
+            self.below = dict.fromkeys(self._edges, 0)
+            self.above = dict.fromkeys(self._edges, 0)
+            self.digests = {name: TDigest(self.compression) for name, spec in self.profile.features.items()
+                            if not spec['discrete']}
+            # Risque par code de quartier ; dernière ligne (index -1) : quartiers hors registre
+            self.risk_counts = np.zeros((N_QUARTIERS + 1, n_risk_bins), dtype=np.int64)
+            self.risk_sums = np.zeros(N_QUARTIERS + 1, dtype=np.float64)
+            self.risk_month_rows = np.zeros((N_QUARTIERS + 1, MONTHS + 1), dtype=np.int64)
+            self.risk_digests = [TDigest(self.compression) for _ in range(N_QUARTIERS + 1)]
+            self.unknown = CountMinSketch()
+            self.unknown_top: Dict[str, int] = {}
+
+    def _feature_columns(self, df: pd.DataFrame, date_col: str) -> Tuple[Dict[str, np.ndarray], int]:
+        """Colonnes de MODEL_CONFIG['features'] (NaN si manquante) et nombre de dates illisibles."""
+        # Lots scorés : colonnes déjà numériques et dates déjà analysées, aucune conversion
+        columns = {}
+        for name in INPUT_FEATURES:
+            if name not in df.columns:
+                columns[name] = np.full(len(df), np.nan)
+            elif pd.api.types.is_numeric_dtype(df[name]):
+                columns[name] = df[name].to_numpy(dtype=np.float64)
+            else:
+                columns[name] = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float64)
+        if date_col not in df.columns:
+            dates = np.full(len(df), np.datetime64('NaT'), dtype='datetime64[ns]')
+        elif pd.api.types.is_datetime64_any_dtype(df[date_col]):
+            dates = df[date_col].to_numpy()
+        else:
+            dates = pd.to_datetime(df[date_col], errors='coerce').to_numpy()
+        valid = ~np.isnat(dates)
+        for name in TIME_FEATURES:
+            columns[name] = np.full(len(df), np.nan)
+        if valid.any():
+            for name, values in time_features(dates[valid]).items():
+                columns[name][valid] = values
+        return columns, int((~valid).sum())
+
+    def update(self, df: pd.DataFrame, date_col: str = 'date_heure'):
+        """
+        Ajoute un lot de lignes (invalides comprises : elles comptent pour la qualité).
+
+        Args:
+            df: Lignes avec date, entrées (INPUT_FEATURES), quartier et,
+                si scorées, risque (%)
+            date_col: Colonne de date
+        """
+        if df.empty:
+            return
+        columns, invalid_dates = self._feature_columns(df, date_col)
+        codes = encode_quartiers(df['quartier']) if 'quartier' in df.columns \
+            else np.full(len(df), -1, dtype=np.int16)
+
+        with self._lock:
+            self.rows += len(df)
+            self.invalid_dates += invalid_dates
+            months = _month_index(columns[MONTH_FEATURE])
+            self.month_rows += np.bincount(months, minlength=MONTHS + 1)
+            for name in MODEL_CONFIG['features']:
+                values = columns[name]
+                finite = np.isfinite(values)
+                if not finite.all():
+                    self.missing[name] += int((~finite).sum())
+                    values = values[finite]
+                spec = self.profile.features[name]
+                self.below[name] += int((values < spec['min']).sum())
+                self.above[name] += int((values > spec['max']).sum())
+                self.counts[name] += _bin_counts(self._edges[name], values)
+                if name in self.digests:
+                    self.digests[name].update(values)
+
+            if 'risque' in df.columns:
+                self._update_risk(df['risque'].to_numpy(dtype=np.float64), codes, months)
+            if 'quartier' in df.columns and (codes < 0).any():
+                self._update_unknown(df['quartier'].to_numpy()[codes < 0])
+            self.updated_at = datetime.now().isoformat(timespec='seconds')
+
+        if self.state_path is not None and time.monotonic() - self._saved >= self.save_every:
+            self.save_state()
+
+    def _update_risk(self, risque: np.ndarray, codes: np.ndarray, months: np.ndarray):
+        finite = np.isfinite(risque)
+        if not finite.all():
+            risque, codes, months = risque[finite], codes[finite], months[finite]
+        if not len(risque):
+            return
+        rows = np.where(codes < 0, N_QUARTIERS, codes).astype(np.int64)
+        n_bins = self.risk_counts.shape[1]
+        bins = np.searchsorted(self._risk_edges, risque, side='right')
+        self.risk_counts += np.bincount(rows * n_bins + bins, minlength=self.risk_counts.size).reshape(
+            self.risk_counts.shape)
+        self.risk_sums += np.bincount(rows, weights=risque, minlength=N_QUARTIERS + 1)
+        self.risk_month_rows += np.bincount(rows * (MONTHS + 1) + months, minlength=self.risk_month_rows.size).reshape(
+            self.risk_month_rows.shape)
+        # Tri par code (entiers : tri linéaire), puis une tranche par quartier présent
+        order = np.argsort(rows, kind='stable')
+        bounds = np.r_[0, np.cumsum(np.bincount(rows, minlength=N_QUARTIERS + 1))]
+        sorted_risk = risque[order]
+        for row in np.flatnonzero(np.diff(bounds)):
+            self.risk_digests[row].update(sorted_risk[bounds[row]:bounds[row + 1]])
+
+    def _update_unknown(self, names: np.ndarray):
+        names = pd.Series(names).dropna().astype(str).to_numpy(dtype=object)
+        if not len(names):
+            return
+        self.unknown.add(names)
+        uniques = pd.unique(names)
+        self.unknown_top.update(zip(uniques.tolist(), self.unknown.estimate(uniques).tolist()))
+        if len(self.unknown_top) > TOP_UNKNOWN:
+            self.unknown_top = dict(sorted(self.unknown_top.items(), key=lambda kv: -kv[1])[:TOP_UNKNOWN])
+
+    # ------------------------------------------------------------------------
+    # Rapport
+    # ------------------------------------------------------------------------
+
+    @staticmethod
+    def _ks_digest(digest: TDigest, percentiles, weights=None) -> float:
+        """
+        KS entre les percentiles du profil et la répartition du t-digest.
+
+        Args:
+            digest: Valeurs observées
+            percentiles, weights: Référence (voir reference_cdf)
+        """
+        if not digest.count:
+            return float('nan')
+        grid, expected = reference_cdf(percentiles, weights)
+        return float(np.abs(digest.cdf(grid) - expected).max())
+
+    def report(self, min_rows: int = DEFAULT_MIN_ROWS) -> Dict:
+        """
+        Dérive et qualité depuis le début (ou le dernier reset).
+
+        Args:
+            min_rows: Lignes minimales pour qualifier une dérive (sinon 'insuffisant')
+
+        Returns:
+            {'features': DataFrame (feature, calendaire, reference ('mois' : profils
+             des mois observés, 'annuel'), lignes, manquants_pct, hors_plage_pct,
+             psi, ks, derive, statut_global (compte dans 'statut')),
+             'quartiers': DataFrame (quartier, reference, lignes, risque_moyen,
+             risque_median, risque_median_attendu, psi, ks, derive, statut_global ;
+             'Tous' en tête),
+             'qualite': {lignes, dates_invalides, quartiers_inconnus, quartiers_inconnus_frequents},
+             'statut': dérive la plus forte des lignes statut_global (features
+             non calendaires et risque comparés aux mois observés),
+             'debut', 'mise_a_jour'}
+        """
+        with self._lock:
+            # Profil annuel contre une fenêtre partielle : écart saisonnier attendu, hors statut global
+            all_months = bool((self.month_rows[1:] > 0).all())
+            feature_rows = []
+            for name, spec in self.profile.features.items():
+                counts = self.counts[name]
+                n = int(counts.sum())
+                expected, percentiles, weights, reference = self.profile.reference(name, self.month_rows)
+                value = psi(expected, counts)
+                calendaire = name in TIME_FEATURES
+                feature_rows.append({
+                    'feature': name,
+                    'calendaire': calendaire,
+                    'reference': reference,
+                    'lignes': n,
+                    'manquants_pct': 100 * self.missing[name] / self.rows if self.rows else 0.0,
+                    'hors_plage_pct': 100 * (self.below[name] + self.above[name]) / n if n else 0.0,
+                    'psi': value,
+                    'ks': (self._ks_digest(self.digests[name], percentiles, weights) if name in self.digests
+                           else ks_from_counts(expected, counts)),
+                    'derive': drift_status(value, n, min_rows),
+                    'statut_global': not calendaire and (reference == 'mois' or all_months)
+                })
+
+            risk = self.profile.risque
+            quartier_rows = []
+            entries = [(ALL, self.risk_counts.sum(axis=0), self.risk_sums.sum(),
+                        TDigest.merge(self.risk_digests, self.compression), risk, self.risk_month_rows.sum(axis=0))]
+            entries += [(QUARTIERS[code], self.risk_counts[code], self.risk_sums[code], self.risk_digests[code],
+                         risk['par_quartier'].get(QUARTIERS[code]), self.risk_month_rows[code])
+                        for code in range(N_QUARTIERS)]
+            for name, counts, total, digest, spec, month_rows in entries:
+                n = int(counts.sum())
+                if not n:
+                    continue
+                if spec:
+                    expected, percentiles, weights, reference = month_reference(spec, month_rows)
+                    grid, cdf = reference_cdf(percentiles, weights)
+                    median = float(grid[min(np.searchsorted(cdf, 0.5), len(grid) - 1)])
+                    value = psi(expected, counts)
+                    ks = self._ks_digest(digest, percentiles, weights)
+                else:
+                    reference, median, value, ks = None, float('nan'), float('nan'), float('nan')
+                quartier_rows.append({
+                    'quartier': name,
+                    'reference': reference,
+                    'lignes': n,
+                    'risque_moyen': total / n,
+                    'risque_median': float(digest.quantile(0.5)),
+                    'risque_median_attendu': median,
+                    'psi': value,
+                    'ks': ks,
+                    'derive': drift_status(value, n, min_rows),
+                    'statut_global': bool(reference == 'mois' or all_months)
+                })
+
+            qualite = {
+                'lignes': self.rows,
+                'dates_invalides': self.invalid_dates,
+                'quartiers_inconnus': int(self.unknown.total),
+                'quartiers_inconnus_frequents': sorted(self.unknown_top.items(), key=lambda kv: -kv[1])
+            }
+            started_at, updated_at = self.started_at, self.updated_at
+
+        features = pd.DataFrame(feature_rows)
+        quartiers = pd.DataFrame(quartier_rows, columns=['quartier', 'reference', 'lignes', 'risque_moyen',
+                                                         'risque_median', 'risque_median_attendu', 'psi', 'ks',
+                                                         'derive', 'statut_global'])
+        statuses = list(features.loc[features['statut_global'], 'derive']) \
+            + list(quartiers.loc[quartiers['statut_global'], 'derive'])
+        known = [STATUSES.index(s) for s in statuses if s in STATUSES]
+        return {'features': features, 'quartiers': quartiers, 'qualite': qualite,
+                'statut': STATUSES[max(known)] if known else INSUFFICIENT,
+                'debut': started_at, 'mise_a_jour': updated_at}
+
+    def histogram(self, name: str, quartier: str = ALL) -> pd.DataFrame:
+        """
+        Proportions attendues et observées par classe.
+
+        Args:
+            name: Feature de MODEL_CONFIG['features'], ou 'risque'
+            quartier: Quartier (risque uniquement ; 'Tous' = toutes les lignes)
+
+        Returns:
+            Colonnes : classe, attendu (profil des mois observés), observe (proportions)
+        """
+        with self._lock:
+            if name == 'risque':
+                edges = self._risk_edges
+                if quartier == ALL:
+                    counts = self.risk_counts.sum(axis=0)
+                    expected = month_reference(self.profile.risque, self.risk_month_rows.sum(axis=0))[0]
+                else:
+                    code = QUARTIERS.index(quartier)
+                    reference = self.profile.risque['par_quartier'].get(quartier)
+                    expected = month_reference(reference, self.risk_month_rows[code])[0] if reference \
+                        else np.full(len(edges) + 1, np.nan)
+                    counts = self.risk_counts[code]
+                discrete = False
+            else:
+                spec = self.profile.features[name]
+                expected = self.profile.reference(name, self.month_rows)[0]
+                edges, counts, discrete = self._edges[name], self.counts[name], spec['discrete']
+            counts = counts.copy()
+
+        if discrete:
+            values = np.r_[edges - 0.5, edges[-1] + 0.5] if len(edges) else np.array([0.0])
+            labels = [f"{v:g}" for v in values]
+        else:
+            bounds = np.r_[-np.inf, edges, np.inf]
+            labels = [f"< {hi:.4g}" if np.isinf(lo) else (f"≥ {lo:.4g}" if np.isinf(hi) else f"{lo:.4g} – {hi:.4g}")
+                      for lo, hi in zip(bounds[:-1], bounds[1:])]
+        total = counts.sum()
+        return pd.DataFrame({'classe': labels, 'attendu': np.asarray(expected, dtype=np.float64),
+                             'observe': counts / total if total else np.zeros(len(counts))})
+
+    # ------------------------------------------------------------------------
+    # État persistant
+    # ------------------------------------------------------------------------
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'profile_created_at': self.profile.created_at,
+                'debut': self.started_at,
+                'mise_a_jour': self.updated_at,
+                'rows': self.rows,
+                'invalid_dates': self.invalid_dates,
+                'month_rows': self.month_rows.tolist(),
+                'features': {name: {'counts': self.counts[name].tolist(), 'missing': self.missing[name],
+                                    'below': self.below[name], 'above': self.above[name],
+                                    'digest': self.digests[name].to_dict() if name in self.digests else None}
+                             for name in self._edges},
+                'risk_counts': self.risk_counts.tolist(),
+                'risk_sums': self.risk_sums.tolist(),
+                'risk_month_rows': self.risk_month_rows.tolist(),
+                'risk_digests': [digest.to_dict() for digest in self.risk_digests],
+                'unknown': self.unknown.to_dict(),
+                'unknown_top': self.unknown_top
+            }
+
+    @classmethod
+    def from_dict(cls, profile: DriftProfile, state: Dict) -> 'DriftMonitor':
+        """
+        Moniteur restauré depuis to_dict().
+
+        Raises:
+            ValueError: État calculé avec un autre profil
+        """
+        if state.get('profile_created_at') != profile.created_at:
+            raise ValueError("État de dérive calculé avec un autre profil d'entraînement")
+        monitor = cls(profile)
+        monitor.started_at, monitor.updated_at = state['debut'], state['mise_a_jour']
+        monitor.rows, monitor.invalid_dates = state['rows'], state['invalid_dates']
+        if 'month_rows' in state:
+            monitor.month_rows = np.asarray(state['month_rows'], dtype=np.int64)
+            monitor.risk_month_rows = np.asarray(state['risk_month_rows'], dtype=np.int64)
+        for name, spec in state['features'].items():
+            monitor.counts[name] = np.asarray(spec['counts'], dtype=np.int64)
+            monitor.missing[name], monitor.below[name], monitor.above[name] = \
+                spec['missing'], spec['below'], spec['above']
+            if spec['digest'] is not None:
+                monitor.digests[name] = TDigest.from_dict(spec['digest'], monitor.compression)
+        monitor.risk_counts = np.asarray(state['risk_counts'], dtype=np.int64)
+        monitor.risk_sums = np.asarray(state['risk_sums'], dtype=np.float64)
+        monitor.risk_digests = [TDigest.from_dict(spec, monitor.compression) for spec in state['risk_digests']]
+        monitor.unknown = CountMinSketch.from_dict(state['unknown'])
+        monitor.unknown_top = dict(state['unknown_top'])
+        return monitor
+
+    def save_state(self, path=None) -> Path:
+        """Écrit l'état (fichier remplacé atomiquement : un lecteur ne voit jamais d'état partiel)."""
+        path = Path(path or self.state_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        state = self.to_dict()
+        fd, tmp = tempfile.mkstemp(prefix='.drift-', dir=path.parent)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except Exception:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self._saved = time.monotonic()
+        return path
+
+    @classmethod
+    def load_state(cls, profile: DriftProfile, path=DEFAULT_STATE_FILE) -> 'DriftMonitor':
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(profile, json.load(f))
+
+    @property
+    def nbytes(self) -> int:
+        """Mémoire des résumés (hors profil), indépendante du nombre de lignes vues."""
+        with self._lock:
+            return int(sum(c.nbytes for c in self.counts.values()) + self.risk_counts.nbytes
+                       + self.month_rows.nbytes + self.risk_month_rows.nbytes + self.risk_sums.nbytes
+                       + self.unknown.table.nbytes
+                       + sum(d.nbytes for d in self.digests.values())
+                       + sum(d.nbytes for d in self.risk_digests))
+
+
+def monitor_frame(profile: DriftProfile, df: pd.DataFrame, date_col: str = 'date_heure') -> DriftMonitor:
+    """Moniteur rempli avec un DataFrame complet (fichier récent, fenêtre d'historique)."""
+    monitor = DriftMonitor(profile)
+    monitor.update(df, date_col)
+    return monitor
+
+
+def report_to_json(report: Dict) -> Dict:
+    """Rapport sérialisable : tables arrondies, NaN remplacés par None."""
+    def records(frame: pd.DataFrame):
+        return frame.round(4).astype(object).where(frame.notna(), None).to_dict('records')
+
+    return {**report, 'features': records(report['features']), 'quartiers': records(report['quartiers'])}
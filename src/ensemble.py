@@ -0,0 +1,192 @@
+"""
+Fichier : src/ensemble.py
+Couche d'ensemble calibrée (stacking logistique)
+================================================
+
+Remplace la moyenne fixe 50/50 de LightGBM et du LSTM suivie du
+multiplicateur QUARTIER_ADJUSTMENT (qui pouvait dépasser 100% et
+décalibrer les probabilités) par une régression logistique apprise :
+
+    logit(risque) = b + w_lgb * logit(p_lgb) + w_lstm * logit(p_lstm) + c[quartier]
+
+Elle est ajustée dans scripts/2_train_models.py sur des prédictions
+hors-échantillon (validation croisée), ce qui la rend calibrée. Le
+modèle tient dans quelques nombres (ensemble.json dans le bundle) et
+s'applique en vectorisé pour un coût négligeable.
+
+Si le LSTM n'apporte rien (poids appris <= 0, ou gain relatif de log loss
+inférieur à la tolérance, MODEL_CONFIG['stacking_lstm_tolerance']),
+l'ensemble est enregistré sans LSTM et l'inférence ne l'exécute plus. Les
+deux stackers (avec et sans LSTM) sont comparés par validation croisée sur
+les lignes hors-échantillon (STACKER_FOLDS plis) : comparées sur les lignes
+qui ont servi à l'ajustement, une colonne de plus ne dégrade presque jamais
+la log loss, et le LSTM serait toujours gardé.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.quartiers import lookup_by_code, quartier_categorical
+
+ENSEMBLE_FILE = 'ensemble.json'
+
+# Bornes des probabilités avant passage au logit
+EPSILON = 1e-6
+
+# Gain relatif minimal de log loss pour garder le LSTM (0 = dès qu'il aide)
+LSTM_TOLERANCE = 0.0
+
+# Plis de la validation croisée qui compare les stackers avec et sans LSTM
+STACKER_FOLDS = 5
+
+
+def _logit(p: np.ndarray) -> np.ndarray:
+    p = np.clip(np.asarray(p, dtype=np.float64), EPSILON, 1 - EPSILON)
+    return np.log(p / (1 - p))
+
+
+def _log_loss(y: np.ndarray, p: np.ndarray) -> float:
+    p = np.clip(p, EPSILON, 1 - EPSILON)
+    return float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+
+
+class StackingEnsemble:
+    """
+    Stacker logistique sur les logits des modèles de base et le quartier.
+
+    Args:
+        intercept: Biais b
+        w_lgb: Poids du logit LightGBM
+        w_lstm: Poids du logit LSTM (0 si uses_lstm est False)
+        quartier_offsets: Décalage c[quartier] par nom canonique (0 pour un quartier inconnu)
+        uses_lstm: Le LSTM est-il nécessaire à l'inférence
+        metrics: Scores hors-échantillon enregistrés à l'entraînement
+    """
+
+    def __init__(self, intercept: float, w_lgb: float, w_lstm: float,
+                 quartier_offsets: Dict[str, float], uses_lstm: bool = True,
+                 metrics: Optional[Dict] = None):
+        self.intercept = float(intercept)
+        self.w_lgb = float(w_lgb)
+        self.w_lstm = float(w_lstm) if uses_lstm else 0.0
+        self.quartier_offsets = {str(q): float(c) for q, c in quartier_offsets.items()}
+        self.uses_lstm = bool(uses_lstm)
+        self.metrics = metrics or {}
+        # Décalages indexés par code du registre (src/quartiers.py)
+        self._offsets_by_code = lookup_by_code(self.quartier_offsets, 0.0)
+
+    def predict_proba(self, p_lgb: np.ndarray, p_lstm: Optional[np.ndarray] = None,
+                      codes: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Probabilité calibrée de coupure.
+
+        Args:
+            p_lgb: Probabilités LightGBM (0-1)
+            p_lstm: Probabilités LSTM (0-1), ignorées si uses_lstm est False
+            codes: Code du quartier de chaque ligne (encode_quartiers ; None = sans décalage)
+
+        Returns:
+            Tableau (n,) de probabilités 0-1
+        """
+        z = self.intercept + self.w_lgb * _logit(p_lgb)
+        if codes is not None:
+            z = z + self.offsets(codes)
+        if self.uses_lstm and p_lstm is not None:
+            z = z + self.w_lstm * _logit(p_lstm)
+        return 1.0 / (1.0 + np.exp(-z))
+
+    def offsets(self, codes: np.ndarray) -> np.ndarray:
+        """Décalage c[quartier] de chaque ligne (0 pour un quartier inconnu)."""
+        return self._offsets_by_code[codes]
+
+    def to_dict(self) -> Dict:
+        return {
+            'type': 'logistic_stacking',
+            'intercept': self.intercept,
+            'w_lgb': self.w_lgb,
+            'w_lstm': self.w_lstm,
+            'uses_lstm': self.uses_lstm,
+            'quartier_offsets': self.quartier_offsets,
+            'metrics': self.metrics
+        }
+
+    def save(self, directory) -> Path:
+        path = Path(directory) / ENSEMBLE_FILE
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, directory) -> Optional['StackingEnsemble']:
+        """Ensemble du bundle, ou None s'il n'en contient pas."""
+        path = Path(directory) / ENSEMBLE_FILE
+        if not path.exists():
+            return None
+        with open(path, encoding='utf-8') as f:
+            spec = json.load(f)
+        return cls(spec['intercept'], spec['w_lgb'], spec['w_lstm'], spec['quartier_offsets'],
+                   spec.get('uses_lstm', True), spec.get('metrics'))
+
+
+def _fit_logistic(columns, quartiers: np.ndarray, y: np.ndarray, C: float, folds: int, seed: int):
+    """
+    Stacker ajusté sur toutes les lignes, et sa log loss en validation croisée.
+
+    Returns:
+        (intercept, poids des colonnes, décalages par quartier, log loss en validation croisée)
+    """
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import StratifiedKFold, cross_val_predict
+
+    categories = sorted(q for q in pd.unique(quartiers) if isinstance(q, str))
+    one_hot = (quartiers[:, None] == np.asarray(categories)[None, :]).astype(np.float64)
+    X = np.column_stack(list(columns) + [one_hot])
+    model = LogisticRegression(C=C, max_iter=1000).fit(X, y)
+    coef = model.coef_[0]
+    n_base = len(columns)
+    offsets = dict(zip(categories, coef[n_base:]))
+    # Mêmes plis pour les deux stackers : la comparaison ne dépend que des colonnes
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed)
+    held_out = cross_val_predict(LogisticRegression(C=C, max_iter=1000), X, y, cv=cv,
+                                 method='predict_proba')[:, 1]
+    return model.intercept_[0], coef[:n_base], offsets, _log_loss(y, held_out)
+
+
+def fit_stacking_ensemble(p_lgb: np.ndarray, p_lstm: Optional[np.ndarray], quartiers: Sequence[str],
+                          y: np.ndarray, C: float = 1.0, lstm_tolerance: float = LSTM_TOLERANCE,
+                          folds: int = STACKER_FOLDS, seed: int = 42) -> StackingEnsemble:
+    """
+    Ajuste le stacker sur des prédictions hors-échantillon.
+
+    Args:
+        p_lgb: Probabilités LightGBM hors-échantillon (0-1)
+        p_lstm: Probabilités LSTM hors-échantillon (0-1), ou None
+        quartiers: Quartier de chaque ligne
+        y: Cible (0/1)
+        C: Inverse de la régularisation L2 (LogisticRegression)
+        lstm_tolerance: Gain relatif minimal de log loss pour garder le LSTM
+        folds: Plis de la validation croisée qui compare les deux stackers
+        seed: Graine du découpage en plis
+
+    Returns:
+        StackingEnsemble (uses_lstm=False si le poids du LSTM est <= 0 ou son
+        gain inférieur à lstm_tolerance)
+    """
+    quartiers = np.asarray(quartier_categorical(quartiers), dtype=object)
+    y = np.asarray(y)
+    b0, w0, offsets0, loss0 = _fit_logistic([_logit(p_lgb)], quartiers, y, C, folds, seed)
+    metrics = {'log_loss_lgb_only': round(loss0, 6), 'rows': int(len(y)), 'stacker_folds': folds}
+    if p_lstm is None:
+        return StackingEnsemble(b0, w0[0], 0.0, offsets0, uses_lstm=False, metrics=metrics)
+
+    b1, w1, offsets1, loss1 = _fit_logistic([_logit(p_lgb), _logit(p_lstm)], quartiers, y, C, folds, seed)
+    metrics['log_loss_with_lstm'] = round(loss1, 6)
+    gain = (loss0 - loss1) / loss0
+    metrics['lstm_gain'] = round(gain, 6)
+    if w1[1] <= 0 or gain <= lstm_tolerance:
+        return StackingEnsemble(b0, w0[0], 0.0, offsets0, uses_lstm=False, metrics=metrics)
+    return StackingEnsemble(b1, w1[0], w1[1], offsets1, uses_lstm=True, metrics=metrics)
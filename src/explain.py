@@ -0,0 +1,554 @@
+"""
+Fichier : src/explain.py
+Contributions des features (SHAP) de LightGBM, calculées en lot
+===============================================================
+
+Pour chaque prédiction, la part de chaque feature dans le score : valeurs
+SHAP exactes de l'arbre (TreeSHAP « path-dependent », les mêmes que
+booster.predict(X, pred_contrib=True)), mais calculées en vectorisé.
+
+pred_contrib parcourt chaque arbre ligne par ligne (~330 µs par ligne pour
+le modèle entraîné : 30x le coût du scoring). Ici, tout ce qui ne dépend
+pas des lignes est précalculé une fois par modèle (TreeExplainer) :
+- pour chaque feuille de chemin D (d features distinctes), la contribution
+  d'une feature ne dépend que du masque des features de D dont la ligne
+  respecte les conditions du chemin : 2^d cas, tabulés d'avance
+  (polynôme des coalitions pondéré par k!(d-k-1)!/d!)
+- chaque feature est discrétisée une fois sur les seuils du modèle
+  (comme BinnedForest, src/quantized.py) ; dans un arbre, la cellule de la
+  ligne (intervalle entre deux seuils de l'arbre, ou code du quartier)
+  suffit à connaître toutes ses décisions
+
+Par arbre, les lignes sont regroupées par combinaison de cellules (quelques
+milliers de motifs distincts pour des dizaines de milliers de lignes) ; les
+masques de chaque motif s'obtiennent par addition de tables, et les
+contributions par lecture des tables de feuilles. Aucune boucle Python par
+ligne ni par nœud.
+
+Dans l'espace du risque (explain_batch), les contributions sont exprimées
+en logit du risque et se somment exactement à logit(risque) :
+- features et quartier : contributions LightGBM x poids de l'ensemble (le
+  décalage du quartier s'ajoute à la colonne quartier)
+- base : biais de l'ensemble + (w_lgb + w_lstm) x valeur moyenne de
+  LightGBM, référence commune des deux modèles (même cible)
+- lstm : le reste, soit w_lstm x (logit LSTM - valeur moyenne) avec
+  l'ensemble (écart à la moyenne de l'ancienne combinaison sans ensemble)
+
+ImportanceAggregator cumule, lot après lot et en mémoire constante, la
+moyenne des |contributions| (importance) et des contributions signées par
+quartier : importance globale et principaux facteurs par quartier.
+
+Mesure du coût (scoring seul contre scoring + contributions, écart avec
+pred_contrib) :
+    python scripts/benchmark.py --suite explain --sizes 1000,10000,50000
+"""
+
+import weakref
+from math import factorial
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from src.config import MODEL_CONFIG
+from src.ensemble import EPSILON
+from src.inference import lgb_matrix, lgb_uses_quartier, model_codes, predict_batch
+from src.quartiers import N_QUARTIERS, QUARTIERS, encode_quartiers
+
+# Features distinctes au plus sur un chemin (table de 2^d x d par feuille)
+MAX_PATH_FEATURES = 16
+
+# Taille maximale d'une table jointe de groupe de features (codes x feuilles)
+GROUP_ENTRIES = 1 << 17
+
+# Colonnes de contributions ajoutées aux lignes scorées (src/bulk_scoring.py)
+CONTRIB_PREFIX = 'contrib_'
+DRIVERS = MODEL_CONFIG['features'] + ['quartier', 'lstm']
+CONTRIB_COLUMNS = [CONTRIB_PREFIX + name for name in DRIVERS + ['base']]
+
+DRIVER_LABELS = {
+    'temp_celsius': 'Température',
+    'humidite_percent': 'Humidité',
+    'vitesse_vent': 'Vent',
+    'conso_megawatt': 'Consommation',
+    'heure': 'Heure',
+    'jour_semaine': 'Jour de la semaine',
+    'mois': 'Mois',
+    'saison': 'Saison',
+    'is_peak_hour': 'Heure de pointe',
+    'quartier': 'Quartier',
+    'lstm': 'LSTM'
+}
+
+DEFAULT_TOP = 5
+
+
+# ============================================================================
+# TREESHAP PAR TABLES
+# ============================================================================
+
+def _leaf_table(value: float, zero_fractions: np.ndarray) -> np.ndarray:
+    """
+    Contributions d'une feuille pour chaque masque (2^d, d).
+
+    Pour le masque a (a_j = 1 si la ligne respecte les conditions du chemin
+    sur la feature j) et les fractions de couverture z_j :
+        phi_i = v (a_i - z_i) sum_k w(k) [x^k] prod_{j != i} (z_j + a_j x)
+    """
+    d = len(zero_fractions)
+    masks = np.arange(1 << d)
+    one = ((masks[:, None] >> np.arange(d)) & 1).astype(np.float64)
+    # poly[m, i] : polynôme des coalitions sans la feature i
+    poly = np.zeros((1 << d, d, d + 1))
+    poly[:, :, 0] = 1.0
+    for j in range(d):
+        nxt = poly * zero_fractions[j]
+        nxt[:, :, 1:] += poly[:, :, :-1] * one[:, j, None, None]
+        nxt[:, j] = poly[:, j]
+        poly = nxt
+    weights = np.array([factorial(k) * factorial(d - k - 1) / factorial(d) for k in range(d)])
+    return value * (one - zero_fractions) * (poly[:, :, :d] @ weights)
+
+
+class _Tree:
+    """
+    Tables d'un arbre.
+
+    Les features de l'arbre sont réparties en groupes dont le produit des
+    nombres de cellules reste petit : le code d'un groupe (ses cellules en
+    base mixte) indexe directement la somme des bits de masque de ses
+    features pour chaque feuille (joint). Le masque d'une feuille pour un
+    motif est la somme des tables jointes des groupes.
+    """
+
+    def __init__(self, structure: Dict, explainer: 'TreeExplainer'):
+        self.features: List[int] = []
+        self.groups: List[Dict] = []   # {'features', 'lookups' (bin global -> code), 'joint' (codes, feuilles)}
+
+        # Feuilles : (valeur, effectif, chemin [(feature, nœud, fraction de couverture, à gauche)])
+        leaves = []
+        self._walk(structure, [], leaves)
+        root_count = structure.get('internal_count', structure.get('leaf_count', 0)) or 1
+        self.expected_value = sum(value * count for value, count, _ in leaves) / root_count
+        if 'split_feature' not in structure:
+            return
+
+        self.features = sorted({f for _, _, path in leaves for f, _, _, _ in path})
+        column = {f: k for k, f in enumerate(self.features)}
+        tables, offsets, leaf_features = [], [], []
+        for value, _, path in leaves:
+            fractions: Dict[int, float] = {}
+            for f, _, ratio, _ in path:
+                fractions[f] = fractions.get(f, 1.0) * ratio
+            leaf_used = sorted(fractions)
+            if len(leaf_used) > MAX_PATH_FEATURES:
+                raise ValueError(f"TreeExplainer : plus de {MAX_PATH_FEATURES} features sur un chemin")
+            table = np.zeros((1 << len(leaf_used), len(self.features)))
+            table[:, [column[f] for f in leaf_used]] = _leaf_table(
+                value, np.array([fractions[f] for f in leaf_used]))
+            offsets.append(sum(len(t) for t in tables))
+            tables.append(table)
+            leaf_features.append(leaf_used)
+        # Tables des feuilles bout à bout : ligne offsets[feuille] + masque
+        self.table = np.concatenate(tables)
+
+        cells_by_feature, agree_by_feature = [], []
+        for f in self.features:
+            nodes = [node for _, _, path in leaves for g, node, _, _ in path if g == f]
+            cells, local = explainer.tree_cells(f, nodes)
+            agree = np.zeros((len(cells), len(leaves)), dtype=np.int32)
+            for leaf, (_, _, path) in enumerate(leaves):
+                if f not in leaf_features[leaf]:
+                    continue
+                ok = np.ones(len(cells), dtype=bool)
+                for g, node, _, left in path:
+                    if g == f:
+                        ok &= explainer.goes_left(f, node, cells) == left
+                agree[ok, leaf] = 1 << leaf_features[leaf].index(f)
+            cells_by_feature.append(local)
+            agree_by_feature.append(agree)
+
+        max_codes = max(1, GROUP_ENTRIES // len(leaves))
+        group = []
+        for k in range(len(self.features)):
+            size = int(np.prod([len(agree_by_feature[j]) for j in group + [k]], dtype=np.float64))
+            if group and size > max_codes:
+                self._add_group(group, cells_by_feature, agree_by_feature)
+                group = []
+            group.append(k)
+        self._add_group(group, cells_by_feature, agree_by_feature)
+        # Début de la table de chaque feuille, porté par le premier groupe
+        self.groups[0]['joint'] += np.asarray(offsets, dtype=np.int32)
+        sizes = [len(g['joint']) for g in self.groups]
+        # Code du motif (codes des groupes en base mixte), s'il tient sur 63 bits
+        self.multipliers = (np.cumprod([1] + sizes[:-1], dtype=np.int64)
+                            if np.prod(np.asarray(sizes, dtype=np.float64)) < 2.0 ** 62 else None)
+
+    def _add_group(self, members: List[int], cells_by_feature, agree_by_feature):
+        radix = [len(agree_by_feature[k]) for k in members]
+        multiplier = np.cumprod([1] + radix[:-1])
+        codes = np.arange(int(np.prod(radix)))
+        joint = np.zeros((len(codes), agree_by_feature[members[0]].shape[1]), dtype=np.int32)
+        for k, r, m in zip(members, radix, multiplier):
+            joint += agree_by_feature[k][(codes // m) % r]
+        self.groups.append({
+            'features': [self.features[k] for k in members],
+            'lookups': [cells_by_feature[k] * m for k, m in zip(members, multiplier)],
+            'joint': joint
+        })
+
+    def _walk(self, node: Dict, path: list, leaves: list):
+        if 'split_feature' not in node:
+            leaves.append((node['leaf_value'], node.get('leaf_count', 0), path))
+            return
+        count = node.get('internal_count', 0) or 1
+        for child, left in ((node['left_child'], True), (node['right_child'], False)):
+            child_count = child.get('internal_count', child.get('leaf_count', 0))
+            self._walk(child, path + [(node['split_feature'], node, child_count / count, left)], leaves)
+
+
+class TreeExplainer:
+    """
+    TreeSHAP vectorisé d'un booster LightGBM binaire.
+
+    Splits numériques '<=' (valeurs manquantes 'None' ou 'NaN') et
+    catégoriels '==' ; mêmes décisions que LightGBM (une valeur NaN d'une
+    feature 'None' vaut 0, un code catégoriel manquant ou inconnu va à
+    droite).
+
+    Args:
+        booster: lgb.Booster (ou modèle scikit-learn exposant booster_)
+    """
+
+    def __init__(self, booster):
+        booster = getattr(booster, 'booster_', booster)
+        dump = booster.dump_model()
+        if dump.get('num_tree_per_iteration', 1) != 1:
+            raise ValueError("TreeExplainer : seuls les modèles binaires sont supportés")
+        self.n_features = dump['max_feature_idx'] + 1
+
+        nodes = []
+        for tree in dump['tree_info']:
+            self._collect(tree['tree_structure'], nodes)
+        self.categorical = sorted({f for f, node in nodes if node['decision_type'] == '=='})
+        self.nan_missing = sorted({f for f, node in nodes if node.get('missing_type') == 'NaN'})
+        self.edges = [np.asarray(sorted({node['threshold'] for g, node in nodes
+                                         if g == f and node['decision_type'] == '<='}), dtype=np.float64)
+                      for f in range(self.n_features)]
+        self.max_category = {f: max(c for g, node in nodes if g == f for c in self._categories(node))
+                             for f in self.categorical}
+        # Bins globaux : seuils + 1 (dernier = manquant) ; catégories + 1 (dernier = hors ensemble)
+        self.n_bins = [self.max_category[f] + 2 if f in self.categorical else len(self.edges[f]) + 2
+                       for f in range(self.n_features)]
+        # Seuil -> bin global : x <= seuil_k  <=>  bin(x) <= k
+        self._index = [{t: k for k, t in enumerate(e.tolist())} for e in self.edges]
+
+        self.trees = [_Tree(tree['tree_structure'], self) for tree in dump['tree_info']]
+        self.expected_value = float(sum(t.expected_value for t in self.trees))
+
+    @staticmethod
+    def _categories(node) -> list:
+        return [int(c) for c in str(node['threshold']).split('||')]
+
+    @staticmethod
+    def _collect(node, nodes):
+        if 'split_feature' not in node:
+            return
+        decision = node.get('decision_type', '<=')
+        if decision not in ('<=', '=='):
+            raise ValueError(f"TreeExplainer : split '{decision}' non supporté")
+        if node.get('missing_type', 'None') == 'Zero':
+            raise ValueError("TreeExplainer : valeurs manquantes 'Zero' non supportées")
+        nodes.append((node['split_feature'], node))
+        TreeExplainer._collect(node['left_child'], nodes)
+        TreeExplainer._collect(node['right_child'], nodes)
+
+    def tree_cells(self, f: int, nodes: List[Dict]):
+        """
+        Cellules d'un arbre pour la feature f.
+
+        Returns:
+            (valeurs représentatives des cellules, correspondance bin global -> cellule).
+            Numérique : indice de cellule (nombre de seuils de l'arbre < x),
+            dernière cellule = manquante ; catégoriel : le code lui-même.
+        """
+        if f in self.categorical:
+            cells = np.arange(self.n_bins[f])
+            return cells, cells
+        splits = np.asarray(sorted({self._index[f][node['threshold']] for node in nodes}), dtype=np.int64)
+        local = np.searchsorted(splits, np.arange(self.n_bins[f]), side='left')
+        local[-1] = len(splits) + 1
+        # Représentant de la cellule k : bin global du k-ième seuil (x <= seuil), NaN en dernier
+        return np.append(np.append(splits, self.n_bins[f] - 2), -1), local
+
+    def goes_left(self, f: int, node: Dict, cells: np.ndarray) -> np.ndarray:
+        """Décision d'un nœud pour chaque cellule (voir tree_cells)."""
+        if f in self.categorical:
+            return np.isin(cells, self._categories(node))
+        left = cells <= self._index[f][node['threshold']]
+        # Cellule manquante : branche par défaut d'un nœud 'NaN', valeur 0 sinon
+        if node.get('missing_type') == 'NaN':
+            left[-1] = bool(node.get('default_left', True))
+        else:
+            left[-1] = 0.0 <= node['threshold']
+        return left
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """Bins globaux de chaque feature, une ligne par feature (n_features, n)."""
+        X = np.asarray(X, dtype=np.float64)
+        binned = np.empty((self.n_features, len(X)), dtype=np.int64)
+        for f in range(self.n_features):
+            values = X[:, f]
+            if f in self.categorical:
+                valid = np.isfinite(values) & (values >= 0) & (values <= self.max_category[f])
+                binned[f] = np.where(valid, np.nan_to_num(values), self.n_bins[f] - 1)
+                continue
+            missing = np.isnan(values)
+            if f not in self.nan_missing:
+                values = np.where(missing, 0.0, values)
+            binned[f] = np.searchsorted(self.edges[f], values, side='left')
+            if f in self.nan_missing:
+                binned[f, missing] = self.n_bins[f] - 1
+        return binned
+
+    def contributions(self, X: np.ndarray) -> np.ndarray:
+        """
+        Valeurs SHAP en score brut (log-odds) de LightGBM.
+
+        Args:
+            X: Entrée du booster (n, n_features), comme pour booster.predict
+
+        Returns:
+            Tableau (n, n_features + 1) : une colonne par feature, puis la
+            valeur moyenne du modèle (comme pred_contrib=True)
+        """
+        binned = self.transform(X)
+        n = binned.shape[1]
+        ones = np.ones(n * max((len(t.groups[0]['joint'][0]) for t in self.trees if t.features), default=1))
+        # Contributions par motif distinct de chaque arbre, et motif de chaque ligne par arbre
+        by_pattern, pattern_of_row, start = [np.zeros((1, self.n_features + 1))], [], 1
+        by_pattern[0][0, -1] = self.expected_value
+        for tree in self.trees:
+            if not tree.features:
+                continue
+            group_codes = []
+            for group in tree.groups:
+                code = group['lookups'][0][binned[group['features'][0]]]
+                for f, lookup in zip(group['features'][1:], group['lookups'][1:]):
+                    code += lookup[binned[f]]
+                group_codes.append(code)
+            if tree.multipliers is not None:
+                code = group_codes[0].copy()
+                for part, multiplier in zip(group_codes[1:], tree.multipliers[1:]):
+                    code += part * multiplier
+                # Motifs distincts par table de hachage (pas de tri)
+                inverse, uniques = pd.factorize(code)
+                patterns = np.empty(len(uniques), dtype=np.int64)
+                patterns[inverse] = np.arange(n)
+            else:
+                _, patterns, inverse = np.unique(np.column_stack(group_codes), axis=0,
+                                                 return_index=True, return_inverse=True)
+                inverse = inverse.reshape(-1)
+
+            # masks[motif, feuille] : ligne de la table de la feuille pour ce motif
+            masks = tree.groups[0]['joint'][group_codes[0][patterns]]
+            for group, code in zip(tree.groups[1:], group_codes[1:]):
+                masks += group['joint'][code[patterns]]
+            # Somme des lignes de table par motif : produit creux (une entrée par feuille)
+            n_patterns, n_leaves = masks.shape
+            selection = sparse.csr_matrix((ones[:masks.size], masks.ravel(),
+                                           np.arange(0, masks.size + 1, n_leaves)),
+                                          shape=(n_patterns, len(tree.table)))
+            contributions = np.zeros((n_patterns, self.n_features + 1))
+            contributions[:, tree.features] = selection @ tree.table
+            by_pattern.append(contributions)
+            pattern_of_row.append(inverse + start)
+            start += n_patterns
+
+        # Somme sur les arbres : une entrée par (ligne, arbre) + valeur moyenne
+        pattern_of_row.append(np.zeros(n, dtype=np.int64))
+        columns = np.column_stack(pattern_of_row)
+        rows = sparse.csr_matrix((np.ones(columns.size), columns.ravel(),
+                                  np.arange(0, columns.size + 1, columns.shape[1])), shape=(n, start))
+        return rows @ np.concatenate(by_pattern)
+
+
+# ============================================================================
+# CONTRIBUTIONS DANS L'ESPACE DU RISQUE
+# ============================================================================
+
+# Explainer par booster (les tables sont construites une fois par modèle chargé)
+_EXPLAINERS: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+
+
+def explainer_for(lgb_model) -> Optional[TreeExplainer]:
+    """
+    TreeExplainer du modèle LightGBM, mis en cache tant que le modèle existe.
+
+    Returns:
+        None si le modèle n'est pas un booster LightGBM (BinnedForest de la
+        précision 'binned', qui ne garde pas les effectifs des nœuds)
+    """
+    booster = getattr(lgb_model, 'booster_', lgb_model)
+    if not hasattr(booster, 'dump_model'):
+        return None
+    explainer = _EXPLAINERS.get(booster)
+    if explainer is None:
+        explainer = _EXPLAINERS[booster] = TreeExplainer(booster)
+    return explainer
+
+
+def explain_batch(models: Dict, X: np.ndarray, quartiers: Optional[Sequence[str]] = None,
+                  risque: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+    """
+    Contributions de chaque facteur au risque prédit, pour un lot de lignes.
+
+    Args:
+        models: {'lgb', 'lstm', 'scaler', 'ensemble'} (load_bundle)
+        X: Features brutes (n, len(MODEL_CONFIG['features'])), comme pour predict_batch
+        quartiers: Quartier de chaque ligne
+        risque: Risque déjà prédit (%) pour ces lignes (sinon predict_batch)
+
+    Returns:
+        Tableau (n, len(CONTRIB_COLUMNS)) en logit du risque : une colonne
+        par facteur de DRIVERS, puis la base ; chaque ligne se somme à
+        logit(risque). None si les contributions sont indisponibles
+        (LightGBM discrétisé, modèles manquants)
+    """
+    lgb_model, scaler = models['lgb'], models['scaler']
+    if lgb_model is None or scaler is None:
+        return None
+    explainer = explainer_for(lgb_model)
+    if explainer is None:
+        return None
+    X = np.asarray(X, dtype=np.float64)
+    codes = model_codes(models, quartiers) if quartiers is not None else None
+    phi = explainer.contributions(lgb_matrix(lgb_model, scaler.transform(X), codes))
+    if risque is None:
+        risque = predict_batch(models, X, quartiers)['risque']
+
+    n_features = len(MODEL_CONFIG['features'])
+    ensemble = models.get('ensemble')
+    weight = ensemble.w_lgb if ensemble is not None else 1.0
+    out = np.zeros((len(X), len(CONTRIB_COLUMNS)))
+    out[:, :n_features] = weight * phi[:, :n_features]
+    if lgb_uses_quartier(lgb_model):
+        out[:, n_features] = weight * phi[:, n_features]
+    if ensemble is not None and codes is not None:
+        out[:, n_features] += ensemble.offsets(codes)
+    # Base : valeur moyenne de LightGBM, aussi prise comme référence du terme LSTM
+    # (même cible) pour que sa colonne mesure un écart et non un niveau
+    if ensemble is not None:
+        out[:, -1] = ensemble.intercept + (ensemble.w_lgb + ensemble.w_lstm) * phi[:, -1]
+    else:
+        out[:, -1] = phi[:, -1]
+    p = np.clip(np.asarray(risque, dtype=np.float64) / 100, EPSILON, 1 - EPSILON)
+    # Reste : terme LSTM de l'ensemble (ou moyenne des anciens modèles sans ensemble)
+    out[:, n_features + 1] = np.log(p / (1 - p)) - out[:, :n_features + 1].sum(axis=1) - out[:, -1]
+    return out
+
+
+def drivers_frame(contributions: np.ndarray) -> pd.DataFrame:
+    """
+    Facteurs d'une prédiction, du plus influent au moins influent.
+
+    Args:
+        contributions: Une ligne de explain_batch
+
+    Returns:
+        DataFrame [facteur, libelle, contribution] (logit ; > 0 = augmente le risque)
+    """
+    values = np.asarray(contributions, dtype=np.float64)[:len(DRIVERS)]
+    frame = pd.DataFrame({'facteur': DRIVERS, 'libelle': [DRIVER_LABELS[d] for d in DRIVERS],
+                          'contribution': values})
+    return frame.iloc[np.argsort(-np.abs(values), kind='stable')].reset_index(drop=True)
+
+
+# ============================================================================
+# IMPORTANCE CUMULÉE
+# ============================================================================
+
+class ImportanceAggregator:
+    """
+    Importance des facteurs par quartier, cumulée lot après lot.
+
+    Pour chaque quartier (et les quartiers hors registre, regroupés) :
+    nombre de lignes, somme des |contributions| et des contributions
+    signées de chaque facteur. La mémoire ne dépend pas du nombre de lignes.
+    """
+
+    def __init__(self):
+        self.counts = np.zeros(N_QUARTIERS + 1, dtype=np.int64)
+        self.abs_sums = np.zeros((N_QUARTIERS + 1, len(DRIVERS)))
+        self.sums = np.zeros((N_QUARTIERS + 1, len(DRIVERS)))
+
+    @property
+    def rows(self) -> int:
+        return int(self.counts.sum())
+
+    def update(self, contributions: np.ndarray, quartiers: Sequence[str]) -> 'ImportanceAggregator':
+        """
+        Ajoute un lot.
+
+        Args:
+            contributions: Sortie de explain_batch (lignes NaN ignorées)
+            quartiers: Quartier de chaque ligne
+        """
+        contributions = np.asarray(contributions, dtype=np.float64)[:, :len(DRIVERS)]
+        valid = ~np.isnan(contributions).any(axis=1)
+        # Code inconnu (-1) : dernière case, comme lookup_by_code
+        codes = encode_quartiers(quartiers)[valid].astype(np.int64) % (N_QUARTIERS + 1)
+        contributions = contributions[valid]
+        self.counts += np.bincount(codes, minlength=N_QUARTIERS + 1)
+        for k in range(len(DRIVERS)):
+            self.abs_sums[:, k] += np.bincount(codes, np.abs(contributions[:, k]), minlength=N_QUARTIERS + 1)
+            self.sums[:, k] += np.bincount(codes, contributions[:, k], minlength=N_QUARTIERS + 1)
+        return self
+
+    def update_frame(self, scored: pd.DataFrame) -> 'ImportanceAggregator':
+        """Ajoute des lignes scorées avec contributions (score_frame(..., explain=True))."""
+        return self.update(scored[CONTRIB_COLUMNS[:len(DRIVERS)]].to_numpy(dtype=np.float64),
+                           scored['quartier'].to_numpy())
+
+    def merge(self, other: 'ImportanceAggregator') -> 'ImportanceAggregator':
+        self.counts += other.counts
+        self.abs_sums += other.abs_sums
+        self.sums += other.sums
+        return self
+
+    def importance(self, quartier: Optional[str] = None) -> pd.DataFrame:
+        """
+        Importance moyenne des facteurs, globale ou pour un quartier.
+
+        Returns:
+            DataFrame [facteur, libelle, importance (moyenne des |contributions|),
+            effet_moyen (moyenne signée)], par importance décroissante
+        """
+        if quartier is None:
+            count, abs_sums, sums = self.counts.sum(), self.abs_sums.sum(axis=0), self.sums.sum(axis=0)
+        else:
+            code = int(encode_quartiers([quartier])[0]) % (N_QUARTIERS + 1)
+            count, abs_sums, sums = self.counts[code], self.abs_sums[code], self.sums[code]
+        count = max(int(count), 1)
+        frame = pd.DataFrame({'facteur': DRIVERS, 'libelle': [DRIVER_LABELS[d] for d in DRIVERS],
+                              'importance': abs_sums / count, 'effet_moyen': sums / count})
+        return frame.sort_values('importance', ascending=False, kind='stable').reset_index(drop=True)
+
+    def top_drivers(self, top: int = DEFAULT_TOP) -> pd.DataFrame:
+        """
+        Principaux facteurs de chaque quartier observé.
+
+        Returns:
+            DataFrame [quartier, rang, facteur, libelle, importance, effet_moyen]
+        """
+        frames = []
+        for code, name in enumerate(QUARTIERS):
+            if self.counts[code]:
+                frame = self.importance(name).head(top)
+                frame.insert(0, 'rang', np.arange(1, len(frame) + 1))
+                frame.insert(0, 'quartier', name)
+                frames.append(frame)
+        if not frames:
+            return pd.DataFrame(columns=['quartier', 'rang', 'facteur', 'libelle', 'importance', 'effet_moyen'])
+        return pd.concat(frames, ignore_index=True)
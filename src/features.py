@@ -0,0 +1,95 @@
+"""
+Fichier : src/features.py
+Construction vectorisée des features du modèle
+==============================================
+
+Source unique des features de MODEL_CONFIG['features'] pour l'entraînement,
+le scoring en lot et l'interface. Les features temporelles sont lues dans
+des tables de correspondance indexées par le mois et l'heure (aucune boucle
+Python), avec exactement l'encodage du générateur (src/data_generator.py) :
+- saison : 0 = sèche fraîche (nov-fév), 1 = sèche chaude (mar-mai),
+  2 = pluies (juin-oct)
+- heures de pointe : 7h-9h et 18h-21h
+
+Parité avec le générateur vérifiée par tests/test_features.py
+"""
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from src.config import MODEL_CONFIG
+
+# Saison par mois (index 1-12 ; l'index 0 n'est jamais lu)
+SAISON_PAR_MOIS = np.array([0, 0, 0, 1, 1, 1, 2, 2, 2, 2, 2, 0, 0], dtype=np.int64)
+
+# Heure de pointe par heure (index 0-23)
+HEURE_DE_POINTE = np.zeros(24, dtype=np.int64)
+HEURE_DE_POINTE[[7, 8, 9, 18, 19, 20, 21]] = 1
+
+TIME_FEATURES = ['heure', 'jour_semaine', 'mois', 'saison', 'is_peak_hour']
+INPUT_FEATURES = ['temp_celsius', 'humidite_percent', 'vitesse_vent', 'conso_megawatt']
+
+
+def time_features(timestamps) -> Dict[str, np.ndarray]:
+    """
+    Calcule les features temporelles pour un tableau de dates.
+
+    Args:
+        timestamps: Date unique ou tableau de dates (datetime, chaînes, Series...)
+
+    Returns:
+        {'heure', 'jour_semaine', 'mois', 'saison', 'is_peak_hour'} : tableaux int64
+    """
+    index = pd.DatetimeIndex(pd.to_datetime(np.atleast_1d(np.asarray(timestamps))))
+    heure = index.hour.to_numpy(dtype=np.int64)
+    mois = index.month.to_numpy(dtype=np.int64)
+    return {
+        'heure': heure,
+        'jour_semaine': index.dayofweek.to_numpy(dtype=np.int64),
+        'mois': mois,
+        'saison': SAISON_PAR_MOIS[mois],
+        'is_peak_hour': HEURE_DE_POINTE[heure]
+    }
+
+
+def build_features(timestamps, temp, humidite, vent, conso) -> np.ndarray:
+    """
+    Construit la matrice de features dans l'ordre de MODEL_CONFIG['features'].
+
+    Les entrées météo / consommation sont des scalaires ou des tableaux de
+    même longueur que `timestamps` (diffusion NumPy).
+
+    Args:
+        timestamps: Date(s) de prédiction
+        temp: Température (°C)
+        humidite: Humidité (%)
+        vent: Vitesse du vent (km/h)
+        conso: Consommation (MW)
+
+    Returns:
+        Tableau float64 (n, len(MODEL_CONFIG['features']))
+    """
+    columns = time_features(timestamps)
+    n = len(columns['heure'])
+    for name, values in zip(INPUT_FEATURES, (temp, humidite, vent, conso)):
+        columns[name] = np.broadcast_to(np.asarray(values, dtype=np.float64), (n,))
+    return np.column_stack([columns[name] for name in MODEL_CONFIG['features']]).astype(np.float64)
+
+
+def add_time_features(df: pd.DataFrame, date_col: str) -> pd.DataFrame:
+    """
+    Recalcule les colonnes temporelles d'un DataFrame depuis sa colonne de date.
+
+    Args:
+        df: Données (CSV historique, fichier à scorer)
+        date_col: Colonne de date
+
+    Returns:
+        Copie de df avec les colonnes de TIME_FEATURES (re)calculées
+    """
+    df = df.copy()
+    for name, values in time_features(df[date_col]).items():
+        df[name] = values
+    return df
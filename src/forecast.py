@@ -0,0 +1,93 @@
+"""
+Fichier : src/forecast.py
+Prévision horaire du risque de coupure sur 24 à 72 heures
+=========================================================
+
+À partir d'un profil météo / consommation (valeurs moyennes des curseurs),
+construit la grille complète (quartier x heure), puis la score en un seul
+appel vectorisé (src/inference.py) : 8 quartiers x 72 h = 576 prédictions.
+
+Les variations dans la journée reprennent les formes du générateur
+(src/data_generator.py) : température maximale l'après-midi, consommation
+majorée aux heures de pointe et réduite la nuit.
+"""
+
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.config import MODEL_CONFIG
+from src.features import HEURE_DE_POINTE, build_features
+from src.inference import predict_batch
+
+# Amplitude de la variation diurne de température (°C), comme le générateur
+TEMP_AMPLITUDE = 5.0
+
+# Facteurs horaires de consommation (générateur : pointe x1.3, nuit x0.7)
+CONSO_FACTEUR_POINTE = 1.3
+CONSO_FACTEUR_NUIT = 0.7
+
+HORIZONS = [24, 48, 72]
+
+
+def build_forecast_grid(quartiers: Sequence[str], start, hours: int,
+                        temp: float, humidite: float, vent: float, conso: float,
+                        diurnal: bool = True) -> pd.DataFrame:
+    """
+    Construit la grille de features (quartier x heure).
+
+    Args:
+        quartiers: Quartiers à prévoir
+        start: Première heure (arrondie à l'heure)
+        hours: Horizon en heures
+        temp, humidite, vent, conso: Profil moyen (valeurs des curseurs)
+        diurnal: Appliquer les variations journalières de température et consommation
+
+    Returns:
+        DataFrame (len(quartiers) * hours lignes) : quartier, date_heure et
+        les features dans l'ordre de MODEL_CONFIG['features']
+    """
+    timeline = pd.date_range(pd.Timestamp(start).floor('h'), periods=hours, freq='h')
+    hour = timeline.hour.to_numpy()
+
+    temp_h = np.full(hours, float(temp))
+    conso_h = np.full(hours, float(conso))
+    if diurnal:
+        temp_h = temp_h + TEMP_AMPLITUDE * np.sin((hour - 6) * np.pi / 12)
+        nuit = (hour >= 22) | (hour <= 5)
+        conso_h = conso_h * np.select([HEURE_DE_POINTE[hour] == 1, nuit],
+                                      [CONSO_FACTEUR_POINTE, CONSO_FACTEUR_NUIT], 1.0)
+
+    n_q = len(quartiers)
+    dates = np.tile(timeline.to_numpy(), n_q)
+    X = build_features(dates, np.tile(temp_h, n_q), humidite, vent, np.tile(conso_h, n_q))
+    grid = pd.DataFrame(X, columns=MODEL_CONFIG['features'])
+    grid.insert(0, 'quartier', np.repeat(np.asarray(quartiers, dtype=object), hours))
+    grid.insert(1, 'date_heure', dates)
+    return grid
+
+
+def forecast_risk(models: Dict, quartiers: Sequence[str], start, hours: int,
+                  temp: float, humidite: float, vent: float, conso: float,
+                  diurnal: bool = True) -> pd.DataFrame:
+    """
+    Prévision du risque heure par heure pour tous les quartiers, en un passage.
+
+    Returns:
+        Grille de build_forecast_grid complétée par 'lgb', 'lstm' et 'risque' (%),
+        ou DataFrame vide si les modèles manquent
+    """
+    grid = build_forecast_grid(quartiers, start, hours, temp, humidite, vent, conso, diurnal)
+    preds = predict_batch(models, grid[MODEL_CONFIG['features']].to_numpy(), grid['quartier'].to_numpy())
+    if preds is None:
+        return pd.DataFrame()
+    for key, values in preds.items():
+        grid[key] = values
+    return grid
+
+
+def to_heatmap(forecast: pd.DataFrame) -> pd.DataFrame:
+    """Pivot quartier (lignes) x heure (colonnes) du risque, quartiers dans l'ordre d'origine."""
+    order = pd.unique(forecast['quartier'])
+    return forecast.pivot(index='quartier', columns='date_heure', values='risque').loc[order]
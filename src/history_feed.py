@@ -0,0 +1,183 @@
+"""
+Fichier : src/history_feed.py
+Flux incrémental de l'historique des prédictions
+================================================
+
+get_predictions_history(limit=100) renvoie les 100 dernières lignes à
+chaque appel : un tableau de bord qui rafraîchit toutes les 5 s retélécharge
+100 lignes, même sans nouvelle prédiction.
+
+PredictionFeed garde un curseur (dernier id vu) et ne demande que les
+lignes d'id supérieur (get_predictions_since). Les lignes reçues alimentent
+un tampon circulaire des prédictions récentes et sont poussées aux
+abonnés. Le volume transféré suit le nombre de nouvelles prédictions, plus
+la taille de l'historique affiché.
+
+Temps réel : en tâche de fond (start), le flux interroge le backend à
+intervalle régulier, et se réveille immédiatement quand une écriture du
+même processus le signale (StorageBackend.add_listener, équivalent local
+de LISTEN / NOTIFY).
+
+Usage :
+    feed = PredictionFeed().start()
+    unsubscribe = feed.subscribe(lambda rows: print(len(rows), "nouvelles"))
+    feed.recent(20)
+"""
+
+import threading
+from collections import deque
+from typing import Callable, List, Optional
+
+import pandas as pd
+
+from src import metrics
+from src.storage import StorageBackend
+
+DEFAULT_CAPACITY = 500
+DEFAULT_BATCH = 1000
+DEFAULT_POLL_INTERVAL = 5.0
+
+
+class PredictionFeed:
+    """
+    Historique des prédictions tenu à jour par curseur.
+
+    Args:
+        backend: Backend de stockage (défaut : src.database.get_backend())
+        capacity: Taille du tampon circulaire (prédictions récentes gardées)
+        batch_size: Lignes par requête de rattrapage
+        poll_interval: Intervalle d'interrogation en tâche de fond (secondes)
+        since_id: Curseur initial ; None = amorcer avec les `capacity`
+            dernières prédictions
+    """
+
+    def __init__(self, backend: Optional[StorageBackend] = None, capacity: int = DEFAULT_CAPACITY,
+                 batch_size: int = DEFAULT_BATCH, poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 since_id: Optional[int] = None):
+        if backend is None:
+            from src.database import get_backend
+            backend = get_backend()
+        self.backend = backend
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.last_id = since_id
+        self.last_error: Optional[str] = None
+        self._buffer = deque(maxlen=capacity)
+        self._columns: List[str] = []
+        self._subscribers: List[Callable[[pd.DataFrame], None]] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _prime(self):
+        """Amorce : dernières prédictions (une requête), curseur sur le plus grand id."""
+        latest = self.backend.get_predictions_history(self._buffer.maxlen)
+        if 'id' in latest.columns and len(latest):
+            latest = latest.sort_values('id')
+            self._append(latest)
+            self.last_id = int(latest['id'].iloc[-1])
+        else:
+            self.last_id = 0
+
+    def _append(self, rows: pd.DataFrame):
+        # Tuples simples dans l'ordre de self._columns (to_dict('records') est bien plus lent)
+        if not self._columns:
+            self._columns = list(rows.columns)
+        if list(rows.columns) != self._columns:
+            rows = rows.reindex(columns=self._columns)
+        self._buffer.extend(rows.itertuples(index=False, name=None))
+
+    def poll(self) -> pd.DataFrame:
+        """
+        Récupère les prédictions arrivées depuis le dernier appel.
+
+        Returns:
+            Nouvelles lignes par id croissant (DataFrame vide si aucune)
+        """
+        with self._lock:
+            if self.last_id is None:
+                self._prime()
+                return pd.DataFrame()
+            chunks = []
+            while True:
+                rows = self.backend.get_predictions_since(self.last_id, self.batch_size)
+                if 'id' not in rows.columns or rows.empty:
+                    break
+                chunks.append(rows)
+                self.last_id = int(rows['id'].iloc[-1])
+                if len(rows) < self.batch_size:
+                    break
+            if len(chunks) > 1:
+                new_rows = pd.concat(chunks, ignore_index=True)
+            else:
+                new_rows = chunks[0] if chunks else pd.DataFrame()
+            if len(new_rows):
+                self._append(new_rows)
+            subscribers = list(self._subscribers)
+
+        metrics.inc('history_feed_polls_total')
+        if len(new_rows):
+            metrics.inc('history_feed_rows_total', len(new_rows))
+            for callback in subscribers:
+                try:
+                    callback(new_rows)
+                except Exception:
+                    metrics.inc('history_feed_subscriber_errors_total')
+        return new_rows
+
+    def recent(self, limit: Optional[int] = None) -> pd.DataFrame:
+        """Prédictions du tampon, plus récentes d'abord (comme get_predictions_history)."""
+        with self._lock:
+            records = list(self._buffer)
+        if limit is not None:
+            records = records[-limit:] if limit > 0 else []
+        return pd.DataFrame.from_records(records[::-1], columns=self._columns or None)
+
+    def subscribe(self, callback: Callable[[pd.DataFrame], None]) -> Callable[[], None]:
+        """
+        Abonne `callback` aux nouvelles lignes (appelé depuis poll, hors verrou).
+
+        Returns:
+            Fonction de désabonnement
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def _on_write(self, table_name: str, rows: int):
+        if table_name == 'predictions':
+            self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Effacé avant l'interrogation : une écriture pendant poll() relance aussitôt
+            self._wake.clear()
+            try:
+                self.poll()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+            self._wake.wait(self.poll_interval)
+
+    def start(self) -> 'PredictionFeed':
+        """Démarre le suivi en tâche de fond (thread démon)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self.backend.add_listener(self._on_write)
+            self._thread = threading.Thread(target=self._run, name='prediction-feed', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self.backend.remove_listener(self._on_write)
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
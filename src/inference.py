@@ -0,0 +1,151 @@
+"""
+Fichier : src/inference.py
+Inférence vectorisée : scaler + LightGBM + LSTM sur un lot de lignes
+====================================================================
+
+Un seul chemin de calcul pour toutes les prédictions (prédiction unitaire
+de l'interface, prévisions, scoring en masse) : un appel par modèle pour
+tout le lot, au lieu d'une boucle Python ligne par ligne.
+
+Quartier : les noms sont convertis une fois en codes (src/quartiers.py).
+Les modèles entraînés avec le quartier le reçoivent directement (colonne
+catégorielle de LightGBM, index d'embedding du LSTM) ; les anciens modèles
+sans quartier passent par le multiplicateur QUARTIER_ADJUSTMENT.
+
+Combinaison des modèles :
+- avec un ensemble entraîné (models['ensemble'], src/ensemble.py) : stacker
+  logistique calibré sur les deux probabilités et le quartier ; si
+  l'ensemble n'utilise pas le LSTM, celui-ci n'est pas exécuté
+- sinon : moyenne LightGBM / LSTM (x QUARTIER_ADJUSTMENT pour les modèles
+  sans quartier)
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from src import metrics
+from src.config import MODEL_CONFIG, QUARTIER_ADJUSTMENT
+from src.models import EMBEDDING_LAYER
+from src.quartiers import embedding_index, encode_quartiers, lookup_by_code, mask_unseen
+
+# Multiplicateur par code (modèles sans quartier) ; dernière case = quartier inconnu
+ADJUSTMENT_BY_CODE = lookup_by_code(QUARTIER_ADJUSTMENT, 1.0)
+
+
+def lgb_uses_quartier(lgb_model) -> bool:
+    """LightGBM a-t-il été entraîné avec la colonne catégorielle du quartier ?"""
+    booster = getattr(lgb_model, 'booster_', lgb_model)
+    try:
+        return booster.num_feature() > len(MODEL_CONFIG['features'])
+    except AttributeError:
+        return False
+
+
+def lstm_quartier_rows(lstm_model) -> int:
+    """Lignes de l'embedding du quartier du LSTM (0 = modèle sans quartier)."""
+    rows = getattr(lstm_model, 'quartier_rows', None)
+    if rows is not None:
+        return rows
+    if len(getattr(lstm_model, 'inputs', None) or ()) > 1:
+        # Modèle Keras (repli pickles)
+        return int(lstm_model.get_layer(EMBEDDING_LAYER).input_dim)
+    return 0
+
+
+def model_codes(models: Dict, quartiers: Sequence) -> np.ndarray:
+    """
+    Codes des quartiers pour les modèles : UNKNOWN_CODE pour un nom hors
+    registre, et pour un quartier du registre absent de l'entraînement
+    (models['quartier_codes'], manifeste du bundle ; None = tous vus).
+    """
+    return mask_unseen(encode_quartiers(quartiers), models.get('quartier_codes'))
+
+
+def lgb_matrix(lgb_model, X_scaled: np.ndarray, codes: Optional[np.ndarray]) -> np.ndarray:
+    """
+    Entrée de LightGBM : features normalisées, plus le code du quartier si le
+    modèle l'utilise (NaN = quartier inconnu, traité comme valeur manquante).
+    """
+    if not lgb_uses_quartier(lgb_model):
+        return X_scaled
+    if codes is None:
+        column = np.full(len(X_scaled), np.nan, dtype=X_scaled.dtype)
+    else:
+        column = np.where(codes >= 0, codes, np.nan).astype(X_scaled.dtype)
+    return np.column_stack([X_scaled, column])
+
+
+def predict_batch(models: Dict, X: np.ndarray, quartiers: Optional[Sequence[str]] = None) -> Optional[Dict]:
+    """
+    Prédit le risque de coupure pour un lot de lignes.
+
+    Args:
+        models: {'lgb', 'lstm', 'scaler', 'ensemble'} (load_models_cached / load_bundle)
+        X: Features brutes (n, len(MODEL_CONFIG['features'])), dans l'ordre de la config
+        quartiers: Quartier de chaque ligne (noms, toute orthographe ; None = inconnu)
+
+    Returns:
+        {'lgb', 'lstm', 'risque'} : tableaux (n,) en pourcentage [0, 100]
+        ('lstm' vaut NaN si l'ensemble n'utilise pas le LSTM),
+        ou None si LightGBM ou le scaler manquent
+    """
+    lgb_model = models['lgb']
+    lstm_model = models['lstm']
+    scaler = models['scaler']
+    ensemble = models.get('ensemble')
+    if lgb_model is None or scaler is None:
+        metrics.inc('prediction_errors_total', stage='models_missing')
+        return None
+
+    X = np.asarray(X, dtype=np.float64)
+    n = len(X)
+    codes = model_codes(models, quartiers) if quartiers is not None else None
+    with metrics.timer('inference_seconds', stage='total'):
+        with metrics.timer('inference_seconds', stage='scaler'):
+            X_scaled = scaler.transform(X)
+        with metrics.timer('inference_seconds', stage='lgbm'):
+            X_lgb = lgb_matrix(lgb_model, X_scaled, codes)
+            try:
+                pred_lgb = np.asarray(lgb_model.predict(X_lgb), dtype=np.float64) * 100
+            except Exception:
+                metrics.inc('prediction_fallback_total', reason='lgb_predict_proba')
+                try:
+                    pred_lgb = np.asarray(lgb_model.predict_proba(X_lgb))[:, 1] * 100
+                except Exception:
+                    metrics.inc('prediction_fallback_total', reason='lgb_default_50')
+                    pred_lgb = np.full(n, 50.0)
+        if ensemble is not None and not ensemble.uses_lstm:
+            pred_lstm = None
+        elif lstm_model is not None:
+            with metrics.timer('inference_seconds', stage='lstm'):
+                try:
+                    X_lstm = X_scaled.reshape(n, 1, -1)
+                    rows = lstm_quartier_rows(lstm_model)
+                    if rows:
+                        X_lstm = [X_lstm, embedding_index(codes, rows, n).reshape(n, 1)]
+                    pred_lstm = np.asarray(lstm_model.predict(X_lstm, verbose=0), dtype=np.float64).reshape(n) * 100
+                except Exception:
+                    metrics.inc('prediction_fallback_total', reason='lstm_error')
+                    pred_lstm = pred_lgb
+        else:
+            metrics.inc('prediction_fallback_total', reason='lstm_missing')
+            pred_lstm = pred_lgb
+
+        if ensemble is not None:
+            with metrics.timer('inference_seconds', stage='ensemble'):
+                risque = ensemble.predict_proba(pred_lgb / 100, None if pred_lstm is None else pred_lstm / 100,
+                                                codes) * 100
+            if pred_lstm is None:
+                pred_lstm = np.full(n, np.nan)
+        else:
+            risque = (pred_lgb + pred_lstm) / 2
+            if codes is not None and not lgb_uses_quartier(lgb_model):
+                risque = risque * ADJUSTMENT_BY_CODE[codes]
+
+    metrics.inc('predicted_rows_total', n)
+    return {
+        'lgb': np.clip(pred_lgb, 0, 100),
+        'lstm': np.clip(pred_lstm, 0, 100),
+        'risque': np.clip(risque, 0, 100)
+    }
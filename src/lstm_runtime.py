@@ -0,0 +1,214 @@
+"""
+Fichier : src/lstm_runtime.py
+Inférence LSTM en NumPy pur (sans TensorFlow)
+=============================================
+
+Le modèle Keras (src/models.py) est exporté en fichiers .npy (un par poids)
+et une description JSON des couches. En service, ces poids sont relus avec
+np.load(mmap_mode='r') : plusieurs processus partagent la même copie
+physique via le cache de pages du système, et TensorFlow (plusieurs
+centaines de Mo par processus) n'est plus importé.
+
+Couches supportées : LSTM, Dense, Dropout (ignorée en inférence), et
+l'embedding du quartier (src/models.py) : ses vecteurs sont concaténés aux
+features de chaque pas de temps, comme la couche Concatenate de Keras.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+SPEC_FILE = 'lstm_layers.json'
+
+# Poids exportés par type de couche (ordre de layer.get_weights())
+WEIGHT_NAMES = {
+    'LSTM': ['kernel', 'recurrent_kernel', 'bias'],
+    'Dense': ['kernel', 'bias'],
+    'Embedding': ['embeddings']
+}
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+
+def _relu(x: np.ndarray) -> np.ndarray:
+    return np.maximum(x, 0.0)
+
+
+def _linear(x: np.ndarray) -> np.ndarray:
+    return x
+
+
+def _hard_sigmoid(x: np.ndarray) -> np.ndarray:
+    return np.clip(0.2 * x + 0.5, 0.0, 1.0)
+
+
+ACTIVATIONS = {
+    'sigmoid': _sigmoid,
+    'tanh': np.tanh,
+    'relu': _relu,
+    'linear': _linear,
+    'hard_sigmoid': _hard_sigmoid
+}
+
+
+def export_keras_model(model, directory) -> List[Dict]:
+    """
+    Exporte un modèle Keras en .npy + description JSON.
+
+    Args:
+        model: keras.Sequential ou keras.Model de src/models.py
+            (Embedding / LSTM / Dense / Dropout)
+        directory: Dossier de destination
+
+    Returns:
+        Liste des couches exportées (contenu du JSON)
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    spec = []
+    for index, layer in enumerate(model.layers):
+        kind = layer.__class__.__name__
+        config = layer.get_config()
+        if kind in ('Dropout', 'InputLayer', 'Concatenate'):
+            continue
+        if kind not in WEIGHT_NAMES:
+            raise ValueError(f"Couche non supportée par le runtime NumPy : {kind}")
+        if kind == 'Embedding' and spec:
+            raise ValueError("L'embedding du quartier doit précéder les couches LSTM")
+
+        # Poids exportés tels quels : les lignes d'embedding non entraînées sont
+        # remplacées sur le modèle Keras (src/models.reset_unseen_embeddings)
+        layer_weights = layer.get_weights()
+        files = {}
+        for name, weights in zip(WEIGHT_NAMES[kind], layer_weights):
+            filename = f"lstm_{index:02d}_{kind.lower()}_{name}.npy"
+            np.save(directory / filename, np.ascontiguousarray(weights, dtype=np.float32))
+            files[name] = filename
+
+        entry = {'type': kind, 'activation': config.get('activation', 'linear'), 'weights': files}
+        if kind == 'LSTM':
+            entry['units'] = config['units']
+            entry['recurrent_activation'] = config.get('recurrent_activation', 'sigmoid')
+            entry['return_sequences'] = config.get('return_sequences', False)
+        spec.append(entry)
+
+    with open(directory / SPEC_FILE, 'w', encoding='utf-8') as f:
+        json.dump(spec, f, indent=2)
+    return spec
+
+
+class NumpyLSTM:
+    """
+    Modèle LSTM exécuté en NumPy, interface compatible keras (predict).
+
+    Args:
+        spec: Description des couches (export_keras_model)
+        weights: {nom de fichier: tableau} (mémoire partagée possible)
+    """
+
+    def __init__(self, spec: List[Dict], weights: Dict[str, np.ndarray]):
+        self.layers = []
+        for entry in spec:
+            arrays = {name: weights[filename] for name, filename in entry['weights'].items()}
+            self.layers.append((entry, arrays))
+
+    def _layer_weights(self):
+        """Couches et poids utilisés par predict (surchargé par la version int8)."""
+        return self.layers
+
+    @property
+    def quartier_rows(self) -> int:
+        """Lignes de la table d'embedding du quartier (0 = modèle sans quartier)."""
+        entry, arrays = self.layers[0]
+        return int(arrays['embeddings'].shape[0]) if entry['type'] == 'Embedding' else 0
+
+    @property
+    def n_features_in_(self) -> int:
+        """Nombre de features en entrée (noyau de la première couche LSTM, hors embedding)."""
+        embedding = 0
+        for entry, arrays in self.layers:
+            if entry['type'] == 'Embedding':
+                embedding = int(arrays['embeddings'].shape[1])
+            else:
+                return int(arrays['kernel'].shape[0]) - embedding
+
+    @classmethod
+    def load(cls, directory, mmap: bool = True) -> 'NumpyLSTM':
+        """
+        Charge un modèle exporté.
+
+        Args:
+            directory: Dossier contenant SPEC_FILE et les .npy
+            mmap: Mapper les poids en mémoire (lecture seule, partagés entre processus)
+        """
+        directory = Path(directory)
+        with open(directory / SPEC_FILE, encoding='utf-8') as f:
+            spec = json.load(f)
+        weights = {}
+        for entry in spec:
+            for filename in entry['weights'].values():
+                weights[filename] = np.load(directory / filename, mmap_mode='r' if mmap else None)
+        return cls(spec, weights)
+
+    @staticmethod
+    def _lstm(x: np.ndarray, entry: Dict, arrays: Dict) -> np.ndarray:
+        kernel, recurrent, bias = arrays['kernel'], arrays['recurrent_kernel'], arrays['bias']
+        units = entry['units']
+        act = ACTIVATIONS[entry['activation']]
+        rec_act = ACTIVATIONS[entry['recurrent_activation']]
+
+        batch, timesteps, _ = x.shape
+        h = np.zeros((batch, units), dtype=x.dtype)
+        c = np.zeros((batch, units), dtype=x.dtype)
+        # Projection des entrées pour tous les pas de temps en un seul produit
+        x_proj = x @ kernel + bias
+        outputs = []
+        for t in range(timesteps):
+            z = x_proj[:, t, :]
+            if t > 0:
+                z = z + h @ recurrent
+            # Ordre des portes Keras : input, forget, cell, output
+            i = rec_act(z[:, :units])
+            f = rec_act(z[:, units:2 * units])
+            g = act(z[:, 2 * units:3 * units])
+            o = rec_act(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * act(c)
+            if entry['return_sequences']:
+                outputs.append(h)
+        return np.stack(outputs, axis=1) if entry['return_sequences'] else h
+
+    def predict(self, x: np.ndarray, verbose: int = 0, batch_size: int = None) -> np.ndarray:
+        """
+        Probabilités pour un lot (mêmes entrées / sorties que keras predict).
+
+        Args:
+            x: Tableau (batch, timesteps, features), ou [features, index du
+                quartier (batch,) ou (batch, 1)] pour un modèle avec embedding
+            verbose, batch_size: Ignorés (compatibilité keras)
+
+        Returns:
+            Tableau (batch, 1)
+        """
+        index = None
+        if isinstance(x, (list, tuple)):
+            x, index = x
+        out = np.asarray(x, dtype=np.float32)
+        for entry, arrays in self._layer_weights():
+            if entry['type'] == 'Embedding':
+                table = arrays['embeddings']
+                if index is None:
+                    index = np.full(len(out), len(table) - 1)
+                embedded = np.asarray(table[np.asarray(index).reshape(len(out))], dtype=np.float32)
+                embedded = np.broadcast_to(embedded[:, None, :], out.shape[:2] + embedded.shape[1:])
+                out = np.concatenate([out, embedded], axis=-1)
+            elif entry['type'] == 'LSTM':
+                out = self._lstm(out, entry, arrays)
+            else:
+                out = ACTIVATIONS[entry['activation']](out @ arrays['kernel'] + arrays['bias'])
+        return out
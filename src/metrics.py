@@ -0,0 +1,375 @@
+"""
+Fichier : src/metrics.py
+Instrumentation : compteurs, histogrammes de latence, export Prometheus
+=======================================================================
+
+Mesure où passe le temps en production (scaler, LightGBM, LSTM, appels
+Supabase) et compte les replis silencieux (ex: LSTM indisponible).
+
+- Désactivé par défaut : timer() retourne alors un contexte vide partagé
+  et inc()/observe() sortent immédiatement (surcoût quasi nul).
+- Activation : variable d'environnement DAKAR_METRICS=1 ou enable().
+- Export : export_prometheus() (format texte) ou start_metrics_server(port)
+  qui sert /metrics dans un thread de fond.
+- Profilage : SamplingProfiler échantillonne les piles de tous les threads
+  et peut être démarré / arrêté à chaud (PROFILER.start() / .stop()).
+
+Usage :
+    from src import metrics
+    with metrics.timer('inference_stage_seconds', stage='lgbm'):
+        pred = model.predict(X)
+    metrics.inc('prediction_fallback_total', reason='lstm_missing')
+"""
+
+import bisect
+import os
+import sys
+import threading
+import time
+from collections import Counter as _StackCounter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+# Bornes (secondes) adaptées à des latences de quelques µs à quelques s
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_enabled = os.environ.get('DAKAR_METRICS', '0') == '1'
+_lock = threading.Lock()
+
+
+def enable(flag: bool = True):
+    """Active (ou désactive) la collecte des métriques à chaud."""
+    global _enabled
+    _enabled = bool(flag)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _label_key(labels: Dict) -> Tuple:
+    return tuple(sorted(labels.items()))
+
+
+# ============================================================================
+# TYPES DE MÉTRIQUES
+# ============================================================================
+
+class Counter:
+    """Compteur monotone, une valeur par combinaison de labels."""
+
+    type_name = 'counter'
+
+    def __init__(self, name: str, help_text: str = ''):
+        self.name = name
+        self.help = help_text
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        if not _enabled:
+            return
+        key = _label_key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def samples(self):
+        # Instantané sous le verrou : l'export ne bloque pas les inc() pendant qu'il écrit
+        with _lock:
+            items = list(self.values.items())
+        for key, value in items:
+            yield self.name, key, value
+
+
+class Gauge(Counter):
+    """Valeur instantanée (ex: version de modèle active)."""
+
+    type_name = 'gauge'
+
+    def set(self, value: float, **labels):
+        if not _enabled:
+            return
+        with _lock:
+            self.values[_label_key(labels)] = float(value)
+
+
+class Histogram:
+    """Histogramme cumulatif à bornes fixes (compatible Prometheus)."""
+
+    type_name = 'histogram'
+
+    def __init__(self, name: str, help_text: str = '', buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [comptes par borne (+Inf en dernier), somme, total]
+        self.values: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        if not _enabled:
+            return
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with _lock:
+            state = self.values.get(key)
+            if state is None:
+                state = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self.values[key] = state
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        with _lock:
+            items = [(k, [list(v[0]), v[1], v[2]]) for k, v in self.values.items()]
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float('inf'),), counts):
+                cumulative += n
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                yield f"{self.name}_bucket", key + (('le', le),), cumulative
+            yield f"{self.name}_sum", key, total
+            yield f"{self.name}_count", key, count
+
+
+# ============================================================================
+# REGISTRE
+# ============================================================================
+
+REGISTRY: Dict[str, object] = {}
+
+
+def _get_or_create(cls, name: str, help_text: str, **kwargs):
+    metric = REGISTRY.get(name)
+    if metric is None:
+        with _lock:
+            metric = REGISTRY.get(name)
+            if metric is None:
+                metric = cls(name, help_text, **kwargs)
+                REGISTRY[name] = metric
+    return metric
+
+
+def counter(name: str, help_text: str = '') -> Counter:
+    return _get_or_create(Counter, name, help_text)
+
+
+def gauge(name: str, help_text: str = '') -> Gauge:
+    return _get_or_create(Gauge, name, help_text)
+
+
+def histogram(name: str, help_text: str = '', buckets=DEFAULT_BUCKETS) -> Histogram:
+    return _get_or_create(Histogram, name, help_text, buckets=buckets)
+
+
+def inc(name: str, amount: float = 1.0, **labels):
+    """Incrémente un compteur (créé au premier appel)."""
+    if _enabled:
+        counter(name).inc(amount, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    """Ajoute une observation à un histogramme (créé au premier appel)."""
+    if _enabled:
+        histogram(name).observe(value, **labels)
+
+
+class _Timer:
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, hist: Histogram, labels: Dict):
+        self.histogram = hist
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name: str, **labels):
+    """
+    Chronomètre un bloc et l'enregistre dans l'histogramme `name`.
+
+    Retourne un contexte vide partagé quand les métriques sont désactivées.
+    """
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(histogram(name), labels)
+
+
+def reset():
+    """Vide toutes les métriques (tests, benchmarks)."""
+    with _lock:
+        REGISTRY.clear()
+
+
+# ============================================================================
+# EXPORT PROMETHEUS
+# ============================================================================
+
+def _format_labels(key: Tuple) -> str:
+    if not key:
+        return ''
+    parts = []
+    for name, value in key:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{name}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def export_prometheus() -> str:
+    """Retourne toutes les métriques au format texte Prometheus (v0.0.4)."""
+    lines = []
+    for name in sorted(REGISTRY):
+        metric = REGISTRY[name]
+        if metric.help:
+            lines.append(f"# HELP {name} {metric.help}")
+        lines.append(f"# TYPE {name} {metric.type_name}")
+        for sample_name, key, value in metric.samples():
+            lines.append(f"{sample_name}{_format_labels(key)} {value:g}")
+    return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = export_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_metrics_server(port: int, host: str = '0.0.0.0') -> ThreadingHTTPServer:
+    """
+    Sert /metrics (format Prometheus) dans un thread de fond.
+
+    Args:
+        port: Port d'écoute (0 = port libre)
+        host: Adresse d'écoute
+
+    Returns:
+        Le serveur (server.shutdown() pour l'arrêter)
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ============================================================================
+# PROFILEUR PAR ÉCHANTILLONNAGE
+# ============================================================================
+
+class SamplingProfiler:
+    """
+    Profileur statistique : échantillonne périodiquement la pile de chaque
+    thread (sys._current_frames) depuis un thread dédié.
+
+    Aucun coût sur le code profilé quand il est arrêté ; pendant
+    l'échantillonnage, seul le thread du profileur travaille. Le compteur
+    des piles est protégé par un verrou : les lectures (collapsed,
+    top_functions) en copient un instantané pendant l'échantillonnage.
+
+    Args:
+        interval: Période d'échantillonnage en secondes
+        max_depth: Profondeur maximale des piles enregistrées
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = _StackCounter()
+        self.samples = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join(timeout=1)
+        self._thread = None
+
+    def toggle(self, flag: bool):
+        """Démarre ou arrête le profileur selon `flag`."""
+        self.start() if flag else self.stop()
+
+    def clear(self):
+        with self._lock:
+            self.stacks.clear()
+            self.samples = 0
+
+    def _snapshot(self) -> _StackCounter:
+        with self._lock:
+            return _StackCounter(self.stacks)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            sampled = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                sampled.append(';'.join(reversed(stack)))
+            with self._lock:
+                for stack in sampled:
+                    self.stacks[stack] += 1
+                self.samples += 1
+
+    def collapsed(self) -> str:
+        """Piles au format 'collapsed' (flamegraph.pl, speedscope)."""
+        return '\n'.join(f"{stack} {count}" for stack, count in self._snapshot().most_common())
+
+    def top_functions(self, n: int = 15):
+        """Fonctions les plus souvent en haut de pile : [(fonction, part)]."""
+        leaves = _StackCounter()
+        for stack, count in self._snapshot().items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return [(name, count / total) for name, count in leaves.most_common(n)]
+
+
+PROFILER = SamplingProfiler()
@@ -0,0 +1,367 @@
+"""
+Fichier : src/model_bundle.py
+Modèles au format partageable entre processus
+=============================================
+
+Au lieu de désérialiser des pickles et un .keras dans chaque processus
+Streamlit, les modèles sont exportés en fichiers bruts :
+- LightGBM : format texte natif (lgbm_model.txt)
+- Scaler : tableaux mean_ / scale_ (.npy)
+- LSTM : poids .npy + description des couches (src/lstm_runtime.py)
+- Ensemble : stacker logistique calibré (ensemble.json, src/ensemble.py), optionnel
+- Profil de dérive : distribution de référence des features et des
+  probabilités (drift_profile.json, src/drift.py), optionnel
+
+Les .npy sont relus avec mmap_mode='r' : une seule copie physique en
+mémoire (cache de pages) pour tous les processus de la machine.
+
+Publication atomique : chaque écriture (save_bundle, add_drift_profile)
+produit un dossier de version complet à côté du bundle
+(models/.bundle-v<horodatage>), puis le chemin du bundle, un lien
+symbolique, est basculé d'un seul os.replace. Un lecteur (ModelRegistry)
+voit l'ancienne ou la nouvelle version, jamais un dossier vide ou à moitié
+écrit ; la version précédente est gardée pour un chargement en cours.
+Sans liens symboliques (ou pour un ancien bundle qui est un vrai dossier),
+l'ancien dossier est renommé de côté juste avant la bascule.
+
+Le manifeste (manifest.json) décrit le bundle : version du format, liste
+ordonnée des features (et colonnes catégorielles, avec le registre des
+quartiers dont les codes ont servi à l'entraînement), empreinte SHA-256 de chaque fichier et empreinte
+globale du contenu, et repère d'entraînement (période et volume des
+données, codes des quartiers présents à l'entraînement :
+training['quartier_codes'], les autres sont servis comme inconnus). Au chargement, les empreintes, la liste des features et les
+dimensions des modèles sont vérifiées : un bundle incohérent lève
+BundleError au lieu de servir des prédictions fausses.
+
+Usage :
+    save_bundle('models/bundle', lgb_model, scaler, lstm_model, training={...})
+    models = load_bundle('models/bundle')   # {'lgb', 'lstm', 'scaler', 'ensemble', 'drift_profile',
+                                            #  'quartier_codes', 'manifest'}
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.config import MODEL_CONFIG
+from src.drift import DriftProfile
+from src.ensemble import StackingEnsemble
+from src.quartiers import QUARTIERS
+from src.lstm_runtime import NumpyLSTM, SPEC_FILE, export_keras_model
+
+BUNDLE_DIR = 'models/bundle'
+
+LGBM_FILE = 'lgbm_model.txt'
+SCALER_MEAN_FILE = 'scaler_mean.npy'
+SCALER_SCALE_FILE = 'scaler_scale.npy'
+MANIFEST_FILE = 'manifest.json'
+
+FORMAT_VERSION = 1
+
+# Dossiers de version publiés ('-v') et en cours d'écriture ('-tmp-') à côté du bundle
+VERSION_MARK = '-v'
+TMP_MARK = '-tmp-'
+
+
+class BundleError(ValueError):
+    """Bundle incomplet, corrompu ou incompatible avec la configuration."""
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _content_hash(files: Dict[str, Dict]) -> str:
+    """Empreinte globale : SHA-256 des (nom, empreinte) triés."""
+    digest = hashlib.sha256()
+    for name in sorted(files):
+        digest.update(f"{name}:{files[name]['sha256']}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def write_manifest(directory, training: Optional[Dict] = None, categorical: Optional[list] = None) -> Dict:
+    """
+    Écrit le manifeste d'un dossier de bundle (empreintes de tous ses fichiers).
+
+    Args:
+        directory: Dossier du bundle
+        training: Repère d'entraînement (période, nombre de lignes, source...)
+        categorical: Colonnes catégorielles des modèles (ex: ['quartier'])
+
+    Returns:
+        Contenu du manifeste
+    """
+    directory = Path(directory)
+    files = {
+        path.name: {'sha256': _sha256(path), 'bytes': path.stat().st_size}
+        for path in sorted(directory.iterdir())
+        if path.is_file() and path.name != MANIFEST_FILE
+    }
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'features': list(MODEL_CONFIG['features']),
+        'categorical_features': list(categorical or []),
+        'training': training or {},
+        'files': files,
+        'content_hash': _content_hash(files)
+    }
+    if categorical:
+        manifest['quartiers'] = list(QUARTIERS)
+    with open(directory / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def read_manifest(directory) -> Optional[Dict]:
+    """Manifeste du bundle, ou None pour un bundle antérieur au format versionné."""
+    path = Path(directory) / MANIFEST_FILE
+    if not path.exists():
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def verify_bundle(directory, manifest: Optional[Dict] = None) -> Dict:
+    """
+    Vérifie le manifeste et les empreintes des fichiers d'un bundle.
+
+    Args:
+        directory: Dossier du bundle
+        manifest: Manifeste déjà lu (relu sinon)
+
+    Returns:
+        Manifeste vérifié
+
+    Raises:
+        BundleError: Manifeste absent, version ou features incompatibles,
+            codes de quartiers changés, fichier manquant ou modifié
+    """
+    directory = Path(directory).resolve()
+    manifest = manifest or read_manifest(directory)
+    if manifest is None:
+        raise BundleError(f"{directory}: pas de {MANIFEST_FILE} (réexporter le bundle)")
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise BundleError(f"{directory}: format {manifest.get('format_version')} non supporté "
+                          f"(attendu {FORMAT_VERSION})")
+    if manifest.get('features') != list(MODEL_CONFIG['features']):
+        raise BundleError(f"{directory}: features du bundle {manifest.get('features')} "
+                          f"différentes de MODEL_CONFIG['features']")
+    trained_quartiers = manifest.get('quartiers', [])
+    if trained_quartiers != list(QUARTIERS[:len(trained_quartiers)]):
+        raise BundleError(f"{directory}: codes de quartiers du bundle différents du registre "
+                          f"(src/quartiers.py) : réentraîner les modèles")
+    for name, entry in manifest['files'].items():
+        path = directory / name
+        if not path.exists():
+            raise BundleError(f"{directory}: fichier manquant {name}")
+        if path.stat().st_size != entry['bytes'] or _sha256(path) != entry['sha256']:
+            raise BundleError(f"{directory}: empreinte invalide pour {name}")
+    if _content_hash(manifest['files']) != manifest.get('content_hash'):
+        raise BundleError(f"{directory}: empreinte globale invalide")
+    return manifest
+
+
+def _staging_dir(directory: Path) -> Path:
+    """Dossier temporaire de construction d'une version (même système de fichiers que le bundle)."""
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=f'.{directory.name}{TMP_MARK}', dir=directory.parent))
+    os.chmod(tmp, 0o755)
+    return tmp
+
+
+def _publish(tmp: Path, directory: Path):
+    """
+    Rend la version construite dans tmp visible au chemin du bundle, atomiquement.
+
+    La version est renommée en dossier de version, puis un lien symbolique
+    vers elle remplace le bundle (os.replace d'un lien : atomique). Seules la
+    nouvelle version et la précédente sont gardées.
+    """
+    version = directory.parent / f'.{directory.name}{VERSION_MARK}{time.time_ns()}'
+    os.replace(tmp, version)
+    previous = directory.resolve() if directory.is_symlink() else None
+    link = directory.parent / f'.{directory.name}{TMP_MARK}link-{time.time_ns()}'
+    try:
+        os.symlink(version.name, link, target_is_directory=True)
+    except (OSError, NotImplementedError):
+        link = None
+    if link is not None and (directory.is_symlink() or not directory.exists()):
+        os.replace(link, directory)
+    else:
+        # Ancien bundle en vrai dossier (ou liens indisponibles) : mis de côté le temps de la bascule
+        aside = directory.parent / f'.{directory.name}{TMP_MARK}old-{time.time_ns()}'
+        if directory.exists() or directory.is_symlink():
+            os.replace(directory, aside)
+        os.replace(link if link is not None else version, directory)
+        if aside.is_symlink():
+            aside.unlink()
+        else:
+            shutil.rmtree(aside, ignore_errors=True)
+    keep = {version.name, previous.name if previous else None}
+    for path in directory.parent.glob(f'.{directory.name}{VERSION_MARK}*'):
+        if path.name not in keep and path.is_dir() and not path.is_symlink():
+            shutil.rmtree(path, ignore_errors=True)
+
+
+class ArrayScaler:
+    """
+    Équivalent de StandardScaler.transform à partir des tableaux bruts.
+
+    Args:
+        mean: Moyennes par feature (scaler.mean_)
+        scale: Écarts-types par feature (scaler.scale_)
+    """
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    @property
+    def n_features_in_(self) -> int:
+        return len(self.mean_)
+
+    def transform(self, X) -> np.ndarray:
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+def save_bundle(directory, lgb_model, scaler, lstm_model=None, training: Optional[Dict] = None,
+                ensemble: Optional[StackingEnsemble] = None, drift_profile: Optional[DriftProfile] = None) -> Path:
+    """
+    Exporte les modèles entraînés et leur manifeste.
+
+    La version est écrite entière dans un dossier temporaire, puis publiée
+    par bascule atomique du lien du bundle (voir _publish) : le bundle
+    précédent reste lisible jusqu'à la bascule.
+
+    Args:
+        directory: Dossier du bundle (remplacé s'il existe)
+        lgb_model: lgb.Booster (ou LGBMClassifier)
+        scaler: StandardScaler entraîné
+        lstm_model: Modèle Keras (optionnel)
+        training: Repère d'entraînement enregistré dans le manifeste
+        ensemble: Stacker calibré (src/ensemble.py), optionnel
+        drift_profile: Profil de référence pour la surveillance de dérive (src/drift.py), optionnel
+
+    Returns:
+        Chemin du bundle
+    """
+    directory = Path(directory)
+    tmp = _staging_dir(directory)
+
+    try:
+        booster = getattr(lgb_model, 'booster_', lgb_model)
+        booster.save_model(str(tmp / LGBM_FILE))
+        # Modèle entraîné avec le code du quartier (colonne après les features)
+        categorical = (MODEL_CONFIG['categorical_features']
+                       if booster.num_feature() > len(MODEL_CONFIG['features']) else [])
+        np.save(tmp / SCALER_MEAN_FILE, np.asarray(scaler.mean_, dtype=np.float64))
+        np.save(tmp / SCALER_SCALE_FILE, np.asarray(scaler.scale_, dtype=np.float64))
+        if lstm_model is not None:
+            export_keras_model(lstm_model, tmp)
+        if ensemble is not None:
+            ensemble.save(tmp)
+        if drift_profile is not None:
+            drift_profile.save(tmp)
+        write_manifest(tmp, training, categorical)
+        _publish(tmp, directory)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return directory
+
+
+def load_bundle(directory=BUNDLE_DIR, mmap: bool = True, verify: bool = True) -> dict:
+    """
+    Charge un bundle exporté par save_bundle.
+
+    Args:
+        directory: Dossier du bundle
+        mmap: Mapper les tableaux en mémoire (partage entre processus)
+        verify: Vérifier le manifeste et les empreintes avant de charger
+
+    Returns:
+        {'lgb': lgb.Booster, 'lstm': NumpyLSTM ou None, 'scaler': ArrayScaler,
+         'ensemble': StackingEnsemble ou None, 'drift_profile': DriftProfile ou None,
+         'quartier_codes': codes des quartiers vus à l'entraînement (None = non enregistrés),
+         'manifest': manifeste (None si non vérifié et absent)}
+
+    Raises:
+        BundleError: Bundle incohérent (voir verify_bundle), ou dimensions
+            des modèles différentes du nombre de features
+    """
+    import lightgbm as lgb
+
+    # Version courante résolue une fois : une bascule pendant le chargement ne mélange pas deux versions
+    directory = Path(directory).resolve()
+    manifest = verify_bundle(directory) if verify else read_manifest(directory)
+    mode = 'r' if mmap else None
+    scaler = ArrayScaler(np.load(directory / SCALER_MEAN_FILE, mmap_mode=mode),
+                         np.load(directory / SCALER_SCALE_FILE, mmap_mode=mode))
+    lstm = NumpyLSTM.load(directory, mmap=mmap) if (directory / SPEC_FILE).exists() else None
+    booster = lgb.Booster(model_file=str(directory / LGBM_FILE))
+
+    n_features = len(MODEL_CONFIG['features'])
+    n_categorical = len((manifest or {}).get('categorical_features', []))
+    sizes = {'scaler': scaler.n_features_in_, 'lightgbm': booster.num_feature() - n_categorical}
+    if lstm is not None:
+        sizes['lstm'] = lstm.n_features_in_
+    wrong = {name: size for name, size in sizes.items() if size != n_features}
+    if wrong:
+        raise BundleError(f"{directory}: dimensions {wrong} différentes des {n_features} features")
+    if lstm is not None and n_categorical and lstm.quartier_rows == 0:
+        raise BundleError(f"{directory}: LSTM sans embedding du quartier")
+    ensemble = StackingEnsemble.load(directory)
+    if ensemble is not None and ensemble.uses_lstm and lstm is None:
+        raise BundleError(f"{directory}: l'ensemble utilise le LSTM, absent du bundle")
+    codes = ((manifest or {}).get('training') or {}).get('quartier_codes')
+    return {'lgb': booster, 'lstm': lstm, 'scaler': scaler, 'ensemble': ensemble,
+            'drift_profile': DriftProfile.load(directory),
+            'quartier_codes': None if codes is None else [int(c) for c in codes], 'manifest': manifest}
+
+
+def add_drift_profile(directory, profile: DriftProfile) -> Dict:
+    """
+    Ajoute (ou remplace) le profil de dérive d'un bundle existant.
+
+    Le bundle est copié, le profil ajouté et le manifeste réécrit (même
+    repère d'entraînement) dans la copie, publiée comme save_bundle :
+    l'empreinte change, les processus servant le bundle le rechargent sans
+    jamais lire de version partielle.
+
+    Returns:
+        Nouveau manifeste
+
+    Raises:
+        BundleError: Bundle invalide avant l'ajout
+    """
+    directory = Path(directory)
+    source = directory.resolve()
+    manifest = verify_bundle(source)
+    tmp = _staging_dir(directory)
+    try:
+        shutil.copytree(source, tmp, dirs_exist_ok=True)
+        profile.save(tmp)
+        manifest = write_manifest(tmp, manifest.get('training'), manifest.get('categorical_features'))
+        _publish(tmp, directory)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return manifest
+
+
+def bundle_exists(directory=BUNDLE_DIR) -> bool:
+    directory = Path(directory)
+    return (directory / LGBM_FILE).exists() and (directory / SCALER_MEAN_FILE).exists()
@@ -0,0 +1,173 @@
+"""
+Fichier : src/model_registry.py
+Rechargement à chaud des modèles (sans redémarrer l'application)
+================================================================
+
+ModelRegistry surveille le manifeste du bundle (models/bundle/manifest.json)
+dans un thread de fond. Quand une nouvelle version apparaît (empreinte du
+contenu différente, ex: après scripts/2_train_models.py), elle est chargée,
+vérifiée et préchauffée en arrière-plan, puis remplace le jeu de modèles
+actif en une seule affectation.
+
+Une prédiction récupère le jeu actif une fois (get()) et l'utilise jusqu'au
+bout : les calculs en cours se terminent sur l'ancienne version, les
+suivants utilisent la nouvelle. Les poids de l'ancienne version restent
+valides tant qu'ils sont référencés (fichiers mappés, même remplacés).
+
+Usage :
+    registry = ModelRegistry(fallback=load_pickles).start()
+    models = registry.get()      # {'lgb', 'lstm', 'scaler', 'ensemble', 'manifest'}
+    registry.version             # empreinte courte du bundle actif
+"""
+
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from src import metrics
+from src.features import build_features
+from src.inference import predict_batch
+from src.model_bundle import BUNDLE_DIR, MANIFEST_FILE, load_bundle, read_manifest
+from src.quantized import apply_precision, default_precision
+
+DEFAULT_POLL_INTERVAL = 5.0
+FALLBACK_VERSION = 'pickles'
+VERSION_GAUGE = 'model_version_info'
+
+
+def _short_version(manifest: Optional[Dict]) -> Optional[str]:
+    return manifest['content_hash'][:12] if manifest else None
+
+
+def version_of(models: Dict) -> str:
+    """Version d'un jeu de modèles (empreinte courte du bundle, ou 'pickles')."""
+    return _short_version(models.get('manifest')) or FALLBACK_VERSION
+
+
+def warm_up(models: Dict):
+    """Une prédiction factice pour initialiser LightGBM / le LSTM avant l'activation."""
+    X = build_features(np.datetime64('2024-01-01T12:00'), 30.0, 65.0, 15.0, 800.0)
+    if predict_batch(models, X) is None:
+        raise RuntimeError("Modèles incomplets (LightGBM ou scaler manquant)")
+
+
+class ModelRegistry:
+    """
+    Jeu de modèles actif, remplacé atomiquement quand le bundle change.
+
+    Args:
+        directory: Dossier du bundle surveillé
+        poll_interval: Intervalle de vérification du manifeste (secondes)
+        fallback: Chargeur utilisé si aucun bundle valide n'existe au démarrage
+            (ex: pickles) ; le registre bascule sur le bundle dès qu'il apparaît
+        precision: Précision de service du bundle (src/quantized.py ; défaut :
+            variable DAKAR_PRECISION)
+    """
+
+    def __init__(self, directory=BUNDLE_DIR, poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 fallback: Optional[Callable[[], Dict]] = None, precision: Optional[str] = None):
+        self.directory = Path(directory)
+        self.poll_interval = poll_interval
+        self.fallback = fallback
+        self.precision = precision or default_precision()
+        self.version: Optional[str] = None
+        self.loaded_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.reloads = 0
+        self._models: Optional[Dict] = None
+        self._fingerprint = None
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.check()
+        if self._models is None and fallback is not None:
+            self._activate(fallback(), FALLBACK_VERSION)
+
+    def get(self) -> Optional[Dict]:
+        """Jeu de modèles actif (à garder pour toute la durée d'une prédiction)."""
+        return self._models
+
+    def _manifest_fingerprint(self):
+        try:
+            stat = (self.directory / MANIFEST_FILE).stat()
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def _activate(self, models: Dict, version: str):
+        previous = self.version
+        # Affectation unique : les lecteurs voient l'ancien ou le nouveau jeu, jamais un mélange
+        self._models = models
+        self.version = version
+        self.loaded_at = datetime.now()
+        if previous is not None:
+            metrics.gauge(VERSION_GAUGE, "Version de modèle active").set(0, version=previous)
+        self.report_metrics()
+
+    def report_metrics(self):
+        """Publie la version active (gauge model_version_info{version} = 1)."""
+        if self.version is not None:
+            metrics.gauge(VERSION_GAUGE, "Version de modèle active").set(1, version=self.version)
+
+    def check(self) -> bool:
+        """
+        Recharge le bundle si son manifeste a changé.
+
+        Returns:
+            True si une nouvelle version a été activée
+        """
+        fingerprint = self._manifest_fingerprint()
+        if fingerprint is None or fingerprint == self._fingerprint:
+            return False
+        with self._reload_lock:
+            if fingerprint == self._fingerprint:
+                return False
+            manifest = read_manifest(self.directory)
+            version = _short_version(manifest)
+            if version is None or version == self.version:
+                self._fingerprint = fingerprint
+                return False
+            start = time.perf_counter()
+            try:
+                models = apply_precision(load_bundle(self.directory), self.precision)
+                warm_up(models)
+            except Exception as e:
+                # Bundle en cours d'écriture ou invalide : on garde la version active
+                # et on réessaiera au prochain changement du manifeste
+                self._fingerprint = fingerprint
+                self.last_error = f"{version}: {e}"
+                metrics.inc('model_reloads_total', status='error')
+                return False
+            self._fingerprint = fingerprint
+            self.last_error = None
+            if self._models is not None:
+                self.reloads += 1
+            self._activate(models, _short_version(models['manifest']))
+            metrics.inc('model_reloads_total', status='ok')
+            metrics.observe('model_reload_seconds', time.perf_counter() - start)
+            return True
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                self.last_error = str(e)
+
+    def start(self) -> 'ModelRegistry':
+        """Démarre la surveillance en tâche de fond (thread démon)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='model-registry', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
@@ -0,0 +1,86 @@
+"""
+Fichier : src/models.py
+Architectures des modèles
+=========================
+
+Définition unique du réseau LSTM, partagée par l'entraînement
+(scripts/2_train_models.py) et les benchmarks.
+"""
+
+import numpy as np
+
+EMBEDDING_LAYER = 'quartier_embedding'
+
+
+def build_lstm_model(n_features: int, n_quartiers: int = 0, embedding_dim: int = 4):
+    """
+    Construit le modèle LSTM (non compilé).
+
+    Avec n_quartiers > 0, le modèle prend deux entrées : les features
+    (batch, 1, n_features) et l'index du quartier (batch, 1), projeté par
+    un embedding (n_quartiers + 1 lignes, la dernière pour un quartier
+    inconnu, voir src/quartiers.embedding_index) puis concaténé aux features.
+
+    Args:
+        n_features: Nombre de features en entrée
+        n_quartiers: Nombre de quartiers du registre (0 = sans quartier)
+        embedding_dim: Dimension de l'embedding du quartier
+
+    Returns:
+        keras.Sequential, ou keras.Model à deux entrées avec quartier
+    """
+    # Import local : TensorFlow est lourd et optionnel hors entraînement
+    from tensorflow import keras
+    from tensorflow.keras import layers
+
+    if not n_quartiers:
+        return keras.Sequential([
+            layers.LSTM(64, input_shape=(1, n_features), return_sequences=True),
+            layers.Dropout(0.2),
+            layers.LSTM(32),
+            layers.Dropout(0.2),
+            layers.Dense(16, activation='relu'),
+            layers.Dense(1, activation='sigmoid')
+        ])
+
+    features = keras.Input(shape=(1, n_features), name='features')
+    quartier = keras.Input(shape=(1,), dtype='int32', name='quartier')
+    embedded = layers.Embedding(n_quartiers + 1, embedding_dim, name=EMBEDDING_LAYER)(quartier)
+    x = layers.Concatenate()([features, embedded])
+    x = layers.LSTM(64, return_sequences=True)(x)
+    x = layers.Dropout(0.2)(x)
+    x = layers.LSTM(32)(x)
+    x = layers.Dropout(0.2)(x)
+    x = layers.Dense(16, activation='relu')(x)
+    output = layers.Dense(1, activation='sigmoid')(x)
+    return keras.Model([features, quartier], output)
+
+
+def reset_unseen_embeddings(model, seen_rows) -> int:
+    """
+    Remplace les lignes d'embedding non entraînées par le vecteur moyen des lignes vues.
+
+    Les quartiers du registre absents des données d'entraînement, et la
+    dernière ligne (quartier inconnu), gardent sinon leurs poids initiaux
+    aléatoires. Appliqué au modèle Keras lui-même : le runtime NumPy
+    (src/lstm_runtime.py), qui en exporte les poids tels quels, et le repli
+    Keras donnent le même résultat.
+
+    Args:
+        model: Modèle Keras à deux entrées (build_lstm_model avec n_quartiers > 0)
+        seen_rows: Index d'embedding présents à l'entraînement
+
+    Returns:
+        Nombre de lignes remplacées (0 pour un modèle sans quartier)
+    """
+    if len(getattr(model, 'inputs', None) or ()) < 2:
+        return 0
+    layer = model.get_layer(EMBEDDING_LAYER)
+    table = np.array(layer.get_weights()[0])
+    seen = np.zeros(len(table), dtype=bool)
+    seen[[int(r) for r in seen_rows if 0 <= int(r) < len(table) - 1]] = True
+    if not seen.any():
+        return 0
+    table[~seen] = table[seen].mean(axis=0)
+    layer.set_weights([table])
+    return int((~seen).sum())
@@ -0,0 +1,330 @@
+"""
+Fichier : src/quantized.py
+Mode d'inférence en précision réduite
+=====================================
+
+Variante moins coûteuse du jeu de modèles, construite à partir d'un bundle
+vérifié (aucun nouvel artefact à versionner) :
+- Scaler en float32 (moyenne et inverse de l'écart-type précalculés)
+- LSTM : poids quantifiés en int8 (échelle symétrique par colonne de sortie),
+  déquantifiés en float32 au moment du calcul : 4x moins de mémoire de poids
+- LightGBM : seuils des arbres remplacés par des indices de bins. Chaque
+  feature est discrétisée une fois (np.searchsorted sur les seuils du modèle,
+  bin dédié aux valeurs manquantes), puis tous les arbres sont parcourus en
+  vectorisé sur des entiers uint8
+
+Modes (DAKAR_PRECISION pour l'application, --precision pour le scoring en masse) :
+- full : modèles du bundle tels quels
+- reduced : scaler float32 + LSTM int8, LightGBM natif (entrées float32)
+- binned : reduced + LightGBM à seuils discrétisés (modèle 5x plus petit,
+  décisions identiques, mais parcours NumPy plus lent que LightGBM natif)
+
+L'écart avec la précision complète (AUC, écart des probabilités), la latence
+et la taille des modèles sont mesurés par :
+    python scripts/benchmark.py --suite precision --sizes 1,100,10000
+"""
+
+import os
+from typing import Dict
+
+import numpy as np
+
+from src.lstm_runtime import NumpyLSTM
+
+PRECISION_ENV = 'DAKAR_PRECISION'
+PRECISIONS = ('full', 'reduced', 'binned')
+
+# Valeur des codes catégoriels manquants dans BinnedForest (hors de tout masque)
+MISSING_CATEGORY = 31
+
+
+def default_precision() -> str:
+    """Précision de service configurée (variable DAKAR_PRECISION, 'full' par défaut)."""
+    precision = os.environ.get(PRECISION_ENV, 'full')
+    return precision if precision in PRECISIONS else 'full'
+
+
+# ============================================================================
+# SCALER FLOAT32
+# ============================================================================
+
+class Float32Scaler:
+    """StandardScaler.transform en float32 : (X - mean) * (1 / scale)."""
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray):
+        self.mean_ = np.asarray(mean, dtype=np.float32)
+        self.inv_scale_ = (1.0 / np.asarray(scale, dtype=np.float64)).astype(np.float32)
+
+    @property
+    def n_features_in_(self) -> int:
+        return len(self.mean_)
+
+    def transform(self, X) -> np.ndarray:
+        return (np.asarray(X, dtype=np.float32) - self.mean_) * self.inv_scale_
+
+
+# ============================================================================
+# LSTM INT8
+# ============================================================================
+
+def quantize_int8(weights: np.ndarray):
+    """
+    Quantification symétrique int8 par colonne (dernier axe).
+
+    Returns:
+        (poids int8, échelles float32) avec weights ≈ q * scale
+    """
+    weights = np.asarray(weights, dtype=np.float32)
+    if weights.ndim == 1:
+        scale = np.float32(max(np.abs(weights).max(), 1e-12) / 127.0)
+    else:
+        scale = np.maximum(np.abs(weights).max(axis=0), 1e-12) / 127.0
+    q = np.clip(np.round(weights / scale), -127, 127).astype(np.int8)
+    return q, np.asarray(scale, dtype=np.float32)
+
+
+class Int8LSTM(NumpyLSTM):
+    """
+    NumpyLSTM aux noyaux stockés en int8 (biais conservés en float32).
+
+    Args:
+        model: NumpyLSTM en précision complète
+    """
+
+    def __init__(self, model: NumpyLSTM):
+        self.layers = []
+        self.scales = []
+        for entry, arrays in model.layers:
+            stored, scales = {}, {}
+            for name, weights in arrays.items():
+                if name == 'bias':
+                    stored[name] = np.asarray(weights, dtype=np.float32)
+                else:
+                    stored[name], scales[name] = quantize_int8(weights)
+            self.layers.append((entry, stored))
+            self.scales.append(scales)
+
+    def _layer_weights(self):
+        # Déquantification à la volée : seules les versions int8 restent en mémoire
+        for (entry, arrays), scales in zip(self.layers, self.scales):
+            yield entry, {name: a.astype(np.float32) * scales[name] if name in scales else a
+                          for name, a in arrays.items()}
+
+
+# ============================================================================
+# LIGHTGBM À SEUILS DISCRÉTISÉS
+# ============================================================================
+
+class BinnedForest:
+    """
+    Forêt LightGBM (binaire) évaluée sur des indices de bins.
+
+    Pour chaque feature, les seuils distincts du modèle sont triés :
+    bin(x) = nombre de seuils < x, donc x <= seuil_k  <=>  bin(x) <= k.
+
+    Valeurs manquantes (NaN), comme LightGBM (et src/explain.py) : pour une
+    feature dont les nœuds sont de type 'NaN', un bin dédié (après le
+    dernier seuil) suit la branche par défaut de chaque nœud (default_left) ;
+    sinon NaN vaut 0. Les décisions sont exactement celles de LightGBM.
+
+    Features catégorielles (code du quartier) : la valeur est le code
+    lui-même ; un nœud '==' garde l'ensemble de ses catégories en masque de
+    bits (code manquant ou inconnu : branche droite, comme LightGBM).
+
+    Args:
+        booster: lgb.Booster (objectif binaire, splits numériques '<=' (manquants 'None'
+            ou 'NaN') ou catégoriels '==')
+    """
+
+    def __init__(self, booster):
+        dump = booster.dump_model()
+        if dump.get('num_tree_per_iteration', 1) != 1:
+            raise ValueError("BinnedForest : seuls les modèles binaires sont supportés")
+        n_features = dump['max_feature_idx'] + 1
+
+        nodes = []
+        for tree in dump['tree_info']:
+            self._collect(tree['tree_structure'], nodes)
+        self.categorical = sorted({f for f, t, _ in nodes if t is None})
+        self.nan_missing = sorted({f for f, _, missing in nodes if missing == 'NaN'})
+        thresholds = [sorted({t for f, t, _ in nodes if f == i and t is not None}) for i in range(n_features)]
+        self.edges = [np.asarray(t, dtype=np.float64) for t in thresholds]
+        # Bin des valeurs manquantes : après le dernier seuil (len(edges) + 1)
+        self.missing_bin = np.asarray([len(t) + 1 for t in thresholds], dtype=np.int64)
+        max_bins = max((len(t) for t in thresholds), default=0) + 2
+        self.bin_dtype = np.uint8 if max_bins <= 256 else np.uint16
+
+        # Nœuds aplatis : index >= 0 = nœud interne, index < 0 = feuille (~index)
+        self.feature, self.threshold_bin, self.left, self.right = [], [], [], []
+        self.category_mask, self.missing_left, self.leaf_value = [], [], []
+        self.roots = np.asarray([self._flatten(tree['tree_structure'], thresholds)
+                                 for tree in dump['tree_info']], dtype=np.int32)
+        self.feature = np.asarray(self.feature, dtype=np.int32)
+        self.threshold_bin = np.asarray(self.threshold_bin, dtype=self.bin_dtype)
+        self.category_mask = np.asarray(self.category_mask, dtype=np.uint32)
+        self.missing_left = np.asarray(self.missing_left, dtype=bool)
+        self.is_categorical = self.category_mask > 0
+        self.left = np.asarray(self.left, dtype=np.int32)
+        self.right = np.asarray(self.right, dtype=np.int32)
+        self.leaf_value = np.asarray(self.leaf_value, dtype=np.float64)
+
+    @staticmethod
+    def _categories(node) -> list:
+        categories = [int(c) for c in str(node['threshold']).split('||')]
+        if max(categories) >= MISSING_CATEGORY:
+            raise ValueError(f"BinnedForest : catégories limitées à {MISSING_CATEGORY - 1}")
+        return categories
+
+    @staticmethod
+    def _collect(node, nodes):
+        if 'split_feature' not in node:
+            return
+        decision = node.get('decision_type', '<=')
+        missing = node.get('missing_type', 'None')
+        if missing == 'Zero':
+            raise ValueError("BinnedForest : valeurs manquantes 'Zero' non supportées")
+        if decision == '==':
+            BinnedForest._categories(node)
+            nodes.append((node['split_feature'], None, missing))
+        elif decision == '<=':
+            nodes.append((node['split_feature'], node['threshold'], missing))
+        else:
+            raise ValueError(f"BinnedForest : split '{decision}' non supporté")
+        BinnedForest._collect(node['left_child'], nodes)
+        BinnedForest._collect(node['right_child'], nodes)
+
+    def _flatten(self, node, thresholds) -> int:
+        if 'split_feature' not in node:
+            self.leaf_value.append(node['leaf_value'])
+            return ~(len(self.leaf_value) - 1)
+        index = len(self.feature)
+        f = node['split_feature']
+        self.feature.append(f)
+        if node.get('decision_type', '<=') == '==':
+            self.threshold_bin.append(0)
+            self.category_mask.append(sum(1 << c for c in self._categories(node)))
+            self.missing_left.append(False)
+        else:
+            self.threshold_bin.append(thresholds[f].index(node['threshold']))
+            self.category_mask.append(0)
+            # Bin manquant : branche par défaut d'un nœud 'NaN', valeur 0 sinon
+            self.missing_left.append(bool(node.get('default_left', True)) if node.get('missing_type') == 'NaN'
+                                     else 0.0 <= node['threshold'])
+        self.left.append(0)
+        self.right.append(0)
+        self.left[index] = self._flatten(node['left_child'], thresholds)
+        self.right[index] = self._flatten(node['right_child'], thresholds)
+        return index
+
+    def num_feature(self) -> int:
+        return len(self.edges)
+
+    def transform(self, X) -> np.ndarray:
+        """Discrétise les features (n, n_features) en indices de bins."""
+        X = np.asarray(X)
+        binned = np.empty(X.shape, dtype=self.bin_dtype)
+        for f, edges in enumerate(self.edges):
+            if f in self.categorical:
+                values = X[:, f]
+                valid = np.isfinite(values) & (values >= 0) & (values < MISSING_CATEGORY)
+                binned[:, f] = np.where(valid, np.nan_to_num(values), MISSING_CATEGORY)
+                continue
+            values = np.asarray(X[:, f], dtype=np.float64)
+            missing = np.isnan(values)
+            if f not in self.nan_missing:
+                # Feature sans valeur manquante à l'entraînement : NaN vaut 0 (LightGBM)
+                values = np.where(missing, 0.0, values)
+            binned[:, f] = np.searchsorted(edges, values, side='left')
+            if f in self.nan_missing:
+                binned[missing, f] = self.missing_bin[f]
+        return binned
+
+    def predict_raw(self, X) -> np.ndarray:
+        """Somme des feuilles (score brut, comme booster.predict(raw_score=True))."""
+        binned = self.transform(X)
+        n, n_features = binned.shape
+        n_trees = len(self.roots)
+        flat = binned.ravel()
+        # Une position par couple (ligne, arbre) ; seules les positions encore
+        # sur un nœud interne sont avancées à chaque niveau
+        node = np.tile(self.roots, n)
+        offsets = np.repeat(np.arange(n, dtype=np.int64) * n_features, n_trees)
+        active = np.flatnonzero(node >= 0)
+        while len(active):
+            current = node[active]
+            values = flat[offsets[active] + self.feature[current]]
+            go_left = values <= self.threshold_bin[current]
+            if self.nan_missing:
+                missing = values == self.missing_bin[self.feature[current]]
+                go_left = np.where(missing, self.missing_left[current], go_left)
+            if self.categorical:
+                in_set = ((self.category_mask[current] >> values.astype(np.uint32)) & 1).astype(bool)
+                go_left = np.where(self.is_categorical[current], in_set, go_left)
+            nxt = np.where(go_left, self.left[current], self.right[current])
+            node[active] = nxt
+            active = active[nxt >= 0]
+        return self.leaf_value[~node].reshape(n, n_trees).sum(axis=1)
+
+    def predict(self, X) -> np.ndarray:
+        """Probabilité de coupure (sigmoïde du score brut)."""
+        return 1.0 / (1.0 + np.exp(-self.predict_raw(X)))
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [self.feature, self.threshold_bin, self.category_mask, self.missing_left, self.left,
+                  self.right, self.leaf_value, self.roots]
+        return sum(a.nbytes for a in arrays) + sum(e.nbytes for e in self.edges)
+
+
+# ============================================================================
+# JEU DE MODÈLES
+# ============================================================================
+
+def quantize_models(models: Dict, binned_lgb: bool = False) -> Dict:
+    """
+    Version en précision réduite d'un jeu de modèles chargé par load_bundle.
+
+    Args:
+        models: {'lgb', 'lstm', 'scaler', 'ensemble', 'drift_profile', 'manifest'}
+        binned_lgb: Remplacer LightGBM par sa version à seuils discrétisés
+
+    Returns:
+        Même structure, avec 'precision': 'reduced' ou 'binned'
+    """
+    scaler = models['scaler']
+    return {
+        'lgb': BinnedForest(models['lgb']) if binned_lgb else models['lgb'],
+        'lstm': Int8LSTM(models['lstm']) if models['lstm'] is not None else None,
+        'scaler': Float32Scaler(scaler.mean_, scaler.scale_),
+        'ensemble': models.get('ensemble'),
+        'drift_profile': models.get('drift_profile'),
+        'quartier_codes': models.get('quartier_codes'),
+        'manifest': models.get('manifest'),
+        'precision': 'binned' if binned_lgb else 'reduced'
+    }
+
+
+def apply_precision(models: Dict, precision: str) -> Dict:
+    """Jeu de modèles dans la précision demandée ('full', 'reduced' ou 'binned')."""
+    if precision not in PRECISIONS:
+        raise ValueError(f"Précision inconnue : {precision} ({', '.join(PRECISIONS)})")
+    if precision == 'full':
+        return models
+    return quantize_models(models, binned_lgb=precision == 'binned')
+
+
+def weights_nbytes(models: Dict) -> Dict[str, int]:
+    """Taille en octets des paramètres de chaque modèle (scaler, LightGBM, LSTM)."""
+    sizes = {}
+    scaler = models['scaler']
+    sizes['scaler'] = int(np.asarray(scaler.mean_).nbytes
+                          + np.asarray(getattr(scaler, 'inv_scale_', getattr(scaler, 'scale_', []))).nbytes)
+    lgb_model = models['lgb']
+    if isinstance(lgb_model, BinnedForest):
+        sizes['lgb'] = lgb_model.nbytes
+    else:
+        sizes['lgb'] = len(lgb_model.model_to_string().encode('utf-8'))
+    if models['lstm'] is not None and hasattr(models['lstm'], 'layers'):
+        sizes['lstm'] = int(sum(np.asarray(a).nbytes for _, arrays in models['lstm'].layers
+                                for a in arrays.values()))
+    return sizes
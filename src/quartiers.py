@@ -0,0 +1,175 @@
+"""
+Fichier : src/quartiers.py
+Registre canonique des quartiers (codes entiers)
+================================================
+
+Un seul référentiel pour toutes les couches : chaque quartier a un nom
+canonique (celui de src/config.py) et un code entier stable, sa position
+dans QUARTIERS. Les variantes d'écriture (accents, casse, espaces ou
+tirets : 'Sicap-Liberté', 'mermoz sacré-cœur'...) sont ramenées au même
+code.
+
+Les modèles reçoivent le code (feature catégorielle native de LightGBM,
+embedding du LSTM), les datasets le stockent en catégoriel sur ces codes.
+Un nouveau quartier s'ajoute à la fin de QUARTIERS_DAKAR : les codes
+existants ne changent pas, et un modèle entraîné avant le traite comme
+inconnu (UNKNOWN_CODE).
+
+Les conversions sont vectorisées : un lot ne fait qu'une recherche Python
+par nom distinct (pd.factorize), puis une indexation NumPy.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.config import QUARTIERS_DAKAR
+
+QUARTIERS = tuple(QUARTIERS_DAKAR)
+N_QUARTIERS = len(QUARTIERS)
+UNKNOWN_CODE = -1
+CODE_DTYPE = np.int16
+
+# En dessous, conversion directe nom par nom (plus rapide que pd.factorize)
+SMALL_BATCH = 64
+
+# Orthographes historiques (ex: src/data_generator.py, anciens CSV)
+ALIASES = {
+    'Sicap-Liberté': 'Sicap-Liberte',
+    'Mermoz-Sacré-Cœur': 'Mermoz-Sacre-Coeur'
+}
+
+
+def _normalize(name: str) -> str:
+    """Clé de comparaison : sans accents, minuscules, séparateurs unifiés."""
+    name = str(name).replace('œ', 'oe').replace('Œ', 'OE')
+    name = ''.join(c for c in unicodedata.normalize('NFKD', name) if not unicodedata.combining(c))
+    return re.sub(r'[\s_\-]+', '-', name.strip()).casefold()
+
+
+_CODES: Dict[str, int] = {_normalize(q): code for code, q in enumerate(QUARTIERS)}
+_CODES.update({_normalize(alias): _CODES[_normalize(q)] for alias, q in ALIASES.items()})
+
+
+@lru_cache(maxsize=1024)
+def quartier_code(name) -> int:
+    """Code d'un quartier (UNKNOWN_CODE s'il n'est pas dans le registre)."""
+    if name is None or (isinstance(name, float) and np.isnan(name)):
+        return UNKNOWN_CODE
+    return _CODES.get(_normalize(name), UNKNOWN_CODE)
+
+
+def canonical_name(name) -> str:
+    """Nom canonique d'un quartier (le nom tel quel s'il est inconnu)."""
+    code = quartier_code(name)
+    return QUARTIERS[code] if code != UNKNOWN_CODE else str(name)
+
+
+def encode_quartiers(values: Sequence) -> np.ndarray:
+    """
+    Codes entiers d'une colonne de quartiers.
+
+    Args:
+        values: Noms (liste, tableau, Series, Categorical)
+
+    Returns:
+        Tableau (n,) CODE_DTYPE, UNKNOWN_CODE pour un nom inconnu ou manquant
+    """
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.array
+    if isinstance(values, pd.Categorical):
+        positions, uniques = values.codes, values.categories
+    elif len(values) <= SMALL_BATCH:
+        return np.fromiter((quartier_code(v) for v in values), dtype=CODE_DTYPE, count=len(values))
+    else:
+        positions, uniques = pd.factorize(np.asarray(values, dtype=object))
+    # Dernière case = valeur manquante (position -1)
+    lookup = np.array([quartier_code(u) for u in uniques] + [UNKNOWN_CODE], dtype=CODE_DTYPE)
+    return lookup[positions]
+
+
+def decode_quartiers(codes: np.ndarray) -> np.ndarray:
+    """Noms canoniques de codes (None pour UNKNOWN_CODE)."""
+    names = np.array(QUARTIERS + (None,), dtype=object)
+    return names[np.asarray(codes)]
+
+
+def quartier_categorical(values: Sequence) -> pd.Categorical:
+    """
+    Colonne catégorielle dont les codes sont ceux du registre.
+
+    Les noms connus sont ramenés à leur forme canonique ; les noms hors
+    registre sont conservés, en catégories supplémentaires après QUARTIERS.
+    """
+    codes = encode_quartiers(values)
+    series = pd.Series(values, copy=False)
+    extra = sorted({str(v) for v in series[codes == UNKNOWN_CODE].dropna().unique()})
+    names = np.where(codes != UNKNOWN_CODE, decode_quartiers(codes), series.astype(object).to_numpy())
+    return pd.Categorical(names, categories=list(QUARTIERS) + extra)
+
+
+def lookup_by_code(mapping: Dict[str, float], default: float) -> np.ndarray:
+    """
+    Table indexée par code : table[codes] remplace un .map() par nom.
+
+    Args:
+        mapping: {nom de quartier (toute orthographe): valeur}
+        default: Valeur des quartiers absents et de UNKNOWN_CODE
+
+    Returns:
+        Tableau (N_QUARTIERS + 1,) ; la dernière case (index -1) sert aux codes inconnus
+    """
+    table = np.full(N_QUARTIERS + 1, default, dtype=np.float64)
+    for name, value in mapping.items():
+        code = quartier_code(name)
+        if code != UNKNOWN_CODE:
+            table[code] = value
+    return table
+
+
+def mask_unseen(codes: np.ndarray, seen: Optional[Sequence[int]]) -> np.ndarray:
+    """
+    Codes des quartiers absents de l'entraînement ramenés à UNKNOWN_CODE.
+
+    Un quartier du registre sans ligne d'entraînement n'a rien appris (ligne
+    d'embedding aléatoire, pas de décalage d'ensemble) : il est traité comme
+    un quartier inconnu par tous les modèles.
+
+    Args:
+        codes: Codes du registre
+        seen: Codes vus à l'entraînement (None = tous les codes du registre)
+
+    Returns:
+        Tableau (n,) CODE_DTYPE
+    """
+    codes = np.asarray(codes, dtype=CODE_DTYPE)
+    if seen is None:
+        return codes
+    known = np.zeros(N_QUARTIERS + 1, dtype=bool)
+    known[[c for c in seen if 0 <= c < N_QUARTIERS]] = True
+    return np.where(known[codes], codes, UNKNOWN_CODE).astype(CODE_DTYPE)
+
+
+def embedding_index(codes: Optional[np.ndarray], n_rows: int, n: int) -> np.ndarray:
+    """
+    Index de la table d'embedding du LSTM.
+
+    La dernière ligne de la table est réservée aux quartiers inconnus (et
+    aux quartiers ajoutés au registre après l'entraînement).
+
+    Args:
+        codes: Codes du registre (None = tous inconnus)
+        n_rows: Nombre de lignes de la table (quartiers connus + 1)
+        n: Nombre de lignes du lot
+
+    Returns:
+        Tableau (n,) int32
+    """
+    if codes is None:
+        return np.full(n, n_rows - 1, dtype=np.int32)
+    codes = np.asarray(codes, dtype=np.int32)
+    return np.where((codes < 0) | (codes >= n_rows - 1), n_rows - 1, codes)
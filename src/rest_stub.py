@@ -0,0 +1,260 @@
+"""
+Fichier : src/rest_stub.py
+Serveur REST local imitant l'API Supabase (PostgREST)
+=====================================================
+
+Petit serveur HTTP en mémoire utilisé par les benchmarks pour mesurer
+l'ingestion sans dépendre du réseau ni du projet Supabase distant.
+
+Seul le sous-ensemble de PostgREST utilisé par src/database.py est
+implémenté :
+- POST /rest/v1/<table> (JSON, objet ou liste ; ou text/csv avec en-tête)
+- GET /rest/v1/<table> avec select, order, limit, offset, filtres eq. / gt. / gte. / lt. / lte.
+- En-tête Prefer: count=exact / planned / estimated (Content-Range)
+
+Comme PostgREST, le stub connaît le schéma des tables (src/storage.TABLES,
+plus id et created_at) : une table inconnue répond 404, une insertion avec
+une colonne inconnue 400, et tout le lot est rejeté.
+
+Usage :
+    with LocalRestServer() as server:
+        database.BASE_URL = server.url
+        ...
+"""
+
+import csv
+import io
+import json
+import operator
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+from src.storage import TABLES
+
+REST_PREFIX = '/rest/v1/'
+
+# Colonnes ajoutées par la base à chaque table
+GENERATED_COLUMNS = ('id', 'created_at')
+
+# Opérateurs de filtre PostgREST (comparaisons numériques, sauf eq)
+FILTERS = {
+    'eq': None,
+    'gt': operator.gt,
+    'gte': operator.ge,
+    'lt': operator.lt,
+    'lte': operator.le
+}
+
+
+def _coerce(value: str):
+    """Valeur CSV typée comme le ferait PostgreSQL pour une colonne numérique ('' = NULL)."""
+    if value == '':
+        return None
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _parse_csv(payload: bytes) -> List[Dict]:
+    reader = csv.reader(io.StringIO(payload.decode('utf-8')))
+    header = next(reader, [])
+    return [dict(zip(header, map(_coerce, row))) for row in reader]
+
+
+class _RestHandler(BaseHTTPRequestHandler):
+    """Gestionnaire HTTP : traduit les requêtes PostgREST sur les tables en mémoire."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        # Silencieux : les benchmarks impriment leur propre sortie
+        pass
+
+    def _table_name(self) -> str:
+        path = urlparse(self.path).path
+        if not path.startswith(REST_PREFIX):
+            return ''
+        return path[len(REST_PREFIX):].strip('/')
+
+    def _send(self, status: int, body: bytes = b'', headers: Dict = None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _error(self, status: int, code: str, message: str):
+        self._send(status, json.dumps({'code': code, 'message': message}).encode('utf-8'))
+
+    def _check_table(self, table: str) -> bool:
+        if table in self.server.store.schema:
+            return True
+        self._error(404, '42P01', f'relation "public.{table}" does not exist')
+        return False
+
+    def do_POST(self):
+        table = self._table_name()
+        length = int(self.headers.get('Content-Length', 0))
+        payload = self.rfile.read(length)
+        if not self._check_table(table):
+            return
+
+        try:
+            if self.headers.get('Content-Type', '').startswith('text/csv'):
+                records = _parse_csv(payload)
+            else:
+                records = json.loads(payload or b'[]')
+        except ValueError:
+            self._send(400, b'{"message": "invalid payload"}')
+            return
+        if isinstance(records, dict):
+            records = [records]
+        columns = self.server.store.schema[table]
+        unknown = sorted({key for record in records for key in record} - columns)
+        if unknown:
+            self._error(400, 'PGRST204',
+                        f"Could not find the '{unknown[0]}' column of '{table}' in the schema cache")
+            return
+
+        inserted = self.server.store.insert(table, records)
+
+        if 'return=representation' in self.headers.get('Prefer', ''):
+            self._send(201, json.dumps(inserted).encode('utf-8'))
+        else:
+            self._send(201)
+
+    def do_GET(self):
+        table = self._table_name()
+        if not table:
+            self._send(200, b'{}')
+            return
+        if not self._check_table(table):
+            return
+
+        params = {k: v[-1] for k, v in parse_qs(urlparse(self.path).query).items()}
+        rows, total = self.server.store.select(table, params)
+
+        headers = {}
+        # count=planned / estimated : le stub renvoie le comptage exact
+        if any(f'count={m}' in self.headers.get('Prefer', '') for m in ('exact', 'planned', 'estimated')):
+            offset = int(params.get('offset', 0))
+            end = offset + len(rows) - 1 if rows else offset
+            headers['Content-Range'] = f"{offset}-{end}/{total}"
+
+        self._send(200, json.dumps(rows).encode('utf-8'), headers)
+
+
+class _MemoryStore:
+    """
+    Tables en mémoire protégées par un verrou (le serveur est multi-thread).
+
+    Args:
+        tables: Schéma {table: colonnes} (défaut : src/storage.TABLES)
+    """
+
+    def __init__(self, tables: Dict = None):
+        self.schema = {name: set(columns) | set(GENERATED_COLUMNS)
+                       for name, columns in (TABLES if tables is None else tables).items()}
+        self._tables: Dict[str, List[Dict]] = {}
+        self._next_id: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def insert(self, table: str, records: List[Dict]) -> List[Dict]:
+        with self._lock:
+            rows = self._tables.setdefault(table, [])
+            next_id = self._next_id.get(table, 1)
+            inserted = []
+            for record in records:
+                row = dict(record)
+                row.setdefault('id', next_id)
+                next_id = max(next_id, row['id']) + 1
+                rows.append(row)
+                inserted.append(row)
+            self._next_id[table] = next_id
+        return inserted
+
+    def select(self, table: str, params: Dict):
+        with self._lock:
+            rows = list(self._tables.get(table, []))
+
+        # Filtres colonne=op.valeur
+        for key, value in params.items():
+            op, _, expected = value.partition('.')
+            if key in ('select', 'order', 'limit', 'offset') or op not in FILTERS:
+                continue
+            if op == 'eq':
+                rows = [r for r in rows if str(r.get(key)) == expected]
+            else:
+                rows = [r for r in rows if r.get(key) is not None and FILTERS[op](float(r[key]), float(expected))]
+
+        total = len(rows)
+
+        if 'order' in params:
+            column, _, direction = params['order'].partition('.')
+            rows.sort(key=lambda r: (r.get(column) is None, r.get(column)),
+                      reverse=(direction == 'desc'))
+
+        offset = int(params.get('offset', 0))
+        limit = int(params['limit']) if 'limit' in params else None
+        rows = rows[offset:offset + limit] if limit is not None else rows[offset:]
+
+        if 'select' in params and params['select'] != '*':
+            columns = params['select'].split(',')
+            rows = [{c: r.get(c) for c in columns} for r in rows]
+
+        return rows, total
+
+    def count(self, table: str) -> int:
+        with self._lock:
+            return len(self._tables.get(table, []))
+
+
+class LocalRestServer:
+    """
+    Serveur REST local démarré dans un thread de fond.
+
+    Args:
+        host: Adresse d'écoute
+        port: Port (0 = port libre choisi par l'OS)
+        tables: Schéma {table: colonnes} (défaut : src/storage.TABLES)
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, tables: Dict = None):
+        self._httpd = ThreadingHTTPServer((host, port), _RestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.store = _MemoryStore(tables)
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def store(self) -> _MemoryStore:
+        return self._httpd.store
+
+    def start(self) -> 'LocalRestServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> 'LocalRestServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
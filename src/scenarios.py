@@ -0,0 +1,596 @@
+"""
+Fichier : src/scenarios.py
+Scénarios synthétiques pluriannuels avec événements météo
+=========================================================
+
+Un scénario (fichier JSON ou YAML, voir scenarios/) décrit la période, les
+quartiers et les événements injectés ; il pilote un générateur vectorisé
+qui reprend les équations de src/data_generator.py (température, humidité,
+vent, consommation, probabilité de coupure) sur des tableaux numpy, au lieu
+d'une boucle Python par ligne.
+
+Format :
+    nom: stress-2023-2025
+    graine: 42
+    debut: 2023-01-01
+    fin: 2025-12-31 23:00
+    frequence: h                  # fréquence pandas (défaut : horaire)
+    quartiers:                    # liste, ou dict nom -> paramètres modifiés
+      Guediawaye: {}
+      Pikine: {risque_base: 0.12, consommation_avg: 800, temperature_bias: 1.2}
+    tendance:
+      rechauffement: 0.05         # °C par an depuis le début
+      croissance_conso: 0.04      # fraction de consommation en plus par an
+    bornes:
+      temp_celsius: [18, 46]      # remplace les bornes de BORNES
+    evenements:
+      - type: canicule            # intensite en °C
+        debut: 2024-04-10
+        fin: 2024-04-17
+        quartiers: [Guediawaye, Pikine]
+      - type: pic_demande         # intensite en fraction de consommation
+        debut: 2024-12-24 18:00
+        fin: 2025-01-01 02:00
+        heures: [18, 19, 20, 21]
+      - type: orage               # intensite en km/h de vent
+        recurrence: {mois: [7, 8, 9, 10], par_an: 6, duree_heures: 8}
+        risque: 0.25
+
+Paramètres d'un quartier : ceux de QUARTIERS_CONFIG, sinon DEFAULT_QUARTIER
+(quartiers sans configuration : Pikine, Fann, ou hors registre).
+
+Événements (EVENT_TYPES) : fenêtres explicites debut / fin (bornes
+incluses), ou `recurrence` tirée chaque année dans les mois indiqués ;
+`risque` s'ajoute à la probabilité de coupure pendant l'événement. La
+colonne `evenement` porte le nom du dernier événement actif (vide sinon).
+
+Reproductibilité : les lignes sont produites par blocs de `block_steps`
+pas de temps (tous les quartiers, ordre chronologique), chacun avec son
+générateur np.random.default_rng([graine, 0, bloc]) ; les fenêtres
+récurrentes utilisent default_rng([graine, 1, indice de l'événement]).
+Même scénario et même block_steps → mêmes données, quel que soit l'usage
+(itération, écriture CSV ou parquet).
+
+PyYAML et pyarrow sont optionnels (fichiers .yaml ; sortie parquet et
+writer CSV natif, sinon DataFrame.to_csv).
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data_generator import QUARTIERS_CONFIG
+from src.features import time_features
+from src.quartiers import canonical_name
+
+DEFAULT_BLOCK_STEPS = 8760
+DEFAULT_OUTPUT_DIR = 'data/scenarios'
+OUTPUT_FORMATS = ('csv', 'parquet')
+
+# Quartier sans configuration dans QUARTIERS_CONFIG (valeurs de Yoff)
+DEFAULT_QUARTIER = {'risque_base': 0.071, 'consommation_avg': 650, 'temperature_bias': 0.0}
+QUARTIER_PARAMS = tuple(DEFAULT_QUARTIER)
+
+# Bornes de src/data_generator.py (modifiables par scénario)
+BORNES = {
+    'temp_celsius': (18.0, 42.0),
+    'humidite_percent': (30.0, 95.0),
+    'vitesse_vent': (0.0, 50.0),
+    'conso_megawatt': (200.0, 1500.0)
+}
+
+# Type -> intensité et risque additionnel par défaut
+EVENT_TYPES = {
+    'canicule': {'intensite': 5.0, 'risque': 0.0},       # °C
+    'pic_demande': {'intensite': 0.3, 'risque': 0.0},    # fraction de consommation
+    'orage': {'intensite': 25.0, 'risque': 0.2}          # km/h de vent
+}
+STORM_HUMIDITY = 20.0
+STORM_COOLING = 3.0
+
+# Colonnes de generate_dataset, puis l'événement actif
+COLUMNS = ['date_heure', 'quartier', 'temp_celsius', 'humidite_percent', 'vitesse_vent', 'conso_megawatt',
+           'heure', 'jour_semaine', 'mois', 'saison', 'is_peak_hour', 'coupure', 'evenement']
+
+HOUR_FACTOR = np.ones(24)
+HOUR_FACTOR[[22, 23, 0, 1, 2, 3, 4, 5]] = 0.7
+SEASON_TEMPERATURE = np.array([24.0, 30.0, 27.0])
+SEASON_HUMIDITY = np.array([0.0, -10.0, 15.0])
+SEASON_WIND = np.array([12.0, 12.0, 20.0])
+YEAR = pd.Timedelta(days=365.25)
+
+
+def _timestamp(value, key: str) -> pd.Timestamp:
+    try:
+        return pd.Timestamp(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} : date illisible ({value!r})") from None
+
+
+def _number(spec: Dict, key: str, default: float, where: str) -> float:
+    value = spec.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{where}.{key} : nombre attendu ({value!r})")
+    return float(value)
+
+
+class Event:
+    """
+    Événement injecté : fenêtres de temps, quartiers touchés et intensité.
+
+    Args:
+        type: Clé de EVENT_TYPES
+        nom: Nom porté par la colonne `evenement`
+        fenetres: Tableau datetime64[ns] (k, 2) des fenêtres [début, fin]
+        intensite: Amplitude de l'effet (unité selon le type)
+        risque: Probabilité de coupure ajoutée pendant l'événement
+        quartiers: Quartiers touchés (None = tous)
+        heures: Heures touchées (None = toutes)
+    """
+
+    def __init__(self, type: str, nom: str, fenetres: np.ndarray, intensite: float, risque: float,
+                 quartiers: Optional[List[str]] = None, heures: Optional[List[int]] = None):
+        self.type = type
+        self.nom = nom
+        self.fenetres = fenetres
+        self.intensite = intensite
+        self.risque = risque
+        self.quartiers = quartiers
+        self.heures = heures
+
+    @classmethod
+    def from_dict(cls, spec: Dict, index: int, scenario: Dict) -> 'Event':
+        """
+        Lit un événement du scénario et tire ses fenêtres récurrentes.
+
+        Args:
+            spec: Entrée de `evenements`
+            index: Position dans la liste (nom par défaut, graine des tirages)
+            scenario: {'graine', 'debut', 'fin'} du scénario
+
+        Returns:
+            Event
+        """
+        where = f"evenements[{index}]"
+        if not isinstance(spec, dict):
+            raise ValueError(f"{where} : dictionnaire attendu")
+        type = spec.get('type')
+        if type not in EVENT_TYPES:
+            raise ValueError(f"{where}.type : {type!r} inconnu (choix : {', '.join(EVENT_TYPES)})")
+        defaults = EVENT_TYPES[type]
+        intensite = _number(spec, 'intensite', defaults['intensite'], where)
+        risque = _number(spec, 'risque', defaults['risque'], where)
+        if not 0.0 <= risque <= 1.0:
+            raise ValueError(f"{where}.risque : doit être entre 0 et 1 ({risque})")
+
+        if 'recurrence' in spec:
+            fenetres = cls._recurring(spec['recurrence'], where, index, scenario)
+        elif 'debut' in spec:
+            debut = _timestamp(spec['debut'], f"{where}.debut")
+            fin = _timestamp(spec.get('fin', spec['debut']), f"{where}.fin")
+            if fin < debut:
+                raise ValueError(f"{where} : fin ({fin}) avant debut ({debut})")
+            fenetres = np.array([[debut.to_datetime64(), fin.to_datetime64()]], dtype='datetime64[ns]')
+        else:
+            raise ValueError(f"{where} : 'debut' / 'fin' ou 'recurrence' requis")
+
+        quartiers = spec.get('quartiers')
+        if quartiers is not None:
+            quartiers = [canonical_name(q) for q in quartiers]
+        heures = spec.get('heures')
+        if heures is not None:
+            heures = [int(h) for h in heures]
+            if any(not 0 <= h <= 23 for h in heures):
+                raise ValueError(f"{where}.heures : heures entre 0 et 23 attendues")
+        return cls(type, str(spec.get('nom', f"{type}-{index + 1}")), fenetres, intensite, risque,
+                   quartiers, heures)
+
+    @staticmethod
+    def _recurring(spec: Dict, where: str, index: int, scenario: Dict) -> np.ndarray:
+        """Fenêtres tirées chaque année : `par_an` débuts uniformes sur les heures des `mois`."""
+        where = f"{where}.recurrence"
+        if not isinstance(spec, dict):
+            raise ValueError(f"{where} : dictionnaire attendu")
+        mois = [int(m) for m in spec.get('mois', range(1, 13))]
+        if not mois or any(not 1 <= m <= 12 for m in mois):
+            raise ValueError(f"{where}.mois : mois entre 1 et 12 attendus")
+        par_an = int(_number(spec, 'par_an', 1, where))
+        duree = pd.Timedelta(hours=_number(spec, 'duree_heures', 24, where))
+        if par_an < 0 or duree <= pd.Timedelta(0):
+            raise ValueError(f"{where} : par_an >= 0 et duree_heures > 0 attendus")
+
+        rng = np.random.default_rng([scenario['graine'], 1, index])
+        hours = pd.date_range(scenario['debut'].floor('h'), scenario['fin'], freq='h')
+        hours = hours[hours.month.isin(mois)]
+        starts = []
+        for _, candidates in pd.Series(hours, index=hours.year).groupby(level=0):
+            if len(candidates) and par_an:
+                picks = rng.choice(len(candidates), size=min(par_an, len(candidates)), replace=False)
+                starts.append(np.sort(candidates.to_numpy()[picks]))
+        starts = np.concatenate(starts) if starts else np.array([], dtype='datetime64[ns]')
+        return np.column_stack([starts, starts + duree.to_timedelta64() - np.timedelta64(1, 's')])
+
+    def active(self, times: np.ndarray) -> np.ndarray:
+        """Masque des pas de temps (triés) couverts par une fenêtre et une heure de l'événement."""
+        mask = np.zeros(len(times), dtype=bool)
+        lo = np.searchsorted(times, self.fenetres[:, 0], side='left')
+        hi = np.searchsorted(times, self.fenetres[:, 1], side='right')
+        for a, b in zip(lo, hi):
+            mask[a:b] = True
+        if self.heures is not None and mask.any():
+            mask &= np.isin(pd.DatetimeIndex(times).hour, self.heures)
+        return mask
+
+    def to_dict(self) -> Dict:
+        """Résumé JSON (fenêtres en ISO 8601)."""
+        return {
+            'type': self.type, 'nom': self.nom, 'intensite': self.intensite, 'risque': self.risque,
+            'quartiers': self.quartiers, 'heures': self.heures,
+            'fenetres': [[pd.Timestamp(t).isoformat(timespec='seconds') for t in window]
+                         for window in self.fenetres]
+        }
+
+
+class Scenario:
+    """
+    Scénario de génération : période, quartiers, tendances et événements.
+
+    Construit par Scenario.from_dict ou load_scenario ; les erreurs de
+    spécification lèvent ValueError avec le chemin de la clé fautive.
+    """
+
+    def __init__(self, nom: str, debut: pd.Timestamp, fin: pd.Timestamp, quartiers: Dict[str, Dict],
+                 evenements: List[Event], graine: int = 42, frequence: str = 'h',
+                 tendance: Optional[Dict] = None, bornes: Optional[Dict] = None):
+        self.nom = nom
+        self.debut = debut
+        self.fin = fin
+        self.quartiers = quartiers
+        self.evenements = evenements
+        self.graine = graine
+        self.frequence = frequence
+        self.tendance = {'rechauffement': 0.0, 'croissance_conso': 0.0, **(tendance or {})}
+        self.bornes = {**BORNES, **(bornes or {})}
+        self.timestamps = pd.date_range(debut, fin, freq=frequence)
+
+    @classmethod
+    def from_dict(cls, spec: Dict) -> 'Scenario':
+        """
+        Valide une spécification (dict issu du JSON / YAML).
+
+        Args:
+            spec: Spécification du scénario (voir le format en tête de module)
+
+        Returns:
+            Scenario
+        """
+        if not isinstance(spec, dict):
+            raise ValueError("Scénario : dictionnaire attendu")
+        unknown = set(spec) - {'nom', 'graine', 'debut', 'fin', 'frequence', 'quartiers', 'tendance',
+                               'bornes', 'evenements', 'description'}
+        if unknown:
+            raise ValueError(f"Clés inconnues : {', '.join(sorted(unknown))}")
+        for key in ('debut', 'fin'):
+            if key not in spec:
+                raise ValueError(f"{key} : clé requise")
+        debut = _timestamp(spec['debut'], 'debut')
+        fin = _timestamp(spec['fin'], 'fin')
+        if fin < debut:
+            raise ValueError(f"fin ({fin}) avant debut ({debut})")
+        graine = spec.get('graine', 42)
+        if isinstance(graine, bool) or not isinstance(graine, int) or graine < 0:
+            raise ValueError(f"graine : entier positif attendu ({graine!r})")
+        frequence = str(spec.get('frequence', 'h'))
+        try:
+            pd.tseries.frequencies.to_offset(frequence)
+        except ValueError:
+            raise ValueError(f"frequence : {frequence!r} illisible") from None
+
+        tendance = spec.get('tendance') or {}
+        tendance = {key: _number(tendance, key, 0.0, 'tendance') for key in ('rechauffement', 'croissance_conso')}
+        bornes = {}
+        for key, value in (spec.get('bornes') or {}).items():
+            if key not in BORNES:
+                raise ValueError(f"bornes.{key} : colonne inconnue (choix : {', '.join(BORNES)})")
+            if not isinstance(value, (list, tuple)) or len(value) != 2 or value[0] > value[1]:
+                raise ValueError(f"bornes.{key} : [min, max] attendu ({value!r})")
+            bornes[key] = (float(value[0]), float(value[1]))
+
+        quartiers = cls._quartiers(spec.get('quartiers'))
+        context = {'graine': graine, 'debut': debut, 'fin': fin}
+        evenements = [Event.from_dict(event, i, context) for i, event in enumerate(spec.get('evenements') or [])]
+        noms = [event.nom for event in evenements]
+        if len(set(noms)) != len(noms):
+            doubles = sorted({n for n in noms if noms.count(n) > 1})
+            raise ValueError(f"evenements : noms en double ({', '.join(doubles)})")
+        for event in evenements:
+            outside = set(event.quartiers or []) - set(quartiers)
+            if outside:
+                raise ValueError(f"Événement {event.nom} : quartiers absents du scénario "
+                                 f"({', '.join(sorted(outside))})")
+        return cls(str(spec.get('nom', 'scenario')), debut, fin, quartiers, evenements, graine, frequence,
+                   tendance, bornes)
+
+    @staticmethod
+    def _quartiers(spec) -> Dict[str, Dict]:
+        """Paramètres par quartier : QUARTIERS_CONFIG / DEFAULT_QUARTIER, modifiés par le scénario."""
+        if spec is None:
+            spec = list(QUARTIERS_CONFIG)
+        if isinstance(spec, list):
+            spec = {name: {} for name in spec}
+        if not isinstance(spec, dict) or not spec:
+            raise ValueError("quartiers : liste ou dictionnaire non vide attendu")
+        quartiers = {}
+        for name, overrides in spec.items():
+            overrides = overrides or {}
+            unknown = set(overrides) - set(QUARTIER_PARAMS)
+            if unknown:
+                raise ValueError(f"quartiers.{name} : paramètres inconnus ({', '.join(sorted(unknown))})")
+            name = canonical_name(name)
+            base = QUARTIERS_CONFIG.get(name, DEFAULT_QUARTIER)
+            quartiers[name] = {key: _number(overrides, key, base[key], f"quartiers.{name}")
+                               for key in QUARTIER_PARAMS}
+        return quartiers
+
+    @property
+    def rows(self) -> int:
+        """Nombre de lignes générées (pas de temps × quartiers)."""
+        return len(self.timestamps) * len(self.quartiers)
+
+    def summary(self) -> Dict:
+        """Résumé JSON du scénario (événements avec leurs fenêtres tirées)."""
+        return {
+            'nom': self.nom, 'graine': self.graine, 'debut': self.debut.isoformat(), 'fin': self.fin.isoformat(),
+            'frequence': self.frequence, 'pas_de_temps': len(self.timestamps), 'lignes': self.rows,
+            'quartiers': self.quartiers, 'tendance': self.tendance,
+            'evenements': [event.to_dict() for event in self.evenements]
+        }
+
+
+def load_scenario(path) -> Scenario:
+    """
+    Charge un scénario JSON (.json) ou YAML (.yaml, .yml ; nécessite PyYAML).
+
+    Args:
+        path: Chemin du fichier
+
+    Returns:
+        Scenario
+    """
+    path = Path(path)
+    text = path.read_text(encoding='utf-8')
+    if path.suffix.lower() in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError(f"{path} : PyYAML requis pour les scénarios YAML (pip install pyyaml)") from None
+        try:
+            spec = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ValueError(f"{path} : YAML invalide ({e})") from None
+    else:
+        try:
+            spec = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path} : JSON invalide ({e})") from None
+    try:
+        return Scenario.from_dict(spec)
+    except ValueError as e:
+        raise ValueError(f"{path} : {e}") from None
+
+
+# ============================================================================
+# GÉNÉRATION VECTORISÉE
+# ============================================================================
+
+def generate_block(scenario: Scenario, times: pd.DatetimeIndex, block: int) -> pd.DataFrame:
+    """
+    Génère un bloc de pas de temps pour tous les quartiers (ordre chronologique).
+
+    Mêmes équations que src/data_generator.py, calculées sur des tableaux
+    (pas de temps, quartiers), puis effets des événements et tendances.
+
+    Args:
+        scenario: Scénario
+        times: Pas de temps du bloc
+        block: Indice du bloc (graine du générateur)
+
+    Returns:
+        DataFrame aux colonnes COLUMNS
+    """
+    rng = np.random.default_rng([scenario.graine, 0, block])
+    names = list(scenario.quartiers)
+    shape = (len(times), len(names))
+    params = {key: np.array([scenario.quartiers[q][key] for q in names]) for key in QUARTIER_PARAMS}
+    calendar = time_features(times)
+    heure, saison = calendar['heure'][:, None], calendar['saison'][:, None]
+    peak = calendar['is_peak_hour'][:, None].astype(bool)
+    annees = ((times - scenario.debut) / YEAR).to_numpy()[:, None]
+
+    # Effets des événements (pas de temps × quartiers)
+    temp_shift = np.zeros(shape)
+    humidity_shift = np.zeros(shape)
+    wind_shift = np.zeros(shape)
+    conso_factor = np.ones(shape)
+    extra_risk = np.zeros(shape)
+    event_code = np.full(shape, -1, dtype=np.int16)
+    moments = times.to_numpy()
+    for code, event in enumerate(scenario.evenements):
+        mask = event.active(moments)
+        if not mask.any():
+            continue
+        columns = np.ones(len(names), dtype=bool) if event.quartiers is None else np.isin(names, event.quartiers)
+        mask = mask[:, None] & columns[None, :]
+        if event.type == 'canicule':
+            temp_shift += mask * event.intensite
+        elif event.type == 'pic_demande':
+            conso_factor *= np.where(mask, 1.0 + event.intensite, 1.0)
+        elif event.type == 'orage':
+            wind_shift += mask * event.intensite
+            humidity_shift += mask * STORM_HUMIDITY
+            temp_shift -= mask * STORM_COOLING
+        extra_risk += mask * event.risque
+        event_code[mask] = code
+
+    bornes = scenario.bornes
+    temp = (SEASON_TEMPERATURE[saison] + 5 * np.sin((heure - 6) * np.pi / 12) + params['temperature_bias']
+            + scenario.tendance['rechauffement'] * annees + temp_shift + rng.normal(0, 2, shape))
+    temp = np.clip(temp, *bornes['temp_celsius'])
+    humidity = 100 - (temp - 20) * 1.5 + SEASON_HUMIDITY[saison] + humidity_shift + rng.normal(0, 8, shape)
+    humidity = np.clip(humidity, *bornes['humidite_percent']).astype(np.int64)
+    wind = SEASON_WIND[saison] + 5 * peak + wind_shift + rng.normal(0, 5, shape)
+    wind = np.clip(wind, *bornes['vitesse_vent'])
+    conso = (params['consommation_avg'] * np.where(peak, 1.3, HOUR_FACTOR[heure])
+             * (1 + np.maximum(temp - 32, 0) * 0.03)
+             * (1 + scenario.tendance['croissance_conso']) ** annees * conso_factor
+             + rng.normal(0, 50, shape))
+    conso = np.clip(conso, *bornes['conso_megawatt']).astype(np.int64)
+
+    proba = (params['risque_base'] + np.maximum(temp - 30, 0) * 0.02 + np.maximum(conso - 900, 0) * 0.0001
+             + 0.03 * peak + 0.02 * (saison == 1) + extra_risk)
+    coupure = (rng.random(shape) < np.clip(proba, 0, 1)).astype(np.int64)
+
+    n_q = len(names)
+    repeat = lambda values: np.repeat(values, n_q)
+    return pd.DataFrame({
+        'date_heure': repeat(moments),
+        'quartier': pd.Categorical.from_codes(np.tile(np.arange(n_q), len(times)), names),
+        'temp_celsius': temp.ravel().round(2),
+        'humidite_percent': humidity.ravel(),
+        'vitesse_vent': wind.ravel().round(2),
+        'conso_megawatt': conso.ravel(),
+        'heure': repeat(calendar['heure']),
+        'jour_semaine': repeat(calendar['jour_semaine']),
+        'mois': repeat(calendar['mois']),
+        'saison': repeat(calendar['saison']),
+        'is_peak_hour': repeat(calendar['is_peak_hour']),
+        'coupure': coupure.ravel(),
+        'evenement': pd.Categorical.from_codes(event_code.ravel(), [e.nom for e in scenario.evenements])
+    }, columns=COLUMNS)
+
+
+def iter_scenario_chunks(scenario: Scenario, block_steps: int = DEFAULT_BLOCK_STEPS) -> Iterator[pd.DataFrame]:
+    """
+    Génère le scénario bloc par bloc (mémoire bornée par block_steps × quartiers).
+
+    Args:
+        scenario: Scénario
+        block_steps: Pas de temps par bloc
+
+    Yields:
+        DataFrame aux colonnes COLUMNS, en ordre chronologique
+    """
+    if block_steps < 1:
+        raise ValueError(f"block_steps doit être >= 1 ({block_steps})")
+    for block, start in enumerate(range(0, len(scenario.timestamps), block_steps)):
+        yield generate_block(scenario, scenario.timestamps[start:start + block_steps], block)
+
+
+def generate_scenario(scenario: Scenario, block_steps: int = DEFAULT_BLOCK_STEPS) -> pd.DataFrame:
+    """Scénario complet en mémoire (voir write_scenario pour les gros volumes)."""
+    frame = pd.concat(iter_scenario_chunks(scenario, block_steps), ignore_index=True)
+    frame['quartier'] = frame['quartier'].astype(pd.CategoricalDtype(list(scenario.quartiers)))
+    return frame
+
+
+class _Tally:
+    """Lignes et coupures par événement (None = hors événement)."""
+
+    def __init__(self, scenario: Scenario):
+        self.names = [e.nom for e in scenario.evenements]
+        self.rows = np.zeros(len(self.names) + 1, dtype=np.int64)
+        self.coupures = np.zeros(len(self.names) + 1, dtype=np.int64)
+
+    def update(self, chunk: pd.DataFrame):
+        codes = chunk['evenement'].cat.codes.to_numpy().astype(np.int64) + 1
+        self.rows += np.bincount(codes, minlength=len(self.rows))
+        coupures = np.bincount(codes, weights=chunk['coupure'].to_numpy(), minlength=len(self.rows))
+        self.coupures += coupures.astype(np.int64)
+
+    def frame(self) -> pd.DataFrame:
+        taux = np.where(self.rows > 0, self.coupures / np.maximum(self.rows, 1), np.nan)
+        return pd.DataFrame({'evenement': ['(aucun)'] + self.names, 'lignes': self.rows,
+                             'coupures': self.coupures, 'taux_coupure': taux})
+
+
+def write_scenario(scenario: Scenario, destination, fmt: Optional[str] = None,
+                   block_steps: int = DEFAULT_BLOCK_STEPS,
+                   progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """
+    Écrit le scénario en CSV ou parquet, bloc par bloc.
+
+    Avec pyarrow, chaque bloc est converti en table Arrow et écrit par les
+    writers natifs (CSV ou parquet) ; sinon DataFrame.to_csv en ajout.
+
+    Args:
+        scenario: Scénario
+        destination: Fichier de sortie
+        fmt: 'csv' ou 'parquet' (défaut : d'après l'extension, sinon csv)
+        block_steps: Pas de temps par bloc
+        progress: Appelée avec (lignes écrites, lignes totales) après chaque bloc
+
+    Returns:
+        {'lignes', 'secondes', 'secondes_generation', 'lignes_par_seconde',
+         'lignes_par_seconde_generation', 'coupures', 'taux_coupure', 'par_evenement'}
+    """
+    destination = Path(destination)
+    fmt = fmt or ('parquet' if destination.suffix.lower() == '.parquet' else 'csv')
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Format inconnu : {fmt} (choix : {', '.join(OUTPUT_FORMATS)})")
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
+    except ImportError:
+        if fmt == 'parquet':
+            raise ValueError("pyarrow requis pour la sortie parquet (pip install pyarrow)") from None
+        pa = None
+    destination.parent.mkdir(parents=True, exist_ok=True)
+
+    tally = _Tally(scenario)
+    written, generation, writer = 0, 0.0, None
+    start = time.perf_counter()
+    try:
+        chunks = iter_scenario_chunks(scenario, block_steps)
+        while True:
+            tick = time.perf_counter()
+            chunk = next(chunks, None)
+            generation += time.perf_counter() - tick
+            if chunk is None:
+                break
+            tally.update(chunk)
+            if pa is None:
+                # Sans pyarrow : writer C de pandas, en ajout
+                chunk.to_csv(destination, mode='w' if written == 0 else 'a', header=written == 0, index=False)
+            else:
+                # Dates à la seconde : « 2024-01-01 00:00:00 » comme DataFrame.to_csv
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                table = table.set_column(0, 'date_heure', table.column(0).cast(pa.timestamp('s')))
+                if writer is None:
+                    writer = (pq.ParquetWriter(destination, table.schema) if fmt == 'parquet'
+                              else pa_csv.CSVWriter(str(destination), table.schema))
+                writer.write_table(table)
+            written += len(chunk)
+            if progress is not None:
+                progress(written, scenario.rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    seconds = time.perf_counter() - start
+
+    par_evenement = tally.frame()
+    coupures = int(tally.coupures.sum())
+    return {
+        'lignes': written,
+        'secondes': seconds,
+        'secondes_generation': generation,
+        'lignes_par_seconde': written / seconds if seconds > 0 else float('inf'),
+        'lignes_par_seconde_generation': written / generation if generation > 0 else float('inf'),
+        'coupures': coupures,
+        'taux_coupure': coupures / written if written else float('nan'),
+        'par_evenement': par_evenement
+    }
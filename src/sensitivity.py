@@ -0,0 +1,124 @@
+"""
+Fichier : src/sensitivity.py
+Analyse de sensibilité : balayage des entrées et dépendance partielle
+=====================================================================
+
+Au lieu de déplacer un curseur et de relancer une prédiction à chaque fois,
+on balaie une ou deux entrées sur toute leur plage (celle des curseurs de
+l'interface) et on score la grille complète en un seul lot (src/inference.py).
+
+La dépendance partielle de LightGBM est calculée sur un échantillon de
+l'historique : chaque valeur de la grille remplace la colonne balayée dans
+tout l'échantillon, et les n_grille x n_échantillon lignes sont prédites en
+un seul appel.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.config import MODEL_CONFIG
+from src.features import INPUT_FEATURES, build_features
+from src.inference import lgb_matrix, model_codes, predict_batch
+
+# Plages des curseurs de l'interface (min, max)
+SWEEP_RANGES = {
+    'temp_celsius': (15.0, 45.0),
+    'humidite_percent': (30.0, 100.0),
+    'vitesse_vent': (0.0, 50.0),
+    'conso_megawatt': (400.0, 1500.0)
+}
+
+FEATURE_LABELS = {
+    'temp_celsius': 'Température (°C)',
+    'humidite_percent': 'Humidité (%)',
+    'vitesse_vent': 'Vent (km/h)',
+    'conso_megawatt': 'Consommation (MW)'
+}
+
+
+def sweep_grid(feature: str, n_points: int) -> np.ndarray:
+    """Valeurs régulièrement espacées sur la plage du curseur de `feature`."""
+    low, high = SWEEP_RANGES[feature]
+    return np.linspace(low, high, n_points)
+
+
+def sweep(models: Dict, quartier: str, timestamp, base: Dict[str, float],
+          feature_x: str, feature_y: Optional[str] = None,
+          n_points: int = 50) -> pd.DataFrame:
+    """
+    Balaie une ou deux entrées et score toute la grille en un lot.
+
+    Args:
+        models: {'lgb', 'lstm', 'scaler'}
+        quartier: Quartier (ajustement du risque)
+        timestamp: Date de prédiction (features temporelles)
+        base: Valeurs des entrées non balayées, par nom de feature
+        feature_x: Entrée balayée
+        feature_y: Seconde entrée balayée (surface 2D), ou None
+        n_points: Nombre de points par axe
+
+    Returns:
+        Une ligne par point : colonnes balayées, 'lgb', 'lstm', 'risque' (%),
+        ou DataFrame vide si les modèles manquent
+    """
+    axes = {feature_x: sweep_grid(feature_x, n_points)}
+    if feature_y is not None and feature_y != feature_x:
+        axes[feature_y] = sweep_grid(feature_y, n_points)
+    mesh = np.meshgrid(*axes.values(), indexing='ij')
+    points = {name: values.ravel() for name, values in zip(axes, mesh)}
+
+    inputs = {name: points.get(name, base[name]) for name in INPUT_FEATURES}
+    X = build_features(np.repeat(np.datetime64(pd.Timestamp(timestamp)), len(points[feature_x])),
+                       inputs['temp_celsius'], inputs['humidite_percent'],
+                       inputs['vitesse_vent'], inputs['conso_megawatt'])
+    preds = predict_batch(models, X, np.repeat(quartier, len(X)))
+    if preds is None:
+        return pd.DataFrame()
+    return pd.DataFrame({**points, **preds})
+
+
+def partial_dependence(models: Dict, background: pd.DataFrame, feature: str,
+                       n_points: int = 30, max_rows: int = 500,
+                       random_state: int = 42) -> pd.DataFrame:
+    """
+    Dépendance partielle de LightGBM pour une entrée.
+
+    Args:
+        models: {'lgb', 'scaler'}
+        background: Lignes historiques (colonnes de MODEL_CONFIG['features'], et
+            'quartier' pour un modèle entraîné avec le quartier)
+        feature: Entrée étudiée
+        n_points: Taille de la grille
+        max_rows: Taille maximale de l'échantillon d'historique
+        random_state: Graine de l'échantillonnage
+
+    Returns:
+        Colonnes : feature, 'moyenne', 'p10', 'p90' (probabilité en %),
+        ou DataFrame vide si LightGBM ou le scaler manquent
+    """
+    if models['lgb'] is None or models['scaler'] is None:
+        return pd.DataFrame()
+    features = MODEL_CONFIG['features']
+    if len(background) > max_rows:
+        background = background.sample(max_rows, random_state=random_state)
+    X_bg = background[features].to_numpy(dtype=np.float64)
+    grid = sweep_grid(feature, n_points)
+
+    # (n_grille * n_échantillon) lignes, la colonne étudiée prenant chaque valeur de la grille
+    X = np.tile(X_bg, (len(grid), 1))
+    X[:, features.index(feature)] = np.repeat(grid, len(X_bg))
+    codes = model_codes(models, background['quartier']) if 'quartier' in background.columns else None
+    if codes is not None:
+        codes = np.tile(codes, len(grid))
+    X_lgb = lgb_matrix(models['lgb'], models['scaler'].transform(X), codes)
+    pred = np.asarray(models['lgb'].predict(X_lgb), dtype=np.float64) * 100
+    ice = pred.reshape(len(grid), len(X_bg))
+
+    return pd.DataFrame({
+        feature: grid,
+        'moyenne': ice.mean(axis=1),
+        'p10': np.percentile(ice, 10, axis=1),
+        'p90': np.percentile(ice, 90, axis=1)
+    })
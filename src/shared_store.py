@@ -0,0 +1,125 @@
+"""
+Fichier : src/shared_store.py
+Dataset historique en mémoire partagée (colonnes mappées en mémoire)
+====================================================================
+
+Le CSV est converti une fois en un dossier de colonnes .npy (une par
+colonne, quartier en codes entiers, dates en int64). Chaque processus
+Streamlit relit ces colonnes avec np.load(mmap_mode='r') : les pages sont
+partagées par le noyau entre toutes les sessions et tous les processus de
+la machine, sans désérialisation ni copie.
+
+Le cache est invalidé automatiquement quand le CSV change (taille, date
+de modification) ; sa création est atomique (dossier temporaire renommé),
+ce qui permet à plusieurs processus de démarrer en même temps.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.dataset import PreparedDataset
+
+CACHE_DIR = 'data/cache'
+MANIFEST_FILE = 'columns.json'
+# Incrémenté quand le contenu du cache change (2 : quartiers sur les codes du registre)
+CACHE_FORMAT = 2
+
+
+def _cache_path(csv_path: Path, cache_dir: Path) -> Path:
+    stat = csv_path.stat()
+    return cache_dir / f"{csv_path.stem}-{stat.st_size}-{stat.st_mtime_ns}-v{CACHE_FORMAT}"
+
+
+def export_dataset(dataset: PreparedDataset, directory) -> Path:
+    """
+    Écrit le frame préparé en colonnes .npy (écriture atomique).
+
+    Args:
+        dataset: Dataset préparé (trié, indexé)
+        directory: Dossier de destination
+
+    Returns:
+        Chemin du dossier
+    """
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix='.columns-', dir=directory.parent))
+
+    frame = dataset.frame
+    manifest = {'date_col': dataset.date_col, 'rows': len(frame), 'columns': []}
+    try:
+        np.save(tmp / '_index.npy', frame.index.asi8)
+        for i, col in enumerate(frame.columns):
+            series = frame[col]
+            entry = {'name': col, 'file': f"{i:03d}.npy"}
+            if isinstance(series.dtype, pd.CategoricalDtype) or series.dtype == object:
+                categorical = series.astype('category')
+                entry['categories'] = [str(c) for c in categorical.cat.categories]
+                values = categorical.cat.codes.to_numpy()
+            else:
+                values = series.to_numpy()
+            np.save(tmp / entry['file'], np.ascontiguousarray(values))
+            manifest['columns'].append(entry)
+        with open(tmp / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.rename(tmp, directory)
+    except OSError:
+        # Un autre processus a créé le cache entre-temps : on utilise le sien
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not (directory / MANIFEST_FILE).exists():
+            raise
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return directory
+
+
+def load_columns(directory) -> PreparedDataset:
+    """
+    Relit un dossier de colonnes en mémoire partagée (aucune copie des données).
+
+    Args:
+        directory: Dossier créé par export_dataset
+
+    Returns:
+        PreparedDataset adossé aux fichiers mappés en mémoire
+    """
+    directory = Path(directory)
+    with open(directory / MANIFEST_FILE, encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    index = pd.DatetimeIndex(np.load(directory / '_index.npy', mmap_mode='r').view('datetime64[ns]'),
+                             name='date')
+    columns = {}
+    for entry in manifest['columns']:
+        values = np.load(directory / entry['file'], mmap_mode='r')
+        if 'categories' in entry:
+            values = pd.Categorical.from_codes(values, entry['categories'], validate=False)
+        columns[entry['name']] = values
+
+    frame = pd.DataFrame(columns, index=index, copy=False)
+    return PreparedDataset.from_prepared(frame, manifest['date_col'])
+
+
+def load_shared_dataset(csv_path, cache_dir=CACHE_DIR) -> PreparedDataset:
+    """
+    Charge le dataset historique depuis le cache partagé, en le créant si besoin.
+
+    Args:
+        csv_path: CSV source (data/synthetic/synthetic_data_v2.csv)
+        cache_dir: Dossier des caches colonnes
+
+    Returns:
+        PreparedDataset mappé en mémoire
+    """
+    csv_path = Path(csv_path)
+    directory = _cache_path(csv_path, Path(cache_dir))
+    if not (directory / MANIFEST_FILE).exists():
+        export_dataset(PreparedDataset(pd.read_csv(csv_path)), directory)
+    return load_columns(directory)
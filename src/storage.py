@@ -0,0 +1,688 @@
+"""
+Fichier : src/storage.py
+Backends de stockage : Supabase (REST) ou base embarquée locale
+===============================================================
+
+src/database.py délègue toutes ses fonctions au backend actif, choisi par
+la variable DAKAR_STORAGE :
+
+    supabase                 API REST Supabase (défaut)
+    sqlite[:chemin]          SQLite embarqué (défaut: data/local/dakar.db)
+    duckdb[:chemin]          DuckDB embarqué, colonnaire (dépendance optionnelle)
+    local[:chemin]           DuckDB s'il est installé, sinon SQLite
+
+Avec un backend local, les agrégations (statistiques par quartier,
+comptages, historique) s'exécutent dans le processus, en SQL, sans
+aller-retour réseau : plus besoin de paginer toute la table en JSON pour
+calculer une moyenne. Les tables ont le même schéma que sur Supabase.
+
+SQLite est ligne à ligne ; un index couvrant (quartier, coupure,
+temp_celsius, conso_megawatt) permet toutefois aux statistiques de ne lire
+que l'index, sans toucher les lignes.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import requests
+
+from src import metrics
+from src.config import SUPABASE_CONFIG
+
+STORAGE_ENV = 'DAKAR_STORAGE'
+LOCAL_DB = 'data/local/dakar.db'
+BACKENDS = ('supabase', 'sqlite', 'duckdb', 'local')
+
+# Schéma commun (ordre des colonnes = ordre d'insertion), hors id / created_at
+TABLES: Dict[str, Dict[str, str]] = {
+    'enregistrements': {
+        'date_heure': 'TIMESTAMP NOT NULL',
+        'quartier': 'VARCHAR(50) NOT NULL',
+        'temp_celsius': 'DOUBLE NOT NULL',
+        'humidite_percent': 'INTEGER NOT NULL',
+        'vitesse_vent': 'DOUBLE NOT NULL',
+        'conso_megawatt': 'INTEGER NOT NULL',
+        'heure': 'INTEGER NOT NULL',
+        'jour_semaine': 'INTEGER NOT NULL',
+        'mois': 'INTEGER NOT NULL',
+        'saison': 'INTEGER NOT NULL',
+        'is_peak_hour': 'INTEGER NOT NULL',
+        'coupure': 'INTEGER NOT NULL'
+    },
+    'predictions': {
+        'date_heure': 'TIMESTAMP NOT NULL',
+        'quartier': 'VARCHAR(50) NOT NULL',
+        'temp_celsius': 'DOUBLE NOT NULL',
+        'humidite_percent': 'INTEGER NOT NULL',
+        'vitesse_vent': 'DOUBLE NOT NULL',
+        'conso_megawatt': 'INTEGER NOT NULL',
+        'proba_lgbm': 'DOUBLE NOT NULL',
+        'proba_lstm': 'DOUBLE NOT NULL',
+        'proba_moyenne': 'DOUBLE NOT NULL',
+        'prediction': 'INTEGER NOT NULL',
+        'modele_utilise': 'VARCHAR(50)',
+        'seuil_decision': 'DOUBLE'
+    }
+}
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_enregistrements_date ON enregistrements(date_heure DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_enregistrements_stats "
+    "ON enregistrements(quartier, coupure, temp_celsius, conso_megawatt)",
+    "CREATE INDEX IF NOT EXISTS idx_predictions_quartier ON predictions(quartier)",
+    "CREATE INDEX IF NOT EXISTS idx_predictions_date ON predictions(date_heure DESC)"
+]
+
+STATS_COLUMNS = ['quartier', 'total_enregistrements', 'total_coupures',
+                 'taux_coupure', 'temp_moyenne', 'conso_moyenne']
+
+
+def _check_table(table_name: str):
+    # Le nom de table est interpolé dans le SQL : uniquement les tables du schéma
+    if table_name not in TABLES:
+        raise ValueError(f"Table inconnue : {table_name}")
+
+
+def schema_columns(df: pd.DataFrame, table_name: str) -> pd.DataFrame:
+    """Colonnes du schéma de la table uniquement (scores, colonnes d'entrée en plus... écartés)."""
+    _check_table(table_name)
+    return df[[c for c in TABLES[table_name] if c in df.columns]]
+
+
+def finalize_statistics(stats: pd.DataFrame) -> pd.DataFrame:
+    """Colonnes et tri communs à tous les backends (risque_moyen décroissant)."""
+    stats = stats[STATS_COLUMNS].copy()
+    stats['risque_moyen'] = stats['taux_coupure']  # Déjà entre 0 et 1
+    return stats.sort_values('risque_moyen', ascending=False)
+
+
+# ============================================================================
+# INTERFACE
+# ============================================================================
+
+class StorageBackend:
+    """
+    Interface commune des backends (mêmes fonctions que src/database.py).
+
+    Les méthodes ne lèvent pas d'exception : False / 0 / DataFrame vide en
+    cas d'erreur, comme l'API historique.
+
+    Écouteurs (add_listener) : appelés avec le nom de la table et le nombre
+    de lignes insérées après chaque écriture réussie faite par ce processus,
+    l'équivalent local de LISTEN / NOTIFY (src/history_feed.py s'en sert
+    pour se réveiller, src/table_counts.py pour tenir ses comptages à jour).
+    """
+
+    name = 'base'
+
+    def __init__(self):
+        self._listeners: List[Callable[[str, int], None]] = []
+
+    def add_listener(self, callback: Callable[[str, int], None]):
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str, int], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, table_name: str, rows: int):
+        for callback in list(self._listeners):
+            try:
+                callback(table_name, rows)
+            except Exception:
+                metrics.inc('storage_listener_errors_total', backend=self.name)
+
+    def test_connection(self) -> bool:
+        raise NotImplementedError
+
+    def insert_data_bulk(self, df: pd.DataFrame, table_name: str = 'enregistrements') -> bool:
+        raise NotImplementedError
+
+    def append(self, df: pd.DataFrame, table_name: str):
+        """
+        Insertion en masse silencieuse (services en continu, src/streaming.py).
+
+        Raises:
+            Exception: Échec de l'insertion (contrairement à insert_data_bulk)
+        """
+        raise NotImplementedError
+
+    def save_prediction(self, record: Dict) -> bool:
+        raise NotImplementedError
+
+    def get_predictions_history(self, limit: int = 100) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def get_predictions_since(self, since_id: int = 0, limit: int = 1000) -> pd.DataFrame:
+        """Prédictions d'id > since_id, par id croissant (curseur incrémental)."""
+        raise NotImplementedError
+
+    def get_statistics_by_quartier(self, quartier_filter: Optional[str] = None) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def get_table_count(self, table_name: str, strict: bool = False) -> int:
+        """
+        Comptage exact (COUNT(*) : parcourt toute la table).
+
+        0 si la table est inaccessible ; avec strict=True, l'erreur est levée
+        (un cache distingue ainsi une panne d'une table vide).
+        """
+        raise NotImplementedError
+
+    def estimate_table_count(self, table_name: str, strict: bool = False) -> int:
+        """Comptage estimé, en temps constant (statistiques du moteur) ; exact à défaut."""
+        return self.get_table_count(table_name, strict)
+
+    def close(self):
+        pass
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.name}>"
+
+
+# ============================================================================
+# SUPABASE (REST)
+# ============================================================================
+
+# Format d'envoi des insertions en masse (PostgREST accepte text/csv)
+BULK_WIRE = 'csv'
+WIRES = ('csv', 'json')
+JSON_BATCH_ROWS = 100
+CSV_BATCH_ROWS = 10_000
+
+
+def json_batches(df: pd.DataFrame, batch_size: int = JSON_BATCH_ROWS) -> Iterator[List[Dict]]:
+    """Ancien format : un dict Python par ligne, dates converties une à une."""
+    data = df.to_dict('records')
+    for record in data:
+        if 'date_heure' in record and isinstance(record['date_heure'], pd.Timestamp):
+            record['date_heure'] = record['date_heure'].isoformat()
+    for i in range(0, len(data), batch_size):
+        yield data[i:i + batch_size]
+
+
+def csv_batches(df: pd.DataFrame, batch_size: int = CSV_BATCH_ROWS) -> Iterator[Tuple[int, bytes]]:
+    """
+    Lots CSV (en-tête compris) écrits directement depuis les colonnes.
+
+    Avec pyarrow, le DataFrame est converti une fois en table Arrow et
+    chaque lot est une tranche sans copie, écrite par le writer CSV natif ;
+    sinon DataFrame.to_csv (writer C de pandas). Aucun objet Python par ligne.
+
+    Yields:
+        (nombre de lignes, CSV encodé en UTF-8)
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        pa = None
+    if pa is not None:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        for start in range(0, len(df), batch_size):
+            batch = table.slice(start, batch_size)
+            sink = pa.BufferOutputStream()
+            pa_csv.write_csv(batch, sink)
+            yield batch.num_rows, sink.getvalue().to_pybytes()
+    else:
+        for start in range(0, len(df), batch_size):
+            batch = df.iloc[start:start + batch_size]
+            yield len(batch), batch.to_csv(index=False, date_format='%Y-%m-%dT%H:%M:%S').encode('utf-8')
+
+
+class RestBackend(StorageBackend):
+    """
+    API REST Supabase (PostgREST).
+
+    Args:
+        base_url: URL du projet (ou d'un src/rest_stub.LocalRestServer)
+        api_key: Clé anonyme
+    """
+
+    name = 'supabase'
+
+    def __init__(self, base_url: str = SUPABASE_CONFIG['url'], api_key: str = SUPABASE_CONFIG['key']):
+        super().__init__()
+        self.base_url = base_url
+        self.headers = {
+            'apikey': api_key,
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json',
+            'Prefer': 'return=representation'
+        }
+
+    def _request(self, method, operation, url, **kwargs):
+        """Appel HTTP vers Supabase, chronométré et compté par opération (src/metrics.py)."""
+        try:
+            with metrics.timer('supabase_request_seconds', operation=operation):
+                response = requests.request(method, url, **kwargs)
+        except Exception:
+            metrics.inc('supabase_requests_total', operation=operation, status='error')
+            raise
+        metrics.inc('supabase_requests_total', operation=operation, status=str(response.status_code))
+        return response
+
+    def test_connection(self) -> bool:
+        try:
+            response = self._request('GET', 'test_connection', f"{self.base_url}/rest/v1/",
+                                     headers=self.headers, timeout=10)
+            if response.status_code in [200, 404]:
+                print("✅ Connexion Supabase API réussie")
+                return True
+            print(f"❌ Erreur API : {response.status_code}")
+            return False
+        except Exception as e:
+            print(f"❌ Erreur de connexion : {e}")
+            return False
+
+    def append(self, df, table_name, wire: str = BULK_WIRE,
+               progress: Optional[Callable[[int, int, int], None]] = None):
+        """
+        Envoie un DataFrame par lots.
+
+        Args:
+            wire: 'csv' (lots de CSV_BATCH_ROWS lignes en text/csv, sans retour
+                des lignes insérées) ou 'json' (ancien chemin, lots de 100 objets)
+            progress: Appelé après chaque lot avec (numéro, nombre de lots, lignes)
+        """
+        if wire not in WIRES:
+            raise ValueError(f"Format inconnu : {wire} (choix : {', '.join(WIRES)})")
+        # PostgREST rejette tout le lot si une colonne n'existe pas dans la table
+        df = schema_columns(df, table_name)
+        url = f"{self.base_url}/rest/v1/{table_name}"
+        if wire == 'csv':
+            headers = {**self.headers, 'Content-Type': 'text/csv', 'Prefer': 'return=minimal'}
+            batches = ((rows, {'data': body}) for rows, body in csv_batches(df))
+            batch_size = CSV_BATCH_ROWS
+        else:
+            batches = ((len(batch), {'json': batch}) for batch in json_batches(df))
+            headers, batch_size = self.headers, JSON_BATCH_ROWS
+        total_batches = (len(df) + batch_size - 1) // batch_size
+
+        for number, (rows, payload) in enumerate(batches, start=1):
+            response = self._request('POST', f'insert_data_bulk_{wire}', url,
+                                     headers=headers, timeout=30, **payload)
+            if response.status_code not in [200, 201]:
+                raise RuntimeError(f"Erreur batch {number} (HTTP {response.status_code})")
+            if progress is not None:
+                progress(number, total_batches, rows)
+        self._notify(table_name, len(df))
+
+    def insert_data_bulk(self, df, table_name='enregistrements', wire: str = BULK_WIRE):
+        print(f"\n📊 Insertion de {len(df):,} lignes dans '{table_name}' ({wire})...")
+        try:
+            self.append(df, table_name, wire,
+                        progress=lambda number, total, rows: print(f"  Batch {number}/{total} : {rows} lignes"))
+            print(f"✅ {len(df):,} lignes insérées !")
+            return True
+        except Exception as e:
+            print(f"❌ Erreur : {e}")
+            return False
+
+    def save_prediction(self, record):
+        try:
+            response = self._request('POST', 'save_prediction', f"{self.base_url}/rest/v1/predictions",
+                                     headers=self.headers, json=record, timeout=10)
+        except Exception:
+            return False
+        if response.status_code not in [200, 201]:
+            return False
+        self._notify('predictions', 1)
+        return True
+
+    def get_predictions_history(self, limit=100):
+        try:
+            response = self._request('GET', 'get_predictions_history', f"{self.base_url}/rest/v1/predictions",
+                                     headers=self.headers, params={'order': 'date_heure.desc', 'limit': limit},
+                                     timeout=10)
+            if response.status_code == 200:
+                return pd.DataFrame(response.json())
+            return pd.DataFrame()
+        except Exception:
+            return pd.DataFrame()
+
+    def get_predictions_since(self, since_id=0, limit=1000):
+        try:
+            response = self._request('GET', 'get_predictions_since', f"{self.base_url}/rest/v1/predictions",
+                                      headers=self.headers,
+                                      params={'id': f'gt.{int(since_id)}', 'order': 'id.asc', 'limit': limit},
+                                      timeout=10)
+            if response.status_code == 200:
+                return pd.DataFrame(response.json())
+            return pd.DataFrame()
+        except Exception:
+            return pd.DataFrame()
+
+    def get_statistics_by_quartier(self, quartier_filter=None):
+        # PostgREST ne fait pas d'agrégation ici : toute la table est paginée puis agrégée en local
+        try:
+            all_data = []
+            offset = 0
+            limit = 1000
+            while True:
+                params = {
+                    'select': 'quartier,coupure,temp_celsius,conso_megawatt',
+                    'order': 'id',
+                    'limit': limit,
+                    'offset': offset
+                }
+                if quartier_filter:
+                    params['quartier'] = f'eq.{quartier_filter}'
+
+                response = self._request('GET', 'get_statistics_by_quartier',
+                                         f"{self.base_url}/rest/v1/enregistrements",
+                                         headers=self.headers, params=params, timeout=15)
+                if response.status_code != 200:
+                    break
+                data = response.json()
+                if not data:
+                    break
+                all_data.extend(data)
+                if len(data) < limit:
+                    break
+                offset += limit
+
+            if not all_data:
+                return pd.DataFrame()
+
+            df = pd.DataFrame(all_data)
+            stats = df.groupby('quartier').agg({
+                'coupure': ['count', 'sum', 'mean'],
+                'temp_celsius': 'mean',
+                'conso_megawatt': 'mean'
+            }).reset_index()
+            stats.columns = STATS_COLUMNS
+            return finalize_statistics(stats)
+        except Exception as e:
+            print(f"❌ Erreur get_statistics_by_quartier: {e}")
+            return pd.DataFrame()
+
+    def _count(self, table_name, method, strict):
+        try:
+            response = self._request('GET', f'get_table_count_{method}', f"{self.base_url}/rest/v1/{table_name}",
+                                     headers={**self.headers, 'Prefer': f'count={method}'},
+                                     params={'select': 'id', 'limit': 1}, timeout=10)
+            if response.status_code not in (200, 206):
+                raise RuntimeError(f"Comptage de {table_name} (HTTP {response.status_code})")
+            count = response.headers.get('Content-Range', '0').split('/')[-1]
+            return int(count) if count != '*' else 0
+        except Exception:
+            if strict:
+                raise
+            return 0
+
+    def get_table_count(self, table_name, strict=False):
+        return self._count(table_name, 'exact', strict)
+
+    def estimate_table_count(self, table_name, strict=False):
+        # count=estimated : exact sous le seuil max-rows de PostgREST, estimation du planificateur au-delà
+        return self._count(table_name, 'estimated', strict)
+
+
+# ============================================================================
+# BASES EMBARQUÉES (SQL)
+# ============================================================================
+
+class SQLBackend(StorageBackend):
+    """
+    Base embarquée dans le processus : schéma créé à l'ouverture, requêtes
+    SQL paramétrées, une connexion partagée protégée par un verrou (Streamlit
+    sert plusieurs sessions par threads).
+
+    Args:
+        path: Fichier de la base (':memory:' pour une base temporaire)
+    """
+
+    # Type SQL de la clé primaire auto-incrémentée (dépend du moteur)
+    id_column = 'id INTEGER PRIMARY KEY'
+    # Dates stockées en texte (moteur sans type TIMESTAMP natif)
+    text_dates = True
+
+    def __init__(self, path=LOCAL_DB):
+        super().__init__()
+        self.path = str(path)
+        if self.path != ':memory:':
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = self._connect()
+        self._create_schema()
+
+    def _connect(self):
+        raise NotImplementedError
+
+    def _create_schema(self):
+        with self._lock:
+            for table, columns in TABLES.items():
+                body = ',\n    '.join([self.id_column] + [f"{c} {t}" for c, t in columns.items()]
+                                      + ['created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP'])
+                self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (\n    {body}\n)")
+            for statement in INDEXES:
+                self._conn.execute(statement)
+            self._conn.commit()
+
+    def _query(self, operation: str, sql: str, params=()) -> pd.DataFrame:
+        with metrics.timer('storage_query_seconds', backend=self.name, operation=operation), self._lock:
+            cursor = self._conn.execute(sql, params)
+            columns = [d[0] for d in cursor.description]
+            return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+    def _insert_frame(self, frame: pd.DataFrame, table_name: str):
+        raise NotImplementedError
+
+    def _prepare(self, df: pd.DataFrame, table_name: str) -> pd.DataFrame:
+        """Colonnes du schéma uniquement, dates normalisées."""
+        frame = schema_columns(df, table_name).copy()
+        if 'date_heure' in frame.columns:
+            frame['date_heure'] = pd.to_datetime(frame['date_heure'])
+            if self.text_dates:
+                # Texte ISO à largeur fixe : tri lexicographique = tri chronologique
+                frame['date_heure'] = frame['date_heure'].dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+        return frame
+
+    def _insert(self, df: pd.DataFrame, table_name: str, operation: str):
+        """Insertion dans une transaction (annulée en cas d'erreur)."""
+        _check_table(table_name)
+        frame = self._prepare(df, table_name)
+        with metrics.timer('storage_query_seconds', backend=self.name, operation=operation), self._lock:
+            try:
+                self._insert_frame(frame, table_name)
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        self._notify(table_name, len(frame))
+
+    def test_connection(self):
+        try:
+            with self._lock:
+                self._conn.execute("SELECT 1").fetchall()
+            print(f"✅ Base locale {self.name} : {self.path}")
+            return True
+        except Exception as e:
+            print(f"❌ Erreur base locale : {e}")
+            return False
+
+    def append(self, df, table_name):
+        self._insert(df, table_name, 'append')
+
+    def insert_data_bulk(self, df, table_name='enregistrements'):
+        print(f"\n📊 Insertion de {len(df):,} lignes dans '{table_name}' ({self.name})...")
+        try:
+            self._insert(df, table_name, 'insert_data_bulk')
+            print(f"✅ {len(df):,} lignes insérées !")
+            return True
+        except Exception as e:
+            print(f"❌ Erreur : {e}")
+            return False
+
+    def save_prediction(self, record):
+        # Une ligne : requête paramétrée directe, sans passer par un DataFrame
+        columns = [c for c in TABLES['predictions'] if c in record]
+        values = [record[c] for c in columns]
+        if 'date_heure' in record:
+            timestamp = pd.Timestamp(record['date_heure'])
+            values[columns.index('date_heure')] = (timestamp.strftime('%Y-%m-%d %H:%M:%S.%f')
+                                                   if self.text_dates else timestamp.to_pydatetime())
+        sql = f"INSERT INTO predictions ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        with metrics.timer('storage_query_seconds', backend=self.name, operation='save_prediction'), self._lock:
+            try:
+                self._conn.execute(sql, values)
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                return False
+        self._notify('predictions', 1)
+        return True
+
+    def get_predictions_history(self, limit=100):
+        try:
+            return self._query('get_predictions_history',
+                               "SELECT * FROM predictions ORDER BY date_heure DESC, id DESC LIMIT ?", (int(limit),))
+        except Exception:
+            return pd.DataFrame()
+
+    def get_predictions_since(self, since_id=0, limit=1000):
+        try:
+            return self._query('get_predictions_since',
+                               "SELECT * FROM predictions WHERE id > ? ORDER BY id LIMIT ?",
+                               (int(since_id), int(limit)))
+        except Exception:
+            return pd.DataFrame()
+
+    def get_statistics_by_quartier(self, quartier_filter=None):
+        where, params = ("WHERE quartier = ?", (quartier_filter,)) if quartier_filter else ("", ())
+        try:
+            stats = self._query('get_statistics_by_quartier', f"""
+                SELECT quartier,
+                       COUNT(coupure) AS total_enregistrements,
+                       SUM(coupure) AS total_coupures,
+                       AVG(coupure) AS taux_coupure,
+                       AVG(temp_celsius) AS temp_moyenne,
+                       AVG(conso_megawatt) AS conso_moyenne
+                FROM enregistrements {where}
+                GROUP BY quartier""", params)
+        except Exception as e:
+            print(f"❌ Erreur get_statistics_by_quartier: {e}")
+            return pd.DataFrame()
+        return finalize_statistics(stats) if len(stats) else pd.DataFrame()
+
+    def get_table_count(self, table_name, strict=False):
+        try:
+            _check_table(table_name)
+            return int(self._query('get_table_count', f"SELECT COUNT(*) AS n FROM {table_name}")['n'].iloc[0])
+        except Exception:
+            if strict:
+                raise
+            return 0
+
+    def estimate_table_count(self, table_name, strict=False):
+        # Plus grand id : une descente dans la clé primaire (exact tant qu'aucune ligne n'est supprimée)
+        try:
+            _check_table(table_name)
+            value = self._query('estimate_table_count', f"SELECT MAX(id) AS n FROM {table_name}")['n'].iloc[0]
+            return 0 if pd.isna(value) else int(value)
+        except Exception:
+            if strict:
+                raise
+            return 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SQLiteBackend(SQLBackend):
+    """SQLite (bibliothèque standard), fichier unique, journal WAL."""
+
+    name = 'sqlite'
+
+    def _connect(self):
+        import sqlite3
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        if self.path != ':memory:':
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _insert_frame(self, frame, table_name):
+        # Series.tolist() : scalaires Python (sqlite3 ne lie pas les types NumPy)
+        rows = list(zip(*(frame[c].tolist() for c in frame.columns)))
+        placeholders = ', '.join('?' * len(frame.columns))
+        self._conn.executemany(
+            f"INSERT INTO {table_name} ({', '.join(frame.columns)}) VALUES ({placeholders})", rows)
+
+
+class DuckDBBackend(SQLBackend):
+    """DuckDB (pip install duckdb) : stockage colonnaire, agrégations vectorisées."""
+
+    name = 'duckdb'
+    id_column = "id BIGINT DEFAULT nextval('storage_ids') PRIMARY KEY"
+    text_dates = False
+
+    def _connect(self):
+        import duckdb
+        conn = duckdb.connect(self.path)
+        conn.execute("CREATE SEQUENCE IF NOT EXISTS storage_ids")
+        return conn
+
+    def _query(self, operation, sql, params=()):
+        with metrics.timer('storage_query_seconds', backend=self.name, operation=operation), self._lock:
+            return self._conn.execute(sql, list(params)).fetchdf()
+
+    def estimate_table_count(self, table_name, strict=False):
+        # La séquence des id est partagée entre tables : taille estimée tenue par DuckDB
+        try:
+            _check_table(table_name)
+            return int(self._query('estimate_table_count',
+                                   "SELECT estimated_size AS n FROM duckdb_tables() WHERE table_name = ?",
+                                   (table_name,))['n'].iloc[0])
+        except Exception:
+            if strict:
+                raise
+            return 0
+
+    def _insert_frame(self, frame, table_name):
+        # Lecture directe du DataFrame par DuckDB (pas de conversion ligne à ligne)
+        self._conn.register('incoming', frame)
+        try:
+            columns = ', '.join(frame.columns)
+            self._conn.execute(f"INSERT INTO {table_name} ({columns}) SELECT {columns} FROM incoming")
+        finally:
+            self._conn.unregister('incoming')
+
+
+# ============================================================================
+# SÉLECTION DU BACKEND
+# ============================================================================
+
+def duckdb_available() -> bool:
+    try:
+        import duckdb  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def create_backend(spec: Optional[str] = None) -> StorageBackend:
+    """
+    Backend décrit par `spec` (ou DAKAR_STORAGE), ex: 'sqlite:data/local/dakar.db'.
+
+    Raises:
+        ValueError: Backend inconnu
+        ImportError: 'duckdb' demandé sans le paquet duckdb
+    """
+    spec = spec or os.environ.get(STORAGE_ENV) or 'supabase'
+    kind, _, path = spec.partition(':')
+    kind = kind.strip().lower()
+    if kind == 'local':
+        kind = 'duckdb' if duckdb_available() else 'sqlite'
+    if kind == 'supabase':
+        return RestBackend(path) if path else RestBackend()
+    if kind == 'sqlite':
+        return SQLiteBackend(path or LOCAL_DB)
+    if kind == 'duckdb':
+        return DuckDBBackend(path or str(Path(LOCAL_DB).with_suffix('.duckdb')))
+    raise ValueError(f"Backend de stockage inconnu : {kind} (choix : {', '.join(BACKENDS)})")
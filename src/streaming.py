@@ -0,0 +1,421 @@
+"""
+Fichier : src/streaming.py
+Ingestion en continu des relevés (compteurs et météo)
+=====================================================
+
+Les relevés arrivent d'une source (file en mémoire, socket TCP, ou rejeu
+d'un fichier pour les tests) et sont traités par micro-lots : un lot part
+dès qu'il atteint `batch_size` relevés ou que le premier relevé attend
+depuis `max_latency` secondes.
+
+Pour chaque micro-lot, en un appel vectorisé :
+- scoring avec les modèles existants (src/bulk_scoring.score_frame)
+- mise à jour de l'état glissant par quartier (derniers relevés, risque
+  moyen et maximum sur les `window` derniers relevés)
+- ajout des prédictions (et des relevés dont la coupure est connue) au
+  stockage par le chemin d'insertion en masse (StorageBackend.append)
+- évaluation des règles d'alerte, si un moteur est fourni (src/alerting.py)
+- mise à jour des résumés de dérive et de qualité, si un moniteur est
+  fourni (src/drift.py ; lignes invalides comprises)
+
+Format d'un relevé (dict, ligne JSON du socket ou ligne CSV rejouée) :
+quartier, timestamp (ou date / date_heure ; heure de réception si absent),
+temp_celsius, humidite_percent, vitesse_vent, conso_megawatt, et
+facultativement coupure (0 / 1, issue observée).
+
+Usage :
+    source = QueueSource()
+    ingestor = StreamIngestor(models).start(source)
+    source.put({'quartier': 'Yoff', 'temp_celsius': 34.0, ...})
+    ingestor.snapshot()
+"""
+
+import json
+import queue
+import socketserver
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src import metrics
+from src.alerting import AlertEngine
+from src.bulk_scoring import REQUIRED_COLUMNS, score_frame
+from src.drift import DriftMonitor
+from src.features import add_time_features
+from src.model_registry import ModelRegistry, version_of
+from src.storage import StorageBackend, schema_columns
+from src.timeseries import detect_date_column
+
+DEFAULT_BATCH = 1000
+DEFAULT_MAX_LATENCY = 0.5
+DEFAULT_WINDOW = 24
+DEFAULT_REPLAY_CHUNK = 10_000
+DEFAULT_PORT = 8765
+
+# Fin de flux dans une QueueSource
+_END = object()
+
+
+# ============================================================================
+# SOURCES
+# ============================================================================
+
+class QueueSource:
+    """
+    File de relevés en mémoire, alimentée par d'autres threads.
+
+    Args:
+        maxsize: Taille maximale de la file (0 = illimitée) ; put bloque au-delà
+    """
+
+    def __init__(self, maxsize: int = 0):
+        self.queue = queue.Queue(maxsize)
+        self.closed = False
+
+    def put(self, reading: Union[Dict, List[Dict]]):
+        """Ajoute un relevé (dict) ou une liste de relevés."""
+        self.queue.put(reading)
+
+    def close(self):
+        """Signale la fin du flux (les relevés déjà en file sont traités)."""
+        self.queue.put(_END)
+
+    def read(self, max_rows: int, timeout: float) -> Optional[pd.DataFrame]:
+        """
+        Micro-lot suivant.
+
+        Attend au plus `timeout` secondes après le premier relevé reçu.
+
+        Returns:
+            DataFrame (vide si rien n'est arrivé), None à la fin du flux
+        """
+        if self.closed:
+            return None
+        records = []
+        try:
+            item = self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return pd.DataFrame()
+        deadline = time.monotonic() + timeout
+        while True:
+            if item is _END:
+                self.closed = True
+                break
+            if isinstance(item, dict):
+                records.append(item)
+            else:
+                records.extend(item)
+            if len(records) >= max_rows:
+                break
+            remaining = deadline - time.monotonic()
+            try:
+                item = self.queue.get_nowait() if remaining <= 0 else self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+        if self.closed and not records:
+            return None
+        return pd.DataFrame.from_records(records)
+
+
+class _ReadingHandler(socketserver.StreamRequestHandler):
+    """Une connexion : un relevé JSON par ligne."""
+
+    def handle(self):
+        source = self.server.source
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                reading = json.loads(line)
+            except ValueError:
+                source.rejected += 1
+                continue
+            if isinstance(reading, (dict, list)):
+                source.put(reading)
+            else:
+                source.rejected += 1
+
+
+class SocketSource(QueueSource):
+    """
+    Relevés reçus sur un socket TCP (une ligne JSON par relevé, plusieurs
+    connexions simultanées), mis en file pour le micro-lot.
+
+    Args:
+        host, port: Adresse d'écoute (port 0 = port libre, voir self.port)
+        maxsize: Voir QueueSource (contre-pression sur les émetteurs)
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = DEFAULT_PORT, maxsize: int = 100_000):
+        super().__init__(maxsize)
+        self.rejected = 0
+        self._server = socketserver.ThreadingTCPServer((host, port), _ReadingHandler)
+        self._server.daemon_threads = True
+        self._server.source = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='stream-socket', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+        super().close()
+
+
+class FileReplaySource:
+    """
+    Rejeu d'un CSV de relevés (tests, démonstration, rattrapage).
+
+    Args:
+        path: CSV (mêmes colonnes qu'un relevé)
+        speed: None = aussi vite que possible ; sinon facteur d'accélération
+            du temps des relevés (3600 = une heure de données par seconde)
+        chunksize: Lignes lues à la fois dans le fichier
+    """
+
+    def __init__(self, path, speed: Optional[float] = None, chunksize: int = DEFAULT_REPLAY_CHUNK):
+        self.path = path
+        self.speed = speed
+        self._reader = pd.read_csv(path, chunksize=chunksize)
+        self._buffer = pd.DataFrame()
+        self._offset = 0
+        self._clock = None  # (premier instant des données, instant réel correspondant)
+
+    def _pace(self, batch: pd.DataFrame):
+        # Attend que le premier relevé du lot soit « arrivé » à la vitesse demandée
+        date_col = detect_date_column(batch)
+        if self.speed is None or date_col is None:
+            return
+        first = pd.to_datetime(batch[date_col].iloc[0], errors='coerce')
+        if pd.isna(first):
+            return
+        if self._clock is None:
+            self._clock = (first, time.monotonic())
+        due = self._clock[1] + (first - self._clock[0]).total_seconds() / self.speed
+        delay = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def read(self, max_rows: int, timeout: float) -> Optional[pd.DataFrame]:
+        if self._buffer is None:
+            return None
+        if self._offset >= len(self._buffer):
+            self._buffer = next(self._reader, None)
+            self._offset = 0
+            if self._buffer is None:
+                return None
+        batch = self._buffer.iloc[self._offset:self._offset + max_rows]
+        self._offset += len(batch)
+        self._pace(batch)
+        return batch
+
+
+# ============================================================================
+# TRAITEMENT
+# ============================================================================
+
+class StreamIngestor:
+    """
+    Score et stocke les relevés par micro-lots.
+
+    Args:
+        models: Jeu de modèles ({'lgb', 'lstm', 'scaler', ...}) ou
+            ModelRegistry (le jeu actif est relu à chaque lot)
+        backend: Backend de stockage (défaut : src.database.get_backend() ;
+            False = ne rien stocker)
+        batch_size: Relevés par micro-lot au maximum
+        max_latency: Attente maximale d'un relevé avant traitement (secondes)
+        window: Relevés gardés par quartier pour l'état glissant
+        seuil: Seuil de décision (%) de la colonne prediction
+        alerts: Moteur d'alertes (src/alerting.py) évalué sur chaque lot scoré
+        drift: Moniteur de dérive (src/drift.py) mis à jour avec chaque lot
+    """
+
+    def __init__(self, models, backend: Optional[StorageBackend] = None, batch_size: int = DEFAULT_BATCH,
+                 max_latency: float = DEFAULT_MAX_LATENCY, window: int = DEFAULT_WINDOW, seuil: float = 50.0,
+                 alerts: Optional[AlertEngine] = None, drift: Optional[DriftMonitor] = None):
+        if backend is None:
+            from src.database import get_backend
+            backend = get_backend()
+        self.models = models
+        self.backend = backend or None
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.window = window
+        self.seuil = seuil
+        self.alerts = alerts
+        self.drift = drift
+        self.stats = {'readings': 0, 'invalid': 0, 'batches': 0, 'stored_readings': 0,
+                      'stored_predictions': 0, 'storage_errors': 0, 'alerts': 0, 'seconds': 0.0}
+        self.last_error: Optional[str] = None
+        # {quartier: {'lectures', 'derniere_lecture', entrées..., 'risque', 'risques' (deque)}}
+        self._state: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _models(self) -> Dict:
+        return self.models.get() if isinstance(self.models, ModelRegistry) else self.models
+
+    def _normalize(self, readings: pd.DataFrame) -> pd.DataFrame:
+        date_col = detect_date_column(readings)
+        if date_col is None:
+            readings = readings.assign(date_heure=pd.Timestamp.now())
+        elif date_col != 'date_heure':
+            readings = readings.rename(columns={date_col: 'date_heure'})
+        # Dates analysées une fois par lot (score_frame et le stockage les reprennent telles quelles)
+        readings = readings.assign(date_heure=pd.to_datetime(readings['date_heure'], errors='coerce'))
+        missing = [c for c in REQUIRED_COLUMNS if c not in readings.columns]
+        if missing:
+            # Colonne absente de tout le lot : lignes invalides, pas d'erreur
+            readings = readings.assign(**{c: np.nan for c in missing})
+        return readings
+
+    def _update_state(self, scored: pd.DataFrame):
+        with self._lock:
+            for quartier, group in scored.groupby('quartier', sort=False):
+                state = self._state.get(quartier)
+                if state is None:
+                    state = self._state[quartier] = {'lectures': 0, 'risques': deque(maxlen=self.window)}
+                last = group.iloc[-1]
+                state['lectures'] += len(group)
+                state['derniere_lecture'] = last['date_heure']
+                for col in ('temp_celsius', 'humidite_percent', 'vitesse_vent', 'conso_megawatt', 'risque'):
+                    state[col] = last[col]
+                state['risques'].extend(group['risque'].to_numpy().tolist())
+
+    def _store(self, scored: pd.DataFrame, models: Dict):
+        predictions = pd.DataFrame({
+            'date_heure': scored['date_heure'],
+            'quartier': scored['quartier'],
+            'temp_celsius': scored['temp_celsius'],
+            'humidite_percent': scored['humidite_percent'],
+            'vitesse_vent': scored['vitesse_vent'],
+            'conso_megawatt': scored['conso_megawatt'],
+            'proba_lgbm': scored['lgb'],
+            # Colonne obligatoire : valeur LightGBM si l'ensemble n'exécute pas le LSTM
+            'proba_lstm': scored['lstm'].fillna(scored['lgb']),
+            'proba_moyenne': scored['risque'],
+            'prediction': (scored['risque'] >= self.seuil).astype(int),
+            'modele_utilise': version_of(models),
+            'seuil_decision': self.seuil
+        })
+        self.backend.append(predictions, 'predictions')
+        self.stats['stored_predictions'] += len(predictions)
+
+        if 'coupure' in scored.columns:
+            observed = scored[scored['coupure'].notna()]
+            if len(observed):
+                readings = add_time_features(observed, 'date_heure')
+                readings['coupure'] = readings['coupure'].astype(int)
+                # Sans les scores ni les colonnes d'entrée hors schéma (evenement...)
+                readings = schema_columns(readings, 'enregistrements')
+                self.backend.append(readings, 'enregistrements')
+                self.stats['stored_readings'] += len(readings)
+
+    def process(self, readings: pd.DataFrame) -> pd.DataFrame:
+        """
+        Traite un micro-lot : scoring, état par quartier, stockage.
+
+        Args:
+            readings: Relevés bruts (voir le format en tête de module)
+
+        Returns:
+            Relevés valides scorés (colonnes lgb, lstm, risque, niveau)
+        """
+        if readings.empty:
+            return readings
+        start = time.perf_counter()
+        models = self._models()
+        readings = self._normalize(readings)
+        scored = score_frame(models, readings.reset_index(drop=True), 'date_heure')
+        if self.drift is not None:
+            self.drift.update(scored)
+        valid = scored['risque'].notna()
+        if not valid.all():
+            scored = scored[valid]
+            self.stats['invalid'] += int((~valid).sum())
+            metrics.inc('stream_invalid_readings_total', int((~valid).sum()))
+        if len(scored):
+            self._update_state(scored)
+            if self.alerts is not None:
+                self.stats['alerts'] += len(self.alerts.evaluate(scored))
+            if self.backend is not None:
+                try:
+                    self._store(scored, models)
+                except Exception as e:
+                    # Le flux continue : le lot est scoré, seul son stockage est perdu
+                    self.stats['storage_errors'] += 1
+                    self.last_error = str(e)
+                    metrics.inc('stream_storage_errors_total')
+
+        seconds = time.perf_counter() - start
+        self.stats['readings'] += len(readings)
+        self.stats['batches'] += 1
+        self.stats['seconds'] += seconds
+        metrics.inc('stream_readings_total', len(readings))
+        metrics.observe('stream_batch_seconds', seconds)
+        return scored
+
+    def run(self, source, limit: Optional[int] = None) -> Dict:
+        """
+        Consomme la source jusqu'à sa fin (ou stop(), ou `limit` relevés).
+
+        Returns:
+            Compteurs (self.stats) avec 'wall_seconds' et 'readings_per_second'
+        """
+        start = time.perf_counter()
+        while not self._stop.is_set():
+            if limit is not None and self.stats['readings'] >= limit:
+                break
+            max_rows = self.batch_size if limit is None else min(self.batch_size, limit - self.stats['readings'])
+            batch = source.read(max_rows, self.max_latency)
+            if batch is None:
+                break
+            try:
+                self.process(batch)
+            except Exception as e:
+                self.last_error = str(e)
+                metrics.inc('stream_batch_errors_total')
+        wall = time.perf_counter() - start
+        return {**self.stats, 'wall_seconds': wall,
+                'readings_per_second': self.stats['readings'] / wall if wall else 0.0}
+
+    def start(self, source) -> 'StreamIngestor':
+        """Consomme la source en tâche de fond (thread démon)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, args=(source,), name='stream-ingestor', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.max_latency + 5)
+            self._thread = None
+
+    def snapshot(self) -> pd.DataFrame:
+        """
+        État glissant par quartier.
+
+        Returns:
+            DataFrame : quartier, lectures, derniere_lecture, derniers relevés,
+            risque (dernier), risque_moyen et risque_max sur la fenêtre
+        """
+        with self._lock:
+            rows = []
+            for quartier, state in self._state.items():
+                risques = np.fromiter(state['risques'], dtype=np.float64)
+                row = {k: v for k, v in state.items() if k != 'risques'}
+                row['quartier'] = quartier
+                row['risque_moyen'] = round(float(risques.mean()), 2) if len(risques) else np.nan
+                row['risque_max'] = float(risques.max()) if len(risques) else np.nan
+                rows.append(row)
+        columns = ['quartier', 'lectures', 'derniere_lecture', 'temp_celsius', 'humidite_percent',
+                   'vitesse_vent', 'conso_megawatt', 'risque', 'risque_moyen', 'risque_max']
+        return pd.DataFrame(rows, columns=columns)
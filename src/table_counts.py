@@ -0,0 +1,132 @@
+"""
+Fichier : src/table_counts.py
+Comptages de tables sans COUNT(*) à chaque appel
+================================================
+
+get_table_count envoyait `Prefer: count=exact` : PostgreSQL parcourt toute
+la table à chaque appel, et print_database_summary le fait pour deux
+tables. Le coût croît avec `enregistrements`.
+
+TableCounts répond en O(1) la plupart du temps :
+- Cache par table avec TTL : une valeur récente est rendue telle quelle
+- Mise à jour incrémentale : chaque insertion faite par ce processus
+  ajoute ses lignes à la valeur en cache (écouteur du backend), sans
+  requête
+- Estimation pour les grandes tables : le rafraîchissement demande
+  d'abord une estimation au moteur (planificateur PostgreSQL, plus grand id
+  SQLite, taille estimée DuckDB) ; le COUNT(*) exact n'est fait que sous
+  `estimate_above` lignes
+
+Les écritures d'autres processus ne sont vues qu'à l'expiration du TTL.
+mode='exact' force un vrai comptage (qui réinitialise le cache).
+
+Un backend en échec n'est pas mis en cache pour tout le TTL : la dernière
+valeur lue reste servie (0 s'il n'y en a jamais eu) et le backend est
+réinterrogé après `failure_ttl` secondes seulement.
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from src import metrics
+from src.storage import StorageBackend
+
+DEFAULT_TTL = 60.0
+DEFAULT_FAILURE_TTL = 5.0
+DEFAULT_ESTIMATE_ABOVE = 100_000
+MODES = ('auto', 'exact', 'estimated')
+
+
+class TableCounts:
+    """
+    Comptages en cache d'un backend.
+
+    Args:
+        backend: Backend de stockage (src/storage.py)
+        ttl: Durée de validité d'une valeur en cache (secondes)
+        estimate_above: Taille au-delà de laquelle un rafraîchissement est estimé
+        failure_ttl: Délai avant de réinterroger un backend en échec (secondes)
+    """
+
+    def __init__(self, backend: StorageBackend, ttl: float = DEFAULT_TTL,
+                 estimate_above: int = DEFAULT_ESTIMATE_ABOVE, failure_ttl: float = DEFAULT_FAILURE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.estimate_above = estimate_above
+        self.failure_ttl = failure_ttl
+        # {table: (valeur, 'exact' | 'estimated' | None (jamais lue), expiration)}
+        self._cache: Dict[str, Tuple[int, Optional[str], float]] = {}
+        self._lock = threading.Lock()
+        backend.add_listener(self._on_write)
+
+    def _on_write(self, table_name: str, rows: int):
+        with self._lock:
+            cached = self._cache.get(table_name)
+            if cached is not None and cached[1] is not None:
+                value, kind, expires = cached
+                self._cache[table_name] = (value + rows, kind, expires)
+
+    def _refresh(self, table_name: str, kind: str) -> Tuple[int, bool]:
+        """(valeur, succès) : en échec, dernière valeur lue et nouvel essai après failure_ttl."""
+        try:
+            if kind == 'exact':
+                value = self.backend.get_table_count(table_name, strict=True)
+            else:
+                value = self.backend.estimate_table_count(table_name, strict=True)
+        except Exception:
+            metrics.inc('table_count_errors_total', table=table_name, kind=kind)
+            with self._lock:
+                last, last_kind, _ = self._cache.get(table_name, (0, None, 0.0))
+                self._cache[table_name] = (last, last_kind, time.monotonic() + self.failure_ttl)
+            return last, False
+        metrics.inc('table_count_refresh_total', table=table_name, kind=kind)
+        with self._lock:
+            self._cache[table_name] = (value, kind, time.monotonic() + self.ttl)
+        return value, True
+
+    def count(self, table_name: str, mode: str = 'auto') -> int:
+        """
+        Nombre de lignes d'une table.
+
+        Args:
+            table_name: Table ('enregistrements', 'predictions')
+            mode: 'auto' (cache, sinon estimation, exacte sous estimate_above),
+                'exact' (COUNT(*)) ou 'estimated' (statistiques du moteur)
+
+        Returns:
+            Nombre de lignes (dernière valeur lue si le backend est en échec,
+            0 s'il n'a jamais répondu)
+        """
+        if mode not in MODES:
+            raise ValueError(f"Mode de comptage inconnu : {mode} (choix : {', '.join(MODES)})")
+        if mode != 'auto':
+            return self._refresh(table_name, mode)[0]
+
+        with self._lock:
+            cached = self._cache.get(table_name)
+        if cached is not None and time.monotonic() < cached[2]:
+            metrics.inc('table_count_cache_hits_total', table=table_name)
+            return cached[0]
+        # Estimation d'abord (temps constant) ; comptage exact seulement pour une petite table
+        estimate, ok = self._refresh(table_name, 'estimated')
+        if not ok or estimate > self.estimate_above:
+            return estimate
+        return self._refresh(table_name, 'exact')[0]
+
+    def kind(self, table_name: str) -> Optional[str]:
+        """'exact' ou 'estimated' pour la valeur en cache (None si absente ou jamais lue)."""
+        with self._lock:
+            cached = self._cache.get(table_name)
+        return cached[1] if cached else None
+
+    def invalidate(self, table_name: Optional[str] = None):
+        """Oublie une valeur (ou toutes) : le prochain appel interroge le backend."""
+        with self._lock:
+            if table_name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(table_name, None)
+
+    def close(self):
+        self.backend.remove_listener(self._on_write)
@@ -0,0 +1,167 @@
+"""
+Fichier : src/timeseries.py
+Agrégations temporelles et sous-échantillonnage des séries historiques
+======================================================================
+
+Les graphiques de l'onglet Historique ne tracent jamais les données brutes :
+- Les agrégats horaires, journaliers et hebdomadaires par quartier sont
+  calculés une seule fois au chargement (build_rollups)
+- La série choisie est ensuite réduite au budget de points de l'écran par
+  LTTB (Largest-Triangle-Three-Buckets), qui conserve pics et creux
+  contrairement à un échantillonnage aléatoire.
+
+Le résultat est déterministe : deux rendus successifs sont identiques.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Colonnes de date reconnues, par ordre de priorité
+DATE_COLUMNS = ['timestamp', 'date', 'datetime', 'time', 'date_heure']
+
+# Clé des agrégats tous quartiers confondus
+ALL_QUARTIERS = 'Tous'
+
+GRANULARITIES = {
+    'H': 'Horaire',
+    'D': 'Journalier',
+    'W': 'Hebdomadaire'
+}
+
+# Nombre de points tracés au maximum par série (~ largeur d'un graphique en pixels)
+DEFAULT_POINT_BUDGET = 1500
+
+# Colonnes moyennées par période (si présentes)
+MEAN_COLUMNS = ['conso_megawatt', 'temp_celsius']
+
+
+def detect_date_column(df: pd.DataFrame) -> Optional[str]:
+    """Retourne le nom de la colonne de date du DataFrame (None si absente)."""
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            return col
+    return None
+
+
+def _period_start(dates: pd.Series, freq: str) -> pd.Series:
+    """Début de la période (heure, jour ou semaine commençant le lundi)."""
+    if freq == 'W':
+        return (dates - pd.to_timedelta(dates.dt.dayofweek, unit='D')).dt.floor('D')
+    return dates.dt.floor(freq)
+
+
+def _aggregate(df: pd.DataFrame, keys) -> pd.DataFrame:
+    spec = {col: (col, 'mean') for col in MEAN_COLUMNS if col in df.columns}
+    if 'coupure' in df.columns:
+        spec['coupures'] = ('coupure', 'sum')
+    spec['total'] = ('period', 'size')
+    out = df.groupby(keys, sort=True, observed=True).agg(**spec).reset_index()
+    if 'coupures' in out.columns:
+        out['taux'] = out['coupures'] / out['total'] * 100
+    return out
+
+
+def build_rollups(df: pd.DataFrame, date_col: Optional[str] = None) -> Dict[str, Dict[str, pd.DataFrame]]:
+    """
+    Pré-calcule les agrégats horaires, journaliers et hebdomadaires.
+
+    Args:
+        df: Données historiques (une ligne par quartier et par heure)
+        date_col: Colonne de date (détectée automatiquement si None ; à
+            défaut, l'index est utilisé s'il contient des dates)
+
+    Returns:
+        {granularité: {quartier: DataFrame}} où chaque DataFrame est trié par
+        'period' et contient les moyennes de MEAN_COLUMNS, 'coupures',
+        'total' et 'taux' (%). La clé ALL_QUARTIERS agrège tous les quartiers.
+    """
+    date_col = date_col or detect_date_column(df)
+    columns = [c for c in MEAN_COLUMNS + ['coupure', 'quartier'] if c in df.columns]
+    work = df[columns].reset_index(drop=True)
+    if date_col is not None:
+        dates = pd.Series(pd.to_datetime(df[date_col]).to_numpy())
+    elif isinstance(df.index, pd.DatetimeIndex):
+        # Dates déjà parsées en index (PreparedDataset)
+        dates = pd.Series(df.index.to_numpy())
+    else:
+        # Pas de date : index horaire fictif, comme l'ancien comportement des graphiques
+        dates = pd.Series(pd.date_range(start='2023-01-01', periods=len(df), freq='h'))
+
+    rollups = {}
+    for freq in GRANULARITIES:
+        work['period'] = _period_start(dates, freq).to_numpy()
+        by_quartier = {ALL_QUARTIERS: _aggregate(work, 'period')}
+        if 'quartier' in work.columns:
+            grouped = _aggregate(work, ['quartier', 'period'])
+            for quartier, part in grouped.groupby('quartier', sort=False, observed=True):
+                by_quartier[quartier] = part.drop(columns='quartier').reset_index(drop=True)
+        rollups[freq] = by_quartier
+    return rollups
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Sous-échantillonnage Largest-Triangle-Three-Buckets.
+
+    Garde le premier et le dernier point, puis dans chaque seau le point qui
+    forme le plus grand triangle avec le point retenu précédemment et la
+    moyenne du seau suivant.
+
+    Args:
+        x: Abscisses croissantes (numériques)
+        y: Ordonnées
+        n_out: Nombre de points à conserver
+
+    Returns:
+        Indices (croissants) des points retenus
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Bornes des n_out - 2 seaux intérieurs (le premier et le dernier point sont fixes)
+    edges = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    # Moyennes de chaque seau via sommes cumulées, et dernier point comme « seau suivant » final
+    cx = np.concatenate(([0.0], np.cumsum(x)))
+    cy = np.concatenate(([0.0], np.cumsum(y)))
+    counts = edges[1:] - edges[:-1]
+    avg_x = np.append((cx[edges[1:]] - cx[edges[:-1]]) / counts, x[-1])
+    avg_y = np.append((cy[edges[1:]] - cy[edges[:-1]]) / counts, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        xs, ys = x[start:stop], y[start:stop]
+        area = np.abs((x[a] - avg_x[i + 1]) * (ys - y[a]) - (x[a] - xs) * (avg_y[i + 1] - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(df: pd.DataFrame, column: str, budget: int = DEFAULT_POINT_BUDGET,
+               x_col: str = 'period') -> pd.DataFrame:
+    """
+    Réduit une série agrégée à `budget` points par LTTB sur `column`.
+
+    Args:
+        df: Agrégat trié par x_col (une entrée de build_rollups)
+        column: Colonne dont la forme doit être préservée
+        budget: Nombre maximal de points
+        x_col: Colonne des abscisses (dates)
+
+    Returns:
+        Sous-ensemble de df (lignes d'origine, ordre conservé)
+    """
+    if len(df) <= budget:
+        return df
+    x = df[x_col].to_numpy().astype('datetime64[ns]').astype(np.int64)
+    return df.iloc[lttb_indices(x, df[column].to_numpy(), budget)]
@@ -0,0 +1,305 @@
+"""
+Fichier : src/zones.py
+Registre des zones (quartiers, départs) et index spatial
+========================================================
+
+Les zones affichées sur la carte ne sont plus codées en dur : elles sont lues
+dans un fichier (data/zones.csv par défaut, ou la variable DAKAR_ZONES), une
+ligne par zone :
+
+    zone_id, nom, quartier, lat, lon[, type][, charge]
+
+- quartier : quartier du registre (src/quartiers.py) dont le modèle utilise
+  le code ; plusieurs centaines de départs peuvent partager un quartier
+- charge : facteur appliqué à la consommation saisie (1.0 par défaut)
+
+Sans fichier, le registre est construit depuis COORDONNEES_QUARTIERS.
+
+GridIndex range les zones dans une grille régulière (cellules triées, sans
+dépendance) : une requête par rectangle ne lit que les cellules couvertes,
+la recherche du plus proche voisin part de la cellule du point et s'élargit
+anneau par anneau. La carte ne score et ne dessine que les zones du cadre
+affiché.
+
+Génération d'un registre de départs pour les tests de charge :
+    python scripts/generate_zones.py --feeders 1000
+"""
+
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config import COORDONNEES_QUARTIERS, SEUILS_RISQUE
+from src.features import build_features
+from src.inference import predict_batch
+from src.quartiers import UNKNOWN_CODE, encode_quartiers
+
+ZONES_FILE = 'data/zones.csv'
+ZONES_ENV = 'DAKAR_ZONES'
+REQUIRED_COLUMNS = ['zone_id', 'nom', 'quartier', 'lat', 'lon']
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Distance orthodromique (km), vectorisée."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def radius_bbox(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """Rectangle (lat_min, lat_max, lon_min, lon_max) contenant le disque de rayon radius_km."""
+    dlat = radius_km / KM_PER_DEGREE
+    dlon = radius_km / (KM_PER_DEGREE * max(np.cos(np.radians(lat)), 1e-6))
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
+# ============================================================================
+# INDEX SPATIAL
+# ============================================================================
+
+class GridIndex:
+    """
+    Grille régulière en degrés sur un nuage de points (lat, lon).
+
+    Les points sont triés par cellule (ligne-majeure) ; starts[k] donne le
+    début de la cellule k dans `order`. Une ligne de cellules d'un rectangle
+    est donc une seule tranche contiguë.
+
+    Args:
+        lat, lon: Coordonnées (degrés)
+        cell_deg: Taille de cellule (défaut : ~2 points par cellule en moyenne)
+    """
+
+    def __init__(self, lat: np.ndarray, lon: np.ndarray, cell_deg: Optional[float] = None):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        n = len(self.lat)
+        self.lat0 = float(self.lat.min()) if n else 0.0
+        self.lon0 = float(self.lon.min()) if n else 0.0
+        span = max(float(np.ptp(self.lat)) if n else 0.0, float(np.ptp(self.lon)) if n else 0.0, 1e-6)
+        self.cell = cell_deg or span / max(np.sqrt(n / 2), 1.0)
+        self.n_rows = int(np.ptp(self.lat) // self.cell) + 1 if n else 1
+        self.n_cols = int(np.ptp(self.lon) // self.cell) + 1 if n else 1
+
+        keys = self._row(self.lat) * self.n_cols + self._col(self.lon)
+        self.order = np.argsort(keys, kind='stable')
+        self.starts = np.searchsorted(keys[self.order], np.arange(self.n_rows * self.n_cols + 1))
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def _row(self, lat) -> np.ndarray:
+        return np.clip(((np.asarray(lat) - self.lat0) // self.cell).astype(np.int64), 0, self.n_rows - 1)
+
+    def _col(self, lon) -> np.ndarray:
+        return np.clip(((np.asarray(lon) - self.lon0) // self.cell).astype(np.int64), 0, self.n_cols - 1)
+
+    def _cells(self, lat_min, lat_max, lon_min, lon_max) -> np.ndarray:
+        """Points des cellules couvrant le rectangle (candidats, non filtrés)."""
+        if lat_max < self.lat0 or lon_max < self.lon0:
+            return np.empty(0, dtype=np.int64)
+        r0, r1 = self._row(lat_min), self._row(lat_max)
+        c0, c1 = self._col(lon_min), self._col(lon_max)
+        rows = np.arange(r0, r1 + 1) * self.n_cols
+        bounds = zip(self.starts[rows + c0], self.starts[rows + c1 + 1])
+        return np.concatenate([self.order[a:b] for a, b in bounds] or [np.empty(0, dtype=np.int64)])
+
+    def bbox(self, lat_min: float, lat_max: float, lon_min: float, lon_max: float) -> np.ndarray:
+        """Index des points du rectangle (bornes incluses), triés."""
+        candidates = self._cells(lat_min, lat_max, lon_min, lon_max)
+        lat, lon = self.lat[candidates], self.lon[candidates]
+        inside = (lat >= lat_min) & (lat <= lat_max) & (lon >= lon_min) & (lon <= lon_max)
+        return np.sort(candidates[inside])
+
+    def within(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Points à moins de radius_km d'un point.
+
+        Returns:
+            (index, distances en km), triés par distance croissante
+        """
+        candidates = self._cells(*radius_bbox(lat, lon, radius_km))
+        distances = haversine_km(lat, lon, self.lat[candidates], self.lon[candidates])
+        keep = distances <= radius_km
+        order = np.argsort(distances[keep], kind='stable')
+        return candidates[keep][order], distances[keep][order]
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k plus proches voisins d'un point.
+
+        Les anneaux de cellules autour du point sont élargis jusqu'à réunir k
+        candidats ; la distance du k-ième donne ensuite un rayon de recherche
+        exact (un voisin plus proche peut se trouver dans une cellule voisine).
+
+        Returns:
+            (index, distances en km), triés par distance croissante
+        """
+        k = min(k, len(self))
+        if k == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        ring = 0
+        while True:
+            half = ring * self.cell
+            candidates = self._cells(lat - half, lat + half, lon - half, lon + half)
+            if len(candidates) >= k or half > max(self.n_rows, self.n_cols) * self.cell + abs(lat - self.lat0) + abs(lon - self.lon0):
+                break
+            ring += 1
+        distances = haversine_km(lat, lon, self.lat[candidates], self.lon[candidates])
+        radius = np.partition(distances, k - 1)[k - 1]
+        index, distances = self.within(lat, lon, radius)
+        return index[:k], distances[:k]
+
+
+# ============================================================================
+# REGISTRE DES ZONES
+# ============================================================================
+
+class ZoneRegistry:
+    """
+    Zones géolocalisées et leur index spatial.
+
+    Args:
+        frame: Une ligne par zone (REQUIRED_COLUMNS, 'type' et 'charge' optionnels)
+
+    Raises:
+        ValueError: Colonne manquante, identifiant dupliqué ou coordonnées invalides
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        missing = [c for c in REQUIRED_COLUMNS if c not in frame.columns]
+        if missing:
+            raise ValueError(f"Registre des zones : colonnes manquantes {', '.join(missing)}")
+        frame = frame.reset_index(drop=True).copy()
+        frame['zone_id'] = frame['zone_id'].astype(str)
+        duplicated = frame['zone_id'][frame['zone_id'].duplicated()].unique()
+        if len(duplicated):
+            raise ValueError(f"Registre des zones : identifiants dupliqués {', '.join(duplicated[:5])}")
+        for col in ('lat', 'lon'):
+            frame[col] = pd.to_numeric(frame[col], errors='coerce')
+        invalid = frame['lat'].isna() | frame['lon'].isna() | ~frame['lat'].between(-90, 90) | ~frame['lon'].between(-180, 180)
+        if invalid.any():
+            raise ValueError(f"Registre des zones : coordonnées invalides pour {', '.join(frame.loc[invalid, 'zone_id'][:5])}")
+        if 'type' not in frame.columns:
+            frame['type'] = 'quartier'
+        frame['charge'] = pd.to_numeric(frame['charge'], errors='coerce').fillna(1.0) if 'charge' in frame.columns else 1.0
+
+        self.frame = frame
+        self.codes = encode_quartiers(frame['quartier'])
+        self.index = GridIndex(frame['lat'].to_numpy(), frame['lon'].to_numpy())
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @property
+    def unknown_quartiers(self) -> int:
+        """Zones dont le quartier est hors registre (prédites comme quartier inconnu)."""
+        return int((self.codes == UNKNOWN_CODE).sum())
+
+    @classmethod
+    def from_file(cls, path) -> 'ZoneRegistry':
+        """Registre depuis un CSV ou un JSON (liste d'objets)."""
+        path = Path(path)
+        frame = pd.read_json(path) if path.suffix == '.json' else pd.read_csv(path)
+        return cls(frame)
+
+    @classmethod
+    def from_config(cls) -> 'ZoneRegistry':
+        """Registre des quartiers de src/config.py (un point par quartier)."""
+        return cls(pd.DataFrame([
+            {'zone_id': q, 'nom': q, 'quartier': q, 'lat': c['lat'], 'lon': c['lon'], 'type': 'quartier'}
+            for q, c in COORDONNEES_QUARTIERS.items()
+        ]))
+
+    def center(self) -> Tuple[float, float]:
+        return float(self.frame['lat'].mean()), float(self.frame['lon'].mean())
+
+    def in_bbox(self, lat_min: float, lat_max: float, lon_min: float, lon_max: float) -> np.ndarray:
+        """Index des zones d'un rectangle (cadre de la carte)."""
+        return self.index.bbox(lat_min, lat_max, lon_min, lon_max)
+
+    def within(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        return self.index.within(lat, lon, radius_km)
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> pd.DataFrame:
+        """k zones les plus proches d'un point, avec leur distance (colonne 'distance_km')."""
+        index, distances = self.index.nearest(lat, lon, k)
+        rows = self.frame.iloc[index].copy()
+        rows['distance_km'] = distances
+        return rows
+
+
+def load_zones(path=None) -> ZoneRegistry:
+    """
+    Registre des zones : fichier `path`, sinon DAKAR_ZONES, sinon data/zones.csv,
+    sinon les quartiers de src/config.py.
+    """
+    path = path or os.environ.get(ZONES_ENV) or ZONES_FILE
+    if Path(path).exists():
+        return ZoneRegistry.from_file(path)
+    return ZoneRegistry.from_config()
+
+
+def generate_feeders(n: int, spread_km: float = 1.5, seed: int = 42) -> pd.DataFrame:
+    """
+    Registre synthétique de n départs répartis autour des quartiers.
+
+    Args:
+        n: Nombre de départs
+        spread_km: Écart-type de la position autour du centre du quartier
+        seed: Graine aléatoire
+
+    Returns:
+        DataFrame au format du registre (type 'depart', charge ~1 +/- 15 %)
+    """
+    rng = np.random.default_rng(seed)
+    names = list(COORDONNEES_QUARTIERS)
+    quartier = rng.integers(0, len(names), n)
+    lat = np.array([COORDONNEES_QUARTIERS[q]['lat'] for q in names])[quartier]
+    lon = np.array([COORDONNEES_QUARTIERS[q]['lon'] for q in names])[quartier]
+    lat = lat + rng.normal(0, spread_km / KM_PER_DEGREE, n)
+    lon = lon + rng.normal(0, spread_km / (KM_PER_DEGREE * np.cos(np.radians(lat))), n)
+    ids = [f"D{i:05d}" for i in range(n)]
+    return pd.DataFrame({
+        'zone_id': ids,
+        'nom': [f"Départ {i} - {names[q]}" for i, q in zip(ids, quartier)],
+        'quartier': np.array(names, dtype=object)[quartier],
+        'lat': lat.round(5),
+        'lon': lon.round(5),
+        'type': 'depart',
+        'charge': rng.lognormal(0, 0.15, n).round(3)
+    })
+
+
+def score_zones(models, registry: ZoneRegistry, index: np.ndarray, timestamp,
+                temp: float, humidite: float, vent: float, conso: float) -> pd.DataFrame:
+    """
+    Risque d'un sous-ensemble de zones, en un seul appel vectorisé.
+
+    Args:
+        models: {'lgb', 'lstm', 'scaler', 'ensemble'}
+        registry: Registre des zones
+        index: Zones à scorer (ex: ZoneRegistry.in_bbox)
+        timestamp: Date de prédiction
+        temp, humidite, vent: Conditions communes à toutes les zones
+        conso: Consommation de référence (MW), multipliée par la charge de chaque zone
+
+    Returns:
+        Colonnes du registre + 'risque' (%) et 'niveau' ; vide si les modèles manquent
+    """
+    zones = registry.frame.iloc[index]
+    n = len(zones)
+    X = build_features(np.repeat(np.datetime64(pd.Timestamp(timestamp)), n), temp, humidite, vent,
+                       conso * zones['charge'].to_numpy(dtype=np.float64))
+    preds = predict_batch(models, X, registry.codes[index]) if n else None
+    if preds is None:
+        return zones.assign(risque=pd.Series(dtype=np.float64), niveau=pd.Series(dtype=object)).iloc[:0]
+    risque = preds['risque']
+    return zones.assign(risque=risque, niveau=np.select(
+        [risque < SEUILS_RISQUE['moyen'], risque < SEUILS_RISQUE['eleve']], ['FAIBLE', 'MOYEN'], 'ÉLEVÉ'))
@@ -1,14 +1,23 @@
 ﻿import streamlit as st
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from pathlib import Path
 import sys
+import tempfile
 
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from streamlit_app.utils_simple import *
-from src.config import QUARTIERS_DAKAR
+from src.config import QUARTIERS_DAKAR, COORDONNEES_QUARTIERS, SEUILS_RISQUE
+from src.alerting import LEVELS, risk_levels
+from src import metrics
+from src.timeseries import GRANULARITIES
+from src.shared_store import load_shared_dataset
+from src.bulk_scoring import score_csv
+from src.model_registry import version_of
+from src.drift import DEFAULT_STATE_FILE
 
 st.set_page_config(page_title="Dakar Power", page_icon="⚡", layout="wide")
 
@@ -18,16 +27,22 @@ if 'initialized' not in st.session_state:
         del st.session_state[key]
     st.session_state['initialized'] = True
 
+registry = get_model_registry()
 models = load_models_cached()
+models_version = version_of(models)
+start_metrics_exporter()
 
-@st.cache_data
-def load_csv():
+@st.cache_resource
+def load_dataset():
+    # Un seul objet par processus (pas de copie par session) ; colonnes mappées en
+    # mémoire depuis data/cache/, partagées entre tous les processus de la machine
     try:
-        return pd.read_csv("data/synthetic/synthetic_data_v2.csv")
-    except:
+        return load_shared_dataset("data/synthetic/synthetic_data_v2.csv")
+    except Exception:
         return None
 
-df_hist = load_csv()
+dataset = load_dataset()
+data_watermark = dataset_watermark(dataset) if dataset is not None else None
 
 st.sidebar.title("🌡️ Paramètres")
 temperature = st.sidebar.slider("Température (°C)", 15.0, 45.0, 25.0, 0.5)
@@ -43,6 +58,20 @@ if st.sidebar.button("🔮 Lancer la Prédiction", type="primary", use_container
         'vitesse_vent': vitesse_vent, 'consommation': consommation, 'timestamp': datetime.now()
     }
 
+st.sidebar.markdown("---")
+with st.sidebar.expander("🔬 Diagnostic"):
+    # Collecte commune à toutes les sessions du processus : réglée par l'environnement, pas par un visiteur
+    st.caption("Métriques : actives" if metrics.is_enabled()
+               else "Métriques : désactivées (DAKAR_METRICS=1 pour les activer)")
+    metrics.PROFILER.toggle(st.checkbox("Profileur (échantillonnage)", value=metrics.PROFILER.running, key='diag_profiler'))
+    if metrics.PROFILER.samples:
+        st.caption(f"{metrics.PROFILER.samples:,} échantillons")
+        for name, share in metrics.PROFILER.top_functions(5):
+            st.text(f"{share*100:5.1f}%  {name}")
+        st.download_button("📥 Piles (flamegraph)", metrics.PROFILER.collapsed(), "profile.collapsed", "text/plain")
+    if metrics.is_enabled():
+        st.download_button("📥 Métriques (Prometheus)", metrics.export_prometheus(), "metrics.txt", "text/plain")
+
 st.sidebar.markdown("---")
 st.sidebar.header("ℹ️ À propos")
 st.sidebar.info("""
@@ -59,7 +88,10 @@ Application de prédiction des coupures d'électricité à Dakar.
 - 8 quartiers
 """)
 st.sidebar.markdown("---")
-st.sidebar.caption("⚡ Version 1.0")
+st.sidebar.caption(f"⚡ Version 1.0 · modèles {registry.version} ({models.get('precision', 'full')})"
+                   + (f" (chargés à {registry.loaded_at:%H:%M:%S})" if registry.loaded_at else ""))
+if registry.last_error:
+    st.sidebar.warning(f"⚠️ Nouvelle version refusée : {registry.last_error}")
 
 st.title("⚡ Dakar Power Prediction")
 
@@ -69,20 +101,19 @@ with col1:
 with col2:
     st.success("✅ LSTM" if models['lstm'] else "⚠️ LSTM")
 with col3:
-    st.success(f"✅ CSV ({len(df_hist):,} lignes)" if df_hist is not None else "❌ CSV")
+    st.success(f"✅ CSV ({len(dataset):,} lignes)" if dataset is not None else "❌ CSV")
 
-tab1, tab2, tab3, tab4 = st.tabs(["🎯 Prédiction", "🗺️ Carte", "📊 Statistiques", "📈 Historique"])
+tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9 = st.tabs(["🎯 Prédiction", "🗺️ Carte", "🔭 Prévision", "🧪 Sensibilité", "📦 Scoring CSV", "📊 Statistiques", "📈 Historique", "🩺 Dérive", "🔍 Explications"])
 
 with tab1:
     st.header("🎯 Prédiction Immédiate")
     if st.session_state.get('run', False):
         params = st.session_state['params']
-        time_features = create_time_features(params['timestamp'])
-        result = make_prediction_single(models, params['quartier'], params['temperature'], params['humidite'], params['vitesse_vent'], params['consommation'], time_features)
+        result = make_prediction_single(models, params['quartier'], params['temperature'], params['humidite'], params['vitesse_vent'], params['consommation'], params['timestamp'])
         
         if result:
             pred_lgb, pred_lstm, risque = result
-            niveau = "FAIBLE" if risque < 40 else ("MOYEN" if risque < 70 else "ÉLEVÉ")
+            niveau = str(LEVELS[risk_levels(risque)])
             
             if 'predictions_history' not in st.session_state:
                 st.session_state['predictions_history'] = []
@@ -96,13 +127,16 @@ with tab1:
             with col1:
                 st.metric("🌳 LightGBM", f"{pred_lgb:.1f}%")
             with col2:
-                st.metric("🧠 LSTM", f"{pred_lstm:.1f}%")
+                if np.isnan(pred_lstm):
+                    st.metric("🧠 LSTM", "—", help="Non utilisé par l'ensemble (aucun gain mesuré)")
+                else:
+                    st.metric("🧠 LSTM", f"{pred_lstm:.1f}%")
             with col3:
                 st.metric("⚠️ NIVEAU", niveau)
             
-            if risque < 40:
+            if risque < SEUILS_RISQUE['moyen']:
                 st.success(f"✅ Risque {niveau} ({risque:.0f}%)")
-            elif risque < 70:
+            elif risque < SEUILS_RISQUE['eleve']:
                 st.warning(f"⚠️ Risque {niveau} ({risque:.0f}%)")
             else:
                 st.error(f"🚨 Risque {niveau} ({risque:.0f}%)")
@@ -124,53 +158,232 @@ with tab1:
 
 with tab2:
     st.header("🗺️ Carte Interactive")
-    if st.button("🔄 Calculer pour tous les quartiers"):
-        time_features = create_time_features(datetime.now())
-        results = []
-        progress = st.progress(0)
-        for i, q in enumerate(QUARTIERS_DAKAR):
-            result = make_prediction_single(models, q, temperature, humidite, vitesse_vent, consommation, time_features)
-            if result:
-                results.append({'Quartier': q, 'Risque': result[2]})
-            progress.progress((i + 1) / len(QUARTIERS_DAKAR))
-        progress.empty()
-        if results:
-            fig = create_map(results)
+    zone_registry = get_zone_registry()
+    lat_c, lon_c = zone_registry.center()
+    col_c, col_r = st.columns(2)
+    with col_c:
+        centres = ["Toutes les zones"] + QUARTIERS_DAKAR
+        centre = st.selectbox("Centrer sur", centres, key='map_centre')
+    with col_r:
+        rayon = st.slider("Rayon affiché (km)", 1, 50, 20, key='map_rayon')
+    if centre != "Toutes les zones":
+        lat_c, lon_c = COORDONNEES_QUARTIERS[centre]['lat'], COORDONNEES_QUARTIERS[centre]['lon']
+        proche = zone_registry.nearest(lat_c, lon_c, k=1)
+        st.caption(f"📍 Zone la plus proche du centre : {proche['nom'].iloc[0]} ({proche['distance_km'].iloc[0]:.2f} km)")
+    if st.button("🔄 Calculer les zones affichées"):
+        zones = predict_visible_zones(models, zone_registry, (lat_c, lon_c), rayon, temperature, humidite, vitesse_vent, consommation, datetime.now())
+        st.caption(f"{len(zones)} zone(s) dans le cadre sur {len(zone_registry)}")
+        if len(zones):
+            fig = create_map(zones, (lat_c, lon_c), zoom_for_radius(rayon))
             st.plotly_chart(fig, use_container_width=True, config={'scrollZoom': True})
-            df_res = pd.DataFrame(results).sort_values('Risque', ascending=False)
-            df_res['Niveau'] = df_res['Risque'].apply(lambda r: "ÉLEVÉ" if r >= 70 else ("MOYEN" if r >= 40 else "FAIBLE"))
+            df_res = zones.nlargest(50, 'risque')[['nom', 'quartier', 'risque', 'niveau', 'distance_km']]
+            df_res.columns = ['Zone', 'Quartier', 'Risque', 'Niveau', 'Distance (km)']
             df_res['Risque'] = df_res['Risque'].apply(lambda x: f"{x:.1f}%")
+            df_res['Distance (km)'] = df_res['Distance (km)'].round(1)
             st.dataframe(df_res, use_container_width=True, hide_index=True)
 
 with tab3:
+    st.header("🔭 Prévision Horaire")
+    col_h, col_q = st.columns(2)
+    with col_h:
+        horizon = st.select_slider("Horizon (heures)", options=[24, 48, 72], value=48, key='fc_h')
+    with col_q:
+        quartier_fc = st.selectbox("Quartier", QUARTIERS_DAKAR, index=QUARTIERS_DAKAR.index(quartier), key='fc_q')
+    st.caption("Profil des curseurs, avec variations journalières de température et de consommation")
+    start = pd.Timestamp.now().floor('h')
+    forecast = compute_forecast(models, models_version, start, horizon, temperature, humidite, vitesse_vent, consommation)
+    if len(forecast):
+        fig = create_forecast_heatmap(forecast)
+        if fig:
+            st.plotly_chart(fig, use_container_width=True)
+        fig = create_forecast_chart(forecast, quartier_fc)
+        if fig:
+            st.plotly_chart(fig, use_container_width=True)
+        pic = forecast.loc[forecast.groupby('quartier', sort=False)['risque'].idxmax(), ['quartier', 'date_heure', 'risque']]
+        pic.columns = ['Quartier', 'Heure du pic', 'Risque max (%)']
+        st.dataframe(pic.sort_values('Risque max (%)', ascending=False).round(1), use_container_width=True, hide_index=True)
+        st.download_button("📥 Télécharger la prévision", forecast.to_csv(index=False).encode('utf-8'), f"prevision_{start.strftime('%Y%m%d_%H')}h.csv", "text/csv")
+    else:
+        st.warning("⚠️ Modèles indisponibles")
+
+with tab4:
+    st.header("🧪 Analyse de Sensibilité")
+    base = {'temp_celsius': temperature, 'humidite_percent': humidite, 'vitesse_vent': vitesse_vent, 'conso_megawatt': consommation}
+    col_q, col_x, col_y = st.columns(3)
+    with col_q:
+        quartier_sens = st.selectbox("Quartier", QUARTIERS_DAKAR, index=QUARTIERS_DAKAR.index(quartier), key='sens_q')
+    with col_x:
+        feature_x = st.selectbox("Entrée balayée", list(FEATURE_LABELS), index=0, format_func=FEATURE_LABELS.get, key='sens_x')
+    with col_y:
+        options_y = [None] + [f for f in FEATURE_LABELS if f != feature_x]
+        feature_y = st.selectbox("Seconde entrée (surface)", options_y, index=0, format_func=lambda f: "Aucune" if f is None else FEATURE_LABELS[f], key='sens_y')
+    st.caption("Les autres entrées gardent la valeur des curseurs ; heure de prédiction : maintenant")
+    now = pd.Timestamp.now().floor('h')
+    df_sweep = compute_sweep(models, models_version, quartier_sens, now, base, feature_x, feature_y, 30 if feature_y else 60)
+    if len(df_sweep):
+        fig = create_sensitivity_surface(df_sweep, feature_x, feature_y) if feature_y else create_sensitivity_chart(df_sweep, feature_x, base[feature_x])
+        if fig:
+            st.plotly_chart(fig, use_container_width=True)
+        if dataset is not None:
+            with st.expander("📐 Dépendance partielle (LightGBM, historique)"):
+                fig = create_pdp_chart(compute_partial_dependence(models, models_version, dataset, data_watermark, feature_x), feature_x)
+                if fig:
+                    st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.warning("⚠️ Modèles indisponibles")
+
+with tab5:
+    st.header("📦 Scoring de Scénarios")
+    st.caption("Colonnes : quartier, timestamp, temp_celsius, humidite_percent, vitesse_vent, conso_megawatt")
+    uploaded = st.file_uploader("Fichier CSV de scénarios", type=['csv'], key='bulk_file')
+    bulk_explain = st.checkbox("Ajouter les contributions des facteurs (colonnes contrib_*)", value=False, key='bulk_explain')
+    if uploaded is not None and st.button("⚙️ Scorer le fichier", key='bulk_run'):
+        progress = st.empty()
+        output = Path(tempfile.mkdtemp(prefix='scores-')) / f"{Path(uploaded.name).stem}_scores.csv"
+        uploaded.seek(0)
+        try:
+            summary = score_csv(uploaded, output, models=models,
+                                progress=lambda rows: progress.info(f"⏳ {rows:,} lignes scorées"),
+                                explain=bulk_explain)
+            st.session_state['bulk_result'] = {'path': str(output), 'summary': summary}
+        except (ValueError, RuntimeError) as e:
+            st.error(f"❌ {e}")
+        progress.empty()
+    result_bulk = st.session_state.get('bulk_result')
+    if result_bulk and Path(result_bulk['path']).exists():
+        summary = result_bulk['summary']
+        st.success(f"✅ {summary['rows']:,} lignes en {summary['seconds']:.1f} s ({summary['rows_per_second']:,.0f} lignes/s)")
+        if summary['invalid']:
+            st.warning(f"⚠️ {summary['invalid']:,} lignes invalides (niveau INVALIDE)")
+        st.dataframe(pd.read_csv(result_bulk['path'], nrows=100), use_container_width=True, hide_index=True)
+        with open(result_bulk['path'], 'rb') as f:
+            st.download_button("📥 Télécharger les scores", f, Path(result_bulk['path']).name, "text/csv")
+
+with tab6:
     st.header("📊 Statistiques CSV")
-    if df_hist is not None:
+    if dataset is not None:
         quartier_filter = st.selectbox("Quartier", ["Tous"] + QUARTIERS_DAKAR, index=0, key='stats_q')
-        df_f = df_hist if quartier_filter == "Tous" else df_hist[df_hist['quartier'] == quartier_filter]
-        stats = df_f.groupby('quartier').agg({'coupure': ['sum', 'count'], 'temp_celsius': 'mean', 'conso_megawatt': 'mean'}).reset_index()
-        stats.columns = ['quartier', 'coupures', 'total', 'temp_moy', 'conso_moy']
-        stats['taux_coupure'] = stats['coupures'] / stats['total']
+        stats = dataset.stats(quartier_filter)
         fig = create_bar_chart_quartiers(stats)
         if fig:
             st.plotly_chart(fig, use_container_width=True)
         st.dataframe(stats, use_container_width=True, hide_index=True)
-        st.info(f"📊 {len(df_f):,} enregistrements")
+        st.info(f"📊 {dataset.count(quartier_filter):,} enregistrements")
 
-with tab4:
+with tab7:
     st.header("📈 Historique")
-    if df_hist is not None:
-        quartier_hist = st.selectbox("Quartier", ["Tous"] + QUARTIERS_DAKAR, index=0, key='hist_q')
+    if dataset is not None:
+        col_q, col_g = st.columns(2)
+        with col_q:
+            quartier_hist = st.selectbox("Quartier", ["Tous"] + QUARTIERS_DAKAR, index=0, key='hist_q')
+        with col_g:
+            granularite = st.selectbox("Granularité", list(GRANULARITIES), index=0, format_func=GRANULARITIES.get, key='hist_g')
         col1, col2 = st.columns(2)
         with col1:
             st.subheader("📉 Évolution Temporelle")
-            fig_temp = create_temporal_chart(df_hist, quartier_hist)
+            fig_temp = create_temporal_chart(dataset, quartier_hist, granularite)
             if fig_temp:
                 st.plotly_chart(fig_temp, use_container_width=True)
         with col2:
             st.subheader("📊 Tendance des Risques")
-            fig_risk = create_risk_trend_chart(df_hist, quartier_hist)
+            # Le taux horaire vaut 0 ou 100% : la tendance est au moins journalière
+            fig_risk = create_risk_trend_chart(dataset, quartier_hist, 'W' if granularite == 'W' else 'D')
             if fig_risk:
                 st.plotly_chart(fig_risk, use_container_width=True)
 
+with tab8:
+    st.header("🩺 Dérive et qualité des données")
+    drift_profile = models.get('drift_profile')
+    if drift_profile is None:
+        st.info("ℹ️ Bundle sans profil d'entraînement : python scripts/drift_monitor.py --build-profile")
+    else:
+        state_path = Path(DEFAULT_STATE_FILE)
+        sources = ["Historique récent"] + (["Flux en continu"] if state_path.exists() else [])
+        col_s, col_j = st.columns(2)
+        with col_s:
+            drift_source = st.radio("Source", sources, horizontal=True, key='drift_source')
+        drift = None
+        if drift_source == "Flux en continu":
+            try:
+                drift = load_drift_state(drift_profile, models_version, str(state_path), state_path.stat().st_mtime)
+            except (OSError, ValueError) as e:
+                st.warning(f"⚠️ État du flux illisible : {e}")
+        elif dataset is not None:
+            with col_j:
+                drift_days = st.slider("Derniers jours", 7, 180, 30, 1, key='drift_days')
+            # Tous les onglets s'exécutent à chaque rerun : la période n'est scorée qu'à la demande,
+            # puis relue du cache (empreinte du bundle, repère des données, nombre de jours)
+            if st.session_state.get('drift_run') or st.button("📊 Analyser la période", key='drift_button'):
+                st.session_state['drift_run'] = True
+                with st.spinner("Scoring de la période..."):
+                    drift = compute_drift_history(models, models_version, dataset, data_watermark, drift_days)
+
+        if drift is not None:
+            report = drift['report']
+            qualite = report['qualite']
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Dérive", report['statut'])
+            col2.metric("Lignes", f"{qualite['lignes']:,}")
+            col3.metric("Dates illisibles", f"{qualite['dates_invalides']:,}")
+            col4.metric("Quartiers hors registre", f"{qualite['quartiers_inconnus']:,}")
+            st.caption(f"Profil d'entraînement du {drift_profile.created_at} ({drift_profile.rows:,} lignes) · "
+                       f"PSI < 0.1 stable, 0.1-0.25 modérée, > 0.25 forte · "
+                       f"météo et consommation comparées au profil des mêmes mois · "
+                       f"features calendaires hors statut global")
+            if qualite['quartiers_inconnus_frequents']:
+                st.warning("⚠️ Quartiers hors registre : " + ", ".join(
+                    f"{name} (~{count:,})" for name, count in qualite['quartiers_inconnus_frequents']))
 
+            col1, col2 = st.columns(2)
+            with col1:
+                fig_psi = create_drift_psi_chart(report['features'])
+                if fig_psi:
+                    st.plotly_chart(fig_psi, use_container_width=True)
+            with col2:
+                drift_feature = st.selectbox("Distribution", list(drift['histogrammes']), index=0, key='drift_feature')
+                fig_hist = create_drift_histogram(drift['histogrammes'][drift_feature], drift_feature)
+                if fig_hist:
+                    st.plotly_chart(fig_hist, use_container_width=True)
+            st.subheader("📊 Features")
+            st.dataframe(report['features'].round(3), use_container_width=True, hide_index=True)
+            st.subheader("🏘️ Risque prédit par quartier")
+            st.dataframe(report['quartiers'].round(3), use_container_width=True, hide_index=True)
+
+with tab9:
+    st.header("🔍 Explications des prédictions")
+    st.caption("Contributions SHAP de LightGBM dans l'ensemble, en logit du risque : > 0 augmente le risque. "
+               "La base et les contributions se somment au logit du risque prédit ; LSTM : écart du terme LSTM à la base.")
+    now = pd.Timestamp.now().floor('h')
+    contributions = explain_single(models, quartier, temperature, humidite, vitesse_vent, consommation, now)
+    if contributions is None:
+        st.info("ℹ️ Contributions indisponibles pour ces modèles (précision 'binned' ou LightGBM manquant)")
+    else:
+        risque_scenario = 100 / (1 + np.exp(-contributions.sum()))
+        st.subheader(f"🎯 Scénario des curseurs · {quartier} ({risque_scenario:.1f}%)")
+        fig = create_waterfall_chart(contributions, risque_scenario)
+        if fig:
+            st.plotly_chart(fig, use_container_width=True)
 
+        if dataset is not None:
+            st.subheader("🏘️ Principaux facteurs par quartier (historique)")
+            explain_days = st.slider("Derniers jours", 7, 365, 90, 1, key='explain_days')
+            explained = None
+            if st.session_state.get('explain_run') or st.button("📊 Calculer les contributions", key='explain_button'):
+                st.session_state['explain_run'] = True
+                with st.spinner("Scoring et contributions de la période..."):
+                    explained = compute_explain_history(models, models_version, dataset, data_watermark, explain_days)
+            if explained is not None:
+                st.caption(f"{explained['lignes']:,} lignes, importance cumulée bloc par bloc")
+                col1, col2 = st.columns(2)
+                with col1:
+                    fig = create_importance_chart(explained['global'])
+                    if fig:
+                        st.plotly_chart(fig, use_container_width=True)
+                with col2:
+                    fig = create_drivers_heatmap(explained['par_quartier'])
+                    if fig:
+                        st.plotly_chart(fig, use_container_width=True)
+                quartier_explain = st.selectbox("Quartier", QUARTIERS_DAKAR, index=QUARTIERS_DAKAR.index(quartier), key='explain_q')
+                top = explained['par_quartier']
+                top = top[(top['quartier'] == quartier_explain) & (top['rang'] <= 5)]
+                st.dataframe(top[['rang', 'libelle', 'importance', 'effet_moyen']].round(3), use_container_width=True, hide_index=True)
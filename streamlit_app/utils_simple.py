@@ -2,6 +2,7 @@
 Fonctions utilitaires - THÈME PAR DÉFAUT STREAMLIT/PLOTLY
 """
 import streamlit as st
+import os
 import warnings
 warnings.filterwarnings('ignore')
 import pandas as pd
@@ -9,18 +10,46 @@ import numpy as np
 from datetime import datetime
 import pickle
 import plotly.graph_objects as go
-from tensorflow import keras
-from src.config import QUARTIERS_DAKAR, COORDONNEES_QUARTIERS, QUARTIER_ADJUSTMENT
+from src.config import QUARTIERS_DAKAR, SEUILS_RISQUE
+from src.alerting import LEVELS, risk_levels
+from src import metrics
+from src.model_registry import ModelRegistry
+from src.features import build_features
+from src.inference import predict_batch
+from src.forecast import forecast_risk, to_heatmap
+from src.timeseries import downsample
+from src.sensitivity import FEATURE_LABELS, sweep, partial_dependence
+from src.zones import load_zones, score_zones
+from src.bulk_scoring import score_frame
+from src.drift import PSI_THRESHOLDS, DriftMonitor, monitor_frame
+from src.explain import DRIVER_LABELS, DRIVERS, ImportanceAggregator, drivers_frame, explain_batch
 
-@st.cache_resource
-def load_models_cached():
-    models = {'lgb': None, 'lstm': None, 'scaler': None}
+# Couleurs et fonds par niveau (FAIBLE, MOYEN, ÉLEVÉ) ; seuils de SEUILS_RISQUE
+RISK_COLORS = np.array(["#28a745", "#ffc107", "#dc3545"])
+RISK_BACKGROUNDS = ['#d4edda', '#fff3cd', '#f8d7da']
+SEUIL_MOYEN, SEUIL_ELEVE = SEUILS_RISQUE['moyen'], SEUILS_RISQUE['eleve']
+# Échelle de couleurs 0-100 % par paliers, alignée sur les seuils
+RISK_COLORSCALE = [[0, RISK_COLORS[0]], [SEUIL_MOYEN / 100, RISK_COLORS[0]], [SEUIL_MOYEN / 100, RISK_COLORS[1]],
+                   [SEUIL_ELEVE / 100, RISK_COLORS[1]], [SEUIL_ELEVE / 100, RISK_COLORS[2]], [1, RISK_COLORS[2]]]
+
+def add_risk_thresholds(fig, annotate=True):
+    # Lignes des seuils MOYEN et ÉLEVÉ sur un graphique en % de risque
+    for level, seuil in ((1, SEUIL_MOYEN), (2, SEUIL_ELEVE)):
+        label = dict(annotation_text=f"Seuil {LEVELS[level]}") if annotate else {}
+        fig.add_hline(y=seuil, line_dash="dash", line_color=RISK_COLORS[level], **label)
+
+def load_legacy_models():
+    # Repli sans bundle valide : pickles + .keras (TensorFlow)
+    models = {'lgb': None, 'lstm': None, 'scaler': None, 'ensemble': None, 'drift_profile': None,
+              'quartier_codes': None, 'manifest': None}
     try:
         with open('models/lgbm_model.pkl', 'rb') as f:
             models['lgb'] = pickle.load(f)
     except Exception as e:
         st.warning(f"⚠️ LightGBM: {e}")
     try:
+        # Import différé : TensorFlow n'est chargé que sans bundle
+        from tensorflow import keras
         # Charger LSTM avec compile=False pour éviter les erreurs de compatibilité
         models['lstm'] = keras.models.load_model('models/lstm_model.keras', compile=False)
         # Compiler manuellement avec les bons paramètres
@@ -35,66 +64,263 @@ def load_models_cached():
         st.error(f"❌ Scaler: {e}")
     return models
 
-def create_time_features(date_time):
-    month = date_time.month
-    if month in [12, 1, 2]:
-        saison = 1
-    elif month in [3, 4, 5]:
-        saison = 2
-    elif month in [6, 7, 8]:
-        saison = 3
-    else:
-        saison = 4
-    is_peak_hour = 1 if 18 <= date_time.hour <= 22 else 0
-    return {'hour': date_time.hour, 'day_of_week': date_time.weekday(), 'month': date_time.month, 'saison': saison, 'is_peak_hour': is_peak_hour}
-
-def make_prediction_single(models, quartier, temp, humidite, vent, conso, time_features):
-    lgb_model = models['lgb']
-    lstm_model = models['lstm']
-    scaler = models['scaler']
-    if lgb_model is None or scaler is None:
+@st.cache_resource
+def get_model_registry():
+    # Un registre par processus : bundle (poids mappés, sans TensorFlow) rechargé
+    # à chaud quand models/bundle/ change, pickles en repli au démarrage
+    return ModelRegistry(fallback=load_legacy_models).start()
+
+def load_models_cached():
+    # Jeu de modèles actif au début du rerun : toute la page utilise la même version
+    registry = get_model_registry()
+    registry.report_metrics()
+    return registry.get()
+
+@st.cache_resource
+def start_metrics_exporter():
+    """Sert /metrics (Prometheus) si DAKAR_METRICS_PORT est défini ; une seule fois par processus."""
+    port = os.environ.get('DAKAR_METRICS_PORT')
+    if not port:
         return None
+    metrics.enable()
+    return metrics.start_metrics_server(int(port))
+
+def make_prediction_single(models, quartier, temp, humidite, vent, conso, timestamp):
     try:
-        features = [temp, humidite, vent, conso, time_features['hour'], time_features['day_of_week'], time_features['month'], time_features['saison'], time_features['is_peak_hour']]
-        features_array = np.array([features])
-        features_scaled = scaler.transform(features_array)
-        try:
-            pred_lgb = float(lgb_model.predict(features_scaled)[0]) * 100
-        except:
-            try:
-                pred_lgb = lgb_model.predict_proba(features_scaled)[0][1] * 100
-            except:
-                pred_lgb = 50.0
-        if lstm_model is not None:
-            try:
-                features_lstm = features_scaled.reshape(1, 1, -1)
-                pred_lstm = float(lstm_model.predict(features_lstm, verbose=0)[0][0]) * 100
-            except:
-                pred_lstm = pred_lgb
-        else:
-            pred_lstm = pred_lgb
-        risque_base = (pred_lgb + pred_lstm) / 2
-        adjustment = QUARTIER_ADJUSTMENT.get(quartier, 1.0)
-        risque_ajuste = risque_base * adjustment
-        pred_lgb = np.clip(pred_lgb, 0, 100)
-        pred_lstm = np.clip(pred_lstm, 0, 100)
-        risque_ajuste = np.clip(risque_ajuste, 0, 100)
-        return pred_lgb, pred_lstm, risque_ajuste
+        preds = predict_batch(models, build_features(timestamp, temp, humidite, vent, conso), [quartier])
+        if preds is None:
+            return None
+        metrics.inc('predictions_total', quartier=quartier)
+        return preds['lgb'][0], preds['lstm'][0], preds['risque'][0]
     except Exception as e:
+        metrics.inc('prediction_errors_total', stage='inference')
         st.error(f"❌ Erreur: {e}")
         return None
 
+@st.cache_resource
+def get_zone_registry():
+    # Registre des zones (data/zones.csv ou DAKAR_ZONES) et son index spatial, une fois par processus
+    return load_zones()
+
+# Au-delà, la carte ne dessine que les zones les plus à risque du cadre
+MAX_MAP_ZONES = 2000
+
+def predict_visible_zones(models, registry, center, radius_km, temp, humidite, vent, conso, timestamp):
+    """Risque des seules zones du cadre affiché (disque centre / rayon), en un appel vectorisé."""
+    index, distances = registry.within(center[0], center[1], radius_km)
+    zones = score_zones(models, registry, index, timestamp, temp, humidite, vent, conso)
+    if len(zones):
+        zones['distance_km'] = distances
+    return zones
+
+def zoom_for_radius(radius_km):
+    # Zoom mapbox affichant environ 2 x radius_km de large (~40 000 km au zoom 0)
+    return float(np.clip(np.log2(40000 / (2.5 * max(radius_km, 0.1))), 3, 16))
+
+@st.cache_data(ttl=600, show_spinner=False)
+def compute_forecast(_models, version, start, hours, temp, humidite, vent, conso):
+    # _models n'est pas haché (objet de cache_resource) : la version des modèles fait partie de la clé
+    return forecast_risk(_models, QUARTIERS_DAKAR, start, hours, temp, humidite, vent, conso)
+
+def create_forecast_heatmap(forecast):
+    if forecast is None or len(forecast) == 0:
+        return None
+    grid = to_heatmap(forecast)
+    fig = go.Figure(go.Heatmap(
+        z=grid.to_numpy(), x=grid.columns, y=grid.index, zmin=0, zmax=100,
+        colorscale=RISK_COLORSCALE,
+        colorbar=dict(title="Risque (%)"),
+        hovertemplate='<b>%{y}</b><br>%{x|%d/%m %Hh}<br>Risque: %{z:.1f}%<extra></extra>'
+    ))
+    fig.update_layout(title="Risque heure par heure", xaxis_title="Heure", height=450)
+    return fig
+
+def create_forecast_chart(forecast, quartier):
+    if forecast is None or len(forecast) == 0:
+        return None
+    df_q = forecast[forecast['quartier'] == quartier]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=df_q['date_heure'], y=df_q['risque'], mode='lines', name='Risque',
+        line=dict(width=2, color='#00bcd4'), fill='tozeroy',
+        hovertemplate='%{x|%d/%m %Hh}<br>Risque: %{y:.1f}%<extra></extra>'
+    ))
+    add_risk_thresholds(fig)
+    fig.update_layout(title=f"Prévision - {quartier}", xaxis_title="Heure", yaxis_title="Risque (%)", yaxis=dict(range=[0, 100]), height=400)
+    return fig
+
+@st.cache_data(ttl=600, show_spinner=False)
+def compute_sweep(_models, version, quartier, timestamp, base, feature_x, feature_y=None, n_points=50):
+    return sweep(_models, quartier, timestamp, base, feature_x, feature_y, n_points)
+
+def dataset_watermark(dataset):
+    # Repère des données pour les clés de cache : change quand l'historique est rechargé ou complété
+    frame = dataset.frame
+    return len(frame), str(frame.index.max())
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def compute_partial_dependence(_models, version, _dataset, watermark, feature):
+    # L'échantillon d'historique est fixe (graine) : la clé est la version, les données et la feature
+    return partial_dependence(_models, _dataset.frame, feature)
+
+DRIFT_COLORS = {'stable': '#28a745', 'modérée': '#ffc107', 'forte': '#dc3545', 'insuffisant': '#adb5bd'}
+
+def summarize_drift(monitor):
+    # Rapport et histogrammes (attendu / observé) : objets sérialisables pour st.cache_data
+    features = list(monitor.profile.features)
+    histograms = {name: monitor.histogram(name) for name in features}
+    histograms['risque'] = monitor.histogram('risque')
+    return {'report': monitor.report(), 'histogrammes': histograms}
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def compute_drift_history(_models, version, _dataset, watermark, days):
+    # Derniers `days` jours de l'historique, scorés puis comparés au profil du bundle ;
+    # clé : empreinte du bundle (version) et repère des données (watermark)
+    frame = _dataset.frame
+    recent = frame[frame.index >= frame.index.max() - pd.Timedelta(days=days)]
+    scored = score_frame(_models, recent.rename_axis('date_heure').reset_index(), 'date_heure')
+    return summarize_drift(monitor_frame(_models['drift_profile'], scored))
+
+@st.cache_data(show_spinner=False)
+def load_drift_state(_profile, version, path, mtime):
+    # Relu quand le flux réécrit l'état (clé : date de modification du fichier)
+    return summarize_drift(DriftMonitor.load_state(_profile, path))
+
+def create_drift_psi_chart(features):
+    if features is None or len(features) == 0:
+        return None
+    labels = [f"{f} (calendaire)" if c else f if g else f"{f} (hors statut)"
+              for f, c, g in zip(features['feature'], features['calendaire'], features['statut_global'])]
+    fig = go.Figure(go.Bar(
+        x=features['psi'], y=labels, orientation='h',
+        marker=dict(color=[DRIFT_COLORS[s] for s in features['derive']]),
+        customdata=np.column_stack([features['derive'], features['ks']]),
+        hovertemplate='<b>%{y}</b><br>PSI: %{x:.3f}<br>KS: %{customdata[1]:.3f}<br>Dérive: %{customdata[0]}<extra></extra>'
+    ))
+    fig.add_vline(x=PSI_THRESHOLDS[0], line_dash="dash", line_color="#ffc107")
+    fig.add_vline(x=PSI_THRESHOLDS[1], line_dash="dash", line_color="#dc3545")
+    fig.update_layout(title="PSI par feature", xaxis_title="PSI", yaxis=dict(autorange='reversed'), height=400)
+    return fig
+
+def create_drift_histogram(histogram, name):
+    if histogram is None or len(histogram) == 0:
+        return None
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=histogram['classe'], y=histogram['attendu'] * 100, name='Entraînement', marker_color='#adb5bd'))
+    fig.add_trace(go.Bar(x=histogram['classe'], y=histogram['observe'] * 100, name='Observé', marker_color='#00bcd4'))
+    fig.update_layout(title=f"Distribution - {FEATURE_LABELS.get(name, name)}", xaxis_title="Classe", yaxis_title="Part (%)", barmode='group', height=400)
+    return fig
+
+def explain_single(models, quartier, temp, humidite, vent, conso, timestamp):
+    # Contributions d'un scénario (None si indisponibles : précision 'binned', modèles manquants)
+    contributions = explain_batch(models, build_features(timestamp, temp, humidite, vent, conso), [quartier])
+    return None if contributions is None else contributions[0]
+
+# Lignes scorées par bloc pour l'importance cumulée de l'historique
+EXPLAIN_CHUNK = 20_000
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def compute_explain_history(_models, version, _dataset, watermark, days):
+    # Derniers `days` jours, scorés avec contributions bloc par bloc ; seule l'importance cumulée est gardée
+    frame = _dataset.frame
+    recent = frame[frame.index >= frame.index.max() - pd.Timedelta(days=days)].rename_axis('date_heure').reset_index()
+    aggregator = ImportanceAggregator()
+    for start in range(0, len(recent), EXPLAIN_CHUNK):
+        chunk = recent.iloc[start:start + EXPLAIN_CHUNK]
+        aggregator.update_frame(score_frame(_models, chunk, 'date_heure', explain=True))
+    return {'global': aggregator.importance(), 'par_quartier': aggregator.top_drivers(len(DRIVERS)), 'lignes': aggregator.rows}
+
+def create_waterfall_chart(contributions, risque):
+    # Du niveau de base au logit du risque : une barre par facteur, du plus influent au moins influent
+    if contributions is None:
+        return None
+    drivers = drivers_frame(contributions)
+    base = contributions[-1]
+    fig = go.Figure(go.Waterfall(
+        orientation='h', measure=['absolute'] + ['relative'] * len(drivers) + ['total'],
+        y=['Base'] + list(drivers['libelle']) + [f"Risque {risque:.1f}%"],
+        x=[base] + list(drivers['contribution']) + [0],
+        increasing=dict(marker=dict(color='#dc3545')), decreasing=dict(marker=dict(color='#28a745')),
+        totals=dict(marker=dict(color='#00bcd4')),
+        hovertemplate='<b>%{y}</b><br>%{x:+.3f}<extra></extra>'
+    ))
+    fig.update_layout(title="Contributions au risque (logit)", xaxis_title="Logit du risque", yaxis=dict(autorange='reversed'), height=500)
+    return fig
+
+def create_importance_chart(importance):
+    if importance is None or len(importance) == 0:
+        return None
+    fig = go.Figure(go.Bar(
+        x=importance['importance'], y=importance['libelle'], orientation='h',
+        marker=dict(color=['#dc3545' if e > 0 else '#28a745' for e in importance['effet_moyen']]),
+        customdata=importance['effet_moyen'],
+        hovertemplate='<b>%{y}</b><br>Importance: %{x:.3f}<br>Effet moyen: %{customdata:+.3f}<extra></extra>'
+    ))
+    fig.update_layout(title="Importance globale (moyenne des |contributions|)", xaxis_title="Logit", yaxis=dict(autorange='reversed'), height=450)
+    return fig
+
+def create_drivers_heatmap(par_quartier):
+    if par_quartier is None or len(par_quartier) == 0:
+        return None
+    grid = par_quartier.pivot(index='quartier', columns='facteur', values='importance')
+    order = grid.mean().sort_values(ascending=False).index
+    grid = grid[order]
+    fig = go.Figure(go.Heatmap(
+        z=grid.to_numpy(), x=[DRIVER_LABELS[f] for f in order], y=grid.index,
+        colorscale='Reds', colorbar=dict(title="Importance"),
+        hovertemplate='<b>%{y}</b><br>%{x}: %{z:.3f}<extra></extra>'
+    ))
+    fig.update_layout(title="Importance des facteurs par quartier", height=450)
+    return fig
+
+def create_sensitivity_chart(df_sweep, feature, base_value=None):
+    if df_sweep is None or len(df_sweep) == 0:
+        return None
+    fig = go.Figure()
+    for col, name, color, dash in [('risque', 'Risque ajusté', '#dc3545', 'solid'), ('lgb', 'LightGBM', '#28a745', 'dot'), ('lstm', 'LSTM', '#00bcd4', 'dot')]:
+        fig.add_trace(go.Scatter(
+            x=df_sweep[feature], y=df_sweep[col], mode='lines', name=name,
+            line=dict(color=color, width=2 if col == 'risque' else 1.5, dash=dash),
+            hovertemplate=f'<b>{name}</b><br>%{{x:.1f}} → %{{y:.1f}}%<extra></extra>'
+        ))
+    if base_value is not None:
+        fig.add_vline(x=base_value, line_dash="dash", line_color="gray", annotation_text="Curseur")
+    add_risk_thresholds(fig, annotate=False)
+    fig.update_layout(title=f"Réponse du risque - {FEATURE_LABELS[feature]}", xaxis_title=FEATURE_LABELS[feature], yaxis_title="Risque (%)", yaxis=dict(range=[0, 100]), hovermode='x unified', height=450)
+    return fig
+
+def create_sensitivity_surface(df_sweep, feature_x, feature_y):
+    if df_sweep is None or len(df_sweep) == 0:
+        return None
+    grid = df_sweep.pivot(index=feature_y, columns=feature_x, values='risque')
+    fig = go.Figure(go.Contour(
+        z=grid.to_numpy(), x=grid.columns, y=grid.index, zmin=0, zmax=100,
+        colorscale=[[0, RISK_COLORS[0]], [SEUIL_MOYEN / 100, RISK_COLORS[1]], [SEUIL_ELEVE / 100, RISK_COLORS[2]], [1, "#8b0000"]],
+        contours=dict(showlabels=True), colorbar=dict(title="Risque (%)"),
+        hovertemplate=f'{FEATURE_LABELS[feature_x]}: %{{x:.1f}}<br>{FEATURE_LABELS[feature_y]}: %{{y:.1f}}<br>Risque: %{{z:.1f}}%<extra></extra>'
+    ))
+    fig.update_layout(title="Surface de risque", xaxis_title=FEATURE_LABELS[feature_x], yaxis_title=FEATURE_LABELS[feature_y], height=500)
+    return fig
+
+def create_pdp_chart(pdp, feature):
+    if pdp is None or len(pdp) == 0:
+        return None
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=pdp[feature], y=pdp['p90'], mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'))
+    fig.add_trace(go.Scatter(x=pdp[feature], y=pdp['p10'], mode='lines', line=dict(width=0), fill='tonexty', fillcolor='rgba(0,188,212,0.2)', name='P10-P90'))
+    fig.add_trace(go.Scatter(x=pdp[feature], y=pdp['moyenne'], mode='lines', name='Moyenne', line=dict(color='#00bcd4', width=2)))
+    fig.update_layout(title=f"Dépendance partielle LightGBM - {FEATURE_LABELS[feature]}", xaxis_title=FEATURE_LABELS[feature], yaxis_title="Probabilité (%)", height=400)
+    return fig
+
 def get_risk_color(risque_pct):
-    if risque_pct < 40:
-        return "#28a745"
-    elif risque_pct < 70:
-        return "#ffc107"
-    else:
-        return "#dc3545"
+    return str(RISK_COLORS[risk_levels(risque_pct)])
+
+def get_risk_level(risque_pct):
+    return str(LEVELS[risk_levels(risque_pct)])
 
 def create_gauge_chart(risque, quartier):
     color = get_risk_color(risque)
-    niveau = "FAIBLE" if risque < 40 else ("MOYEN" if risque < 70 else "ÉLEVÉ")
+    niveau = get_risk_level(risque)
     
     fig = go.Figure(go.Indicator(
         mode="gauge+number",
@@ -106,9 +332,9 @@ def create_gauge_chart(risque, quartier):
             'axis': {'range': [None, 100], 'tickwidth': 2},
             'bar': {'color': color, 'thickness': 0.75},
             'steps': [
-                {'range': [0, 40], 'color': '#d4edda'},
-                {'range': [40, 70], 'color': '#fff3cd'},
-                {'range': [70, 100], 'color': '#f8d7da'}
+                {'range': [0, SEUIL_MOYEN], 'color': RISK_BACKGROUNDS[0]},
+                {'range': [SEUIL_MOYEN, SEUIL_ELEVE], 'color': RISK_BACKGROUNDS[1]},
+                {'range': [SEUIL_ELEVE, 100], 'color': RISK_BACKGROUNDS[2]}
             ]
         }
     ))
@@ -121,32 +347,24 @@ def create_gauge_chart(risque, quartier):
     fig.update_layout(height=350, margin=dict(l=20, r=20, t=40, b=20))
     return fig
 
-def create_map(results):
-    df_map = []
-    for result in results:
-        quartier = result['Quartier']
-        if quartier in COORDONNEES_QUARTIERS:
-            coords = COORDONNEES_QUARTIERS[quartier]
-            r = result['Risque']
-            niveau = "FAIBLE" if r < 40 else ("MOYEN" if r < 70 else "ÉLEVÉ")
-            df_map.append({
-                'Quartier': quartier, 'Latitude': coords['lat'], 'Longitude': coords['lon'],
-                'Risque': r, 'Niveau': niveau
-            })
-    df_map = pd.DataFrame(df_map)
-    df_map['Couleur'] = df_map['Risque'].apply(get_risk_color)
-    df_map['Taille'] = 10 + (df_map['Risque'] / 100) * 40
-    
+def create_map(zones, center, zoom):
+    if len(zones) > MAX_MAP_ZONES:
+        zones = zones.nlargest(MAX_MAP_ZONES, 'risque')
+    risque = zones['risque'].to_numpy()
+    couleurs = RISK_COLORS[risk_levels(risque)]
+    # Marqueurs plus petits quand le cadre contient beaucoup de zones
+    base = 10 if len(zones) <= 50 else 5
+
     fig = go.Figure()
     fig.add_trace(go.Scattermapbox(
-        lat=df_map['Latitude'], lon=df_map['Longitude'], mode='markers',
-        marker=dict(size=df_map['Taille'], color=df_map['Couleur'], opacity=0.8),
-        text=df_map['Quartier'],
-        customdata=df_map[['Risque', 'Niveau']],
-        hovertemplate='<b>%{text}</b><br>Risque: %{customdata[0]:.1f}%<br>Niveau: %{customdata[1]}<extra></extra>'
+        lat=zones['lat'], lon=zones['lon'], mode='markers',
+        marker=dict(size=base + risque / 100 * base * 4, color=couleurs, opacity=0.8),
+        text=zones['nom'],
+        customdata=np.column_stack([risque.astype(object), zones['niveau'].to_numpy(object), zones['quartier'].to_numpy(object)]),
+        hovertemplate='<b>%{text}</b><br>%{customdata[2]}<br>Risque: %{customdata[0]:.1f}%<br>Niveau: %{customdata[1]}<extra></extra>'
     ))
     fig.update_layout(
-        mapbox=dict(style="open-street-map", center=dict(lat=14.7167, lon=-17.4677), zoom=10),
+        mapbox=dict(style="open-street-map", center=dict(lat=center[0], lon=center[1]), zoom=zoom),
         title="Carte des Risques",
         height=600,
         margin=dict(l=0, r=0, t=40, b=0)
@@ -158,8 +376,8 @@ def create_bar_chart_quartiers(df_stats):
         return None
     df_sorted = df_stats.sort_values('taux_coupure', ascending=False)
     risques_pct = (df_sorted['taux_coupure'] * 100).tolist()
-    colors = [get_risk_color(r) for r in risques_pct]
-    niveaux = ["FAIBLE" if r < 40 else ("MOYEN" if r < 70 else "ÉLEVÉ") for r in risques_pct]
+    codes = risk_levels(risques_pct)
+    colors, niveaux = RISK_COLORS[codes].tolist(), LEVELS[codes].tolist()
     
     fig = go.Figure()
     fig.add_trace(go.Bar(
@@ -171,35 +389,26 @@ def create_bar_chart_quartiers(df_stats):
     fig.update_layout(title="Taux de Coupure", xaxis_title="Quartier", yaxis_title="Taux (%)", height=500)
     return fig
 
-def create_temporal_chart(df_hist, quartier_filter):
-    if df_hist is None or len(df_hist) == 0:
+def create_temporal_chart(dataset, quartier_filter, granularite='H'):
+    if dataset is None or len(dataset) == 0:
         return None
     try:
-        df = df_hist.copy()
-        date_col = None
-        for col in ['timestamp', 'date', 'datetime', 'time']:
-            if col in df.columns:
-                date_col = col
-                break
-        if date_col is None:
-            df['index_date'] = pd.date_range(start='2023-01-01', periods=len(df), freq='H')
-            date_col = 'index_date'
-        df[date_col] = pd.to_datetime(df[date_col])
-        df = df.sort_values(date_col)
-        if quartier_filter != "Tous" and 'quartier' in df.columns:
-            df = df[df['quartier'] == quartier_filter]
-        df_sample = df.sample(min(1000, len(df))).sort_values(date_col)
+        df = dataset.rollups[granularite].get(quartier_filter)
+        if df is None or len(df) == 0:
+            return None
         
         fig = go.Figure()
-        if 'conso_megawatt' in df_sample.columns:
+        if 'conso_megawatt' in df.columns:
+            df_conso = downsample(df, 'conso_megawatt')
             fig.add_trace(go.Scatter(
-                x=df_sample[date_col], y=df_sample['conso_megawatt'],
+                x=df_conso['period'], y=df_conso['conso_megawatt'],
                 mode='lines', name='Consommation', line=dict(color='#00bcd4', width=1.5),
                 fill='tozeroy', hovertemplate='<b>Conso</b><br>%{y:.0f} MW<extra></extra>'
             ))
-        if 'temp_celsius' in df_sample.columns:
+        if 'temp_celsius' in df.columns:
+            df_temp = downsample(df, 'temp_celsius')
             fig.add_trace(go.Scatter(
-                x=df_sample[date_col], y=df_sample['temp_celsius'],
+                x=df_temp['period'], y=df_temp['temp_celsius'],
                 mode='lines', name='Température', line=dict(color='#ff5722', width=1.5, dash='dot'),
                 yaxis='y2', hovertemplate='<b>Temp</b><br>%{y:.1f}°C<extra></extra>'
             ))
@@ -211,46 +420,33 @@ def create_temporal_chart(df_hist, quartier_filter):
             hovermode='x unified', height=500
         )
         return fig
-    except:
+    except Exception:
         return None
 
-def create_risk_trend_chart(df_hist, quartier_filter):
-    if df_hist is None or len(df_hist) == 0 or 'coupure' not in df_hist.columns:
+def create_risk_trend_chart(dataset, quartier_filter, granularite='D'):
+    if dataset is None or len(dataset) == 0:
         return None
     try:
-        df = df_hist.copy()
-        date_col = None
-        for col in ['timestamp', 'date', 'datetime', 'time']:
-            if col in df.columns:
-                date_col = col
-                break
-        if date_col is None:
-            df['index_date'] = pd.date_range(start='2023-01-01', periods=len(df), freq='H')
-            date_col = 'index_date'
-        df[date_col] = pd.to_datetime(df[date_col])
-        if quartier_filter != "Tous" and 'quartier' in df.columns:
-            df = df[df['quartier'] == quartier_filter]
-        df = df.sort_values(date_col)
-        df_daily = df.groupby(df[date_col].dt.date).agg({'coupure': ['sum', 'count']}).reset_index()
-        df_daily.columns = ['date', 'coupures', 'total']
-        df_daily['taux'] = (df_daily['coupures'] / df_daily['total'] * 100)
-        df_daily['niveau'] = df_daily['taux'].apply(lambda t: "FAIBLE" if t < 40 else ("MOYEN" if t < 70 else "ÉLEVÉ"))
-        df_daily['couleur'] = df_daily['taux'].apply(get_risk_color)
+        df_daily = dataset.rollups[granularite].get(quartier_filter)
+        if df_daily is None or len(df_daily) == 0 or 'taux' not in df_daily.columns:
+            return None
+        df_daily = downsample(df_daily, 'taux')
+        taux = df_daily['taux'].to_numpy()
+        codes = risk_levels(taux)
+        niveaux, couleurs = LEVELS[codes], RISK_COLORS[codes]
         
         fig = go.Figure()
         fig.add_trace(go.Scatter(
-            x=df_daily['date'], y=df_daily['taux'],
+            x=df_daily['period'], y=taux,
             mode='lines+markers', name='Taux', line=dict(width=2, color='#28a745'),
-            marker=dict(size=6, color=df_daily['couleur']),
+            marker=dict(size=6, color=couleurs),
             fill='tozeroy',
-            customdata=df_daily[['niveau', 'coupures']],
+            customdata=np.column_stack([niveaux, df_daily['coupures'].to_numpy()]),
             hovertemplate='<b>%{x}</b><br>Taux: %{y:.1f}%<br>Niveau: %{customdata[0]}<extra></extra>'
         ))
-        fig.add_hline(y=40, line_dash="dash", line_color="#ffc107", annotation_text="Seuil MOYEN")
-        fig.add_hline(y=70, line_dash="dash", line_color="#dc3545", annotation_text="Seuil ÉLEVÉ")
+        add_risk_thresholds(fig)
         title = f"Tendance - {quartier_filter}" if quartier_filter != "Tous" else "Tendance"
         fig.update_layout(title=title, xaxis_title="Date", yaxis_title="Taux (%)", height=500)
         return fig
-    except:
+    except Exception:
         return None
-
@@ -0,0 +1,46 @@
+"""
+Fixtures communes : petit jeu de relevés (src/scenarios.py), modèles
+entraînés en quelques millisecondes et serveur REST local (src/rest_stub.py).
+"""
+
+import sys
+from pathlib import Path
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.config import MODEL_CONFIG
+from src.rest_stub import LocalRestServer
+from src.scenarios import Scenario, generate_scenario
+
+
+@pytest.fixture(scope='session')
+def readings() -> pd.DataFrame:
+    """Deux jours de relevés pour trois quartiers, avec une colonne `evenement` hors schéma."""
+    scenario = Scenario.from_dict({
+        'nom': 'tests', 'graine': 7, 'debut': '2024-06-01', 'fin': '2024-06-02 23:00',
+        'quartiers': ['Yoff', 'Pikine', 'Dakar-Plateau'],
+        'evenements': [{'type': 'orage', 'debut': '2024-06-02 12:00', 'fin': '2024-06-02 18:00'}]
+    })
+    return generate_scenario(scenario)
+
+
+@pytest.fixture(scope='session')
+def models(readings) -> dict:
+    """LightGBM et scaler minimaux (sans LSTM ni ensemble) : assez pour score_frame."""
+    X = readings[MODEL_CONFIG['features']].to_numpy(dtype=np.float64)
+    scaler = StandardScaler().fit(X)
+    booster = lgb.train({'objective': 'binary', 'verbose': -1, 'num_leaves': 4},
+                        lgb.Dataset(scaler.transform(X), label=readings['coupure'].to_numpy()),
+                        num_boost_round=5)
+    return {'lgb': booster, 'lstm': None, 'scaler': scaler, 'ensemble': None}
+
+
+@pytest.fixture
+def rest_server():
+    with LocalRestServer() as server:
+        yield server
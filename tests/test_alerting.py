@@ -0,0 +1,116 @@
+"""Alertes (src/alerting.py) : indépendance au découpage en lots, déduplication, limite de débit."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import alerting
+from src.alerting import AlertEngine, LevelCrossing, MemorySink, RateOfChange, SustainedHigh, risk_levels
+from src.config import SEUILS_RISQUE
+
+
+def _stream(n_zones: int = 12, hours: int = 120, seed: int = 0) -> pd.DataFrame:
+    # Marche aléatoire horaire par zone, relevés entrelacés dans l'ordre d'arrivée
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2024-05-01', periods=hours, freq='h')
+    risque = np.clip(50 + np.cumsum(rng.normal(0, 9, (hours, n_zones)), axis=0), 0, 100)
+    frame = pd.DataFrame({'date_heure': np.repeat(dates, n_zones),
+                          'quartier': np.tile([f"Z{i}" for i in range(n_zones)], hours),
+                          'risque': risque.ravel()})
+    # Quelques relevés manquants (ignorés) et arrivées dans le désordre entre zones
+    frame.loc[rng.random(len(frame)) < 0.02, 'risque'] = np.nan
+    return frame.sample(frac=1, random_state=seed).sort_values('date_heure', kind='stable').reset_index(drop=True)
+
+
+def _run(stream: pd.DataFrame, batch_size: int, **kwargs):
+    engine = AlertEngine(max_per_minute=None, **kwargs)
+    alerts = []
+    for start in range(0, len(stream), batch_size):
+        alerts += engine.evaluate(stream.iloc[start:start + batch_size])
+    return alerts, engine
+
+
+@pytest.mark.parametrize('cooldown', [0.0, 3 * 3600.0])
+def test_same_alerts_whatever_the_batch_size(cooldown):
+    stream = _stream()
+    expected, engine = _run(stream, len(stream), cooldown=cooldown)
+    assert {a['regle'] for a in expected} == {'changement_niveau', 'risque_prolonge', 'hausse_rapide'}
+    for batch_size in (1, 7, 50, 333):
+        alerts, other = _run(stream, batch_size, cooldown=cooldown)
+        assert alerts == expected, batch_size
+        assert other.stats == engine.stats
+
+
+def test_levels_follow_config():
+    seuils = [SEUILS_RISQUE['moyen'], SEUILS_RISQUE['eleve']]
+    values = [0, seuils[0] - 0.01, seuils[0], seuils[1] - 0.01, seuils[1], 100]
+    assert risk_levels(values).tolist() == [0, 0, 1, 1, 2, 2]
+
+
+def _readings(zone, hours, risque):
+    return pd.DataFrame({'quartier': zone, 'date_heure': pd.date_range('2024-05-01', periods=hours, freq='h'),
+                         'risque': risque})
+
+
+def test_cooldown_deduplicates_per_zone_and_rule():
+    # Oscillations MOYEN / ÉLEVÉ toutes les heures pendant 6 h
+    risque = [50, 80] * 3
+    engine = AlertEngine(rules=[LevelCrossing(on_down=False)], cooldown=3 * 3600, max_per_minute=None)
+    alerts = engine.evaluate(pd.concat([_readings('A', 6, risque), _readings('B', 6, risque)]))
+    # Par zone : hausses à 1 h, 3 h, 5 h ; la deuxième tombe dans le délai
+    assert [(a['zone'], a['date_heure'][11:13]) for a in alerts] == [('A', '01'), ('A', '05'), ('B', '01'), ('B', '05')]
+    assert engine.stats['deduplicated'] == 2
+
+    # Délai suivi d'un lot à l'autre : hausse à 7 h écartée (2 h après 5 h), à 9 h envoyée
+    later = _readings('A', 10, [50] * 6 + [50, 80, 50, 80]).iloc[6:]
+    assert engine.evaluate(later.iloc[:2]) == []
+    assert [a['date_heure'][11:13] for a in engine.evaluate(later.iloc[2:])] == ['09']
+    assert engine.stats['deduplicated'] == 3
+
+
+def test_sustained_high_fires_once_per_episode():
+    risque = [80] * 5 + [30] + [80] * 4
+    engine = AlertEngine(rules=[SustainedHigh(hours=3)], cooldown=0, max_per_minute=None)
+    alerts = engine.evaluate(_readings('A', 10, risque))
+    assert [a['date_heure'][11:13] for a in alerts] == ['03', '09']
+
+
+def test_rate_of_change_across_batches():
+    engine = AlertEngine(rules=[RateOfChange(delta=20, span=3)], cooldown=0, max_per_minute=None)
+    readings = _readings('A', 6, [10, 12, 14, 35, 36, 37])
+    assert engine.evaluate(readings.iloc[:3]) == []
+    alerts = engine.evaluate(readings.iloc[3:])
+    assert [a['date_heure'][11:13] for a in alerts] == ['03', '04', '05']
+
+
+def test_token_bucket_keeps_most_severe_and_reports_drops(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(alerting.time, 'monotonic', lambda: now[0])
+    sink = MemorySink()
+    engine = AlertEngine(rules=[LevelCrossing()], sinks=[sink], cooldown=0, max_per_minute=3)
+
+    # 4 hausses vers MOYEN (warning) puis 2 vers ÉLEVÉ (critical), dans un seul lot
+    zones = [f"Z{i}" for i in range(6)]
+    engine.evaluate(pd.DataFrame({'quartier': zones, 'risque': 10.0, 'date_heure': '2024-05-01 00:00'}))
+    alerts = engine.evaluate(pd.DataFrame({'quartier': zones, 'risque': [50] * 4 + [90] * 2,
+                                           'date_heure': '2024-05-01 01:00'}))
+    assert [a['severite'] for a in alerts] == ['critical', 'critical', 'warning']
+    assert [a['zone'] for a in alerts] == ['Z4', 'Z5', 'Z0']
+    assert engine.stats['rate_limited'] == 3
+
+    # Seau vide : rien ne part avant le remplissage (3 jetons par minute)
+    assert engine.evaluate(pd.DataFrame({'quartier': ['Z0'], 'risque': [10.0], 'date_heure': ['2024-05-01 02:00']})) == []
+    assert engine.stats['rate_limited'] == 4
+
+    # 20 s plus tard : un jeton, utilisé par la synthèse des alertes écartées
+    now[0] += 20
+    alerts = engine.evaluate(pd.DataFrame({'quartier': ['Z0'], 'risque': [50.0], 'date_heure': ['2024-05-01 03:00']}))
+    assert [a['regle'] for a in alerts] == ['limite_debit']
+    assert alerts[0]['message'].startswith('4 alerte(s)')
+    assert engine.stats['rate_limited'] == 5
+
+    # Dix minutes plus tard : seau plein, plafonné à max_per_minute
+    now[0] += 600
+    alerts = engine.evaluate(pd.DataFrame({'quartier': zones, 'risque': 95.0, 'date_heure': '2024-05-01 04:00'}))
+    assert [a['regle'] for a in alerts] == ['limite_debit', 'changement_niveau', 'changement_niveau']
+    assert len(sink.alerts) == 3 + 1 + 3
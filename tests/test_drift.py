@@ -0,0 +1,58 @@
+"""Statut de dérive (src/drift.py) d'une fenêtre courte contre un profil annuel."""
+
+import numpy as np
+import pytest
+
+from src.config import MODEL_CONFIG
+from src.drift import DriftProfile, monitor_frame
+from src.scenarios import Scenario, generate_scenario
+
+
+@pytest.fixture(scope='module')
+def year():
+    scenario = Scenario.from_dict({'nom': 'annee', 'graine': 3, 'debut': '2023-01-01', 'fin': '2023-12-31 23:00',
+                                   'quartiers': ['Yoff', 'Dakar-Plateau']})
+    df = generate_scenario(scenario)
+    # Risque saisonnier : plus élevé en saison chaude
+    df['risque'] = 5 + df['temp_celsius'] + np.random.default_rng(0).normal(0, 1, len(df))
+    return df
+
+
+def _profile(df, monthly: bool = True) -> DriftProfile:
+    X = df[MODEL_CONFIG['features']].to_numpy(dtype=np.float64)
+    mois = df['mois'].to_numpy() if monthly else None
+    profile = DriftProfile.fit(X, df['risque'].to_numpy(), df['quartier'], mois=mois)
+    if not monthly:
+        for spec in profile.features.values():
+            spec.pop('par_mois', None)
+    return profile
+
+
+def _window(df, month: int):
+    return df[df['mois'] == month]
+
+
+def test_seasonal_window_is_stable(year):
+    report = monitor_frame(_profile(year), _window(year, 12)).report()
+    features = report['features'].set_index('feature')
+    assert features.loc['temp_celsius', 'reference'] == 'mois'
+    assert features.loc['temp_celsius', 'derive'] == 'stable'
+    assert report['statut'] == 'stable'
+
+
+def test_monthly_profile_still_detects_drift(year):
+    window = _window(year, 12).copy()
+    window['temp_celsius'] += 5
+    report = monitor_frame(_profile(year), window).report()
+    assert report['features'].set_index('feature').loc['temp_celsius', 'derive'] == 'forte'
+    assert report['statut'] == 'forte'
+
+
+def test_annual_profile_stays_out_of_status(year):
+    report = monitor_frame(_profile(year, monthly=False), _window(year, 12)).report()
+    features = report['features'].set_index('feature')
+    # Décembre contre l'année entière : forte, mais hors statut global
+    assert features.loc['temp_celsius', 'derive'] == 'forte'
+    assert not features.loc['temp_celsius', 'statut_global']
+    # Ni feature ni risque comparables sur cette fenêtre : pas de statut
+    assert report['statut'] == 'insuffisant'
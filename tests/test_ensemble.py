@@ -0,0 +1,30 @@
+"""Stacker logistique (src/ensemble.py) : garder ou retirer le LSTM."""
+
+import numpy as np
+
+from src.ensemble import fit_stacking_ensemble
+
+
+def _inputs(seed: int = 0, n: int = 20000):
+    rng = np.random.default_rng(seed)
+    signal = rng.normal(size=(n, 2))
+    y = (rng.random(n) < 1 / (1 + np.exp(-(-2 + signal[:, 0] + signal[:, 1])))).astype(int)
+    quartiers = rng.choice(['Yoff', 'Pikine', 'Fann'], size=n)
+    p_lgb = 1 / (1 + np.exp(-(-2 + signal[:, 0])))
+    return rng, signal, y, quartiers, p_lgb
+
+
+def test_noise_lstm_is_dropped():
+    # Ajusté et évalué sur les mêmes lignes, ce bruit « gagnerait » toujours un peu de log loss
+    for seed in range(3):
+        rng, _, y, quartiers, p_lgb = _inputs(seed)
+        ensemble = fit_stacking_ensemble(p_lgb, rng.random(len(y)), quartiers, y)
+        assert not ensemble.uses_lstm, ensemble.metrics
+
+
+def test_informative_lstm_is_kept():
+    _, signal, y, quartiers, p_lgb = _inputs()
+    p_lstm = 1 / (1 + np.exp(-(-2 + signal[:, 1])))
+    ensemble = fit_stacking_ensemble(p_lgb, p_lstm, quartiers, y)
+    assert ensemble.uses_lstm
+    assert ensemble.metrics['lstm_gain'] > 0.01
@@ -0,0 +1,92 @@
+"""Contributions TreeSHAP (src/explain.py) contre pred_contrib de LightGBM."""
+
+import lightgbm as lgb
+import numpy as np
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from src.config import MODEL_CONFIG
+from src.ensemble import StackingEnsemble
+from src.explain import CONTRIB_COLUMNS, DRIVERS, TreeExplainer, explain_batch
+from src.inference import predict_batch
+from src.quartiers import QUARTIERS, encode_quartiers
+
+N_FEATURES = len(MODEL_CONFIG['features'])
+QUARTIER_COLUMN = N_FEATURES
+
+
+def _features(rng, n: int) -> np.ndarray:
+    return rng.normal(size=(n, N_FEATURES)) * rng.uniform(1, 50, N_FEATURES) + rng.uniform(0, 100, N_FEATURES)
+
+
+@pytest.fixture(scope='module')
+def trained():
+    """Booster à 10 colonnes (features normalisées + code du quartier catégoriel), température parfois manquante."""
+    rng = np.random.default_rng(0)
+    n = 6000
+    X = _features(rng, n)
+    quartiers = rng.choice(QUARTIERS, size=n)
+    codes = encode_quartiers(quartiers)
+    scaler = StandardScaler().fit(X)
+    X_scaled = scaler.transform(X)
+    logit = X_scaled[:, 0] - 0.5 * X_scaled[:, 3] + np.where(codes % 3 == 0, 1.5, -1.0)
+    missing = rng.random(n) < 0.15
+    X[missing, 0] = np.nan
+    X_scaled[missing, 0] = np.nan
+    logit[missing] += 1.0
+    y = (rng.random(n) < 1 / (1 + np.exp(-logit))).astype(int)
+    matrix = np.column_stack([X_scaled, codes.astype(np.float64)])
+    booster = lgb.train({'objective': 'binary', 'verbose': -1, 'num_leaves': 15, 'min_data_in_leaf': 10,
+                         'min_data_per_group': 5, 'max_cat_to_onehot': 4},
+                        lgb.Dataset(matrix, label=y, categorical_feature=[QUARTIER_COLUMN]), num_boost_round=30)
+    return booster, scaler
+
+
+def _matrix(rng, n: int = 3000) -> np.ndarray:
+    X = np.column_stack([rng.normal(size=(n, N_FEATURES)) * 1.5, rng.integers(0, len(QUARTIERS), n)]).astype(np.float64)
+    X[rng.random(n) < 0.2, 0] = np.nan                       # manquante à l'entraînement
+    X[rng.random(n) < 0.1, 3] = np.nan                       # jamais manquante : NaN vaut 0
+    X[rng.random(n) < 0.1, QUARTIER_COLUMN] = np.nan         # quartier inconnu
+    X[rng.random(n) < 0.05, QUARTIER_COLUMN] = len(QUARTIERS) + 3  # code hors entraînement
+    return X
+
+
+def test_contributions_match_pred_contrib(trained):
+    booster, _ = trained
+    explainer = TreeExplainer(booster)
+    assert explainer.categorical == [QUARTIER_COLUMN]
+    assert 0 in explainer.nan_missing and 3 not in explainer.nan_missing
+
+    X = _matrix(np.random.default_rng(1))
+    phi = explainer.contributions(X)
+    assert np.allclose(phi, booster.predict(X, pred_contrib=True), rtol=0, atol=1e-9)
+    np.testing.assert_allclose(phi.sum(axis=1), booster.predict(X, raw_score=True), rtol=0, atol=1e-9)
+    # Le quartier contribue : les splits catégoriels sont bien couverts
+    assert np.abs(phi[:, QUARTIER_COLUMN]).max() > 0.1
+
+
+def test_contributions_without_quartier(models, readings):
+    booster = models['lgb']
+    X = models['scaler'].transform(readings[MODEL_CONFIG['features']].to_numpy(dtype=np.float64))
+    assert np.allclose(TreeExplainer(booster).contributions(X), booster.predict(X, pred_contrib=True),
+                       rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize('with_ensemble', [False, True])
+def test_explain_batch_sums_to_predicted_logit(trained, with_ensemble):
+    booster, scaler = trained
+    ensemble = (StackingEnsemble(-0.3, 0.8, 0.0, {'Yoff': 0.4, 'Pikine': -0.2}, uses_lstm=False)
+                if with_ensemble else None)
+    models = {'lgb': booster, 'scaler': scaler, 'lstm': None, 'ensemble': ensemble}
+    rng = np.random.default_rng(2)
+    X = _features(rng, 2000)
+    X[rng.random(len(X)) < 0.2, 0] = np.nan
+    quartiers = rng.choice(list(QUARTIERS) + ['Inconnu'], size=len(X))
+
+    contributions = explain_batch(models, X, quartiers)
+    assert contributions.shape == (len(X), len(CONTRIB_COLUMNS))
+    p = predict_batch(models, X, quartiers)['risque'] / 100
+    np.testing.assert_allclose(contributions.sum(axis=1), np.log(p / (1 - p)), rtol=0, atol=1e-8)
+    if with_ensemble:
+        # Sans LSTM, le risque est entièrement expliqué par LightGBM et le quartier
+        np.testing.assert_allclose(contributions[:, DRIVERS.index('lstm')], 0, atol=1e-8)
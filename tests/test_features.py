@@ -0,0 +1,39 @@
+"""Features temporelles (src/features.py) : même encodage que le générateur."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_generator import get_season, is_peak_hour
+from src.features import add_time_features, time_features
+
+
+@pytest.fixture(scope='module')
+def hours() -> pd.DatetimeIndex:
+    # Année bissextile : tous les mois, toutes les heures, tous les jours de la semaine
+    return pd.date_range('2024-01-01', '2024-12-31 23:00', freq='h')
+
+
+def test_time_features_match_generator(hours):
+    computed = time_features(hours)
+    np.testing.assert_array_equal(computed['saison'], [get_season(m) for m in hours.month])
+    np.testing.assert_array_equal(computed['is_peak_hour'], [int(is_peak_hour(h)) for h in hours.hour])
+    np.testing.assert_array_equal(computed['heure'], hours.hour)
+    np.testing.assert_array_equal(computed['jour_semaine'], hours.dayofweek)
+    np.testing.assert_array_equal(computed['mois'], hours.month)
+
+
+def test_every_month_and_hour(hours):
+    computed = time_features(hours)
+    for month in range(1, 13):
+        assert set(computed['saison'][hours.month == month]) == {get_season(month)}
+    for hour in range(24):
+        assert set(computed['is_peak_hour'][hours.hour == hour]) == {int(is_peak_hour(hour))}
+
+
+def test_add_time_features_from_strings(hours):
+    df = pd.DataFrame({'date_heure': hours.strftime('%Y-%m-%d %H:%M:%S')})
+    expected = time_features(hours)
+    result = add_time_features(df, 'date_heure')
+    for name, values in expected.items():
+        np.testing.assert_array_equal(result[name].to_numpy(), values)
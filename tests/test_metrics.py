@@ -0,0 +1,55 @@
+"""Métriques (src/metrics.py) lues pendant qu'elles sont mises à jour."""
+
+import sys
+import threading
+import time
+
+from src import metrics
+from src.metrics import Counter, Gauge, Histogram, SamplingProfiler
+
+
+def _busy(stop: threading.Event, depth: int):
+    # Piles de profondeurs variées : de nouvelles clés apparaissent dans le compteur
+    if depth:
+        return _busy(stop, depth - 1)
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_readers_while_sampling():
+    profiler = SamplingProfiler(interval=0.0005)
+    switch = sys.getswitchinterval()
+    # Changements de thread fréquents : le profileur écrit pendant que les lectures itèrent
+    sys.setswitchinterval(1e-6)
+    stop = threading.Event()
+    workers = [threading.Thread(target=_busy, args=(stop, depth), daemon=True) for depth in range(8)]
+    for worker in workers:
+        worker.start()
+    profiler.start()
+    try:
+        deadline = time.monotonic() + 1.0
+        while time.monotonic() < deadline:
+            profiler.collapsed()
+            profiler.top_functions(5)
+            if profiler.samples > 200:
+                profiler.clear()
+    finally:
+        profiler.stop()
+        stop.set()
+        sys.setswitchinterval(switch)
+    for worker in workers:
+        worker.join(timeout=1)
+
+
+def test_samples_do_not_hold_the_lock(monkeypatch):
+    # Un export lent (générateur suspendu) ne doit pas bloquer les mises à jour des autres threads
+    monkeypatch.setattr(metrics, '_enabled', True)
+    for metric, update in ((Counter('c'), 'inc'), (Gauge('g'), 'set'), (Histogram('h'), 'observe')):
+        getattr(metric, update)(1.0, zone='a')
+        samples = metric.samples()
+        next(samples)
+        writer = threading.Thread(target=lambda: getattr(metric, update)(2.0, zone='b'), daemon=True)
+        writer.start()
+        writer.join(timeout=1)
+        assert not writer.is_alive(), metric.type_name
+        list(samples)
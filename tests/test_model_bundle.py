@@ -0,0 +1,77 @@
+"""Bundle de modèles (src/model_bundle.py) : vérification et publication atomique."""
+
+import json
+import shutil
+import threading
+
+import numpy as np
+import pytest
+
+from src.config import MODEL_CONFIG
+from src.drift import DriftProfile
+from src.model_bundle import (MANIFEST_FILE, SCALER_MEAN_FILE, BundleError, add_drift_profile, load_bundle,
+                              save_bundle)
+
+
+@pytest.fixture
+def bundle(tmp_path, models):
+    return save_bundle(tmp_path / 'bundle', models['lgb'], models['scaler'], training={'rows': 1})
+
+
+def test_load_roundtrip(bundle, models, readings):
+    loaded = load_bundle(bundle)
+    X = readings[MODEL_CONFIG['features']].to_numpy(dtype=np.float64)
+    np.testing.assert_allclose(loaded['lgb'].predict(loaded['scaler'].transform(X)),
+                               models['lgb'].predict(models['scaler'].transform(X)))
+
+
+def test_tampered_file_is_rejected(bundle):
+    with open(bundle / SCALER_MEAN_FILE, 'r+b') as f:
+        f.seek(-1, 2)
+        last = f.read(1)
+        f.seek(-1, 2)
+        f.write(bytes([last[0] ^ 0xFF]))
+    with pytest.raises(BundleError, match=SCALER_MEAN_FILE):
+        load_bundle(bundle)
+
+
+def test_resave_never_exposes_missing_manifest(bundle, models, readings):
+    X = readings[MODEL_CONFIG['features']].to_numpy(dtype=np.float64)
+    profile = DriftProfile.fit(X, np.linspace(0, 100, len(X)), readings['quartier'])
+    stop, missing, seen = threading.Event(), [], set()
+
+    def watch():
+        while not stop.is_set():
+            try:
+                with open(bundle / MANIFEST_FILE, encoding='utf-8') as f:
+                    seen.add(json.load(f)['content_hash'])
+            except (OSError, ValueError) as e:
+                missing.append(e)
+
+    watcher = threading.Thread(target=watch)
+    watcher.start()
+    try:
+        for k in range(10):
+            save_bundle(bundle, models['lgb'], models['scaler'], training={'rows': k})
+            add_drift_profile(bundle, profile)
+    finally:
+        stop.set()
+        watcher.join()
+
+    assert not missing, missing[:3]
+    assert len(seen) > 1
+    loaded = load_bundle(bundle)
+    assert loaded['drift_profile'] is not None
+    # Versions gardées : la courante et la précédente
+    assert len(list(bundle.parent.glob('.bundle-v*'))) == 2
+    assert not list(bundle.parent.glob('.bundle-tmp-*'))
+
+
+def test_plain_directory_bundle_is_replaced(tmp_path, models):
+    # Bundle écrit avant la publication par lien : un vrai dossier
+    directory = tmp_path / 'bundle'
+    first = save_bundle(tmp_path / 'ancien', models['lgb'], models['scaler'])
+    shutil.copytree(first.resolve(), directory)
+    save_bundle(directory, models['lgb'], models['scaler'], training={'rows': 2})
+    assert directory.is_symlink()
+    assert load_bundle(directory)['manifest']['training'] == {'rows': 2}
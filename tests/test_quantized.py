@@ -0,0 +1,48 @@
+"""LightGBM à seuils discrétisés (src/quantized.py) contre le booster natif."""
+
+import lightgbm as lgb
+import numpy as np
+import pytest
+
+from src.quantized import BinnedForest
+
+
+@pytest.fixture(scope='module')
+def booster():
+    rng = np.random.default_rng(0)
+    n = 4000
+    X = rng.normal(size=(n, 4))
+    X[:, 3] = rng.integers(0, 6, n)
+    logit = 2 * X[:, 0] - X[:, 1] + np.where(X[:, 3] % 2 == 0, 1.0, -1.0)
+    # Feature 0 manquante à l'entraînement, et porteuse de signal quand elle l'est
+    missing = rng.random(n) < 0.2
+    X[missing, 0] = np.nan
+    logit[missing] += 3
+    y = (rng.random(n) < 1 / (1 + np.exp(-logit))).astype(int)
+    return lgb.train({'objective': 'binary', 'verbose': -1, 'num_leaves': 15, 'min_data_in_leaf': 5},
+                     lgb.Dataset(X, label=y, categorical_feature=[3]), num_boost_round=40)
+
+
+def _inputs(n: int = 2000, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 4)) * 2
+    X[:, 3] = rng.integers(-1, 8, n)
+    X[rng.random(n) < 0.3, 0] = np.nan
+    # Feature 1 sans valeur manquante à l'entraînement : NaN traité comme 0
+    X[rng.random(n) < 0.1, 1] = np.nan
+    # Code catégoriel manquant
+    X[rng.random(n) < 0.1, 3] = np.nan
+    return X
+
+
+def test_binned_matches_native_with_missing_values(booster):
+    X = _inputs()
+    forest = BinnedForest(booster)
+    assert forest.nan_missing == [0]
+    np.testing.assert_allclose(forest.predict_raw(X), booster.predict(X, raw_score=True), rtol=0, atol=1e-10)
+
+
+def test_binned_matches_native_on_finite_input(booster):
+    X = np.nan_to_num(_inputs(seed=2))
+    forest = BinnedForest(booster)
+    np.testing.assert_allclose(forest.predict_raw(X), booster.predict(X, raw_score=True), rtol=0, atol=1e-10)
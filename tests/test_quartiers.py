@@ -0,0 +1,28 @@
+"""Quartiers du registre absents de l'entraînement : servis comme inconnus."""
+
+import numpy as np
+
+from src.inference import model_codes
+from src.models import EMBEDDING_LAYER, build_lstm_model, reset_unseen_embeddings
+from src.quartiers import N_QUARTIERS, UNKNOWN_CODE, encode_quartiers
+
+
+def test_unseen_quartiers_map_to_unknown():
+    names = ['Yoff', 'Pikine', 'Fann', 'Atlantis', None]
+    seen = [int(c) for c in encode_quartiers(['Yoff', 'Guediawaye'])]
+    codes = model_codes({'quartier_codes': seen}, names)
+    assert codes[0] == encode_quartiers(['Yoff'])[0]
+    assert (codes[1:] == UNKNOWN_CODE).all()
+    # Bundle sans codes enregistrés : registre complet
+    assert (model_codes({}, names) == encode_quartiers(names)).all()
+
+
+def test_unseen_embedding_rows_use_seen_mean():
+    model = build_lstm_model(4, N_QUARTIERS)
+    seen = [0, 3]
+    replaced = reset_unseen_embeddings(model, seen)
+    table = model.get_layer(EMBEDDING_LAYER).get_weights()[0]
+    assert replaced == N_QUARTIERS + 1 - len(seen)
+    unseen = np.setdiff1d(np.arange(N_QUARTIERS + 1), seen)
+    np.testing.assert_allclose(table[unseen], np.broadcast_to(table[seen].mean(axis=0), table[unseen].shape),
+                               rtol=1e-6)
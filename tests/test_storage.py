@@ -0,0 +1,90 @@
+"""Backends de stockage (src/storage.py) : SQLite et REST (serveur local), mêmes attentes."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.storage import TABLES, RestBackend, SQLiteBackend
+
+
+@pytest.fixture(params=['sqlite', 'rest'])
+def backend(request):
+    if request.param == 'sqlite':
+        backend = SQLiteBackend(':memory:')
+        yield backend
+        backend.close()
+    else:
+        server = request.getfixturevalue('rest_server')
+        yield RestBackend(server.url)
+
+
+def _predictions(readings: pd.DataFrame) -> pd.DataFrame:
+    risque = np.linspace(0.05, 0.95, len(readings))
+    return readings.assign(proba_lgbm=risque, proba_lstm=risque, proba_moyenne=risque,
+                           prediction=(risque >= 0.5).astype(int), modele_utilise='tests', seuil_decision=0.5)
+
+
+def test_append_and_count(backend, readings):
+    writes = []
+    backend.add_listener(lambda table, rows: writes.append((table, rows)))
+
+    # `evenement` et les colonnes de scores ne sont pas dans le schéma : écartées
+    backend.append(readings, 'enregistrements')
+    backend.append(_predictions(readings), 'predictions')
+
+    assert writes == [('enregistrements', len(readings)), ('predictions', len(readings))]
+    for table in TABLES:
+        assert backend.get_table_count(table) == len(readings)
+        assert backend.estimate_table_count(table) == len(readings)
+
+
+def test_append_unknown_table(backend, readings):
+    with pytest.raises(ValueError):
+        backend.append(readings, 'inconnue')
+    assert backend.get_table_count('inconnue') == 0
+    with pytest.raises(Exception):
+        backend.get_table_count('inconnue', strict=True)
+
+
+def test_statistics_by_quartier(backend, readings):
+    backend.append(readings, 'enregistrements')
+
+    stats = backend.get_statistics_by_quartier()
+    expected = readings.groupby('quartier', observed=True)['coupure'].agg(['count', 'sum', 'mean'])
+    assert list(stats['risque_moyen']) == sorted(stats['risque_moyen'], reverse=True)
+    stats = stats.set_index('quartier').loc[expected.index]
+    assert list(stats['total_enregistrements']) == list(expected['count'])
+    assert list(stats['total_coupures']) == list(expected['sum'])
+    np.testing.assert_allclose(stats['taux_coupure'], expected['mean'])
+
+    filtered = backend.get_statistics_by_quartier('Yoff')
+    assert list(filtered['quartier']) == ['Yoff']
+
+
+def test_history_and_since(backend, readings):
+    predictions = _predictions(readings)
+    backend.append(predictions, 'predictions')
+    latest = pd.Timestamp(readings['date_heure'].max()) + pd.Timedelta(hours=1)
+    record = predictions.iloc[0].to_dict()
+    assert backend.save_prediction({**{c: record[c] for c in TABLES['predictions']},
+                                    'date_heure': latest.isoformat(), 'prediction': int(record['prediction'])})
+    total = len(predictions) + 1
+
+    history = backend.get_predictions_history(limit=5)
+    assert len(history) == 5
+    dates = pd.to_datetime(history['date_heure'], format='ISO8601')
+    assert dates.iloc[0] == latest
+    assert dates.is_monotonic_decreasing
+
+    # Curseur incrémental : pages d'id croissants, sans doublon ni trou
+    ids, since_id = [], 0
+    while True:
+        page = backend.get_predictions_since(since_id, limit=7)
+        if page.empty:
+            break
+        assert len(page) <= 7
+        ids += page['id'].tolist()
+        since_id = int(page['id'].iloc[-1])
+    assert len(ids) == total
+    assert ids == sorted(set(ids))
+    assert backend.get_predictions_since(since_id).empty
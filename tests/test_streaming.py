@@ -0,0 +1,37 @@
+"""Ingestion en continu (src/streaming.py) rejouée à travers le serveur REST local."""
+
+import pandas as pd
+
+from src.storage import TABLES, RestBackend
+from src.streaming import FileReplaySource, StreamIngestor
+
+
+def test_replay_stores_schema_columns_only(tmp_path, readings, models, rest_server):
+    path = tmp_path / 'releves.csv'
+    readings.to_csv(path, index=False)
+    ingestor = StreamIngestor(models, backend=RestBackend(rest_server.url), batch_size=50)
+
+    stats = ingestor.run(FileReplaySource(path))
+
+    assert stats['storage_errors'] == 0, ingestor.last_error
+    assert stats['stored_readings'] == len(readings)
+    assert stats['stored_predictions'] == len(readings)
+    stored, total = rest_server.store.select('enregistrements', {})
+    assert total == len(readings)
+    assert set(stored[0]) == set(TABLES['enregistrements']) | {'id'}
+    predictions, total = rest_server.store.select('predictions', {})
+    assert total == len(readings)
+    assert set(predictions[0]) == set(TABLES['predictions']) | {'id'}
+
+
+def test_stub_rejects_unknown_columns(readings, rest_server):
+    backend = RestBackend(rest_server.url)
+    frame = pd.DataFrame(readings.head(3)).assign(risque=12.5)
+
+    # Le backend écarte les colonnes hors schéma ; un envoi brut est rejeté comme par PostgREST
+    backend.append(frame, 'enregistrements')
+    assert rest_server.store.count('enregistrements') == 3
+    response = backend._request('POST', 'raw', f"{rest_server.url}/rest/v1/enregistrements",
+                                headers=backend.headers, json=[{'quartier': 'Yoff', 'risque': 12.5}])
+    assert response.status_code == 400
+    assert rest_server.store.count('enregistrements') == 3
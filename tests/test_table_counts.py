@@ -0,0 +1,44 @@
+"""Comptages en cache (src/table_counts.py) quand le backend tombe en panne."""
+
+import time
+
+import pytest
+
+from src.storage import SQLiteBackend, schema_columns
+from src.table_counts import TableCounts
+
+
+@pytest.fixture
+def backend(readings):
+    backend = SQLiteBackend(':memory:')
+    backend.append(schema_columns(readings, 'enregistrements'), 'enregistrements')
+    yield backend
+    backend.close()
+
+
+def _break(monkeypatch, backend):
+    def failing(*args, **kwargs):
+        raise ConnectionError("base indisponible")
+    monkeypatch.setattr(backend, '_query', failing)
+
+
+def test_failure_keeps_last_count(monkeypatch, backend, readings):
+    counts = TableCounts(backend, ttl=0.0, failure_ttl=60.0)
+    assert counts.count('enregistrements') == len(readings)
+
+    _break(monkeypatch, backend)
+    assert counts.count('enregistrements') == len(readings)
+    assert counts.count('enregistrements', mode='exact') == len(readings)
+
+
+def test_failure_is_cached_briefly(monkeypatch, backend, readings):
+    counts = TableCounts(backend, ttl=60.0, failure_ttl=0.05)
+    with monkeypatch.context() as patch:
+        _break(patch, backend)
+        assert counts.count('enregistrements') == 0
+        assert counts.kind('enregistrements') is None
+
+    # Backend rétabli : relu après failure_ttl, pas après le TTL complet
+    time.sleep(0.06)
+    assert counts.count('enregistrements') == len(readings)
+    assert counts.kind('enregistrements') == 'exact'